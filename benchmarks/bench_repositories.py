@@ -0,0 +1,338 @@
+"""
+Замеры операций репозиториев на синтетическом каталоге: загрузка, добавление, изменение статуса,
+удаление, задержки поиска (перцентили), занимаемая память и размер файлов.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_repositories --sizes 10000 100000 --output results.json
+    python -m benchmarks.bench_repositories --sizes 1000000 --backends json sqlite
+    python -m benchmarks.bench_repositories --compare baseline.json --output current.json
+
+Результат выводится в формате JSON (в stdout или в файл --output). С --compare замеры сравниваются
+с результатом другого коммита, и в stderr выводятся метрики, ухудшившиеся больше чем в --threshold раз.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Callable
+
+from benchmarks.synthetic_catalog import SyntheticCatalog
+from main import JOURNAL_THRESHOLD
+from src.application.dto.page_request import PageRequest
+from src.application.dto.search_criteria import SearchCriteria
+from src.application.interfaces.library_repository import LibraryRepository
+from src.application.use_cases.add_book import AddBookUseCase
+from src.domain.value_objects.book_status import BookStatus
+from src.infrastructure.repositories.columnar_library_repository import ColumnarLibraryRepository
+from src.infrastructure.repositories.json_library_repository import JsonLibraryRepository
+from src.infrastructure.repositories.mmap_library_repository import MmapLibraryRepository
+from src.infrastructure.repositories.sharded_library_repository import ShardedLibraryRepository
+from src.infrastructure.repositories.sqlite_library_repository import SqliteLibraryRepository
+from src.infrastructure.serialization.catalog_file import write_catalog
+
+# Книги, добавляемые в хранилище за одну транзакцию при заполнении
+POPULATE_BATCH = 10000
+
+
+@dataclass
+class Backend:
+    """
+    Описание хранилища для замеров.
+    file_name - имя файла данных (None для хранилища в памяти), populate - запись каталога
+    в файл, open - открытие репозитория (для хранилища в памяти - построение из каталога).
+    """
+    file_name: str | None
+    populate: Callable[[str, SyntheticCatalog], None]
+    open: Callable[[str, SyntheticCatalog], LibraryRepository]
+
+
+def populate_json(path: str, catalog: SyntheticCatalog) -> None:
+    """
+    Записывает каталог JSON-хранилища в формате, выбранном по расширению файла.
+    """
+    write_catalog(path, catalog.count + 1, (JsonLibraryRepository._book_to_record(book) for book in catalog.books()))
+
+
+def populate_through_repository(repository: LibraryRepository, catalog: SyntheticCatalog) -> None:
+    """
+    Заполняет хранилище пакетами книг.
+    """
+    batch = []
+    for book in catalog.books():
+        batch.append(book)
+        if len(batch) == POPULATE_BATCH:
+            repository.add_books_to_library(batch)
+            batch = []
+    repository.add_books_to_library(batch)
+    close = getattr(repository, "close", None)
+    if close is not None:
+        close()
+
+
+BACKENDS = {
+    "json": Backend(
+        "books.json", populate_json,
+        lambda path, catalog: JsonLibraryRepository(path, journal_threshold=JOURNAL_THRESHOLD),
+    ),
+    # Тот же JSON-каталог в компактном формате JSON lines и сжатый gzip
+    "jsonl": Backend(
+        "books.jsonl", populate_json,
+        lambda path, catalog: JsonLibraryRepository(path, journal_threshold=JOURNAL_THRESHOLD),
+    ),
+    "jsonl.gz": Backend(
+        "books.jsonl.gz", populate_json,
+        lambda path, catalog: JsonLibraryRepository(path, journal_threshold=JOURNAL_THRESHOLD),
+    ),
+    "sqlite": Backend(
+        "books.sqlite3",
+        lambda path, catalog: populate_through_repository(SqliteLibraryRepository(path), catalog),
+        lambda path, catalog: SqliteLibraryRepository(path),
+    ),
+    "mmap": Backend(
+        "books.rec",
+        lambda path, catalog: populate_through_repository(MmapLibraryRepository(path), catalog),
+        lambda path, catalog: MmapLibraryRepository(path),
+    ),
+    "columnar": Backend(
+        None, lambda path, catalog: None,
+        lambda path, catalog: ColumnarLibraryRepository(catalog.books()),
+    ),
+    # Поиск по столбцам в шардах, по одному рабочему процессу на ядро
+    "sharded": Backend(
+        None, lambda path, catalog: None,
+        lambda path, catalog: ShardedLibraryRepository(ColumnarLibraryRepository(catalog.books())),
+    ),
+}
+
+
+def summarize(samples: list[float]) -> dict:
+    """
+    Сводка по задержкам: среднее, перцентили и максимум в миллисекундах.
+    :param samples: Задержки в секундах.
+    """
+    ordered = sorted(samples)
+
+    def percentile(p: float) -> float:
+        return ordered[round(p / 100 * (len(ordered) - 1))] * 1000
+
+    return {
+        "count": len(ordered),
+        "mean_ms": sum(ordered) / len(ordered) * 1000,
+        "p50_ms": percentile(50),
+        "p95_ms": percentile(95),
+        "p99_ms": percentile(99),
+        "max_ms": ordered[-1] * 1000,
+    }
+
+
+def timed(action: Callable[[], object]) -> float:
+    """
+    :return: Время выполнения action в секундах.
+    """
+    started = time.perf_counter()
+    action()
+    return time.perf_counter() - started
+
+
+def open_and_load(backend: Backend, path: str, catalog: SyntheticCatalog) -> LibraryRepository:
+    """
+    Открывает репозиторий и выполняет первое обращение к данным (ленивые хранилища загружаются при нём).
+    """
+    repository = backend.open(path, catalog)
+    repository.get_book_by_id(1)
+    return repository
+
+
+def close_repository(repository: LibraryRepository) -> None:
+    close = getattr(repository, "close", None)
+    if close is not None:
+        close()
+
+
+def files_size(directory: str) -> int:
+    """
+    :return: Суммарный размер файлов хранилища (данные, журналы, снимки, кучи строк).
+    """
+    return sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory))
+
+
+def search_workload(catalog: SyntheticCatalog, count: int) -> dict[str, list[Callable]]:
+    """
+    Готовит поисковые запросы разных видов. Слова выбираются с той же частотой, что и в названиях,
+    поэтому среди запросов есть и частые, и редкие слова.
+    :param catalog: Каталог.
+    :param count: Количество запросов каждого вида.
+    :return: Словарь: вид запроса -> функции, выполняющие запрос на репозитории.
+    """
+    rng = random.Random(catalog.seed + 3)
+    words = catalog.sample_words(count)
+    authors = [rng.choice(catalog.authors).split()[-1] for _ in range(count)]
+    years = [rng.randint(1800, 2024) for _ in range(count)]
+
+    def typo(word: str) -> str:
+        position = rng.randrange(len(word))
+        return word[:position] + word[position + 1:]
+
+    return {
+        "title": [lambda r, w=w: r.search_book_in_library(SearchCriteria(title=w)) for w in words],
+        "author": [lambda r, a=a: r.search_book_in_library(SearchCriteria(author=a)) for a in authors],
+        "year": [lambda r, y=y: r.search_book_in_library(SearchCriteria(year=y)) for y in years],
+        "year_range_and_status": [
+            lambda r, y=y: r.search_book_in_library(
+                SearchCriteria(year_from=y, year_to=y + 5, status=BookStatus.ISSUED, match_all=True))
+            for y in years
+        ],
+        "first_page_by_title": [
+            lambda r, w=w: list(r.iter_books(PageRequest(limit=20, order_by="title"), SearchCriteria(title=w)))
+            for w in words
+        ],
+        "ranked_with_typo": [lambda r, q=typo(w): r.search_ranked(q) for w in words],
+        "suggest": [lambda r, p=w[:3]: r.suggest(p) for w in words],
+    }
+
+
+def bench_backend(name: str, catalog: SyntheticCatalog, operations: int, searches: int, memory: bool) -> dict:
+    """
+    Выполняет все замеры для одного хранилища и одного размера каталога.
+    """
+    backend = BACKENDS[name]
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, backend.file_name or "unused")
+        result = {"backend": name, "books": catalog.count}
+        result["populate_s"] = timed(lambda: backend.populate(path, catalog))
+
+        # Первое открытие JSON-хранилища пишет двоичный снимок - замеряем повторное, обычное открытие
+        close_repository(open_and_load(backend, path, catalog))
+        if memory:
+            tracemalloc.start()
+            repository = open_and_load(backend, path, catalog)
+            result["memory_bytes"] = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            close_repository(repository)
+
+        started = time.perf_counter()
+        repository = open_and_load(backend, path, catalog)
+        result["load_s"] = time.perf_counter() - started
+
+        latencies = {}
+        for kind, queries in search_workload(catalog, searches).items():
+            # Первый запрос вида может строить ленивый индекс - он учитывается отдельно
+            first = timed(lambda: queries[0](repository))
+            samples = [timed(lambda: query(repository)) for query in queries[1:]] or [first]
+            latencies[kind] = {"first_ms": first * 1000, **summarize(samples)}
+        result["search"] = latencies
+
+        rng = random.Random(catalog.seed + 4)
+        book_ids = rng.sample(range(1, catalog.count + 1), min(operations, catalog.count))
+        add_book = AddBookUseCase(repository)
+        result["change_status"] = summarize([
+            timed(lambda: repository.change_book_status(book_id, BookStatus.ISSUED)) for book_id in book_ids
+        ])
+        result["add"] = summarize([
+            timed(lambda: add_book.execute("Новая книга", "Новый Автор", 2024)) for _ in book_ids
+        ])
+        result["remove"] = summarize([
+            timed(lambda: repository.remove_book_from_library(book_id)) for book_id in book_ids
+        ])
+        close_repository(repository)
+        result["file_bytes"] = files_size(directory) if backend.file_name else None
+    return result
+
+
+def metadata(seed: int) -> dict:
+    """
+    Сведения об окружении для сравнения результатов между коммитами.
+    """
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": seed,
+    }
+
+
+def flatten(result: dict, prefix: str = "") -> dict[str, float]:
+    """
+    Разворачивает вложенные замеры в плоский словарь "search.title.p95_ms" -> значение.
+    """
+    flat = {}
+    for key, value in result.items():
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{prefix}{key}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool) and key not in ("books", "count"):
+            flat[prefix + key] = value
+    return flat
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> list[str]:
+    """
+    Сравнивает результаты двух запусков.
+    :param baseline: Результат предыдущего запуска.
+    :param current: Текущий результат.
+    :param threshold: Во сколько раз метрика должна вырасти, чтобы считаться ухудшением.
+    :return: Строки с описанием ухудшившихся метрик.
+    """
+    previous = {(item["backend"], item["books"]): flatten(item) for item in baseline["results"]}
+    regressions = []
+    for item in current["results"]:
+        before = previous.get((item["backend"], item["books"]))
+        if before is None:
+            continue
+        for metric, value in flatten(item).items():
+            old = before.get(metric)
+            if old and value / old > threshold:
+                regressions.append(f"{item['backend']} / {item['books']} / {metric}: {old:.4g} -> {value:.4g} "
+                                   f"(x{value / old:.2f})")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000],
+                        help="Размеры каталога (по умолчанию 10000 100000; для 1M укажите 1000000)")
+    parser.add_argument("--backends", nargs="+", choices=sorted(BACKENDS), default=sorted(BACKENDS),
+                        help="Хранилища для замеров (по умолчанию все)")
+    parser.add_argument("--operations", type=int, default=200, help="Количество добавлений, удалений и изменений статуса")
+    parser.add_argument("--searches", type=int, default=200, help="Количество запросов каждого вида")
+    parser.add_argument("--seed", type=int, default=42, help="Начальное значение генератора каталога")
+    parser.add_argument("--no-memory", action="store_true", help="Не замерять память (замер замедляет загрузку)")
+    parser.add_argument("--output", help="Файл для результата (по умолчанию stdout)")
+    parser.add_argument("--compare", help="Результат предыдущего запуска для сравнения")
+    parser.add_argument("--threshold", type=float, default=1.2, help="Порог ухудшения для --compare")
+    args = parser.parse_args()
+
+    report = {"meta": metadata(args.seed), "results": []}
+    for size in args.sizes:
+        catalog = SyntheticCatalog(size, seed=args.seed)
+        for name in args.backends:
+            print(f"{name}: {size} книг...", file=sys.stderr, flush=True)
+            report["results"].append(bench_backend(name, catalog, args.operations, args.searches, not args.no_memory))
+
+    payload = json.dumps(report, ensure_ascii=False, indent=4)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(payload + "\n")
+    else:
+        print(payload)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            regressions = compare(json.load(file), report, args.threshold)
+        print("\n".join(regressions) if regressions else "Ухудшений не найдено.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Замер времени запуска JsonLibraryRepository: разбор JSON против чтения двоичного снимка.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_startup --books 100000
+Результат выводится в формате JSON.
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from src.infrastructure.repositories.json_library_repository import JsonLibraryRepository
+
+
+def write_catalog(path: str, count: int) -> None:
+    """
+    Записывает синтетический каталог в формате books.json.
+    :param path: Путь к файлу.
+    :param count: Количество книг.
+    """
+    books = [
+        {
+            "book_id": book_id,
+            "title": f"Книга номер {book_id}",
+            "author": f"Автор {book_id % 5000}",
+            "year": 1900 + book_id % 120,
+            "status": "Выдана" if book_id % 3 == 0 else "В наличии",
+        }
+        for book_id in range(1, count + 1)
+    ]
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump({"next_book_id": count + 1, "books": books}, file, ensure_ascii=False, indent=4)
+
+
+def measure(data_file: str) -> dict:
+    """
+    Замеряет создание репозитория и первое обращение к данным.
+    :param data_file: Путь к JSON-файлу.
+    :return: Время создания и первого обращения в секундах.
+    """
+    started = time.perf_counter()
+    repository = JsonLibraryRepository(data_file)
+    constructed = time.perf_counter()
+    repository.get_book_by_id(1)
+    loaded = time.perf_counter()
+    return {"construct_s": constructed - started, "first_access_s": loaded - constructed}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--books", type=int, default=100000, help="Количество книг в каталоге")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data_file = os.path.join(tmp_dir, "books.json")
+        write_catalog(data_file, args.books)
+        # Первый запуск читает JSON и записывает двоичный снимок, второй читает снимок
+        from_json = measure(data_file)
+        from_snapshot = measure(data_file)
+        result = {
+            "books": args.books,
+            "json_bytes": os.path.getsize(data_file),
+            "snapshot_bytes": os.path.getsize(data_file + ".bin"),
+            "from_json": from_json,
+            "from_snapshot": from_snapshot,
+        }
+    print(json.dumps(result, indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Генератор синтетического каталога для замеров производительности.
+
+Каталог детерминирован: при одинаковых seed и количестве книг получаются одинаковые книги,
+поэтому результаты замеров разных коммитов можно сравнивать между собой.
+"""
+import random
+from typing import Iterator
+
+from src.domain.entities.book import Book
+from src.domain.value_objects.book_status import BookStatus
+
+SYLLABLES = (
+    "ба", "ве", "ги", "да", "ле", "ми", "но", "пра", "ро", "сто", "ти", "фе", "ха", "ца", "че",
+    "ша", "ар", "ен", "ис", "ол", "ур", "кра", "зна", "вол", "мир", "дом", "лес", "град", "свет", "бор",
+)
+
+# Размер словаря названий и доля авторов от числа книг
+VOCABULARY_SIZE = 20000
+BOOKS_PER_AUTHOR = 20
+
+
+class SyntheticCatalog:
+    """
+    Синтетический каталог: названия из 1-5 слов с неравномерной (близкой к закону Ципфа)
+    частотой слов, авторы с несколькими книгами, годы издания и статусы.
+    """
+
+    def __init__(self, count: int, seed: int = 42) -> None:
+        """
+        :param count: Количество книг.
+        :param seed: Начальное значение генератора случайных чисел.
+        """
+        self.count = count
+        self.seed = seed
+        rng = random.Random(seed)
+        self.words = sorted({self._word(rng) for _ in range(VOCABULARY_SIZE)})
+        rng.shuffle(self.words)
+        # Вес слова обратно пропорционален его рангу - частые слова встречаются во многих названиях
+        self._weights = [1 / rank for rank in range(1, len(self.words) + 1)]
+        self.authors = [
+            f"{self._word(rng).title()} {self._word(rng).title()}"
+            for _ in range(max(1, count // BOOKS_PER_AUTHOR))
+        ]
+
+    @staticmethod
+    def _word(rng: random.Random) -> str:
+        return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+
+    def books(self) -> Iterator[Book]:
+        """
+        Перебирает книги каталога с ID от 1 до count.
+        """
+        rng = random.Random(self.seed + 1)
+        titles = iter(())
+        for book_id in range(1, self.count + 1):
+            # Слова названий выбираются пачками - так генерация заметно быстрее
+            title = next(titles, None)
+            if title is None:
+                titles = iter(self._titles(rng, 10000))
+                title = next(titles)
+            yield Book(
+                book_id=book_id,
+                title=title,
+                author=rng.choice(self.authors),
+                year=rng.randint(1800, 2024),
+                status=BookStatus.ISSUED if rng.random() < 1 / 3 else BookStatus.AVAILABLE,
+            )
+
+    def _titles(self, rng: random.Random, count: int) -> list[str]:
+        lengths = [rng.randint(1, 5) for _ in range(count)]
+        words = rng.choices(self.words, self._weights, k=sum(lengths))
+        titles, position = [], 0
+        for length in lengths:
+            titles.append(" ".join(words[position:position + length]).capitalize())
+            position += length
+        return titles
+
+    def sample_words(self, count: int, seed: int = 0) -> list[str]:
+        """
+        Возвращает слова для поисковых запросов с той же частотой, с какой они встречаются в названиях.
+        :param count: Количество слов.
+        :param seed: Начальное значение генератора случайных чисел.
+        """
+        return random.Random(self.seed + 2 + seed).choices(self.words, self._weights, k=count)
@@ -1,28 +1,382 @@
+import argparse
+import asyncio
+import os
+import sys
+from contextlib import nullcontext
+from typing import Iterator
+
+from src.application.interfaces.library_repository import LibraryRepository
+from src.application.interfaces.loan_repository import LoanRepository
+from src.application.cache.search_result_cache import SearchResultCache
+from src.application.deduplication.duplicate_detector import DuplicateDetector
+from src.application.dto.bulk_operation_report import BulkOperationReport
+from src.application.dto.import_report import ImportReport
+from src.application.events.observable_repository import ObservableLibraryRepository
+from src.application.metrics.instrumentation import InstrumentedRepository, instrument_use_case
+from src.application.metrics.metrics_registry import MetricsRegistry
 from src.application.use_cases.add_book import AddBookUseCase
+from src.application.use_cases.borrower_loans import BorrowerLoansUseCase
+from src.application.use_cases.bulk_add_books import BulkAddBooksUseCase
+from src.application.use_cases.bulk_change_status import BulkChangeStatusUseCase
+from src.application.use_cases.bulk_remove_books import BulkRemoveBooksUseCase
+from src.application.use_cases.catalog_statistics import CatalogStatisticsUseCase
 from src.application.use_cases.change_status import ChangeBookStatusUseCase
+from src.application.use_cases.duplicate_clusters import DuplicateClustersUseCase
+from src.application.use_cases.export_books import ExportBooksUseCase
+from src.application.use_cases.issue_book import IssueBookUseCase
+from src.application.use_cases.list_books import ListBooksUseCase
+from src.application.use_cases.overdue_loans import OverdueLoansUseCase
+from src.application.use_cases.ranked_search import RankedSearchUseCase
 from src.application.use_cases.remove_book import RemoveBookUseCase
+from src.application.use_cases.return_book import ReturnBookUseCase
 from src.application.use_cases.search_book import SearchBookUseCase
+from src.application.use_cases.suggest import SuggestUseCase
+from src.domain.value_objects.book_status import BookStatus
 from src.infrastructure.repositories.json_library_repository import JsonLibraryRepository
-from src.presentation.cli.menu import display_menu, add_book, delete_book, search_books, display_books, change_status
+from src.infrastructure.repositories.jsonl_loan_repository import JsonLinesLoanRepository
+from src.infrastructure.repositories.mmap_library_repository import MmapLibraryRepository
+from src.infrastructure.repositories.sharded_library_repository import ShardedLibraryRepository
+from src.infrastructure.repositories.sqlite_library_repository import SqliteLibraryRepository
+from src.infrastructure.serialization.atomic_write import atomic_write
+from src.infrastructure.serialization.book_records import read_records, write_records
+from src.infrastructure.serialization.catalog_file import catalog_extension
+from src.presentation.cli.menu import (
+    display_menu, add_book, delete_book, search_books, display_books, change_status, issue_book, return_book,
+    display_overdue_loans, display_borrower_loans, show_statistics, show_duplicates, show_metrics
+)
+from src.presentation.server.library_server import LibraryServer
+
+# Размер журнала изменений (в байтах), после которого он сворачивается в новый снимок books.json
+JOURNAL_THRESHOLD = 1024 * 1024
+
+# Файлы данных по умолчанию для каждого хранилища
+DEFAULT_DATA_FILES = {
+    "json": "src/infrastructure/database/books.json",
+    "sqlite": "src/infrastructure/database/books.sqlite3",
+    "mmap": "src/infrastructure/database/books.rec",
+}
+
+
+def parse_args() -> argparse.Namespace:
+    """
+    Разбирает аргументы командной строки.
+    :return: Пространство имён с выбранным хранилищем и путём к файлу данных.
+    """
+    parser = argparse.ArgumentParser(description="Система управления библиотекой")
+    parser.add_argument("--backend", choices=sorted(DEFAULT_DATA_FILES), default="json",
+                        help="Хранилище каталога (по умолчанию json)")
+    parser.add_argument("--data", help="Путь к файлу данных (по умолчанию зависит от хранилища)")
+    parser.add_argument("--loans", help="Путь к файлу выдач (по умолчанию <файл данных>.loans.jsonl)")
+    parser.add_argument("--shards", type=int, default=0,
+                        help="Искать по критериям параллельно в N процессах (шарды каталога по диапазонам ID)")
+    parser.add_argument("--metrics", action="store_true",
+                        help="Собирать метрики: время сценариев и операций хранилища, объём чтения и записи")
+    parser.add_argument("--metrics-file",
+                        help="Записать метрики в файл в формате Prometheus при завершении (включает сбор метрик)")
+
+    # Без команды запускается интерактивное меню
+    commands = parser.add_subparsers(dest="command")
+    import_parser = commands.add_parser("import", help="Импортировать книги из файла .csv или .jsonl")
+    import_parser.add_argument("file", help="Путь к файлу с книгами")
+    import_parser.add_argument("--batch-size", type=int, default=1000, help="Количество книг в одной транзакции")
+    import_parser.add_argument("--allow-duplicates", action="store_true",
+                               help="Не отклонять книги, которые уже есть в каталоге "
+                                    "(по ISBN или названию, автору и году)")
+    export_parser = commands.add_parser("export", help="Выгрузить каталог в файл .csv или .jsonl")
+    export_parser.add_argument("file", help="Путь к файлу для выгрузки")
+    set_status_parser = commands.add_parser("set-status", help="Изменить статус книг из списка ID (инвентаризация)")
+    set_status_parser.add_argument("file", help="Файл с ID книг, по одному в строке (\"-\" - стандартный ввод)")
+    set_status_parser.add_argument("--status", required=True, choices=[status.value for status in BookStatus],
+                                   help="Новый статус книг")
+    remove_parser = commands.add_parser("remove", help="Удалить книги из списка ID (списание)")
+    remove_parser.add_argument("file", help="Файл с ID книг, по одному в строке (\"-\" - стандартный ввод)")
+    commands.add_parser("duplicates",
+                        help="Вывести группы дубликатов: книги с общим ISBN или названием, автором и годом")
+    migrate_parser = commands.add_parser(
+        "migrate", help="Перевести JSON-каталог (--data) в формат по расширению: .json, .jsonl, .jsonl.gz, .jsonl.xz")
+    migrate_parser.add_argument("file", help="Путь к новому файлу каталога")
+    serve_parser = commands.add_parser("serve", help="Запустить сервер для клиентов (протокол JSON lines)")
+    serve_parser.add_argument("--host", default="127.0.0.1", help="Адрес TCP-сокета")
+    serve_parser.add_argument("--port", type=int, default=8765, help="Порт TCP-сокета")
+    serve_parser.add_argument("--socket", help="Путь к Unix-сокету вместо TCP")
+    return parser.parse_args()
+
+
+def create_repository(backend: str, data_file: str | None, metrics: MetricsRegistry | None = None,
+                      shards: int = 0) -> LibraryRepository:
+    """
+    Создаёт репозиторий выбранного типа.
+    :param backend: Тип хранилища ("json", "sqlite" или "mmap").
+    :param data_file: Путь к файлу данных или None для пути по умолчанию.
+    :param metrics: Реестр метрик или None, чтобы не собирать метрики.
+    :param shards: Количество процессов параллельного поиска или 0, чтобы искать в текущем процессе.
+    :return: Экземпляр репозитория, публикующий события изменений (ObservableLibraryRepository);
+        с шардами - поверх ShardedLibraryRepository, при сборе метрик - обёрнутый InstrumentedRepository.
+    """
+    data_file = data_file or DEFAULT_DATA_FILES[backend]
+    if backend == "sqlite":
+        repository = SqliteLibraryRepository(data_file)
+    elif backend == "mmap":
+        repository = MmapLibraryRepository(data_file)
+    else:
+        repository = JsonLibraryRepository(data_file, journal_threshold=JOURNAL_THRESHOLD, metrics=metrics)
+    if shards:
+        repository = ShardedLibraryRepository(repository, shards)
+    repository = ObservableLibraryRepository(repository)
+    return repository if metrics is None else InstrumentedRepository(repository, metrics)
+
+
+def create_loan_repository(backend: str, data_file: str | None, loans_file: str | None) -> LoanRepository:
+    """
+    Создаёт хранилище выдач. По умолчанию файл выдач лежит рядом с файлом каталога.
+    :param backend: Тип хранилища каталога.
+    :param data_file: Путь к файлу каталога или None для пути по умолчанию.
+    :param loans_file: Путь к файлу выдач или None, чтобы вывести его из пути к файлу каталога.
+    :return: Экземпляр хранилища выдач.
+    """
+    if loans_file is None:
+        data_file = data_file or DEFAULT_DATA_FILES[backend]
+        # Расширение каталога отбрасывается целиком: books.jsonl.gz -> books.loans.jsonl, как и для books.json
+        extension = catalog_extension(data_file)
+        if data_file.lower().endswith(extension):
+            loans_file = data_file[:-len(extension)] + ".loans.jsonl"
+        else:
+            loans_file = os.path.splitext(data_file)[0] + ".loans.jsonl"
+    return JsonLinesLoanRepository(loans_file)
+
+
+def write_metrics_file(metrics: MetricsRegistry, path: str) -> None:
+    """
+    Записывает метрики в формате Prometheus. Файл заменяется атомарно, чтобы сборщик
+    (например, textfile-коллектор node_exporter) не прочитал его недописанным.
+    :param metrics: Реестр метрик.
+    :param path: Путь к файлу.
+    """
+    atomic_write(path, metrics.render_prometheus().encode("utf-8"))
+
+
+def import_books(repo: LibraryRepository, path: str, batch_size: int, check_duplicates: bool = True) -> None:
+    """
+    Импортирует книги из файла без интерактивного меню, выводя прогресс после каждого пакета.
+    :param repo: Репозиторий библиотеки.
+    :param path: Путь к файлу .csv или .jsonl.
+    :param batch_size: Количество книг в одной транзакции.
+    :param check_duplicates: Отклонять книги, которые уже есть в каталоге или повторяются в файле.
+    """
+    def report_progress(report: ImportReport) -> None:
+        print(f"\rОбработано записей: {report.processed}, добавлено: {report.imported}, "
+              f"ошибок: {len(report.errors)}", end="", flush=True)
+
+    use_case = BulkAddBooksUseCase(repo, DuplicateDetector(repo) if check_duplicates else None)
+    try:
+        report = use_case.execute(read_records(path), batch_size=batch_size, progress=report_progress)
+    except (OSError, ValueError) as e:
+        print(f"\nОшибка: {e}")
+        return
+    print(f"\nИмпорт завершён. Добавлено книг: {report.imported}, отклонено записей: {len(report.errors)}.")
+    for number, error in report.errors:
+        print(f"Запись {number}: {error}")
+
+
+def export_books(repo: LibraryRepository, path: str) -> None:
+    """
+    Выгружает каталог в файл без интерактивного меню.
+    :param repo: Репозиторий библиотеки.
+    :param path: Путь к файлу .csv или .jsonl.
+    """
+    try:
+        count = write_records(path, ExportBooksUseCase(repo).execute())
+    except (OSError, ValueError) as e:
+        print(f"Ошибка: {e}")
+        return
+    print(f"Выгружено книг: {count}.")
+
+
+def migrate_catalog(source: str, target: str) -> None:
+    """
+    Переводит JSON-каталог в другой формат хранения (по расширению нового файла) и проверяет,
+    что новый файл читается и содержит все книги. Исходный файл не переписывается, и рядом с ним
+    не создаётся двоичный снимок.
+    :param source: Путь к текущему файлу каталога.
+    :param target: Путь к новому файлу каталога.
+    """
+    if os.path.exists(target):
+        print(f"Ошибка: файл {target} уже существует.")
+        return
+    # В журналируемом режиме журнал исходного каталога применяется в памяти, без перезаписи исходного файла
+    try:
+        repository = JsonLibraryRepository(source, journal_threshold=JOURNAL_THRESHOLD, snapshot=False)
+        count = len(repository.books)
+        size = repository.export_catalog(target)
+        migrated = len(JsonLibraryRepository(target, journal_threshold=JOURNAL_THRESHOLD).books)
+    except (OSError, ValueError) as e:
+        print(f"Ошибка: {e}")
+        return
+    if migrated != count:
+        print(f"Ошибка: в новом файле {migrated} книг вместо {count}.")
+        return
+    print(f"Перенесено книг: {count}. Размер файла: {os.path.getsize(source)} -> {size} байт.")
+    print(f"Для работы с новым файлом запускайте программу с ключом --data {target}.")
+
+
+def read_book_ids(path: str) -> Iterator[int]:
+    """
+    Читает ID книг из файла по одному в строке; пустые строки пропускаются.
+    :param path: Путь к файлу или "-" для стандартного ввода.
+    :return: Итератор ID книг.
+    :raises ValueError: Если строка не является ID книги.
+    """
+    with (nullcontext(sys.stdin) if path == "-" else open(path, encoding="utf-8")) as file:
+        for number, line in enumerate(file, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            if not line.isdigit():
+                raise ValueError(f"Строка {number}: некорректный ID книги: {line}")
+            yield int(line)
+
+
+def print_bulk_report(report: BulkOperationReport, action: str) -> None:
+    """
+    Выводит итог пакетной операции.
+    :param report: Отчёт пакетной операции.
+    :param action: Действие для итоговой строки (например, "Удалено").
+    """
+    print(f"{action} книг: {report.changed}, не обработано ID: {len(report.errors)}.")
+    for book_id, error in report.errors:
+        print(f"ID {book_id}: {error}")
+
+
+def run_bulk_command(args: argparse.Namespace, repo: LibraryRepository, loans: LoanRepository,
+                     metrics: MetricsRegistry | None) -> None:
+    """
+    Изменяет статус или удаляет книги по списку ID одной транзакцией.
+    :param args: Аргументы командной строки (команда, файл с ID и новый статус).
+    :param repo: Репозиторий библиотеки.
+    :param loans: Хранилище выдач.
+    :param metrics: Реестр метрик или None, чтобы не собирать метрики.
+    """
+    if args.command == "set-status":
+        use_case = BulkChangeStatusUseCase(repo, loans)
+        execute, action = lambda book_ids: use_case.execute(book_ids, args.status), "Изменён статус"
+    else:
+        use_case = BulkRemoveBooksUseCase(repo, loans)
+        execute, action = lambda book_ids: use_case.execute(book_ids), "Удалено"
+    if metrics is not None:
+        instrument_use_case(use_case, metrics)
+    try:
+        report = execute(read_book_ids(args.file))
+    except (OSError, ValueError) as e:
+        print(f"Ошибка: {e}")
+        return
+    print_bulk_report(report, action)
+
+
+async def serve(args: argparse.Namespace, metrics: MetricsRegistry | None) -> None:
+    """
+    Запускает сервер и обслуживает клиентов до прерывания.
+    :param args: Аргументы командной строки.
+    :param metrics: Реестр метрик или None, чтобы не собирать метрики.
+    """
+    server = LibraryServer(lambda: create_repository(args.backend, args.data, metrics, args.shards),
+                           metrics=metrics,
+                           loans_factory=lambda: create_loan_repository(args.backend, args.data, args.loans))
+    listener = await server.start(args.host, args.port, args.socket)
+    addresses = ", ".join(str(sock.getsockname()) for sock in listener.sockets)
+    print(f"Сервер запущен: {addresses}. Для остановки нажмите Ctrl+C.")
+    try:
+        await listener.serve_forever()
+    finally:
+        await server.close()
 
 
 def main():
+    args = parse_args()
+    metrics = MetricsRegistry() if args.metrics or args.metrics_file else None
+    try:
+        run(args, metrics)
+    finally:
+        if args.metrics_file:
+            write_metrics_file(metrics, args.metrics_file)
+
+
+def run(args: argparse.Namespace, metrics: MetricsRegistry | None) -> None:
+    """
+    Выполняет выбранную команду или запускает интерактивное меню.
+    :param args: Аргументы командной строки.
+    :param metrics: Реестр метрик или None, чтобы не собирать метрики.
+    """
+    if args.command == "serve":
+        # Репозиторий создаётся в рабочем потоке сервера
+        try:
+            asyncio.run(serve(args, metrics))
+        except KeyboardInterrupt:
+            pass
+        return
+
+    if args.command == "migrate":
+        if args.backend != "json":
+            print("Ошибка: перевод формата поддерживается только для хранилища json.")
+            return
+        migrate_catalog(args.data or DEFAULT_DATA_FILES["json"], args.file)
+        return
+
     # Создание экземпляра репозитория с указанием пути к файлу базы данных
-    repo = JsonLibraryRepository("src/infrastructure/database/books.json")
+    repo = create_repository(args.backend, args.data, metrics, args.shards)
+
+    if args.command == "import":
+        import_books(repo, args.file, args.batch_size, not args.allow_duplicates)
+        return
+    if args.command == "duplicates":
+        show_duplicates(DuplicateClustersUseCase(repo))
+        return
+    if args.command == "export":
+        export_books(repo, args.file)
+        return
+
+    loans = create_loan_repository(args.backend, args.data, args.loans)
+
+    if args.command in ("set-status", "remove"):
+        run_bulk_command(args, repo, loans, metrics)
+        return
 
     # Инициализация сценариев использования, передача репозитория в качестве зависимости
-    add_book_use_case = AddBookUseCase(repo)
-    change_status_use_case = ChangeBookStatusUseCase(repo)
-    delete_book_use_case = RemoveBookUseCase(repo)
-    search_book_use_case = SearchBookUseCase(repo)
+    # Индексы дубликатов общие для добавления книг и поиска групп дубликатов
+    duplicates = DuplicateDetector(repo)
+    add_book_use_case = AddBookUseCase(repo, duplicates)
+    change_status_use_case = ChangeBookStatusUseCase(repo, loans)
+    delete_book_use_case = RemoveBookUseCase(repo, loans)
+    list_books_use_case = ListBooksUseCase(repo)
+    search_book_use_case = SearchBookUseCase(repo, cache=SearchResultCache(metrics=metrics))
+    ranked_search_use_case = RankedSearchUseCase(repo)
+    suggest_use_case = SuggestUseCase(repo)
+    issue_book_use_case = IssueBookUseCase(repo, loans)
+    return_book_use_case = ReturnBookUseCase(repo, loans)
+    overdue_loans_use_case = OverdueLoansUseCase(repo, loans)
+    borrower_loans_use_case = BorrowerLoansUseCase(repo, loans)
+    statistics_use_case = CatalogStatisticsUseCase(repo)
+    duplicate_clusters_use_case = DuplicateClustersUseCase(repo, duplicates)
+    if metrics is not None:
+        for use_case in (add_book_use_case, change_status_use_case, delete_book_use_case, list_books_use_case,
+                         search_book_use_case, ranked_search_use_case, suggest_use_case, issue_book_use_case,
+                         return_book_use_case, overdue_loans_use_case, borrower_loans_use_case, statistics_use_case,
+                         duplicate_clusters_use_case):
+            instrument_use_case(use_case, metrics)
 
     # Определение словаря действий, где ключи - это выбор пользователя, а значения - функции, которые нужно выполнить
     actions = {
         "1": lambda: add_book(add_book_use_case),  # Добавление книги
         "2": lambda: delete_book(delete_book_use_case),  # Удаление книги
-        "3": lambda: search_books(search_book_use_case),  # Поиск книги
-        "4": lambda: display_books(repo.books),  # Отображение всех книг
+        "3": lambda: search_books(search_book_use_case, ranked_search_use_case, suggest_use_case),  # Поиск книги
+        "4": lambda: display_books(list_books_use_case),  # Отображение всех книг
         "5": lambda: change_status(change_status_use_case),  # Изменение статуса книги
+        "6": lambda: issue_book(issue_book_use_case),  # Выдача книги читателю
+        "7": lambda: return_book(return_book_use_case),  # Возврат книги
+        "8": lambda: display_overdue_loans(overdue_loans_use_case),  # Просроченные выдачи
+        "9": lambda: display_borrower_loans(borrower_loans_use_case),  # Выдачи читателя
+        "10": lambda: show_statistics(statistics_use_case),  # Статистика каталога
+        "11": lambda: show_duplicates(duplicate_clusters_use_case),  # Группы дубликатов
+        "12": lambda: show_metrics(metrics),  # Вывод метрик
     }
 
     # Запуск главного меню и обработка пользовательского ввода
@@ -0,0 +1,87 @@
+from collections import OrderedDict
+
+from src.application.dto.book_dto import BookDTO
+from src.application.dto.search_criteria import SearchCriteria
+from src.application.metrics.metrics_registry import MetricsRegistry
+
+
+class SearchResultCache:
+    """
+    LRU-кэш результатов поиска с ограниченным числом записей.
+    Ключ - нормализованные критерии поиска. Каждый результат помечен номером версии каталога
+    (LibraryRepository.generation), при котором он получен: после любого изменения книг
+    номер версии меняется, и весь кэш сбрасывается при следующем обращении.
+    Попадания и промахи считаются в атрибутах hits и misses и, если передан реестр метрик,
+    в счётчике library_search_cache_requests_total с меткой result.
+    """
+
+    def __init__(self, max_size: int = 256, metrics: MetricsRegistry | None = None) -> None:
+        """
+        Инициализация кэша.
+        :param max_size: Максимальное количество сохранённых результатов.
+        :param metrics: Реестр метрик или None, чтобы не собирать метрики.
+        """
+        if max_size < 1:
+            raise ValueError("Размер кэша должен быть положительным")
+        self.max_size = max_size
+        self.metrics = metrics
+        self.hits = 0
+        self.misses = 0
+        self._generation: int | None = None
+        self._entries: OrderedDict[tuple, list[BookDTO] | None] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, criteria: SearchCriteria, generation: int) -> tuple[bool, list[BookDTO] | None]:
+        """
+        Ищет результат в кэше.
+        :param criteria: Критерии поиска.
+        :param generation: Текущий номер версии каталога.
+        :return: Пара (найден ли результат, результат). Результат - копия списка из кэша.
+        """
+        if generation != self._generation:
+            self._entries.clear()
+            self._generation = generation
+        key = criteria.cache_key()
+        if key not in self._entries:
+            self.misses += 1
+            self._count("miss")
+            return False, None
+        self.hits += 1
+        self._count("hit")
+        self._entries.move_to_end(key)
+        result = self._entries[key]
+        return True, None if result is None else list(result)
+
+    def _count(self, result: str) -> None:
+        """
+        Учитывает обращение к кэшу в реестре метрик.
+        :param result: "hit" или "miss".
+        """
+        if self.metrics is not None:
+            self.metrics.increment("library_search_cache_requests_total", {"result": result})
+
+    def put(self, criteria: SearchCriteria, generation: int, result: list[BookDTO] | None) -> None:
+        """
+        Сохраняет результат поиска. Самый давно не запрошенный результат вытесняется при переполнении.
+        :param criteria: Критерии поиска.
+        :param generation: Номер версии каталога, при котором получен результат.
+        :param result: Результат поиска.
+        """
+        if generation != self._generation:
+            self._entries.clear()
+            self._generation = generation
+        key = criteria.cache_key()
+        self._entries[key] = None if result is None else list(result)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """
+        Очищает кэш и счётчики попаданий.
+        """
+        self._entries.clear()
+        self._generation = None
+        self.hits = self.misses = 0
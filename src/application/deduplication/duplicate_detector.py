@@ -0,0 +1,60 @@
+from src.application.deduplication.duplicate_index import DuplicateIndex, book_fingerprint
+from src.application.dto.page_request import PageRequest
+from src.application.interfaces.library_repository import LibraryRepository
+from src.domain.value_objects.isbn import normalize_isbn
+
+
+class DuplicateBookError(ValueError):
+    """
+    Книга уже есть в каталоге. book_ids - ID найденных дубликатов.
+    """
+
+    def __init__(self, book_ids: list[int]) -> None:
+        super().__init__(f"Такая книга уже есть в каталоге (ID: {', '.join(map(str, book_ids))})")
+        self.book_ids = book_ids
+
+
+class DuplicateDetector:
+    """
+    Поиск дубликатов книг по ISBN и отпечатку (название, автор, год) через хеш-индексы.
+    Индексы строятся одним проходом по каталогу при первом обращении, а дальше обновляются
+    по событиям изменений репозитория. Заново они строятся, только если каталог изменён
+    в обход событий (например, другим процессом) или репозиторий не публикует событий.
+    Один экземпляр используется всеми сценариями, которые проверяют дубликаты.
+    """
+
+    def __init__(self, repository: LibraryRepository) -> None:
+        """
+        Инициализация класса.
+        :param repository: Экземпляр репозитория для работы с данными библиотеки.
+        """
+        self.repository = repository
+        self.index = DuplicateIndex()
+        try:
+            repository.subscribe(self.index.apply)
+        except NotImplementedError:
+            pass
+
+    def current(self) -> DuplicateIndex:
+        """
+        Возвращает индексы, соответствующие текущей версии каталога, при необходимости построив их заново.
+        :return: Объект DuplicateIndex.
+        """
+        if self.index.generation is None or self.index.generation != self.repository.generation():
+            with self.repository.transaction():
+                generation = self.repository.generation()
+                self.index.rebuild(self.repository.iter_books(PageRequest()), generation)
+        return self.index
+
+    def find(self, title: str, author: str, year: int, isbn: str | None = None) -> list[int]:
+        """
+        Находит в каталоге книги с тем же ISBN или с тем же названием, автором и годом
+        (без учёта регистра, "ё" и знаков препинания).
+        :param title: Название книги.
+        :param author: Автор книги.
+        :param year: Год издания.
+        :param isbn: ISBN в любом формате или None.
+        :return: ID найденных книг по возрастанию.
+        :raises ValueError: Если ISBN некорректен.
+        """
+        return self.current().find(book_fingerprint(title, author, year), normalize_isbn(isbn) if isbn else None)
@@ -0,0 +1,142 @@
+import re
+from typing import Iterable
+
+from src.domain.entities.book import Book
+from src.domain.events.book_event import BookEvent, BookEventKind
+from src.domain.value_objects.search_text import normalize_text
+
+# Отпечаток книги: нормализованные название и автор и год издания
+Fingerprint = tuple[str, str, int]
+
+# Знаки препинания и прочие символы, кроме букв и цифр, не различают книги
+_NON_WORD = re.compile(r"[\W_]+")
+
+
+def book_fingerprint(title: str, author: str, year: int) -> Fingerprint:
+    """
+    Строит отпечаток книги для поиска дубликатов: название и автор приводятся к нижнему регистру,
+    "ё" заменяется на "е", знаки препинания и повторяющиеся пробелы убираются.
+    Так "Война и мир" и "ВОЙНА  И МИР." одного автора и года дают один отпечаток.
+    :param title: Название книги.
+    :param author: Автор книги.
+    :param year: Год издания.
+    :return: Отпечаток книги.
+    """
+    def normalize(text: str) -> str:
+        return " ".join(_NON_WORD.sub(" ", normalize_text(text)).split())
+
+    return normalize(title), normalize(author), year
+
+
+class DuplicateIndex:
+    """
+    Хеш-индексы для поиска дубликатов книг: ISBN -> ID книг и отпечаток (название, автор, год) -> ID книг.
+    Проверка, есть ли в каталоге такая же книга, - O(1), а группы дубликатов находятся одним проходом
+    по корзинам индексов, без попарного сравнения книг. Индексы поддерживаются по событиям изменений.
+
+    generation - номер версии каталога, которой соответствуют индексы (None - индексы не построены
+    или устарели, их нужно построить заново по каталогу).
+    """
+
+    def __init__(self) -> None:
+        self.generation: int | None = None
+        self._clear()
+
+    def _clear(self) -> None:
+        """
+        Очищает индексы.
+        """
+        self._by_isbn: dict[str, set[int]] = {}
+        self._by_fingerprint: dict[Fingerprint, set[int]] = {}
+
+    def rebuild(self, books: Iterable[Book], generation: int) -> None:
+        """
+        Строит индексы одним проходом по каталогу.
+        :param books: Все книги каталога.
+        :param generation: Номер версии каталога.
+        """
+        self.generation = None
+        self._clear()
+        for book in books:
+            self._add(book)
+        self.generation = generation
+
+    def apply(self, event: BookEvent) -> None:
+        """
+        Обновляет индексы по событию изменения каталога. Пока индексы не построены, события
+        пропускаются: при построении они всё равно будут учтены. Смена статуса индексы не меняет.
+        :param event: Событие изменения каталога.
+        """
+        if self.generation is None:
+            return
+        if event.kind == BookEventKind.RESET:
+            self.generation = None
+            return
+        if event.kind == BookEventKind.ADDED:
+            self._add(event.book)
+        elif event.kind == BookEventKind.REMOVED:
+            self._remove(event.book)
+        self.generation = event.generation
+
+    def _add(self, book: Book) -> None:
+        self._by_fingerprint.setdefault(book_fingerprint(book.title, book.author, book.year), set()).add(book.book_id)
+        if book.isbn is not None:
+            self._by_isbn.setdefault(book.isbn, set()).add(book.book_id)
+
+    def _remove(self, book: Book) -> None:
+        self._discard(self._by_fingerprint, book_fingerprint(book.title, book.author, book.year), book.book_id)
+        if book.isbn is not None:
+            self._discard(self._by_isbn, book.isbn, book.book_id)
+
+    @staticmethod
+    def _discard(index: dict, key, book_id: int) -> None:
+        """
+        Убирает ID книги из корзины индекса; пустые корзины удаляются.
+        """
+        bucket = index.get(key)
+        if bucket is not None:
+            bucket.discard(book_id)
+            if not bucket:
+                del index[key]
+
+    def find(self, fingerprint: Fingerprint, isbn: str | None = None) -> list[int]:
+        """
+        Находит книги с тем же ISBN или тем же отпечатком.
+        :param fingerprint: Отпечаток книги (см. book_fingerprint).
+        :param isbn: ISBN книги в каноническом виде или None.
+        :return: ID найденных книг по возрастанию.
+        """
+        found = set(self._by_fingerprint.get(fingerprint, ()))
+        if isbn is not None:
+            found.update(self._by_isbn.get(isbn, ()))
+        return sorted(found)
+
+    def clusters(self) -> list[list[int]]:
+        """
+        Группирует дубликаты: книги с общим ISBN или общим отпечатком попадают в одну группу,
+        в том числе через цепочку (A и B с одним ISBN, B и C с одним отпечатком).
+        Просматриваются только корзины из нескольких книг; группы объединяются системой
+        непересекающихся множеств.
+        :return: Группы ID книг (каждая по возрастанию), упорядоченные по наименьшему ID.
+        """
+        parents: dict[int, int] = {}
+
+        def root(book_id: int) -> int:
+            parents.setdefault(book_id, book_id)
+            while parents[book_id] != book_id:
+                parents[book_id] = parents[parents[book_id]]
+                book_id = parents[book_id]
+            return book_id
+
+        for index in (self._by_isbn, self._by_fingerprint):
+            for bucket in index.values():
+                if len(bucket) < 2:
+                    continue
+                first, *others = bucket
+                for book_id in others:
+                    parents[root(book_id)] = root(first)
+
+        groups: dict[int, list[int]] = {}
+        for book_id in parents:
+            groups.setdefault(root(book_id), []).append(book_id)
+        return sorted((sorted(group) for group in groups.values()), key=lambda group: group[0])
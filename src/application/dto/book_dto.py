@@ -14,6 +14,7 @@ class BookDTO:
     author: str
     year: int
     status: str
+    isbn: str | None = None
 
     @staticmethod
     def from_book(book: Book) -> "BookDTO":
@@ -27,11 +28,13 @@ class BookDTO:
             title=book.title,
             author=book.author,
             year=book.year,
-            status=book.status.value
+            status=book.status.value,
+            isbn=book.isbn
         )
 
     def __repr__(self) -> str:
         """
         Возвращает строковое представление объекта BookDTO для удобного отображения.
         """
-        return f"{self.book_id}. {self.title} - {self.author} ({self.year}) - {self.status}"
+        isbn = f" - ISBN {self.isbn}" if self.isbn else ""
+        return f"{self.book_id}. {self.title} - {self.author} ({self.year}){isbn} - {self.status}"
@@ -0,0 +1,18 @@
+from dataclasses import dataclass, field
+
+
+@dataclass
+class BulkOperationReport:
+    """
+    Итог пакетной операции над книгами (изменения статуса или удаления): сколько книг
+    обработано успешно и какие отклонены. errors - список пар (ID книги, описание ошибки).
+    """
+    changed: int = 0
+    errors: list[tuple[int, str]] = field(default_factory=list)
+
+    @property
+    def processed(self) -> int:
+        """
+        Количество обработанных ID (повторяющиеся ID учитываются один раз).
+        """
+        return self.changed + len(self.errors)
@@ -0,0 +1,29 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class CatalogStatisticsDTO:
+    """
+    Data Transfer Object (DTO) для сводной статистики каталога.
+    by_status - количество книг по статусам, by_decade - по десятилетиям издания
+    (первый год десятилетия -> количество), top_authors - авторы с наибольшим числом книг
+    в порядке убывания.
+    """
+    total: int
+    by_status: dict[str, int]
+    by_decade: dict[int, int]
+    top_authors: list[tuple[str, int]]
+
+    def __repr__(self) -> str:
+        """
+        Возвращает строковое представление объекта CatalogStatisticsDTO для удобного отображения.
+        """
+        lines = [f"Всего книг: {self.total}"]
+        lines += [f"{status}: {count}" for status, count in self.by_status.items()]
+        if self.by_decade:
+            lines.append("Книги по десятилетиям издания:")
+            lines += [f"  {decade}-е: {count}" for decade, count in self.by_decade.items()]
+        if self.top_authors:
+            lines.append("Авторы с наибольшим числом книг:")
+            lines += [f"  {number}. {author} - {count}" for number, (author, count) in enumerate(self.top_authors, 1)]
+        return "\n".join(lines)
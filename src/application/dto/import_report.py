@@ -0,0 +1,18 @@
+from dataclasses import dataclass, field
+
+
+@dataclass
+class ImportReport:
+    """
+    Итог массового импорта книг: сколько книг добавлено и какие записи отклонены.
+    errors - список пар (номер записи, описание ошибки).
+    """
+    imported: int = 0
+    errors: list[tuple[int, str]] = field(default_factory=list)
+
+    @property
+    def processed(self) -> int:
+        """
+        Количество обработанных записей.
+        """
+        return self.imported + len(self.errors)
@@ -0,0 +1,46 @@
+from dataclasses import dataclass
+
+from src.domain.entities.book import Book
+from src.domain.entities.loan import Loan
+
+
+@dataclass
+class LoanDTO:
+    """
+    Data Transfer Object (DTO) для представления информации о выдаче книги.
+    Даты передаются строками в формате ISO (ГГГГ-ММ-ДД).
+    """
+    loan_id: int
+    book_id: int
+    title: str | None
+    borrower: str
+    issued_on: str
+    due_on: str
+    returned_on: str | None
+
+    @staticmethod
+    def from_loan(loan: Loan, book: Book | None = None) -> "LoanDTO":
+        """
+        Создаёт объект LoanDTO на основе объекта Loan.
+        :param loan: Объект Loan из доменного слоя.
+        :param book: Выданная книга или None, если её уже нет в каталоге.
+        :return: Экземпляр LoanDTO.
+        """
+        return LoanDTO(
+            loan_id=loan.loan_id,
+            book_id=loan.book_id,
+            title=book.title if book is not None else None,
+            borrower=loan.borrower,
+            issued_on=loan.issued_on.isoformat(),
+            due_on=loan.due_on.isoformat(),
+            returned_on=loan.returned_on.isoformat() if loan.returned_on is not None else None,
+        )
+
+    def __repr__(self) -> str:
+        """
+        Возвращает строковое представление объекта LoanDTO для удобного отображения.
+        """
+        title = self.title if self.title is not None else "книга удалена"
+        text = f"{self.loan_id}. {title} (ID {self.book_id}) - {self.borrower}, выдана {self.issued_on}, " \
+               f"вернуть до {self.due_on}"
+        return text + (f", возвращена {self.returned_on}" if self.returned_on else "")
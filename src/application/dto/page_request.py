@@ -0,0 +1,25 @@
+from dataclasses import dataclass
+from typing import Any
+
+# Поля книги, по которым можно упорядочивать выдачу
+SORT_FIELDS = ("book_id", "title", "author", "year")
+
+
+@dataclass
+class PageRequest:
+    """
+    Класс для описания запроса одной страницы книг.
+    Поддерживает как постраничный вывод через limit/offset, так и курсор по ключу (keyset):
+    after - пара (значение поля сортировки, ID книги) последней книги предыдущей страницы.
+    """
+    limit: int | None = None
+    offset: int = 0
+    order_by: str = "book_id"
+    descending: bool = False
+    after: tuple[Any, int] | None = None
+
+    def __post_init__(self):
+        if self.order_by not in SORT_FIELDS:
+            raise ValueError(f"Недопустимое поле сортировки: {self.order_by}")
+        if self.limit is not None and self.limit < 0 or self.offset < 0:
+            raise ValueError("Размер и смещение страницы не могут быть отрицательными")
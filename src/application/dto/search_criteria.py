@@ -1,12 +1,44 @@
 from dataclasses import dataclass
 
+from src.domain.value_objects.book_status import BookStatus
+from src.domain.value_objects.search_text import normalize_text
+
 
 @dataclass
 class SearchCriteria:
     """
     Класс для описания критериев поиска книг в библиотеке.
     Позволяет задавать фильтры для поиска.
+
+    Каждый заданный фильтр (название, автор, точный год, диапазон лет, статус) - отдельное условие.
+    По умолчанию книга подходит, если выполнено хотя бы одно условие (ИЛИ);
+    при match_all=True должны выполняться все заданные условия (И).
     """
     title: str | None = None
     author: str | None = None
     year: int | None = None
+    year_from: int | None = None
+    year_to: int | None = None
+    status: BookStatus | None = None
+    match_all: bool = False
+
+    def cache_key(self) -> tuple:
+        """
+        Возвращает нормализованный ключ критериев: критерии, которые дают одинаковый результат поиска,
+        имеют одинаковый ключ. Текст приводится к виду, в котором его сравнивают хранилища
+        (нижний регистр, "ё" как "е"), а пустые фильтры не учитываются.
+        :return: Кортеж, пригодный для ключа словаря.
+        """
+        def normalize(text: str | None) -> str | None:
+            return normalize_text(text) if text else None
+
+        conditions = (
+            normalize(self.title),
+            normalize(self.author),
+            self.year or None,
+            (self.year_from, self.year_to) if self.year_from is not None or self.year_to is not None else None,
+            self.status,
+        )
+        # При одном условии И и ИЛИ дают одно и то же
+        match_all = self.match_all and sum(condition is not None for condition in conditions) > 1
+        return conditions + (match_all,)
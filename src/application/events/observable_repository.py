@@ -0,0 +1,164 @@
+import dataclasses
+from contextlib import contextmanager
+from typing import Any, Callable, Iterable, Iterator
+
+from src.application.dto.page_request import PageRequest
+from src.application.dto.search_criteria import SearchCriteria
+from src.application.interfaces.library_repository import LibraryRepository
+from src.domain.entities.book import Book
+from src.domain.events.book_event import BookEvent, BookEventKind
+from src.domain.value_objects.book_status import BookStatus
+
+# Изменение для публикации: вид события, книга и прежний статус
+Change = tuple[BookEventKind, Book | None, BookStatus | None]
+
+
+class ObservableLibraryRepository(LibraryRepository):
+    """
+    Обёртка над репозиторием, которая публикует события изменения каталога.
+
+    Подписчики вызываются синхронно сразу после изменения, внутри его транзакции. Каждое событие
+    содержит номер версии каталога после изменения - по нему подписчик может заметить изменения,
+    сделанные в обход обёртки (например, другим процессом). Если транзакция завершилась ошибкой,
+    публикуется событие RESET: какие из изменений остались в хранилище, неизвестно.
+    Книга с уже существующим ID заменяет прежнюю - тогда публикуются удаление прежней книги и добавление новой.
+
+    Пока подписчиков нет, изменения выполняются без дополнительных чтений. Остальные методы
+    и атрибуты берутся у обёрнутого репозитория.
+    """
+
+    def __init__(self, repository: LibraryRepository) -> None:
+        """
+        :param repository: Обёртываемый репозиторий.
+        """
+        self.repository = repository
+        self._listeners: list[Callable[[BookEvent], None]] = []
+
+    def __getattr__(self, name: str) -> Any:
+        # Вызывается только для атрибутов, которых нет у обёртки
+        if name == "repository":
+            raise AttributeError(name)
+        return getattr(self.repository, name)
+
+    def subscribe(self, listener: Callable[[BookEvent], None]) -> Callable[[], None]:
+        """
+        Подписывает listener на события изменения каталога.
+        :param listener: Функция, которая вызывается с каждым событием.
+        :return: Функция отмены подписки.
+        """
+        self._listeners.append(listener)
+
+        def unsubscribe() -> None:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+        return unsubscribe
+
+    def _publish(self, changes: list[Change]) -> None:
+        """
+        Публикует события изменений; номер версии каталога читается один раз на все изменения.
+        :param changes: Изменения в порядке выполнения.
+        """
+        generation = self.repository.generation()
+        for kind, book, previous_status in changes:
+            event = BookEvent(kind, book, generation, previous_status)
+            for listener in tuple(self._listeners):
+                listener(event)
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """
+        Транзакция обёрнутого репозитория; при ошибке подписчики получают событие RESET.
+        """
+        try:
+            with self.repository.transaction():
+                yield
+        except BaseException:
+            if self._listeners:
+                self._publish([(BookEventKind.RESET, None, None)])
+            raise
+
+    def add_book_to_library(self, book: Book) -> None:
+        if not self._listeners:
+            self.repository.add_book_to_library(book)
+            return
+        self.add_books_to_library([book])
+
+    def add_books_to_library(self, books: Iterable[Book]) -> None:
+        if not self._listeners:
+            self.repository.add_books_to_library(books)
+            return
+        books = list(books)
+        with self.transaction():
+            changes, added = [], {}
+            for book in books:
+                if book.book_id in added:
+                    replaced = added[book.book_id]
+                else:
+                    replaced = self.repository.get_book_by_id(book.book_id)
+                if replaced is not None:
+                    changes.append((BookEventKind.REMOVED, replaced, None))
+                changes.append((BookEventKind.ADDED, book, None))
+                added[book.book_id] = book
+            self.repository.add_books_to_library(books)
+            self._publish(changes)
+
+    def remove_book_from_library(self, book_id: int) -> bool:
+        if not self._listeners:
+            return self.repository.remove_book_from_library(book_id)
+        return not self.remove_books_from_library([book_id])
+
+    def remove_books_from_library(self, book_ids: Iterable[int]) -> list[int]:
+        if not self._listeners:
+            return self.repository.remove_books_from_library(book_ids)
+        book_ids = list(book_ids)
+        with self.transaction():
+            books = [self.repository.get_book_by_id(book_id) for book_id in dict.fromkeys(book_ids)]
+            missing = self.repository.remove_books_from_library(book_ids)
+            self._publish([(BookEventKind.REMOVED, book, None) for book in books if book is not None])
+        return missing
+
+    def change_book_status(self, book_id: int, new_status: BookStatus) -> bool:
+        if not self._listeners:
+            return self.repository.change_book_status(book_id, new_status)
+        return not self.change_books_status([book_id], new_status)
+
+    def change_books_status(self, book_ids: Iterable[int], new_status: BookStatus) -> list[int]:
+        if not self._listeners:
+            return self.repository.change_books_status(book_ids, new_status)
+        book_ids = list(book_ids)
+        with self.transaction():
+            changes = []
+            for book_id in dict.fromkeys(book_ids):
+                book = self.repository.get_book_by_id(book_id)
+                if book is not None:
+                    # Снимок книги с новым статусом: хранилище может менять статус у того же объекта
+                    changes.append((BookEventKind.STATUS_CHANGED, dataclasses.replace(book, status=new_status),
+                                    book.status))
+            missing = self.repository.change_books_status(book_ids, new_status)
+            self._publish(changes)
+        return missing
+
+    def search_book_in_library(self, criteria: SearchCriteria) -> list[Book] | None:
+        return self.repository.search_book_in_library(criteria)
+
+    def search_ranked(self, query: str, limit: int = 10) -> list[Book]:
+        return self.repository.search_ranked(query, limit)
+
+    def suggest(self, prefix: str, limit: int = 10) -> list[str]:
+        return self.repository.suggest(prefix, limit)
+
+    def get_book_by_id(self, book_id: int) -> Book | None:
+        return self.repository.get_book_by_id(book_id)
+
+    def next_book_id(self) -> int:
+        return self.repository.next_book_id()
+
+    def reserve_book_ids(self, count: int) -> range:
+        return self.repository.reserve_book_ids(count)
+
+    def iter_books(self, page: PageRequest, criteria: SearchCriteria | None = None) -> Iterator[Book]:
+        return self.repository.iter_books(page, criteria)
+
+    def generation(self) -> int:
+        return self.repository.generation()
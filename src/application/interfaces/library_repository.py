@@ -1,8 +1,14 @@
+import heapq
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Callable, Iterable, Iterator
 
+from src.application.dto.page_request import PageRequest
 from src.application.dto.search_criteria import SearchCriteria
 from src.domain.entities.book import Book
+from src.domain.events.book_event import BookEvent
 from src.domain.value_objects.book_status import BookStatus
+from src.domain.value_objects.search_text import normalize_text
 
 
 class LibraryRepository(ABC):
@@ -46,3 +52,122 @@ class LibraryRepository(ABC):
         :return: True, если статус успешно изменён, иначе False.
         """
         pass
+
+    @abstractmethod
+    def get_book_by_id(self, book_id: int) -> Book | None:
+        """
+        Возвращает книгу из репозитория по её ID.
+        :param book_id: Идентификатор книги.
+        :return: Объект книги или None, если книга не найдена.
+        """
+        pass
+
+    @abstractmethod
+    def next_book_id(self) -> int:
+        """
+        Выделяет идентификатор для новой книги.
+        Идентификаторы не переиспользуются, даже если книга была удалена.
+        :return: Новый уникальный идентификатор книги.
+        """
+        pass
+
+    @abstractmethod
+    def reserve_book_ids(self, count: int) -> range:
+        """
+        Резервирует блок идентификаторов одним вызовом (например, для массового импорта).
+        :param count: Количество идентификаторов.
+        :return: Диапазон зарезервированных идентификаторов.
+        """
+        pass
+
+    @abstractmethod
+    def iter_books(self, page: PageRequest, criteria: SearchCriteria | None = None) -> Iterator[Book]:
+        """
+        Лениво возвращает одну страницу книг в заданном порядке.
+        :param page: Параметры страницы (limit/offset или курсор, поле и направление сортировки).
+        :param criteria: Критерии поиска или None, чтобы перебирать весь каталог.
+        :return: Итератор книг страницы.
+        """
+        pass
+
+    @abstractmethod
+    def generation(self) -> int:
+        """
+        Возвращает номер версии каталога. Он меняется при каждом добавлении, удалении книги
+        и изменении её статуса, поэтому по нему можно проверить, не устарели ли сохранённые результаты.
+        :return: Номер версии каталога.
+        """
+        pass
+
+    def search_ranked(self, query: str, limit: int = 10) -> list[Book]:
+        """
+        Ищет книги по запросу в свободной форме с учётом опечаток и возвращает лучшие
+        результаты по убыванию релевантности.
+        Реализация по умолчанию не поддерживает такой поиск.
+        :param query: Строка запроса.
+        :param limit: Количество лучших результатов.
+        :return: Список найденных книг.
+        """
+        raise NotImplementedError("Хранилище не поддерживает ранжированный поиск")
+
+    def suggest(self, prefix: str, limit: int = 10) -> list[str]:
+        """
+        Возвращает названия и имена авторов, начинающиеся с prefix (без учёта регистра и "ё"),
+        в алфавитном порядке. Реализация по умолчанию перебирает весь каталог.
+        :param prefix: Начало названия или имени автора.
+        :param limit: Наибольшее количество дополнений.
+        :return: Список дополнений.
+        """
+        key = normalize_text(prefix)
+        completions: dict[str, str] = {}
+        for book in self.iter_books(PageRequest()):
+            for text in (book.title, book.author):
+                normalized = normalize_text(text)
+                if normalized.startswith(key):
+                    completions.setdefault(normalized, text)
+        return [completions[normalized] for normalized in heapq.nsmallest(limit, completions)]
+
+    def subscribe(self, listener: Callable[[BookEvent], None]) -> Callable[[], None]:
+        """
+        Подписывает listener на события изменения каталога: добавление и удаление книги, смена статуса.
+        Реализация по умолчанию не публикует событий.
+        :param listener: Функция, которая вызывается с каждым событием.
+        :return: Функция отмены подписки.
+        """
+        raise NotImplementedError("Хранилище не публикует события изменений")
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """
+        Группирует несколько изменений в одну фиксацию в хранилище.
+        Реализация по умолчанию ничего не группирует: каждое изменение сохраняется сразу.
+        """
+        yield
+
+    def add_books_to_library(self, books: Iterable[Book]) -> None:
+        """
+        Добавляет несколько книг в репозиторий в рамках одной транзакции.
+        :param books: Объекты книг для добавления.
+        """
+        with self.transaction():
+            for book in books:
+                self.add_book_to_library(book)
+
+    def change_books_status(self, book_ids: Iterable[int], new_status: BookStatus) -> list[int]:
+        """
+        Изменяет статус нескольких книг в рамках одной транзакции.
+        :param book_ids: Идентификаторы книг.
+        :param new_status: Новый статус книг.
+        :return: Идентификаторы книг, которые не найдены.
+        """
+        with self.transaction():
+            return [book_id for book_id in book_ids if not self.change_book_status(book_id, new_status)]
+
+    def remove_books_from_library(self, book_ids: Iterable[int]) -> list[int]:
+        """
+        Удаляет несколько книг в рамках одной транзакции.
+        :param book_ids: Идентификаторы книг.
+        :return: Идентификаторы книг, которые не найдены.
+        """
+        with self.transaction():
+            return [book_id for book_id in book_ids if not self.remove_book_from_library(book_id)]
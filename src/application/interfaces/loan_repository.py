@@ -0,0 +1,94 @@
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from datetime import date
+from typing import Iterator
+
+from src.domain.entities.loan import Loan
+
+
+class LoanRepository(ABC):
+    """
+    Абстрактный класс, определяющий интерфейс хранилища выдач книг.
+    Хранилище ведёт историю выдач и индексы, по которым за O(log n + k) находятся
+    открытая выдача книги, выдачи читателя и просроченные выдачи.
+    """
+
+    @abstractmethod
+    def add_loan(self, loan: Loan) -> None:
+        """
+        Добавляет выдачу в хранилище.
+        :param loan: Объект выдачи.
+        """
+        pass
+
+    @abstractmethod
+    def close_loan(self, loan_id: int, returned_on: date) -> bool:
+        """
+        Закрывает выдачу (отмечает возврат книги).
+        :param loan_id: Идентификатор выдачи.
+        :param returned_on: Дата возврата.
+        :return: True, если выдача была открыта и закрыта, иначе False.
+        """
+        pass
+
+    @abstractmethod
+    def next_loan_id(self) -> int:
+        """
+        Выделяет идентификатор для новой выдачи.
+        :return: Новый уникальный идентификатор выдачи.
+        """
+        pass
+
+    @abstractmethod
+    def get_loan(self, loan_id: int) -> Loan | None:
+        """
+        Возвращает выдачу по её ID.
+        :param loan_id: Идентификатор выдачи.
+        :return: Объект выдачи или None, если выдача не найдена.
+        """
+        pass
+
+    @abstractmethod
+    def active_loan(self, book_id: int) -> Loan | None:
+        """
+        Возвращает открытую выдачу книги.
+        :param book_id: Идентификатор книги.
+        :return: Объект выдачи или None, если книга не выдана.
+        """
+        pass
+
+    @abstractmethod
+    def loans_of_book(self, book_id: int) -> list[Loan]:
+        """
+        Возвращает историю выдач книги.
+        :param book_id: Идентификатор книги.
+        :return: Список выдач в порядке оформления.
+        """
+        pass
+
+    @abstractmethod
+    def loans_of_borrower(self, borrower: str, active_only: bool = False) -> list[Loan]:
+        """
+        Возвращает выдачи читателя (имя сравнивается без учёта регистра и "ё").
+        :param borrower: Имя читателя.
+        :param active_only: Вернуть только невозвращённые книги.
+        :return: Список выдач в порядке оформления.
+        """
+        pass
+
+    @abstractmethod
+    def overdue_loans(self, today: date) -> list[Loan]:
+        """
+        Возвращает открытые выдачи, срок возврата которых прошёл.
+        :param today: Текущая дата.
+        :return: Список выдач по возрастанию срока возврата.
+        """
+        pass
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """
+        Группирует несколько изменений в одну фиксацию в хранилище.
+        Реализация по умолчанию ничего не группирует: каждое изменение сохраняется сразу.
+        """
+        yield
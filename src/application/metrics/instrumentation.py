@@ -0,0 +1,196 @@
+import functools
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Iterable, Iterator, TypeVar
+
+from src.application.dto.page_request import PageRequest
+from src.application.dto.search_criteria import SearchCriteria
+from src.application.interfaces.library_repository import LibraryRepository
+from src.application.metrics.metrics_registry import MetricsRegistry
+from src.domain.entities.book import Book
+from src.domain.events.book_event import BookEvent
+from src.domain.value_objects.book_status import BookStatus
+
+UseCase = TypeVar("UseCase")
+
+
+def instrument_use_case(use_case: UseCase, metrics: MetricsRegistry) -> UseCase:
+    """
+    Подменяет метод execute сценария использования обёрткой, которая считает вызовы,
+    ошибки и время выполнения. Для сценариев, возвращающих ленивый итератор,
+    замеряется только создание итератора.
+    :param use_case: Сценарий использования.
+    :param metrics: Реестр метрик.
+    :return: Тот же сценарий использования.
+    """
+    execute = use_case.execute
+    labels = {"use_case": type(use_case).__name__}
+
+    @functools.wraps(execute)
+    def instrumented(*args, **kwargs):
+        metrics.increment("library_use_case_calls_total", labels)
+        started = time.perf_counter()
+        try:
+            return execute(*args, **kwargs)
+        except Exception:
+            metrics.increment("library_use_case_errors_total", labels)
+            raise
+        finally:
+            metrics.observe("library_use_case_duration_seconds", time.perf_counter() - started, labels)
+
+    use_case.execute = instrumented
+    return use_case
+
+
+class InstrumentedRepository(LibraryRepository):
+    """
+    Обёртка над репозиторием, которая для каждого метода считает вызовы, ошибки и время выполнения,
+    а для методов поиска - количество возвращённых книг. Остальные атрибуты (close, books и т.п.)
+    берутся у обёрнутого репозитория.
+    """
+
+    def __init__(self, repository: LibraryRepository, metrics: MetricsRegistry) -> None:
+        """
+        :param repository: Обёртываемый репозиторий.
+        :param metrics: Реестр метрик.
+        """
+        self.repository = repository
+        self.metrics = metrics
+
+    def __getattr__(self, name: str) -> Any:
+        # Вызывается только для атрибутов, которых нет у обёртки
+        if name == "repository":
+            raise AttributeError(name)
+        return getattr(self.repository, name)
+
+    def _call(self, method: str, *args, rows: bool = False) -> Any:
+        """
+        Вызывает метод обёрнутого репозитория и записывает метрики вызова.
+        :param method: Имя метода.
+        :param rows: Учесть количество возвращённых книг.
+        """
+        labels = {"method": method}
+        self.metrics.increment("library_repository_calls_total", labels)
+        started = time.perf_counter()
+        try:
+            result = getattr(self.repository, method)(*args)
+        except Exception:
+            self.metrics.increment("library_repository_errors_total", labels)
+            raise
+        finally:
+            self.metrics.observe("library_repository_duration_seconds", time.perf_counter() - started, labels)
+        if rows:
+            self.metrics.increment("library_repository_rows_returned_total", labels, len(result or ()))
+        return result
+
+    def add_book_to_library(self, book: Book) -> None:
+        """
+        Добавляет книгу, записывая метрики вызова.
+        """
+        self._call("add_book_to_library", book)
+
+    def add_books_to_library(self, books: Iterable[Book]) -> None:
+        """
+        Добавляет несколько книг, записывая метрики вызова.
+        """
+        self._call("add_books_to_library", books)
+
+    def remove_book_from_library(self, book_id: int) -> bool:
+        """
+        Удаляет книгу, записывая метрики вызова.
+        """
+        return self._call("remove_book_from_library", book_id)
+
+    def remove_books_from_library(self, book_ids: Iterable[int]) -> list[int]:
+        """
+        Удаляет несколько книг, записывая метрики вызова.
+        """
+        return self._call("remove_books_from_library", book_ids)
+
+    def change_books_status(self, book_ids: Iterable[int], new_status: BookStatus) -> list[int]:
+        """
+        Изменяет статус нескольких книг, записывая метрики вызова.
+        """
+        return self._call("change_books_status", book_ids, new_status)
+
+    def search_book_in_library(self, criteria: SearchCriteria) -> list[Book] | None:
+        """
+        Ищет книги по критериям, записывая метрики вызова и число найденных книг.
+        """
+        return self._call("search_book_in_library", criteria, rows=True)
+
+    def search_ranked(self, query: str, limit: int = 10) -> list[Book]:
+        """
+        Выполняет ранжированный поиск, записывая метрики вызова и число найденных книг.
+        """
+        return self._call("search_ranked", query, limit, rows=True)
+
+    def suggest(self, prefix: str, limit: int = 10) -> list[str]:
+        """
+        Возвращает дополнения по префиксу, записывая метрики вызова и их число.
+        """
+        return self._call("suggest", prefix, limit, rows=True)
+
+    def change_book_status(self, book_id: int, new_status: BookStatus) -> bool:
+        """
+        Изменяет статус книги, записывая метрики вызова.
+        """
+        return self._call("change_book_status", book_id, new_status)
+
+    def get_book_by_id(self, book_id: int) -> Book | None:
+        """
+        Возвращает книгу по ID, записывая метрики вызова.
+        """
+        return self._call("get_book_by_id", book_id)
+
+    def next_book_id(self) -> int:
+        """
+        Выделяет идентификатор новой книги, записывая метрики вызова.
+        """
+        return self._call("next_book_id")
+
+    def reserve_book_ids(self, count: int) -> range:
+        """
+        Резервирует блок идентификаторов, записывая метрики вызова.
+        """
+        return self._call("reserve_book_ids", count)
+
+    def generation(self) -> int:
+        """
+        Возвращает номер версии каталога, записывая метрики вызова.
+        """
+        return self._call("generation")
+
+    def subscribe(self, listener: Callable[[BookEvent], None]) -> Callable[[], None]:
+        """
+        Подписывает listener на события обёрнутого репозитория (без метрик).
+        """
+        return self.repository.subscribe(listener)
+
+    def iter_books(self, page: PageRequest, criteria: SearchCriteria | None = None) -> Iterator[Book]:
+        """
+        Возвращает страницу книг, записывая метрики вызова и число прочитанных книг.
+        """
+        return self._count_rows(self._call("iter_books", page, criteria))
+
+    def _count_rows(self, books: Iterator[Book]) -> Iterator[Book]:
+        """
+        Пропускает книги страницы, подсчитывая их по мере чтения.
+        """
+        count = 0
+        try:
+            for book in books:
+                count += 1
+                yield book
+        finally:
+            self.metrics.increment("library_repository_rows_returned_total", {"method": "iter_books"}, count)
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """
+        Транзакция обёрнутого репозитория; время замеряется вместе с фиксацией изменений.
+        """
+        labels = {"method": "transaction"}
+        self.metrics.increment("library_repository_calls_total", labels)
+        with self.metrics.timer("library_repository_duration_seconds", labels), self.repository.transaction():
+            yield
@@ -0,0 +1,178 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+# Верхние границы корзин гистограмм задержек (в секундах)
+LATENCY_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+# Описания метрик для формата Prometheus
+METRIC_HELP = {
+    "library_use_case_calls_total": "Количество вызовов сценариев использования",
+    "library_use_case_errors_total": "Количество вызовов сценариев использования, завершившихся исключением",
+    "library_use_case_duration_seconds": "Время выполнения сценариев использования",
+    "library_repository_calls_total": "Количество вызовов методов репозитория",
+    "library_repository_errors_total": "Количество вызовов методов репозитория, завершившихся исключением",
+    "library_repository_duration_seconds": "Время выполнения методов репозитория",
+    "library_repository_rows_returned_total": "Количество книг, возвращённых методами поиска",
+    "library_repository_rows_scanned_total": "Количество книг, просмотренных при поиске",
+    "library_io_duration_seconds": "Время операций ввода-вывода хранилища",
+    "library_io_bytes_written_total": "Количество записанных хранилищем байт",
+    "library_io_bytes_read_total": "Количество прочитанных хранилищем байт",
+    "library_search_cache_requests_total": "Количество обращений к кэшу результатов поиска (hit - найден в кэше)",
+}
+
+Labels = tuple[tuple[str, str], ...]
+
+
+class MetricsRegistry:
+    """
+    Реестр метрик: счётчики и гистограммы с метками. Метрика задаётся именем и набором меток,
+    например ("library_repository_calls_total", {"method": "add_book_to_library"}).
+    Потокобезопасен: обновления выполняются под общей блокировкой.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters: dict[str, dict[Labels, float]] = {}
+        # Гистограмма: [счётчики по корзинам (последняя - +Inf), сумма значений, количество]
+        self._histograms: dict[str, dict[Labels, list]] = {}
+
+    @staticmethod
+    def _labels(labels: dict[str, str] | None) -> Labels:
+        return tuple(sorted(labels.items())) if labels else ()
+
+    def increment(self, name: str, labels: dict[str, str] | None = None, value: float = 1) -> None:
+        """
+        Увеличивает счётчик.
+        :param name: Имя метрики.
+        :param labels: Метки.
+        :param value: Величина увеличения.
+        """
+        key = self._labels(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, value: float, labels: dict[str, str] | None = None) -> None:
+        """
+        Добавляет значение в гистограмму.
+        :param name: Имя метрики.
+        :param value: Наблюдаемое значение (для задержек - в секундах).
+        :param labels: Метки.
+        """
+        key = self._labels(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = [[0] * (len(LATENCY_BUCKETS) + 1), 0.0, 0]
+            histogram[0][bisect.bisect_left(LATENCY_BUCKETS, value)] += 1
+            histogram[1] += value
+            histogram[2] += 1
+
+    @contextmanager
+    def timer(self, name: str, labels: dict[str, str] | None = None) -> Iterator[None]:
+        """
+        Замеряет время выполнения блока и добавляет его в гистограмму.
+        :param name: Имя метрики.
+        :param labels: Метки.
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, labels)
+
+    def counter_value(self, name: str, labels: dict[str, str] | None = None) -> float:
+        """
+        :return: Текущее значение счётчика (0, если он ещё не увеличивался).
+        """
+        with self._lock:
+            return self._counters.get(name, {}).get(self._labels(labels), 0)
+
+    def histogram_count(self, name: str, labels: dict[str, str] | None = None) -> int:
+        """
+        :return: Количество значений в гистограмме.
+        """
+        with self._lock:
+            histogram = self._histograms.get(name, {}).get(self._labels(labels))
+            return histogram[2] if histogram else 0
+
+    def clear(self) -> None:
+        """
+        Сбрасывает все метрики.
+        """
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    @staticmethod
+    def _format_labels(labels: Labels, extra: tuple[tuple[str, str], ...] = ()) -> str:
+        items = labels + extra
+        if not items:
+            return ""
+
+        def escape(value: str) -> str:
+            return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+        return "{" + ",".join(f'{key}="{escape(value)}"' for key, value in items) + "}"
+
+    def render_prometheus(self) -> str:
+        """
+        Выводит метрики в текстовом формате Prometheus.
+        :return: Текст для файла метрик (например, для textfile-коллектора node_exporter).
+        """
+        lines = []
+        with self._lock:
+            for name in sorted(self._counters):
+                lines.append(f"# HELP {name} {METRIC_HELP.get(name, name)}")
+                lines.append(f"# TYPE {name} counter")
+                for labels, value in sorted(self._counters[name].items()):
+                    lines.append(f"{name}{self._format_labels(labels)} {value:g}")
+            for name in sorted(self._histograms):
+                lines.append(f"# HELP {name} {METRIC_HELP.get(name, name)}")
+                lines.append(f"# TYPE {name} histogram")
+                for labels, (buckets, total, count) in sorted(self._histograms[name].items()):
+                    cumulative = 0
+                    for bound, bucket_count in zip(LATENCY_BUCKETS + (float("inf"),), buckets):
+                        cumulative += bucket_count
+                        le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                        lines.append(f"{name}_bucket{self._format_labels(labels, (('le', le),))} {cumulative}")
+                    lines.append(f"{name}_sum{self._format_labels(labels)} {total:g}")
+                    lines.append(f"{name}_count{self._format_labels(labels)} {count}")
+        return "\n".join(lines) + "\n" if lines else ""
+
+    def render_text(self) -> str:
+        """
+        Выводит метрики в виде, удобном для чтения: для гистограмм - количество, среднее
+        и оценку 95-го перцентиля (верхнюю границу корзины, в которую он попадает).
+        :return: Текст сводки.
+        """
+        lines = []
+        with self._lock:
+            for name in sorted(self._histograms):
+                lines.append(f"{METRIC_HELP.get(name, name)}:")
+                for labels, (buckets, total, count) in sorted(self._histograms[name].items()):
+                    label = ", ".join(value for _, value in labels) or name
+                    lines.append(f"  {label}: вызовов {count}, среднее {total / count * 1000:.3f} мс, "
+                                 f"p95 <= {self._percentile_bound(buckets, count, 0.95)}")
+            for name in sorted(self._counters):
+                lines.append(f"{METRIC_HELP.get(name, name)}:")
+                for labels, value in sorted(self._counters[name].items()):
+                    label = ", ".join(value for _, value in labels) or name
+                    lines.append(f"  {label}: {value:g}")
+        return "\n".join(lines)
+
+    @staticmethod
+    def _percentile_bound(buckets: list[int], count: int, fraction: float) -> str:
+        """
+        :return: Верхняя граница корзины, в которую попадает перцентиль, в миллисекундах.
+        """
+        cumulative = 0
+        for bound, bucket_count in zip(LATENCY_BUCKETS, buckets):
+            cumulative += bucket_count
+            if cumulative >= fraction * count:
+                return f"{bound * 1000:g} мс"
+        return f"> {LATENCY_BUCKETS[-1] * 1000:g} мс"
@@ -0,0 +1,174 @@
+import heapq
+from collections import Counter
+from typing import Hashable, Iterable
+
+from src.domain.entities.book import Book
+from src.domain.events.book_event import BookEvent, BookEventKind
+from src.domain.value_objects.book_status import BookStatus
+
+# Наименьший размер кучи авторов, при котором она перестраивается из счётчиков
+AUTHOR_HEAP_MIN_COMPACTION = 1024
+
+
+class CatalogStatistics:
+    """
+    Агрегаты каталога, которые поддерживаются по событиям изменений, без проходов по каталогу:
+    количество книг по статусам, по авторам, по годам и десятилетиям издания.
+    Ответ на вопрос "сколько книг выдано", "сколько книг у автора" или "сколько книг издано
+    в десятилетии" - O(1).
+
+    Для выбора самых представленных авторов ведётся ленивая куча пар (-количество книг, автор):
+    при каждом изменении числа книг автора в неё добавляется новая пара, а устаревшие пары
+    отбрасываются при чтении. Когда пар становится вдвое больше, чем авторов, куча перестраивается
+    из счётчиков.
+
+    generation - номер версии каталога, которой соответствуют агрегаты (None - агрегаты не построены
+    или устарели, их нужно построить заново по каталогу).
+    """
+
+    def __init__(self) -> None:
+        self.generation: int | None = None
+        self._clear()
+
+    def _clear(self) -> None:
+        """
+        Обнуляет агрегаты.
+        """
+        self.total = 0
+        self._by_status: Counter[BookStatus] = Counter()
+        self._by_author: Counter[str] = Counter()
+        self._by_year: Counter[int] = Counter()
+        self._by_decade: Counter[int] = Counter()
+        self._author_heap: list[tuple[int, str]] = []
+
+    def rebuild(self, books: Iterable[Book], generation: int) -> None:
+        """
+        Строит агрегаты одним проходом по каталогу.
+        :param books: Все книги каталога.
+        :param generation: Номер версии каталога.
+        """
+        self.generation = None
+        self._clear()
+        for book in books:
+            self._count(book, 1)
+        self._rebuild_author_heap()
+        self.generation = generation
+
+    def apply(self, event: BookEvent) -> None:
+        """
+        Обновляет агрегаты по событию изменения каталога. Пока агрегаты не построены, события
+        пропускаются: при построении они всё равно будут учтены.
+        :param event: Событие изменения каталога.
+        """
+        if self.generation is None:
+            return
+        if event.kind == BookEventKind.RESET:
+            self.generation = None
+            return
+        if event.kind == BookEventKind.ADDED:
+            self._count(event.book, 1)
+        elif event.kind == BookEventKind.REMOVED:
+            self._count(event.book, -1)
+        elif event.kind == BookEventKind.STATUS_CHANGED:
+            self._update(self._by_status, event.previous_status, -1)
+            self._update(self._by_status, event.book.status, 1)
+        self.generation = event.generation
+
+    @staticmethod
+    def _update(counter: Counter, key: Hashable, delta: int) -> int:
+        """
+        Изменяет счётчик; ключи с нулевым количеством удаляются.
+        :return: Новое значение счётчика.
+        """
+        count = counter[key] + delta
+        if count:
+            counter[key] = count
+        else:
+            del counter[key]
+        return count
+
+    def _count(self, book: Book, delta: int) -> None:
+        """
+        Учитывает добавление (delta=1) или удаление (delta=-1) книги.
+        """
+        self.total += delta
+        self._update(self._by_status, book.status, delta)
+        self._update(self._by_year, book.year, delta)
+        self._update(self._by_decade, book.year // 10 * 10, delta)
+        count = self._update(self._by_author, book.author, delta)
+        if self.generation is None:
+            # При построении куча собирается один раз в конце
+            return
+        if count:
+            heapq.heappush(self._author_heap, (-count, book.author))
+        if len(self._author_heap) > 2 * max(len(self._by_author), AUTHOR_HEAP_MIN_COMPACTION):
+            self._rebuild_author_heap()
+
+    def _rebuild_author_heap(self) -> None:
+        """
+        Собирает кучу авторов заново из счётчиков, без устаревших пар.
+        """
+        self._author_heap = [(-count, author) for author, count in self._by_author.items()]
+        heapq.heapify(self._author_heap)
+
+    def count_by_status(self, status: BookStatus) -> int:
+        """
+        :return: Количество книг с заданным статусом.
+        """
+        return self._by_status[status]
+
+    def count_by_author(self, author: str) -> int:
+        """
+        :return: Количество книг автора (имя сравнивается точно).
+        """
+        return self._by_author[author]
+
+    def count_by_year(self, year: int) -> int:
+        """
+        :return: Количество книг, изданных в заданном году.
+        """
+        return self._by_year[year]
+
+    def count_by_decade(self, decade: int) -> int:
+        """
+        :param decade: Первый год десятилетия (например, 1960).
+        :return: Количество книг, изданных в десятилетии.
+        """
+        return self._by_decade[decade]
+
+    def by_status(self) -> dict[BookStatus, int]:
+        """
+        :return: Количество книг по всем статусам (в том числе нулевое).
+        """
+        return {status: self._by_status[status] for status in BookStatus}
+
+    def by_year(self) -> dict[int, int]:
+        """
+        :return: Гистограмма по годам издания в порядке возрастания года.
+        """
+        return dict(sorted(self._by_year.items()))
+
+    def by_decade(self) -> dict[int, int]:
+        """
+        :return: Гистограмма по десятилетиям издания (первый год десятилетия -> количество).
+        """
+        return dict(sorted(self._by_decade.items()))
+
+    def top_authors(self, limit: int) -> list[tuple[str, int]]:
+        """
+        Возвращает авторов с наибольшим числом книг из кучи: устаревшие пары по пути отбрасываются,
+        а выбранные возвращаются в кучу.
+        :param limit: Количество авторов.
+        :return: Пары (автор, количество книг) по убыванию количества, при равенстве - по имени.
+        """
+        top: list[tuple[str, int]] = []
+        seen = set()
+        while self._author_heap and len(top) < limit:
+            negative_count, author = heapq.heappop(self._author_heap)
+            if author in seen or self._by_author.get(author) != -negative_count:
+                continue
+            seen.add(author)
+            top.append((author, -negative_count))
+        for author, count in top:
+            heapq.heappush(self._author_heap, (-count, author))
+        return top
@@ -1,5 +1,7 @@
+from src.application.deduplication.duplicate_detector import DuplicateBookError, DuplicateDetector
 from src.application.interfaces.library_repository import LibraryRepository
 from src.domain.entities.book import Book
+from src.domain.value_objects.isbn import normalize_isbn
 
 
 class AddBookUseCase:
@@ -7,21 +9,39 @@ class AddBookUseCase:
     Класс для добавления книги в библиотеку с использованием репозитория.
     """
 
-    def __init__(self, repository: LibraryRepository) -> None:
+    def __init__(self, repository: LibraryRepository, duplicates: DuplicateDetector | None = None) -> None:
         """
         Инициализация класса.
         :param repository: Экземпляр репозитория для работы с данными библиотеки.
+        :param duplicates: Поиск дубликатов или None, чтобы не проверять книги на дубликаты.
         """
         self.repository = repository
+        self.duplicates = duplicates
 
-    def execute(self, title: str, author: str, year: int) -> None:
+    def execute(self, title: str, author: str, year: int, isbn: str | None = None,
+                allow_duplicate: bool = False) -> int:
         """
         Добавляет новую книгу в библиотеку.
         :param title: Название книги.
         :param author: Автор книги.
         :param year: Год издания книги.
+        :param isbn: ISBN книги или None.
+        :param allow_duplicate: Добавить книгу, даже если такая уже есть в каталоге (ещё один экземпляр).
+        :return: Идентификатор добавленной книги.
+        :raises DuplicateBookError: Если такая книга уже есть в каталоге и дубликаты не разрешены.
+        :raises ValueError: Если ISBN некорректен.
         """
-        # Определяем ID для новой книги, основываясь на текущих данных репозитория
-        book_id = max((book.book_id for book in self.repository.books), default=0) + 1  # type: ignore
-        book = Book(book_id=book_id, title=title, author=author, year=year)
-        self.repository.add_book_to_library(book)
+        isbn = normalize_isbn(isbn) if isbn else None
+        # Выделение ID и добавление книги сохраняются на диск одной записью. Об ошибке-дубликате
+        # сообщается после выхода из транзакции: неудачная транзакция сбросила бы индексы дубликатов
+        with self.repository.transaction():
+            duplicates = []
+            if self.duplicates is not None and not allow_duplicate:
+                duplicates = self.duplicates.find(title, author, year, isbn)
+            if not duplicates:
+                book_id = self.repository.next_book_id()
+                book = Book(book_id=book_id, title=title, author=author, year=year, isbn=isbn)
+                self.repository.add_book_to_library(book)
+        if duplicates:
+            raise DuplicateBookError(duplicates)
+        return book_id
@@ -0,0 +1,33 @@
+from src.application.dto.loan_dto import LoanDTO
+from src.application.interfaces.library_repository import LibraryRepository
+from src.application.interfaces.loan_repository import LoanRepository
+
+
+class BorrowerLoansUseCase:
+    """
+    Класс для просмотра выдач читателя.
+    """
+
+    def __init__(self, repository: LibraryRepository, loans: LoanRepository) -> None:
+        """
+        Инициализация класса.
+        :param repository: Экземпляр репозитория для работы с данными библиотеки.
+        :param loans: Хранилище выдач.
+        """
+        self.repository = repository
+        self.loans = loans
+
+    def execute(self, borrower: str, active_only: bool = False) -> list[LoanDTO]:
+        """
+        Возвращает выдачи читателя.
+        :param borrower: Имя читателя.
+        :param active_only: Вернуть только невозвращённые книги.
+        :return: Список выдач в формате DTO в порядке оформления.
+        :raises ValueError: Если не указан читатель.
+        """
+        if not borrower.strip():
+            raise ValueError("Не указан читатель")
+        return [
+            LoanDTO.from_loan(loan, self.repository.get_book_by_id(loan.book_id))
+            for loan in self.loans.loans_of_borrower(borrower, active_only)
+        ]
@@ -0,0 +1,125 @@
+from typing import Callable, Iterable
+
+from src.application.deduplication.duplicate_detector import DuplicateBookError, DuplicateDetector
+from src.application.deduplication.duplicate_index import book_fingerprint
+from src.application.dto.import_report import ImportReport
+from src.application.interfaces.library_repository import LibraryRepository
+from src.domain.entities.book import Book
+from src.domain.value_objects.book_status import BookStatus
+from src.domain.value_objects.isbn import normalize_isbn
+
+# Проверенная запись о книге: название, автор, год, статус и ISBN
+ParsedRecord = tuple[str, str, int, BookStatus, str | None]
+
+
+class BulkAddBooksUseCase:
+    """
+    Класс для массового добавления книг (импорта каталога).
+    """
+
+    def __init__(self, repository: LibraryRepository, duplicates: DuplicateDetector | None = None) -> None:
+        """
+        Инициализация класса.
+        :param repository: Экземпляр репозитория для работы с данными библиотеки.
+        :param duplicates: Поиск дубликатов или None, чтобы не проверять книги на дубликаты.
+        """
+        self.repository = repository
+        self.duplicates = duplicates
+
+    def execute(self, records: Iterable[dict | ValueError], batch_size: int = 1000,
+                progress: Callable[[ImportReport], None] | None = None) -> ImportReport:
+        """
+        Проверяет и добавляет книги пакетами: для каждого пакета одним вызовом резервируется
+        блок ID, и пакет сохраняется в репозиторий одной транзакцией.
+        ID книг из исходных записей не используются - книги получают новые ID.
+        Если задан поиск дубликатов, отклоняются записи о книгах, которые уже есть в каталоге
+        или встретились раньше в этом же импорте (по ISBN или названию, автору и году).
+        :param records: Записи о книгах (словари с полями title, author, year и необязательными status и isbn).
+            Вместо записи источник может передать исключение ValueError - оно попадает в отчёт как ошибка записи.
+        :param batch_size: Количество книг в одной транзакции.
+        :param progress: Функция, которая вызывается с промежуточным отчётом после каждого пакета.
+        :return: Отчёт об импорте.
+        """
+        if batch_size < 1:
+            raise ValueError("Размер пакета должен быть положительным")
+
+        report = ImportReport()
+        batch: list[ParsedRecord] = []
+        # Ключи дубликатов (отпечатки и ISBN) записей текущего пакета -> номер записи. Книги
+        # сохранённых пакетов уже есть в индексах дубликатов
+        pending: dict = {}
+        for number, record in enumerate(records, start=1):
+            try:
+                if isinstance(record, ValueError):
+                    raise record
+                parsed = self._parse(record)
+                if self.duplicates is not None:
+                    self._check_duplicate(parsed, number, pending)
+                batch.append(parsed)
+            except (KeyError, TypeError, ValueError) as e:
+                report.errors.append((number, str(e)))
+            if len(batch) >= batch_size:
+                self._flush(batch, report, progress)
+                pending.clear()
+        self._flush(batch, report, progress)
+        return report
+
+    def _check_duplicate(self, parsed: ParsedRecord, number: int, pending: dict) -> None:
+        """
+        Проверяет, что книги нет ни в каталоге, ни среди записей текущего пакета, и запоминает её ключи.
+        :param parsed: Проверенная запись о книге.
+        :param number: Номер записи.
+        :param pending: Ключи дубликатов записей текущего пакета.
+        :raises ValueError: Если запись - дубликат.
+        """
+        title, author, year, _, isbn = parsed
+        fingerprint = book_fingerprint(title, author, year)
+        existing = self.duplicates.current().find(fingerprint, isbn)
+        if existing:
+            raise DuplicateBookError(existing)
+        keys = [fingerprint] if isbn is None else [fingerprint, isbn]
+        for key in keys:
+            if key in pending:
+                raise ValueError(f"Повтор записи {pending[key]}")
+        pending.update(dict.fromkeys(keys, number))
+
+    @staticmethod
+    def _parse(record: dict) -> ParsedRecord:
+        """
+        Проверяет запись о книге.
+        :param record: Словарь с полями книги.
+        :return: Кортеж (название, автор, год, статус, ISBN в каноническом виде или None).
+        :raises ValueError: Если запись некорректна.
+        """
+        title = str(record["title"]).strip()
+        author = str(record["author"]).strip()
+        if not title or not author:
+            raise ValueError("Название и автор книги не могут быть пустыми")
+        try:
+            year = int(record["year"])
+        except (TypeError, ValueError):
+            raise ValueError(f"Некорректный год выпуска: {record['year']}")
+        status = BookStatus(record.get("status") or "В наличии")
+        isbn = str(record.get("isbn") or "").strip()
+        return title, author, year, status, normalize_isbn(isbn) if isbn else None
+
+    def _flush(self, batch: list[ParsedRecord], report: ImportReport,
+               progress: Callable[[ImportReport], None] | None) -> None:
+        """
+        Сохраняет накопленный пакет книг.
+        :param batch: Проверенные записи пакета (очищается после сохранения).
+        :param report: Отчёт об импорте.
+        :param progress: Функция для отчёта о прогрессе.
+        """
+        if not batch:
+            return
+        with self.repository.transaction():
+            book_ids = self.repository.reserve_book_ids(len(batch))
+            self.repository.add_books_to_library(
+                Book(book_id=book_id, title=title, author=author, year=year, status=status, isbn=isbn)
+                for book_id, (title, author, year, status, isbn) in zip(book_ids, batch)
+            )
+        report.imported += len(batch)
+        batch.clear()
+        if progress is not None:
+            progress(report)
@@ -0,0 +1,55 @@
+from contextlib import nullcontext
+from datetime import date
+from typing import Iterable
+
+from src.application.dto.bulk_operation_report import BulkOperationReport
+from src.application.interfaces.library_repository import LibraryRepository
+from src.application.interfaces.loan_repository import LoanRepository
+from src.domain.value_objects.book_status import BookStatus
+
+
+class BulkChangeStatusUseCase:
+    """
+    Класс для изменения статуса многих книг сразу (например, при инвентаризации).
+    """
+
+    def __init__(self, repository: LibraryRepository, loans: LoanRepository | None = None) -> None:
+        """
+        Инициализация класса.
+        :param repository: Экземпляр репозитория для работы с данными библиотеки.
+        :param loans: Хранилище выдач или None, если выдачи не учитываются.
+        """
+        self.repository = repository
+        self.loans = loans
+
+    def execute(self, book_ids: Iterable[int], new_status: str) -> BulkOperationReport:
+        """
+        Изменяет статус книг одной транзакцией: изменения сохраняются на диск один раз.
+        Все ID читаются до начала изменений, поэтому ошибка во входных данных не оставит
+        операцию выполненной наполовину. Повторяющиеся ID учитываются один раз.
+        :param book_ids: Идентификаторы книг (список или поток).
+        :param new_status: Новый статус книг (например, "В наличии" или "Выдана").
+        :return: Отчёт: количество изменённых книг и ID, которые не найдены.
+        :raises ValueError: Если статус некорректен или книги пытаются выдать без оформления выдачи.
+        """
+        status = BookStatus(new_status)
+        if self.loans is not None and status == BookStatus.ISSUED:
+            raise ValueError("Книга выдаётся через оформление выдачи с указанием читателя")
+        book_ids = list(dict.fromkeys(book_ids))
+
+        loans_transaction = self.loans.transaction() if self.loans is not None else nullcontext()
+        with self.repository.transaction(), loans_transaction:
+            missing = self.repository.change_books_status(book_ids, status)
+            if self.loans is not None:
+                # Книги, возвращённые в наличие, закрывают свои выдачи
+                found = set(book_ids).difference(missing)
+                today = date.today()
+                for book_id in book_ids:
+                    loan = self.loans.active_loan(book_id) if book_id in found else None
+                    if loan is not None:
+                        self.loans.close_loan(loan.loan_id, today)
+
+        return BulkOperationReport(
+            changed=len(book_ids) - len(missing),
+            errors=[(book_id, "Книга не найдена") for book_id in missing],
+        )
@@ -0,0 +1,45 @@
+from contextlib import nullcontext
+from typing import Iterable
+
+from src.application.dto.bulk_operation_report import BulkOperationReport
+from src.application.interfaces.library_repository import LibraryRepository
+from src.application.interfaces.loan_repository import LoanRepository
+
+
+class BulkRemoveBooksUseCase:
+    """
+    Класс для удаления многих книг сразу (например, списания по итогам инвентаризации).
+    """
+
+    def __init__(self, repository: LibraryRepository, loans: LoanRepository | None = None) -> None:
+        """
+        Инициализация класса.
+        :param repository: Экземпляр репозитория для работы с данными библиотеки.
+        :param loans: Хранилище выдач или None, если выдачи не учитываются.
+        """
+        self.repository = repository
+        self.loans = loans
+
+    def execute(self, book_ids: Iterable[int]) -> BulkOperationReport:
+        """
+        Удаляет книги одной транзакцией: изменения сохраняются на диск один раз.
+        Все ID читаются до начала удаления; повторяющиеся ID учитываются один раз.
+        Проверка выдач и удаление выполняются в одной транзакции с хранилищем выдач,
+        поэтому книгу не выдадут между проверкой и удалением.
+        :param book_ids: Идентификаторы книг (список или поток).
+        :return: Отчёт: количество удалённых книг и ID, которые не найдены или находятся у читателей.
+        """
+        report = BulkOperationReport()
+        book_ids = list(dict.fromkeys(book_ids))
+
+        loans_transaction = self.loans.transaction() if self.loans is not None else nullcontext()
+        with self.repository.transaction(), loans_transaction:
+            if self.loans is not None:
+                on_loan = {book_id for book_id in book_ids if self.loans.active_loan(book_id) is not None}
+                report.errors.extend((book_id, "Книга выдана читателю и не может быть удалена") for book_id in on_loan)
+                book_ids = [book_id for book_id in book_ids if book_id not in on_loan]
+            missing = self.repository.remove_books_from_library(book_ids)
+
+        report.changed = len(book_ids) - len(missing)
+        report.errors.extend((book_id, "Книга не найдена") for book_id in missing)
+        return report
@@ -0,0 +1,53 @@
+from src.application.dto.catalog_statistics_dto import CatalogStatisticsDTO
+from src.application.dto.page_request import PageRequest
+from src.application.interfaces.library_repository import LibraryRepository
+from src.application.statistics.catalog_statistics import CatalogStatistics
+
+
+class CatalogStatisticsUseCase:
+    """
+    Класс для получения сводной статистики каталога.
+    Статистика строится одним проходом по каталогу при первом запросе, а дальше обновляется
+    по событиям изменений репозитория. Заново она строится, только если каталог изменён
+    в обход событий (например, другим процессом) или репозиторий не публикует событий.
+    """
+
+    def __init__(self, repository: LibraryRepository) -> None:
+        """
+        Инициализация класса.
+        :param repository: Экземпляр репозитория для работы с данными библиотеки.
+        """
+        self.repository = repository
+        self.statistics = CatalogStatistics()
+        try:
+            repository.subscribe(self.statistics.apply)
+        except NotImplementedError:
+            pass
+
+    def execute(self, top_authors: int = 10) -> CatalogStatisticsDTO:
+        """
+        Возвращает сводную статистику каталога.
+        :param top_authors: Количество авторов с наибольшим числом книг.
+        :return: Статистика в формате DTO.
+        :raises ValueError: Если количество авторов отрицательно.
+        """
+        if top_authors < 0:
+            raise ValueError("Количество авторов не может быть отрицательным")
+        statistics = self.current()
+        return CatalogStatisticsDTO(
+            total=statistics.total,
+            by_status={status.value: count for status, count in statistics.by_status().items()},
+            by_decade=statistics.by_decade(),
+            top_authors=statistics.top_authors(top_authors),
+        )
+
+    def current(self) -> CatalogStatistics:
+        """
+        Возвращает агрегаты, соответствующие текущей версии каталога, при необходимости построив их заново.
+        :return: Объект CatalogStatistics.
+        """
+        if self.statistics.generation is None or self.statistics.generation != self.repository.generation():
+            with self.repository.transaction():
+                generation = self.repository.generation()
+                self.statistics.rebuild(self.repository.iter_books(PageRequest()), generation)
+        return self.statistics
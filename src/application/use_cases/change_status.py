@@ -1,4 +1,7 @@
+from datetime import date
+
 from src.application.interfaces.library_repository import LibraryRepository
+from src.application.interfaces.loan_repository import LoanRepository
 from src.domain.value_objects.book_status import BookStatus
 
 
@@ -7,21 +10,36 @@ class ChangeBookStatusUseCase:
     Класс для изменения статуса книги в библиотеке.
     """
 
-    def __init__(self, repository: LibraryRepository) -> None:
+    def __init__(self, repository: LibraryRepository, loans: LoanRepository | None = None) -> None:
         """
         Инициализация класса.
         :param repository: Экземпляр репозитория для работы с данными библиотеки.
+        :param loans: Хранилище выдач или None, если выдачи не учитываются. С учётом выдач
+            книга выдаётся только через оформление выдачи, а при возврате её выдача закрывается.
         """
         self._repository = repository
+        self._loans = loans
 
     def execute(self, book_id: int, new_status: str) -> None:
         """
         Изменяет статус книги по её идентификатору.
         :param book_id: Идентификатор книги.
         :param new_status: Новый статус книги (например, "В наличии" или "Выдана").
-        :raises ValueError: Если книга с указанным идентификатором не найдена.
+        :raises ValueError: Если книга с указанным идентификатором не найдена
+            или книгу пытаются выдать без оформления выдачи.
         """
         # Преобразуем строковое значение статуса в объект BookStatus
         status = BookStatus(new_status)
-        if not self._repository.change_book_status(book_id, status):
-            raise ValueError("Книга не найдена")
+        if self._loans is None:
+            if not self._repository.change_book_status(book_id, status):
+                raise ValueError("Книга не найдена")
+            return
+
+        if status == BookStatus.ISSUED:
+            raise ValueError("Книга выдаётся через оформление выдачи с указанием читателя")
+        with self._repository.transaction(), self._loans.transaction():
+            loan = self._loans.active_loan(book_id)
+            if loan is not None:
+                self._loans.close_loan(loan.loan_id, date.today())
+            if not self._repository.change_book_status(book_id, status):
+                raise ValueError("Книга не найдена")
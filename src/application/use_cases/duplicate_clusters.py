@@ -0,0 +1,32 @@
+from src.application.deduplication.duplicate_detector import DuplicateDetector
+from src.application.dto.book_dto import BookDTO
+from src.application.interfaces.library_repository import LibraryRepository
+
+
+class DuplicateClustersUseCase:
+    """
+    Класс для поиска групп дубликатов в каталоге: книг с общим ISBN или с одинаковыми
+    названием, автором и годом. Группы берутся из хеш-индексов дубликатов одним проходом
+    по их корзинам, без попарного сравнения книг.
+    """
+
+    def __init__(self, repository: LibraryRepository, duplicates: DuplicateDetector | None = None) -> None:
+        """
+        Инициализация класса.
+        :param repository: Экземпляр репозитория для работы с данными библиотеки.
+        :param duplicates: Поиск дубликатов, общий с другими сценариями, или None, чтобы создать свой.
+        """
+        self.repository = repository
+        self.duplicates = duplicates or DuplicateDetector(repository)
+
+    def execute(self) -> list[list[BookDTO]]:
+        """
+        Возвращает группы дубликатов.
+        :return: Группы книг в формате DTO (в группе - по возрастанию ID), упорядоченные по наименьшему ID.
+        """
+        with self.repository.transaction():
+            clusters = self.duplicates.current().clusters()
+            return [
+                [BookDTO.from_book(book) for book in map(self.repository.get_book_by_id, cluster) if book is not None]
+                for cluster in clusters
+            ]
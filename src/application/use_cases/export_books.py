@@ -0,0 +1,28 @@
+from dataclasses import asdict
+from typing import Iterator
+
+from src.application.interfaces.library_repository import LibraryRepository
+from src.application.use_cases.list_books import ListBooksUseCase
+
+
+class ExportBooksUseCase:
+    """
+    Класс для выгрузки всего каталога библиотеки.
+    """
+
+    def __init__(self, repository: LibraryRepository) -> None:
+        """
+        Инициализация класса.
+        :param repository: Экземпляр репозитория для работы с данными библиотеки.
+        """
+        self.repository = repository
+
+    def execute(self, page_size: int = 1000) -> Iterator[dict]:
+        """
+        Лениво перебирает все книги по возрастанию ID, читая каталог постранично.
+        :param page_size: Количество книг, запрашиваемых у репозитория за один раз.
+        :return: Итератор словарей с полями книги.
+        """
+        for page in ListBooksUseCase(self.repository).execute(page_size=page_size):
+            for book in page:
+                yield asdict(book)
@@ -0,0 +1,54 @@
+from datetime import date, timedelta
+
+from src.application.interfaces.library_repository import LibraryRepository
+from src.application.interfaces.loan_repository import LoanRepository
+from src.domain.entities.loan import Loan
+from src.domain.value_objects.book_status import BookStatus
+
+# Срок выдачи по умолчанию, в днях
+LOAN_PERIOD_DAYS = 14
+
+
+class IssueBookUseCase:
+    """
+    Класс для выдачи книги читателю: оформляет выдачу и отмечает книгу выданной.
+    """
+
+    def __init__(self, repository: LibraryRepository, loans: LoanRepository) -> None:
+        """
+        Инициализация класса.
+        :param repository: Экземпляр репозитория для работы с данными библиотеки.
+        :param loans: Хранилище выдач.
+        """
+        self.repository = repository
+        self.loans = loans
+
+    def execute(self, book_id: int, borrower: str, days: int = LOAN_PERIOD_DAYS, today: date | None = None) -> int:
+        """
+        Выдаёт книгу читателю.
+        :param book_id: Идентификатор книги.
+        :param borrower: Имя читателя.
+        :param days: Срок выдачи в днях.
+        :param today: Дата выдачи (по умолчанию - сегодня).
+        :return: Идентификатор выдачи.
+        :raises ValueError: Если книга не найдена или уже выдана, не указан читатель или срок некорректен.
+        """
+        borrower = borrower.strip()
+        if not borrower:
+            raise ValueError("Не указан читатель")
+        if days < 1:
+            raise ValueError("Срок выдачи должен быть положительным")
+        today = today or date.today()
+
+        # Выдача сохраняется раньше статуса книги: после сбоя между двумя записями книга с открытой
+        # выдачей может остаться в наличии - возврат такой книги закрывает выдачу
+        with self.repository.transaction(), self.loans.transaction():
+            book = self.repository.get_book_by_id(book_id)
+            if book is None:
+                raise ValueError("Книга не найдена")
+            if book.status == BookStatus.ISSUED or self.loans.active_loan(book_id) is not None:
+                raise ValueError("Книга уже выдана")
+            loan_id = self.loans.next_loan_id()
+            self.loans.add_loan(Loan(loan_id, book_id, borrower, today, today + timedelta(days=days)))
+            self.repository.change_book_status(book_id, BookStatus.ISSUED)
+        return loan_id
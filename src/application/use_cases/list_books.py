@@ -0,0 +1,54 @@
+from typing import Iterator
+
+from src.application.dto.book_dto import BookDTO
+from src.application.dto.page_request import PageRequest
+from src.application.dto.search_criteria import SearchCriteria
+from src.application.interfaces.library_repository import LibraryRepository
+
+
+class ListBooksUseCase:
+    """
+    Класс для постраничного просмотра книг библиотеки.
+    """
+
+    def __init__(self, repository: LibraryRepository) -> None:
+        """
+        Инициализация класса.
+        :param repository: Экземпляр репозитория для работы с данными библиотеки.
+        """
+        self.repository = repository
+
+    def execute(self, page_size: int = 20, order_by: str = "book_id", descending: bool = False,
+                criteria: SearchCriteria | None = None, after: tuple | None = None) -> Iterator[list[BookDTO]]:
+        """
+        Лениво перебирает книги страницами. Каждая следующая страница запрашивается у репозитория
+        только когда она нужна, по курсору от последней книги предыдущей страницы.
+        :param page_size: Количество книг на странице.
+        :param order_by: Поле сортировки ("book_id", "title", "author" или "year").
+        :param descending: Сортировать по убыванию.
+        :param criteria: Критерии поиска или None, чтобы перебирать весь каталог.
+        :param after: Курсор (значение поля сортировки, book_id) последней уже показанной книги,
+            чтобы продолжить просмотр с места, где он был прерван.
+        :return: Итератор страниц, каждая страница - список книг в формате DTO.
+        """
+        if page_size < 1:
+            raise ValueError("Размер страницы должен быть положительным")
+        # Проверяем параметры сразу, а не при запросе первой страницы
+        PageRequest(limit=page_size, order_by=order_by, descending=descending, after=after)
+        return self._pages(page_size, order_by, descending, criteria, after)
+
+    def _pages(self, page_size: int, order_by: str, descending: bool,
+               criteria: SearchCriteria | None, after: tuple | None) -> Iterator[list[BookDTO]]:
+        """
+        Генератор страниц для execute.
+        """
+        while True:
+            page = PageRequest(limit=page_size, order_by=order_by, descending=descending, after=after)
+            books = list(self.repository.iter_books(page, criteria))
+            if not books:
+                return
+            yield [BookDTO.from_book(book) for book in books]
+            if len(books) < page_size:
+                return
+            last = books[-1]
+            after = (getattr(last, order_by), last.book_id)
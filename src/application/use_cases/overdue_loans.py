@@ -0,0 +1,31 @@
+from datetime import date
+
+from src.application.dto.loan_dto import LoanDTO
+from src.application.interfaces.library_repository import LibraryRepository
+from src.application.interfaces.loan_repository import LoanRepository
+
+
+class OverdueLoansUseCase:
+    """
+    Класс для получения списка просроченных выдач.
+    """
+
+    def __init__(self, repository: LibraryRepository, loans: LoanRepository) -> None:
+        """
+        Инициализация класса.
+        :param repository: Экземпляр репозитория для работы с данными библиотеки.
+        :param loans: Хранилище выдач.
+        """
+        self.repository = repository
+        self.loans = loans
+
+    def execute(self, today: date | None = None) -> list[LoanDTO]:
+        """
+        Возвращает невозвращённые книги, срок возврата которых прошёл.
+        :param today: Текущая дата (по умолчанию - сегодня).
+        :return: Список выдач в формате DTO по возрастанию срока возврата.
+        """
+        return [
+            LoanDTO.from_loan(loan, self.repository.get_book_by_id(loan.book_id))
+            for loan in self.loans.overdue_loans(today or date.today())
+        ]
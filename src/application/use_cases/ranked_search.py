@@ -0,0 +1,29 @@
+from src.application.dto.book_dto import BookDTO
+from src.application.interfaces.library_repository import LibraryRepository
+
+
+class RankedSearchUseCase:
+    """
+    Класс для поиска книг по запросу в свободной форме с учётом опечаток и ранжированием результатов.
+    """
+
+    def __init__(self, repository: LibraryRepository) -> None:
+        """
+        Инициализация класса.
+        :param repository: Экземпляр репозитория для работы с данными библиотеки.
+        """
+        self.repository = repository
+
+    def execute(self, query: str, limit: int = 10) -> list[BookDTO]:
+        """
+        Ищет книги, наиболее подходящие под запрос.
+        :param query: Строка запроса (слова из названия и имени автора, возможно с опечатками).
+        :param limit: Количество лучших результатов.
+        :return: Список найденных книг в формате DTO по убыванию релевантности.
+        :raises ValueError: Если запрос пустой или limit не положительный.
+        """
+        if not query.strip():
+            raise ValueError("Пустой поисковый запрос")
+        if limit < 1:
+            raise ValueError("Количество результатов должно быть положительным")
+        return [BookDTO.from_book(book) for book in self.repository.search_ranked(query, limit)]
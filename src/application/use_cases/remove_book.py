@@ -1,4 +1,5 @@
 from src.application.interfaces.library_repository import LibraryRepository
+from src.application.interfaces.loan_repository import LoanRepository
 
 
 class RemoveBookUseCase:
@@ -6,18 +7,23 @@ class RemoveBookUseCase:
     Класс для удаления книги из библиотеки.
     """
 
-    def __init__(self, repository: LibraryRepository) -> None:
+    def __init__(self, repository: LibraryRepository, loans: LoanRepository | None = None) -> None:
         """
         Инициализация класса.
         :param repository: Экземпляр репозитория для работы с данными библиотеки.
+        :param loans: Хранилище выдач или None, если выдачи не учитываются.
         """
         self.repository = repository
+        self.loans = loans
 
     def execute(self, book_id: int) -> None:
         """
         Удаляет книгу из библиотеки по её идентификатору.
         :param book_id: Идентификатор книги.
-        :raises ValueError: Если книга с указанным идентификатором не найдена.
+        :raises ValueError: Если книга с указанным идентификатором не найдена
+            или находится у читателя.
         """
+        if self.loans is not None and self.loans.active_loan(book_id) is not None:
+            raise ValueError("Книга выдана читателю и не может быть удалена")
         if not self.repository.remove_book_from_library(book_id=book_id):
             raise ValueError("Книга не найдена")
@@ -0,0 +1,41 @@
+from datetime import date
+
+from src.application.interfaces.library_repository import LibraryRepository
+from src.application.interfaces.loan_repository import LoanRepository
+from src.domain.value_objects.book_status import BookStatus
+
+
+class ReturnBookUseCase:
+    """
+    Класс для возврата книги: закрывает выдачу и отмечает книгу имеющейся в наличии.
+    """
+
+    def __init__(self, repository: LibraryRepository, loans: LoanRepository) -> None:
+        """
+        Инициализация класса.
+        :param repository: Экземпляр репозитория для работы с данными библиотеки.
+        :param loans: Хранилище выдач.
+        """
+        self.repository = repository
+        self.loans = loans
+
+    def execute(self, book_id: int, today: date | None = None) -> None:
+        """
+        Принимает книгу от читателя. Книга, выданная до появления учёта выдач (со статусом
+        "Выдана", но без выдачи), тоже может быть возвращена.
+        :param book_id: Идентификатор книги.
+        :param today: Дата возврата (по умолчанию - сегодня).
+        :raises ValueError: Если книга не найдена или не выдана.
+        """
+        # Выдача закрывается до изменения статуса: после сбоя между двумя записями книга
+        # останется выданной без открытой выдачи, и повторный возврат вернёт ей статус
+        with self.repository.transaction(), self.loans.transaction():
+            book = self.repository.get_book_by_id(book_id)
+            if book is None:
+                raise ValueError("Книга не найдена")
+            loan = self.loans.active_loan(book_id)
+            if loan is None and book.status == BookStatus.AVAILABLE:
+                raise ValueError("Книга не выдана")
+            if loan is not None:
+                self.loans.close_loan(loan.loan_id, today or date.today())
+            self.repository.change_book_status(book_id, BookStatus.AVAILABLE)
@@ -1,6 +1,10 @@
+from typing import Iterator
+
+from src.application.cache.search_result_cache import SearchResultCache
 from src.application.dto.book_dto import BookDTO
 from src.application.dto.search_criteria import SearchCriteria
 from src.application.interfaces.library_repository import LibraryRepository
+from src.application.use_cases.list_books import ListBooksUseCase
 
 
 class SearchBookUseCase:
@@ -8,12 +12,14 @@ class SearchBookUseCase:
     Класс для поиска книг в библиотеке по заданным критериям.
     """
 
-    def __init__(self, repository: LibraryRepository) -> None:
+    def __init__(self, repository: LibraryRepository, cache: SearchResultCache | None = None) -> None:
         """
         Инициализация класса.
         :param repository: Экземпляр репозитория для работы с данными библиотеки.
+        :param cache: Кэш результатов поиска или None, чтобы искать в репозитории при каждом вызове.
         """
         self.repository = repository
+        self.cache = cache
 
     def execute(self, criteria: SearchCriteria) -> list[BookDTO] | None:
         """
@@ -21,5 +27,37 @@ class SearchBookUseCase:
         :param criteria: Критерии поиска (название, автор, год).
         :return: Список найденных книг в формате DTO или None, если ничего не найдено.
         """
+        if self.cache is None:
+            return self._search(criteria)
+
+        # Версия читается до поиска: если каталог изменится во время поиска, результат
+        # окажется помечен старой версией и не будет выдан из кэша
+        generation = self.repository.generation()
+        found, result = self.cache.get(criteria, generation)
+        if not found:
+            result = self._search(criteria)
+            self.cache.put(criteria, generation, result)
+        return result
+
+    def _search(self, criteria: SearchCriteria) -> list[BookDTO] | None:
+        """
+        Ищет книги в репозитории.
+        :param criteria: Критерии поиска.
+        :return: Список найденных книг в формате DTO или None, если ничего не найдено.
+        """
         books = self.repository.search_book_in_library(criteria)
         return [BookDTO.from_book(book) for book in books] if books else None
+
+    def iter_pages(self, criteria: SearchCriteria, page_size: int = 20) -> Iterator[list[BookDTO]]:
+        """
+        Выполняет поиск книг и отдаёт результаты страницами. Если задан кэш, поиск идёт через execute
+        и результат целиком берётся из кэша (или сохраняется в него), иначе страницы читаются из
+        репозитория лениво.
+        :param criteria: Критерии поиска (название, автор, год).
+        :param page_size: Количество книг на странице.
+        :return: Итератор страниц найденных книг в формате DTO.
+        """
+        if self.cache is None:
+            return ListBooksUseCase(self.repository).execute(page_size=page_size, criteria=criteria)
+        result = self.execute(criteria) or []
+        return (result[start:start + page_size] for start in range(0, len(result), page_size))
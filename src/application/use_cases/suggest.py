@@ -0,0 +1,28 @@
+from src.application.interfaces.library_repository import LibraryRepository
+
+
+class SuggestUseCase:
+    """
+    Класс для автодополнения названий книг и имён авторов по введённому началу.
+    """
+
+    def __init__(self, repository: LibraryRepository) -> None:
+        """
+        Инициализация класса.
+        :param repository: Экземпляр репозитория для работы с данными библиотеки.
+        """
+        self.repository = repository
+
+    def execute(self, prefix: str, limit: int = 10) -> list[str]:
+        """
+        Возвращает варианты дополнения введённой строки.
+        :param prefix: Начало названия или имени автора.
+        :param limit: Наибольшее количество вариантов.
+        :return: Список названий и имён авторов в алфавитном порядке (пустой для пустой строки).
+        :raises ValueError: Если limit не положительный.
+        """
+        if limit < 1:
+            raise ValueError("Количество вариантов должно быть положительным")
+        if not prefix.strip():
+            return []
+        return self.repository.suggest(prefix, limit)
@@ -1,9 +1,11 @@
+import sys
 from dataclasses import dataclass
 
 from src.domain.value_objects.book_status import BookStatus
+from src.domain.value_objects.isbn import normalize_isbn
 
 
-@dataclass
+@dataclass(slots=True)
 class Book:
     """
     Класс, представляющий книгу в библиотеке.
@@ -12,8 +14,17 @@ class Book:
     title: str
     author: str
     year: int
-    status: BookStatus = BookStatus('В наличии')
+    status: BookStatus = BookStatus.AVAILABLE
+    isbn: str | None = None
 
     """
-    Содержит информацию о книге: ID, название, автор, год издания и статус.
+    Содержит информацию о книге: ID, название, автор, год издания, статус и необязательный ISBN
+    (хранится в каноническом виде ISBN-13, см. normalize_isbn).
+    Класс использует __slots__ вместо словаря атрибутов, а имя автора интернируется:
+    у многих книг один автор, и в памяти хранится одна строка на автора.
     """
+
+    def __post_init__(self):
+        self.author = sys.intern(self.author)
+        if self.isbn is not None:
+            self.isbn = normalize_isbn(self.isbn) if self.isbn else None
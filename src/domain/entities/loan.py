@@ -0,0 +1,35 @@
+from dataclasses import dataclass
+from datetime import date
+
+
+@dataclass(slots=True)
+class Loan:
+    """
+    Класс, представляющий выдачу книги читателю.
+    """
+    loan_id: int
+    book_id: int
+    borrower: str
+    issued_on: date
+    due_on: date
+    returned_on: date | None = None
+
+    """
+    Выдача открыта, пока книга не возвращена (returned_on не задан).
+    Закрытые выдачи не удаляются и составляют историю выдач книги и читателя.
+    """
+
+    @property
+    def is_active(self) -> bool:
+        """
+        :return: True, если книга ещё не возвращена.
+        """
+        return self.returned_on is None
+
+    def is_overdue(self, today: date) -> bool:
+        """
+        Проверяет, просрочен ли возврат книги.
+        :param today: Текущая дата.
+        :return: True, если книга не возвращена, а срок возврата уже прошёл.
+        """
+        return self.is_active and self.due_on < today
@@ -0,0 +1,31 @@
+from dataclasses import dataclass
+from enum import Enum
+
+from src.domain.entities.book import Book
+from src.domain.value_objects.book_status import BookStatus
+
+
+class BookEventKind(Enum):
+    """
+    Вид изменения каталога.
+    """
+    ADDED = "added"
+    REMOVED = "removed"
+    STATUS_CHANGED = "status_changed"
+    # Каталог изменился так, что отдельные изменения неизвестны (изменения в обход репозитория,
+    # откат транзакции): подписчики должны заново построить свои данные по каталогу
+    RESET = "reset"
+
+
+@dataclass(frozen=True, slots=True)
+class BookEvent:
+    """
+    Событие изменения каталога.
+    book - добавленная или удалённая книга, для смены статуса - книга с новым статусом (None для RESET);
+    previous_status - статус до изменения (только для STATUS_CHANGED);
+    generation - номер версии каталога после изменения.
+    """
+    kind: BookEventKind
+    book: Book | None
+    generation: int
+    previous_status: BookStatus | None = None
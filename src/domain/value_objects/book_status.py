@@ -1,19 +1,28 @@
-from dataclasses import dataclass
+from enum import Enum
 
 
-@dataclass(frozen=True)
-class BookStatus:
+class BookStatus(Enum):
     """
     Класс для представления статуса книги.
     """
-    value: str
+    AVAILABLE = "В наличии"
+    ISSUED = "Выдана"
 
     """
-    Статус книги может быть, например, "В наличии" или "Выдана".
-    Класс неизменяемый (frozen=True), чтобы избежать случайных изменений статуса.
+    Статус книги может быть "В наличии" или "Выдана".
+    Каждый статус существует в единственном экземпляре: BookStatus("в наличии") и BookStatus("В Наличии")
+    возвращают один и тот же объект BookStatus.AVAILABLE, поэтому статусы не создаются заново
+    для каждой книги и сравниваются по ссылке.
     """
 
-    def __post_init__(self):
-        allowed_statuses = ["в наличии", "выдана"]
-        if self.value.lower() not in allowed_statuses:
-            raise ValueError(f"Недопустимый статус книги: {self.value}")
+    @classmethod
+    def _missing_(cls, value):
+        # Значение статуса принимается без учёта регистра
+        if isinstance(value, str):
+            member = _MEMBERS_BY_LOWER_VALUE.get(value.lower())
+            if member is not None:
+                return member
+        raise ValueError(f"Недопустимый статус книги: {value}")
+
+
+_MEMBERS_BY_LOWER_VALUE = {member.value.lower(): member for member in BookStatus}
@@ -0,0 +1,31 @@
+def normalize_isbn(value: str) -> str:
+    """
+    Приводит ISBN к каноническому виду: 13 цифр без дефисов и пробелов.
+    ISBN-10 переводится в ISBN-13 (префикс 978), поэтому одна книга, записанная в разных
+    форматах, получает один и тот же ISBN.
+    :param value: ISBN-10 или ISBN-13, возможно с дефисами и пробелами.
+    :return: ISBN-13 из 13 цифр.
+    :raises ValueError: Если строка не является корректным ISBN (длина или контрольная цифра).
+    """
+    digits = value.replace("-", "").replace(" ", "").upper()
+    if len(digits) == 10 and digits[:9].isdigit() and (digits[9].isdigit() or digits[9] == "X"):
+        checksum = sum((10 - i) * (10 if digit == "X" else int(digit)) for i, digit in enumerate(digits))
+        if checksum % 11:
+            raise ValueError(f"Некорректный ISBN: {value}")
+        digits = "978" + digits[:9]
+        return digits + _isbn13_check_digit(digits)
+    if len(digits) == 13 and digits.isdigit():
+        if digits[12] != _isbn13_check_digit(digits[:12]):
+            raise ValueError(f"Некорректный ISBN: {value}")
+        return digits
+    raise ValueError(f"Некорректный ISBN: {value}")
+
+
+def _isbn13_check_digit(digits: str) -> str:
+    """
+    Вычисляет контрольную цифру ISBN-13.
+    :param digits: Первые 12 цифр ISBN-13.
+    :return: Контрольная цифра.
+    """
+    total = sum(int(digit) * (3 if i % 2 else 1) for i, digit in enumerate(digits))
+    return str(-total % 10)
@@ -0,0 +1,15 @@
+import re
+
+# Слово нормализованной строки: последовательность букв, цифр и подчёркиваний
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def normalize_text(text: str) -> str:
+    """
+    Приводит строку к виду для поиска и сравнения: нижний регистр и замена "ё" на "е".
+    Этой функцией пользуются все хранилища и индексы, ключи кэша поиска и отпечатки книг,
+    поэтому строки везде сравниваются одинаково.
+    :param text: Исходная строка.
+    :return: Нормализованная строка.
+    """
+    return text.lower().replace("ё", "е")
@@ -0,0 +1,55 @@
+import os
+from contextlib import contextmanager
+from typing import Iterator
+
+try:
+    import fcntl
+except ImportError:
+    # На платформах без fcntl (Windows) межпроцессная блокировка не выполняется
+    fcntl = None
+
+
+class FileLock:
+    """
+    Исключительная межпроцессная блокировка на отдельном файле (fcntl.flock).
+    Повторный захват тем же объектом не блокирует, а лишь увеличивает счётчик вложенности.
+    Блокировка снимается операционной системой и при аварийном завершении процесса.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        :param path: Путь к файлу блокировки (создаётся при первом захвате).
+        """
+        self.path = path
+        self._fd: int | None = None
+        self._depth = 0
+
+    @property
+    def held(self) -> bool:
+        """
+        :return: True, если блокировка удерживается этим объектом.
+        """
+        return self._depth > 0
+
+    @contextmanager
+    def acquire(self) -> Iterator[None]:
+        """
+        Захватывает блокировку, ожидая, пока её отпустят другие процессы.
+        """
+        if not self._depth:
+            self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            if fcntl is not None:
+                try:
+                    fcntl.flock(self._fd, fcntl.LOCK_EX)
+                except BaseException:
+                    os.close(self._fd)
+                    raise
+        self._depth += 1
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            if not self._depth:
+                # Закрытие дескриптора снимает блокировку flock
+                os.close(self._fd)
+                self._fd = None
@@ -0,0 +1,66 @@
+import threading
+from contextlib import contextmanager
+from typing import Iterator
+
+
+class ReadWriteLock:
+    """
+    Блокировка читателей-писателей для потоков одного процесса.
+    Читатели работают параллельно, писатели - по одному и без читателей. Ожидающий писатель
+    не пропускает вперёд новых читателей, поэтому поток запросов на чтение не блокирует запись.
+    Запись повторно входима, а поток-писатель может читать без дополнительного ожидания.
+    """
+
+    def __init__(self) -> None:
+        self._condition = threading.Condition()
+        self._readers = 0
+        self._writer: int | None = None
+        self._writer_depth = 0
+        self._waiting_writers = 0
+
+    @contextmanager
+    def read(self) -> Iterator[None]:
+        """
+        Захватывает блокировку на чтение.
+        """
+        with self._condition:
+            owner = self._writer == threading.get_ident()
+            if not owner:
+                while self._writer is not None or self._waiting_writers:
+                    self._condition.wait()
+                self._readers += 1
+        try:
+            yield
+        finally:
+            if not owner:
+                with self._condition:
+                    self._readers -= 1
+                    if not self._readers:
+                        self._condition.notify_all()
+
+    @contextmanager
+    def write(self) -> Iterator[None]:
+        """
+        Захватывает блокировку на запись.
+        """
+        me = threading.get_ident()
+        with self._condition:
+            if self._writer == me:
+                self._writer_depth += 1
+            else:
+                self._waiting_writers += 1
+                try:
+                    while self._writer is not None or self._readers:
+                        self._condition.wait()
+                finally:
+                    self._waiting_writers -= 1
+                self._writer = me
+                self._writer_depth = 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._writer_depth -= 1
+                if not self._writer_depth:
+                    self._writer = None
+                    self._condition.notify_all()
@@ -0,0 +1,84 @@
+import bisect
+from typing import Iterable
+
+from src.domain.value_objects.search_text import normalize_text
+
+
+class PrefixIndex:
+    """
+    Индекс для автодополнения: отсортированный массив различных нормализованных строк
+    (названий и имён авторов). Все строки с заданным началом лежат в массиве подряд, поэтому
+    первые N дополнений находятся двоичным поиском и последовательным чтением N элементов.
+    Для каждой строки хранится исходное написание и число книг, в которых она встречается,
+    чтобы строка исчезала из индекса вместе с последней такой книгой.
+    """
+
+    def __init__(self) -> None:
+        self._keys: list[str] = []
+        self._entries: dict[str, list] = {}
+
+    @classmethod
+    def build(cls, texts: Iterable[str]) -> "PrefixIndex":
+        """
+        Строит индекс по набору строк, сортируя их один раз вместо вставки по одной.
+        :param texts: Исходные строки.
+        :return: Новый индекс.
+        """
+        index = cls()
+        for text in texts:
+            key = normalize_text(text)
+            entry = index._entries.get(key)
+            if entry is None:
+                index._entries[key] = [text, 1]
+            else:
+                entry[1] += 1
+        index._keys = sorted(index._entries)
+        return index
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def add(self, text: str) -> None:
+        """
+        Добавляет строку в индекс.
+        :param text: Исходная строка.
+        """
+        key = normalize_text(text)
+        entry = self._entries.get(key)
+        if entry is not None:
+            entry[1] += 1
+            return
+        self._entries[key] = [text, 1]
+        if not self._keys or self._keys[-1] < key:
+            self._keys.append(key)
+        else:
+            bisect.insort(self._keys, key)
+
+    def remove(self, text: str) -> None:
+        """
+        Уменьшает счётчик строки и убирает её из индекса, когда она больше не встречается.
+        :param text: Исходная строка.
+        """
+        key = normalize_text(text)
+        entry = self._entries.get(key)
+        if entry is None:
+            return
+        entry[1] -= 1
+        if not entry[1]:
+            del self._entries[key]
+            del self._keys[bisect.bisect_left(self._keys, key)]
+
+    def complete(self, prefix: str, limit: int = 10) -> list[str]:
+        """
+        Возвращает строки, начинающиеся с prefix, в алфавитном порядке.
+        :param prefix: Начало строки (регистр и "ё" не учитываются).
+        :param limit: Наибольшее количество дополнений.
+        :return: Список строк в исходном написании.
+        """
+        key = normalize_text(prefix)
+        result = []
+        for position in range(bisect.bisect_left(self._keys, key), len(self._keys)):
+            if len(result) >= limit or not self._keys[position].startswith(key):
+                break
+            result.append(self._entries[self._keys[position]][0])
+        return result
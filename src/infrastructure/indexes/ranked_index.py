@@ -0,0 +1,245 @@
+import heapq
+import math
+from collections import defaultdict
+from typing import Iterable
+
+from src.domain.entities.book import Book
+from src.domain.value_objects.search_text import TOKEN_PATTERN, normalize_text
+
+# Параметры BM25: насыщение частоты слова и поправка на длину поля
+K1 = 1.2
+B = 0.75
+
+# Веса полей: совпадение в названии важнее совпадения в имени автора
+FIELD_WEIGHTS = {"title": 2.0, "author": 1.0}
+
+# Наибольшее расстояние редактирования, для которого словарь удалений хранит варианты слов
+MAX_EDIT_DISTANCE = 2
+
+# Варианты с удалениями строятся только по началу слова такой длины: это ограничивает размер
+# словаря удалений, а кандидаты всё равно проверяются по полному расстоянию редактирования
+PREFIX_LENGTH = 7
+
+
+def allowed_distance(token: str) -> int:
+    """
+    Допустимое число опечаток в слове запроса: в коротких словах опечатка слишком
+    меняет смысл, поэтому для них допуск меньше.
+    :param token: Слово запроса.
+    :return: Наибольшее расстояние редактирования.
+    """
+    if len(token) <= 2:
+        return 0
+    if len(token) <= 5:
+        return 1
+    return MAX_EDIT_DISTANCE
+
+
+def _deletions(word: str, distance: int) -> set[str]:
+    """
+    Возвращает все строки, получаемые из слова удалением не более distance символов (включая само слово).
+    :param word: Слово.
+    :param distance: Наибольшее число удалений.
+    :return: Множество вариантов.
+    """
+    variants = {word}
+    frontier = {word}
+    for _ in range(distance):
+        frontier = {variant[:i] + variant[i + 1:] for variant in frontier for i in range(len(variant))}
+        variants |= frontier
+    return variants
+
+
+def edit_distance(first: str, second: str, limit: int) -> int:
+    """
+    Расстояние Дамерау-Левенштейна (вставка, удаление, замена и перестановка соседних символов).
+    Считаются только клетки таблицы не дальше limit от диагонали: остальные заведомо дают больше limit.
+    :param first: Первая строка.
+    :param second: Вторая строка.
+    :param limit: Порог: если расстояние больше, возвращается limit + 1.
+    :return: Расстояние редактирования.
+    """
+    if abs(len(first) - len(second)) > limit:
+        return limit + 1
+    too_far = limit + 1
+    previous_previous: list[int] = []
+    previous = [j if j <= limit else too_far for j in range(len(second) + 1)]
+    for i in range(1, len(first) + 1):
+        current = [too_far] * (len(second) + 1)
+        if i <= limit:
+            current[0] = i
+        row_min = current[0]
+        for j in range(max(1, i - limit), min(len(second), i + limit) + 1):
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (first[i - 1] != second[j - 1]))
+            if i > 1 and j > 1 and first[i - 1] == second[j - 2] and first[i - 2] == second[j - 1]:
+                value = min(value, previous_previous[j - 2] + 1)
+            current[j] = value
+            if value < row_min:
+                row_min = value
+        if row_min > limit:
+            return too_far
+        previous_previous, previous = previous, current
+    return min(previous[-1], too_far)
+
+
+class RankedIndex:
+    """
+    Индекс для ранжированного поиска по названию и автору.
+
+    Для каждого поля хранит списки вхождений слов с частотами и длины полей, по которым
+    считается оценка BM25. Опечатки в запросе исправляются по словарю удалений (подход SymSpell):
+    для каждого слова словаря заранее сохранены все варианты с удалёнными 1-2 символами, поэтому
+    близкие слова находятся поиском в словаре, без перебора всей лексики. Все структуры
+    обновляются инкрементально при добавлении и удалении книг.
+    """
+
+    def __init__(self) -> None:
+        self._postings: dict[str, dict[str, dict[int, int]]] = {field: defaultdict(dict) for field in FIELD_WEIGHTS}
+        self._lengths: dict[str, dict[int, int]] = {field: {} for field in FIELD_WEIGHTS}
+        self._total_lengths = dict.fromkeys(FIELD_WEIGHTS, 0)
+        # Количество вхождений слова во все поля - чтобы знать, когда убрать его из словаря удалений
+        self._vocabulary: dict[str, int] = {}
+        self._deletions: dict[str, set[str]] = defaultdict(set)
+
+    @classmethod
+    def build(cls, books: Iterable[Book]) -> "RankedIndex":
+        """
+        Строит индекс по набору книг.
+        :param books: Книги.
+        :return: Новый индекс.
+        """
+        index = cls()
+        for book in books:
+            index.add(book)
+        return index
+
+    def __len__(self) -> int:
+        return len(self._lengths["title"])
+
+    @staticmethod
+    def _fields(book: Book) -> dict[str, list[str]]:
+        """
+        Разбивает поля книги на нормализованные слова.
+        """
+        return {
+            "title": TOKEN_PATTERN.findall(normalize_text(book.title)),
+            "author": TOKEN_PATTERN.findall(normalize_text(book.author)),
+        }
+
+    def add(self, book: Book) -> None:
+        """
+        Добавляет книгу в индекс. Прежняя версия книги с тем же ID должна быть предварительно удалена.
+        :param book: Объект Book.
+        """
+        for field, tokens in self._fields(book).items():
+            self._lengths[field][book.book_id] = len(tokens)
+            self._total_lengths[field] += len(tokens)
+            postings = self._postings[field]
+            for token in tokens:
+                frequencies = postings[token]
+                if book.book_id not in frequencies:
+                    self._add_to_vocabulary(token)
+                frequencies[book.book_id] = frequencies.get(book.book_id, 0) + 1
+
+    def remove(self, book: Book) -> None:
+        """
+        Удаляет книгу из индекса. Слова книги не хранятся в индексе, поэтому они заново
+        выделяются из переданного объекта - это должна быть та же версия книги, что была добавлена.
+        :param book: Объект Book.
+        """
+        if book.book_id not in self._lengths["title"]:
+            return
+        for field, tokens in self._fields(book).items():
+            self._total_lengths[field] -= self._lengths[field].pop(book.book_id)
+            postings = self._postings[field]
+            for token in set(tokens):
+                frequencies = postings.get(token)
+                if frequencies is None or frequencies.pop(book.book_id, None) is None:
+                    continue
+                if not frequencies:
+                    del postings[token]
+                self._remove_from_vocabulary(token)
+
+    def _add_to_vocabulary(self, token: str) -> None:
+        count = self._vocabulary.get(token, 0)
+        if not count:
+            for variant in _deletions(token[:PREFIX_LENGTH], MAX_EDIT_DISTANCE):
+                self._deletions[variant].add(token)
+        self._vocabulary[token] = count + 1
+
+    def _remove_from_vocabulary(self, token: str) -> None:
+        count = self._vocabulary[token] - 1
+        if count:
+            self._vocabulary[token] = count
+            return
+        del self._vocabulary[token]
+        for variant in _deletions(token[:PREFIX_LENGTH], MAX_EDIT_DISTANCE):
+            tokens = self._deletions[variant]
+            tokens.discard(token)
+            if not tokens:
+                del self._deletions[variant]
+
+    def corrections(self, token: str) -> dict[str, int]:
+        """
+        Находит слова словаря, ближайшие к слову запроса. Возвращаются только слова
+        с наименьшим найденным расстоянием: если есть исправление одной опечатки,
+        более далёкие варианты не рассматриваются.
+        :param token: Нормализованное слово запроса.
+        :return: Словарь: слово словаря -> расстояние редактирования.
+        """
+        if token in self._vocabulary:
+            return {token: 0}
+        distance = allowed_distance(token)
+        result: dict[str, int] = {}
+        checked = set()
+        # Варианты запроса перебираются по числу удалённых символов: слово на расстоянии k
+        # находится среди вариантов не более чем с k удалениями, поэтому, когда число удалений
+        # превысит лучшее найденное расстояние, поиск можно остановить
+        variants = {token[:PREFIX_LENGTH]}
+        deleted = 0
+        while deleted <= distance:
+            for variant in variants:
+                for candidate in self._deletions.get(variant, ()):
+                    if candidate in checked:
+                        continue
+                    checked.add(candidate)
+                    candidate_distance = edit_distance(token, candidate, distance)
+                    if candidate_distance < distance:
+                        # Нашлось более близкое слово - дальше ищем только не хуже него
+                        distance = candidate_distance
+                        result = {}
+                    if candidate_distance <= distance:
+                        result[candidate] = candidate_distance
+            variants = {variant[:i] + variant[i + 1:] for variant in variants for i in range(len(variant))}
+            deleted += 1
+        return result
+
+    def search(self, query: str, limit: int = 10) -> list[int]:
+        """
+        Ищет книги по запросу в свободной форме и ранжирует их по BM25.
+        Слово с опечаткой заменяется близкими словами словаря, их вклад уменьшается с ростом расстояния.
+        :param query: Строка запроса.
+        :param limit: Количество лучших результатов.
+        :return: ID книг по убыванию оценки (при равной оценке - по возрастанию ID).
+        """
+        scores: dict[int, float] = defaultdict(float)
+        book_count = len(self)
+        if not book_count:
+            return []
+        for token in set(TOKEN_PATTERN.findall(normalize_text(query))):
+            for term, distance in self.corrections(token).items():
+                penalty = 1.0 / (1 + distance)
+                for field, weight in FIELD_WEIGHTS.items():
+                    frequencies = self._postings[field].get(term)
+                    if not frequencies:
+                        continue
+                    idf = math.log(1 + (book_count - len(frequencies) + 0.5) / (len(frequencies) + 0.5))
+                    average_length = self._total_lengths[field] / book_count or 1
+                    lengths = self._lengths[field]
+                    factor = penalty * weight * idf * (K1 + 1)
+                    # Знаменатель BM25: frequency + K1 * (1 - B + B * длина / средняя длина)
+                    base, per_token = K1 * (1 - B), K1 * B / average_length
+                    for book_id, frequency in frequencies.items():
+                        scores[book_id] += factor * frequency / (frequency + base + per_token * lengths[book_id])
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], -item[0]))
+        return [book_id for book_id, _ in best]
@@ -0,0 +1,89 @@
+import bisect
+import math
+from typing import Any, Iterable
+
+
+class SortedIndex:
+    """
+    Вторичный индекс, хранящий пары (ключ, ID книги) в отсортированном списке.
+    Поиск по диапазону ключей выполняется бинарным поиском за O(log n + k).
+    """
+
+    def __init__(self) -> None:
+        self._entries: list[tuple[Any, int]] = []
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, key: Any, book_id: int) -> None:
+        """
+        Добавляет книгу в индекс.
+        :param key: Значение индексируемого поля.
+        :param book_id: Идентификатор книги.
+        """
+        entry = (key, book_id)
+        # Книги обычно добавляются с возрастающими ключами - тогда вставка сводится к append
+        if not self._entries or self._entries[-1] < entry:
+            self._entries.append(entry)
+        else:
+            bisect.insort(self._entries, entry)
+
+    def bulk_add(self, entries: Iterable[tuple[Any, int]]) -> None:
+        """
+        Добавляет сразу много записей с одной сортировкой вместо вставки каждой записи по отдельности.
+        :param entries: Пары (ключ, ID книги).
+        """
+        self._entries.extend(entries)
+        self._entries.sort()
+
+    def remove(self, key: Any, book_id: int) -> None:
+        """
+        Удаляет книгу из индекса.
+        :param key: Значение индексируемого поля, с которым книга была добавлена.
+        :param book_id: Идентификатор книги.
+        """
+        entry = (key, book_id)
+        position = bisect.bisect_left(self._entries, entry)
+        if position < len(self._entries) and self._entries[position] == entry:
+            del self._entries[position]
+
+    def remove_many(self, entries: Iterable[tuple[Any, int]]) -> None:
+        """
+        Удаляет сразу много записей одним проходом по индексу за O(n) вместо сдвига
+        хвоста списка при удалении каждой записи.
+        :param entries: Пары (ключ, ID книги), с которыми книги были добавлены.
+        """
+        removed = set(entries)
+        if removed:
+            self._entries = [entry for entry in self._entries if entry not in removed]
+
+    def range(self, low: Any = None, high: Any = None) -> list[int]:
+        """
+        Возвращает ID книг, у которых ключ попадает в диапазон [low, high].
+        :param low: Нижняя граница включительно или None, если граница не задана.
+        :param high: Верхняя граница включительно или None, если граница не задана.
+        :return: Список ID книг в порядке возрастания ключа.
+        """
+        start = 0 if low is None else bisect.bisect_left(self._entries, (low,))
+        end = len(self._entries) if high is None else bisect.bisect_right(self._entries, (high, math.inf))
+        return [book_id for _, book_id in self._entries[start:end]]
+
+    def slice_after(self, after: tuple[Any, int] | None = None, offset: int = 0, limit: int | None = None,
+                    descending: bool = False) -> list[int]:
+        """
+        Возвращает ID книг по порядку индекса, начиная строго после позиции курсора.
+        :param after: Пара (ключ, ID книги), после которой начинается выдача, или None - с начала.
+        :param offset: Сколько записей пропустить после курсора.
+        :param limit: Максимальное число записей или None - без ограничения.
+        :param descending: Перебирать в порядке убывания.
+        :return: Список ID книг.
+        """
+        if descending:
+            end = len(self._entries) if after is None else bisect.bisect_left(self._entries, after)
+            end -= offset
+            start = 0 if limit is None else max(end - limit, 0)
+            return [book_id for _, book_id in reversed(self._entries[start:max(end, 0)])]
+
+        start = (0 if after is None else bisect.bisect_right(self._entries, after)) + offset
+        end = len(self._entries) if limit is None else start + limit
+        return [book_id for _, book_id in self._entries[start:end]]
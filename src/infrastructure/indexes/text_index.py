@@ -0,0 +1,107 @@
+from collections import defaultdict
+
+from src.domain.value_objects.search_text import normalize_text
+
+# Символ-ограничитель, которым дополняется строка при построении триграмм:
+# благодаря ему любая подстрока длиной 1-2 символа входит хотя бы в одну триграмму
+PADDING = "\0"
+
+
+def _trigrams(text: str) -> set[str]:
+    """
+    Возвращает множество триграмм строки.
+    :param text: Строка.
+    :return: Множество подстрок длины 3.
+    """
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class TextIndex:
+    """
+    Инвертированный индекс по одному текстовому полю книги (названию или автору).
+    Хранит нормализованные строки и триграммный индекс для поиска по подстроке.
+    Все структуры обновляются инкрементально при добавлении и удалении книг.
+    """
+
+    def __init__(self) -> None:
+        self._texts: dict[int, str] = {}
+        self._trigrams: dict[str, set[int]] = defaultdict(set)
+
+    def add(self, book_id: int, text: str) -> None:
+        """
+        Добавляет (или заменяет) текст книги в индексе.
+        :param book_id: Идентификатор книги.
+        :param text: Исходный текст поля.
+        """
+        if book_id in self._texts:
+            self.remove(book_id)
+        normalized = normalize_text(text)
+        self._texts[book_id] = normalized
+        for gram in _trigrams(PADDING + normalized + PADDING):
+            self._trigrams[gram].add(book_id)
+
+    def remove(self, book_id: int) -> None:
+        """
+        Удаляет книгу из индекса.
+        :param book_id: Идентификатор книги.
+        """
+        normalized = self._texts.pop(book_id, None)
+        if normalized is None:
+            return
+        for gram in _trigrams(PADDING + normalized + PADDING):
+            self._discard(self._trigrams, gram, book_id)
+
+    @staticmethod
+    def _discard(postings: dict[str, set[int]], key: str, book_id: int) -> None:
+        """
+        Удаляет ID из списка вхождений и убирает опустевший ключ.
+        """
+        ids = postings.get(key)
+        if ids is not None:
+            ids.discard(book_id)
+            if not ids:
+                del postings[key]
+
+    def text(self, book_id: int) -> str | None:
+        """
+        Возвращает нормализованный текст книги.
+        :param book_id: Идентификатор книги.
+        :return: Нормализованная строка или None, если книги нет в индексе.
+        """
+        return self._texts.get(book_id)
+
+    def search(self, query: str) -> set[int]:
+        """
+        Ищет книги, в тексте которых есть запрос как подстрока (в том числе внутри более длинного слова).
+        Кандидаты берутся из триграммного индекса и проверяются вхождением нормализованного
+        запроса в нормализованный текст.
+        :param query: Строка запроса.
+        :return: Множество ID найденных книг.
+        """
+        normalized = normalize_text(query)
+        if not normalized:
+            return set()
+
+        if len(normalized) >= 3:
+            postings = [self._trigrams.get(gram) for gram in _trigrams(normalized)]
+            if not all(postings):
+                return set()
+            candidates = self._intersect(postings)
+        else:
+            # Короткий запрос: объединяем вхождения всех триграмм словаря, которые его содержат
+            candidates = set()
+            for gram, ids in self._trigrams.items():
+                if normalized in gram:
+                    candidates |= ids
+
+        return {book_id for book_id in candidates if normalized in self._texts[book_id]}
+
+    @staticmethod
+    def _intersect(postings: list[set[int]]) -> set[int]:
+        """
+        Пересекает списки вхождений, начиная с самого короткого.
+        :param postings: Списки вхождений.
+        :return: Пересечение множеств.
+        """
+        postings = sorted(postings, key=len)
+        return postings[0].intersection(*postings[1:])
@@ -0,0 +1,431 @@
+import bisect
+import heapq
+from array import array
+from typing import Iterable, Iterator
+
+from src.application.dto.page_request import PageRequest
+from src.application.dto.search_criteria import SearchCriteria
+from src.application.interfaces.library_repository import LibraryRepository
+from src.domain.entities.book import Book
+from src.domain.value_objects.book_status import BookStatus
+from src.domain.value_objects.search_text import normalize_text
+from src.infrastructure.indexes.ranked_index import RankedIndex
+
+# Код статуса в столбце статусов - индекс статуса в этом кортеже
+STATUSES = tuple(BookStatus)
+STATUS_CODES = {status: code for code, status in enumerate(STATUSES)}
+# Код удалённой строки: строка остаётся в столбцах до уплотнения
+DELETED = -1
+# Уплотнение запускается, когда удалённых строк больше, чем живых, и не меньше этого числа
+COMPACT_THRESHOLD = 1024
+
+
+class _StringTable:
+    """
+    Таблица строк: байты UTF-8 всех строк подряд в одном bytearray и смещения начала каждой строки.
+    Строки только дописываются; номер строки - её индекс в таблице.
+    """
+
+    def __init__(self, separator: str = "") -> None:
+        """
+        :param separator: Символ, который дописывается после каждой строки (чтобы совпадения
+            при поиске по всей таблице не пересекали границы строк).
+        """
+        self.heap = bytearray()
+        self.starts = array("q")
+        self._separator = separator
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def append(self, text: str) -> int:
+        """
+        Дописывает строку в таблицу.
+        :param text: Строка.
+        :return: Номер строки в таблице.
+        """
+        self.starts.append(len(self.heap))
+        self.heap += (text + self._separator).encode("utf-8")
+        return len(self.starts) - 1
+
+    def get(self, index: int) -> str:
+        """
+        Декодирует строку по номеру.
+        :param index: Номер строки.
+        :return: Строка.
+        """
+        end = self.starts[index + 1] if index + 1 < len(self.starts) else len(self.heap)
+        return self.heap[self.starts[index]:end - len(self._separator)].decode("utf-8")
+
+    def entry_at(self, position: int) -> int:
+        """
+        Находит номер строки, которой принадлежит байт с заданным смещением.
+        :param position: Смещение в общей куче байтов.
+        :return: Номер строки.
+        """
+        return bisect.bisect_right(self.starts, position) - 1
+
+    def find_all(self, needle: str) -> Iterator[int]:
+        """
+        Ищет подстроку сразу во всей таблице (поиск выполняется bytearray.find на уровне C).
+        :param needle: Искомая подстрока.
+        :return: Итератор номеров строк, содержащих подстроку (каждая строка - не более одного раза).
+        """
+        pattern = needle.encode("utf-8")
+        position = self.heap.find(pattern)
+        while position != -1:
+            entry = self.entry_at(position)
+            yield entry
+            next_start = self.starts[entry + 1] if entry + 1 < len(self.starts) else len(self.heap)
+            position = self.heap.find(pattern, next_start)
+
+
+class ColumnarLibraryRepository(LibraryRepository):
+    """
+    Реализация интерфейса LibraryRepository, хранящая каталог в памяти по столбцам.
+    ID и годы лежат в array('i'), статус - байтовый код в array('b'), ISBN - число в array('q'),
+    названия - в общей таблице строк, авторы - в словаре уникальных имён с кодом автора для каждой строки.
+    Объекты Book создаются только тогда, когда их запрашивают, а фильтры по году или статусу
+    перебирают компактные массивы, не обращаясь к атрибутам объектов.
+
+    Строки упорядочены по ID (поиск строки - бинарный поиск), удалённые строки помечаются
+    кодом статуса DELETED и вычищаются при уплотнении.
+    """
+
+    def __init__(self, books: Iterable[Book] = ()) -> None:
+        """
+        Инициализация репозитория.
+        :param books: Книги для начального заполнения каталога.
+        """
+        self._reset()
+        self._next_book_id = 1
+        self._generation = 0
+        # Индекс ранжированного поиска: строится при первом таком поиске, дальше обновляется при изменениях
+        self._ranked_index: RankedIndex | None = None
+        self.add_books_to_library(books)
+
+    def _reset(self) -> None:
+        """
+        Создаёт пустые столбцы.
+        """
+        self._ids = array("i")
+        self._years = array("i")
+        self._statuses = array("b")
+        self._title_refs = array("i")
+        self._author_codes = array("i")
+        # ISBN-13 числом, 0 - ISBN не указан
+        self._isbns = array("q")
+        self._titles = _StringTable()
+        # Нормализованные названия для поиска по подстроке и ID книги, которой принадлежит каждое название
+        self._titles_normalized = _StringTable(separator="\0")
+        self._title_owners = array("i")
+        self._authors = _StringTable()
+        self._authors_normalized: list[str] = []
+        self._author_codes_by_name: dict[str, int] = {}
+        self._deleted = 0
+
+    def __len__(self) -> int:
+        return len(self._ids) - self._deleted
+
+    @property
+    def books(self) -> list[Book]:
+        """
+        Возвращает список всех книг, упорядоченный по ID.
+        :return: Список объектов Book.
+        """
+        return [self._materialize(row) for row in self._live_rows()]
+
+    def _live_rows(self) -> Iterator[int]:
+        """
+        Перебирает номера неудалённых строк по возрастанию ID.
+        """
+        return (row for row, code in enumerate(self._statuses) if code != DELETED)
+
+    def _row(self, book_id: int) -> int | None:
+        """
+        Находит строку книги бинарным поиском по столбцу ID.
+        :param book_id: Идентификатор книги.
+        :return: Номер строки или None, если книги нет.
+        """
+        row = bisect.bisect_left(self._ids, book_id)
+        if row < len(self._ids) and self._ids[row] == book_id and self._statuses[row] != DELETED:
+            return row
+        return None
+
+    def _materialize(self, row: int) -> Book:
+        """
+        Создаёт объект Book из значений строки.
+        :param row: Номер строки.
+        :return: Объект Book.
+        """
+        return Book(
+            book_id=self._ids[row],
+            title=self._titles.get(self._title_refs[row]),
+            author=self._authors.get(self._author_codes[row]),
+            year=self._years[row],
+            status=STATUSES[self._statuses[row]],
+            isbn=str(self._isbns[row]) if self._isbns[row] else None
+        )
+
+    def _author_code(self, author: str) -> int:
+        """
+        Возвращает код автора, добавляя имя в словарь авторов при первой встрече.
+        :param author: Имя автора.
+        :return: Код автора.
+        """
+        code = self._author_codes_by_name.get(author)
+        if code is None:
+            code = self._authors.append(author)
+            self._authors_normalized.append(normalize_text(author))
+            self._author_codes_by_name[author] = code
+        return code
+
+    def _compact(self) -> None:
+        """
+        Пересобирает столбцы без удалённых строк и устаревших названий.
+        Книги не меняются, поэтому индекс ранжированного поиска сохраняется как есть.
+        """
+        books = self.books
+        ranked_index, self._ranked_index = self._ranked_index, None
+        self._reset()
+        for book in books:
+            self.add_book_to_library(book)
+        self._ranked_index = ranked_index
+
+    def count_by_status(self, status: BookStatus) -> int:
+        """
+        Считает книги с заданным статусом одним проходом по байтовому столбцу статусов.
+        :param status: Статус книги.
+        :return: Количество книг.
+        """
+        return self._statuses.count(STATUS_CODES[status])
+
+    def add_book_to_library(self, book: Book) -> None:
+        """
+        Добавляет книгу в столбцы. Книга с уже существующим ID заменяет прежнюю.
+        :param book: Объект Book для добавления.
+        """
+        if self._ranked_index is not None:
+            previous = self._row(book.book_id)
+            if previous is not None:
+                self._ranked_index.remove(self._materialize(previous))
+            self._ranked_index.add(book)
+        title_ref = self._titles.append(book.title)
+        self._titles_normalized.append(normalize_text(book.title))
+        self._title_owners.append(book.book_id)
+        values = (book.book_id, book.year, STATUS_CODES[book.status], title_ref, self._author_code(book.author),
+                  int(book.isbn or 0))
+        columns = (self._ids, self._years, self._statuses, self._title_refs, self._author_codes, self._isbns)
+
+        row = bisect.bisect_left(self._ids, book.book_id)
+        if row < len(self._ids) and self._ids[row] == book.book_id:
+            if self._statuses[row] == DELETED:
+                self._deleted -= 1
+            for column, value in zip(columns, values):
+                column[row] = value
+        elif row == len(self._ids):
+            # Обычный случай: ID выдаются по возрастанию, и строка дописывается в конец
+            for column, value in zip(columns, values):
+                column.append(value)
+        else:
+            for column, value in zip(columns, values):
+                column.insert(row, value)
+        self._next_book_id = max(self._next_book_id, book.book_id + 1)
+        self._generation += 1
+
+    def remove_book_from_library(self, book_id: int) -> bool:
+        """
+        Помечает строку книги удалённой.
+        :param book_id: Идентификатор книги.
+        :return: True, если книга была удалена, иначе False.
+        """
+        row = self._row(book_id)
+        if row is None:
+            return False
+        if self._ranked_index is not None:
+            self._ranked_index.remove(self._materialize(row))
+        self._statuses[row] = DELETED
+        self._deleted += 1
+        self._generation += 1
+        if self._deleted >= COMPACT_THRESHOLD and self._deleted > len(self):
+            self._compact()
+        return True
+
+    def change_book_status(self, book_id: int, new_status: BookStatus) -> bool:
+        """
+        Изменяет статус книги: запись одного байта в столбце статусов.
+        :param book_id: Идентификатор книги.
+        :param new_status: Новый статус книги.
+        :return: True, если статус был успешно изменён, иначе False.
+        """
+        row = self._row(book_id)
+        if row is None:
+            return False
+        self._statuses[row] = STATUS_CODES[new_status]
+        self._generation += 1
+        return True
+
+    def get_book_by_id(self, book_id: int) -> Book | None:
+        """
+        Возвращает книгу по её ID.
+        :param book_id: Идентификатор книги.
+        :return: Объект Book или None, если книга не найдена.
+        """
+        row = self._row(book_id)
+        return None if row is None else self._materialize(row)
+
+    def search_ranked(self, query: str, limit: int = 10) -> list[Book]:
+        """
+        Ищет книги по запросу в свободной форме с учётом опечаток и ранжирует их по BM25.
+        Индекс строится по материализованным книгам при первом поиске, а дальше обновляется
+        при добавлении и удалении книг.
+        :param query: Строка запроса.
+        :param limit: Количество лучших результатов.
+        :return: Список найденных книг по убыванию релевантности.
+        """
+        if self._ranked_index is None:
+            self._ranked_index = RankedIndex.build(self.books)
+        return [self.get_book_by_id(book_id) for book_id in self._ranked_index.search(query, limit)]
+
+    def generation(self) -> int:
+        """
+        Возвращает номер версии каталога, который увеличивается при каждом изменении книг.
+        :return: Номер версии каталога.
+        """
+        return self._generation
+
+    def next_book_id(self) -> int:
+        """
+        Выделяет новый идентификатор книги.
+        :return: Идентификатор, который ещё не использовался в этом хранилище.
+        """
+        return self.reserve_book_ids(1)[0]
+
+    def reserve_book_ids(self, count: int) -> range:
+        """
+        Резервирует блок идущих подряд идентификаторов книг.
+        :param count: Количество идентификаторов.
+        :return: Диапазон зарезервированных идентификаторов.
+        """
+        if count < 1:
+            raise ValueError("Количество идентификаторов должно быть положительным")
+        start = self._next_book_id
+        self._next_book_id += count
+        return range(start, self._next_book_id)
+
+    def search_book_in_library(self, criteria: SearchCriteria) -> list[Book] | None:
+        """
+        Ищет книги по заданным критериям.
+        :param criteria: Объект SearchCriteria с параметрами поиска.
+        :return: Список найденных книг или None, если ничего не найдено.
+        """
+        return [self._materialize(row) for row in sorted(self._match(criteria))] or None
+
+    def _match(self, criteria: SearchCriteria) -> set[int]:
+        """
+        Находит строки, подходящие под критерии, проходом по столбцам.
+        :param criteria: Объект SearchCriteria с параметрами поиска.
+        :return: Множество номеров строк (пустое, если не задано ни одного условия).
+        """
+        matches: list[set[int]] = []
+        if criteria.title:
+            matches.append(self._match_title(normalize_text(criteria.title)))
+        if criteria.author:
+            query = normalize_text(criteria.author)
+            codes = {code for code, name in enumerate(self._authors_normalized) if query in name}
+            matches.append({row for row, code in enumerate(self._author_codes) if code in codes})
+        if criteria.year:
+            matches.append({row for row, year in enumerate(self._years) if year == criteria.year})
+        if criteria.year_from is not None or criteria.year_to is not None:
+            low = criteria.year_from if criteria.year_from is not None else -2 ** 31
+            high = criteria.year_to if criteria.year_to is not None else 2 ** 31 - 1
+            matches.append({row for row, year in enumerate(self._years) if low <= year <= high})
+        if criteria.status is not None:
+            code = STATUS_CODES[criteria.status]
+            matches.append({row for row, status in enumerate(self._statuses) if status == code})
+        if not matches:
+            return set()
+
+        if criteria.match_all:
+            matches.sort(key=len)
+            rows = matches[0].intersection(*matches[1:])
+        else:
+            rows = set().union(*matches)
+        return {row for row in rows if self._statuses[row] != DELETED}
+
+    def _match_title(self, query: str) -> set[int]:
+        """
+        Ищет подстроку во всех нормализованных названиях сразу.
+        :param query: Нормализованная подстрока.
+        :return: Множество номеров строк.
+        """
+        rows = set()
+        for entry in self._titles_normalized.find_all(query):
+            row = self._row(self._title_owners[entry])
+            # Название могло устареть: книга удалена или заменена книгой с тем же ID
+            if row is not None and self._title_refs[row] == entry:
+                rows.add(row)
+        return rows
+
+    def iter_books(self, page: PageRequest, criteria: SearchCriteria | None = None) -> Iterator[Book]:
+        """
+        Возвращает одну страницу книг. Сортировка выполняется по значениям столбцов,
+        объекты Book создаются только для строк страницы.
+        :param page: Параметры страницы.
+        :param criteria: Критерии поиска или None, чтобы перебирать весь каталог.
+        :return: Итератор книг страницы.
+        """
+        if criteria is None and page.order_by == "book_id":
+            return self._iter_by_id(page)
+
+        column_key = {
+            "book_id": lambda row: self._ids[row],
+            "year": lambda row: self._years[row],
+            "title": lambda row: self._titles.get(self._title_refs[row]),
+            "author": lambda row: self._authors.get(self._author_codes[row]),
+        }[page.order_by]
+
+        def sort_key(row: int) -> tuple:
+            return column_key(row), self._ids[row]
+
+        rows = self._live_rows() if criteria is None else self._match(criteria)
+        if page.after is not None:
+            after = tuple(page.after)
+            if page.descending:
+                rows = [row for row in rows if sort_key(row) < after]
+            else:
+                rows = [row for row in rows if sort_key(row) > after]
+
+        if page.limit is None:
+            ordered = sorted(rows, key=sort_key, reverse=page.descending)[page.offset:]
+        else:
+            select = heapq.nlargest if page.descending else heapq.nsmallest
+            ordered = select(page.offset + page.limit, rows, key=sort_key)[page.offset:]
+        return (self._materialize(row) for row in ordered)
+
+    def _iter_by_id(self, page: PageRequest) -> Iterator[Book]:
+        """
+        Перебирает весь каталог по ID: строки уже упорядочены, поэтому начало страницы
+        находится бинарным поиском, а книги создаются по мере перебора.
+        :param page: Параметры страницы.
+        :return: Итератор книг страницы.
+        """
+        if page.descending:
+            start = len(self._ids) if page.after is None else bisect.bisect_left(self._ids, page.after[1])
+            rows = range(start - 1, -1, -1)
+        else:
+            start = 0 if page.after is None else bisect.bisect_right(self._ids, page.after[1])
+            rows = range(start, len(self._ids))
+
+        skip, remaining = page.offset, page.limit
+        for row in rows:
+            if remaining is not None and remaining <= 0:
+                return
+            if self._statuses[row] == DELETED:
+                continue
+            if skip:
+                skip -= 1
+                continue
+            if remaining is not None:
+                remaining -= 1
+            yield self._materialize(row)
@@ -1,69 +1,584 @@
+import heapq
 import json
+import os
+from contextlib import contextmanager, nullcontext
+from typing import ContextManager, Iterable, Iterator
 
+from src.application.dto.page_request import PageRequest
 from src.application.dto.search_criteria import SearchCriteria
 from src.application.interfaces.library_repository import LibraryRepository
+from src.application.metrics.metrics_registry import MetricsRegistry
 from src.domain.entities.book import Book
 from src.domain.value_objects.book_status import BookStatus
+from src.infrastructure.concurrency.file_lock import FileLock
+from src.infrastructure.concurrency.read_write_lock import ReadWriteLock
+from src.infrastructure.indexes.prefix_index import PrefixIndex
+from src.infrastructure.indexes.ranked_index import RankedIndex
+from src.infrastructure.indexes.sorted_index import SortedIndex
+from src.infrastructure.indexes.text_index import TextIndex
+from src.infrastructure.serialization.binary_snapshot import read_snapshot, write_snapshot
+from src.infrastructure.serialization.catalog_file import read_catalog, write_catalog
 
 
 class JsonLibraryRepository(LibraryRepository):
     """
     Реализация интерфейса LibraryRepository для работы с хранилищем книг в формате JSON.
     Обеспечивает методы для добавления, удаления, поиска и изменения статуса книг.
+
+    Поддерживает два режима хранения:
+    - обычный: каждое изменение атомарно перезаписывает JSON-файл целиком;
+    - журналируемый (journal_threshold задан): изменения дописываются небольшими записями
+      в журнал рядом с файлом данных, а при превышении порога журнал сворачивается в новый снимок.
+
+    Каталог загружается лениво, при первом обращении к данным. Вместе с JSON-файлом
+    записывается двоичный снимок (<data_file>.bin), который читается вместо JSON,
+    пока соответствует текущему JSON-файлу (запись снимка отключается параметром snapshot=False).
+
+    С одним файлом могут одновременно работать несколько процессов: изменения выполняются
+    под межпроцессной блокировкой (<data_file>.lock), а перед каждой операцией репозиторий
+    сверяет версию файлов со своей копией в памяти. Если другой процесс только дописал журнал,
+    применяются лишь новые записи журнала; если снимок был переписан - каталог перечитывается.
+    В потокобезопасном режиме (thread_safe=True) поиск из разных потоков идёт параллельно,
+    а изменения выполняются по одному.
+
+    Если передан реестр метрик, репозиторий записывает в него время и объём чтения и записи
+    файлов и количество книг, просмотренных при поиске.
     """
 
-    def __init__(self, data_file: str) -> None:
+    def __init__(self, data_file: str, journal_threshold: int | None = None, thread_safe: bool = False,
+                 metrics: MetricsRegistry | None = None, snapshot: bool = True) -> None:
         """
         Инициализация репозитория.
         :param data_file: Путь к JSON-файлу с данными о книгах.
+        :param journal_threshold: Размер журнала в байтах, после которого он сворачивается в снимок.
+            None отключает журналирование.
+        :param thread_safe: Защищать репозиторий блокировкой читателей-писателей для работы из нескольких потоков.
+        :param metrics: Реестр метрик ввода-вывода и поиска или None, чтобы не собирать метрики.
+        :param snapshot: Записывать двоичный снимок для быстрой загрузки. False - не создавать снимок
+            рядом с файлом каталога (например, когда каталог только читается для перевода в другой формат).
         """
         self.data_file = data_file
-        self.books = self._load_books()
+        self.journal_file = data_file + '.log'
+        self.snapshot_file = data_file + '.bin'
+        self.lock_file = data_file + '.lock'
+        self.journal_threshold = journal_threshold
+        self.snapshot = snapshot
+        self._file_lock = FileLock(self.lock_file)
+        self._lock = ReadWriteLock() if thread_safe else None
+        self._metrics = metrics
+        # Незафиксированные записи об изменениях внутри транзакции
+        self._pending: list[dict] = []
+        self._transaction_depth = 0
+        self._loaded = False
+        # Версия файлов, которой соответствует копия в памяти: подпись снимка и прочитанная длина журнала
+        self._signature: tuple[int, int, int] | None = None
+        self._journal_offset = 0
+        # Номер версии каталога: растёт при каждом изменении книг в памяти, в том числе
+        # при подгрузке изменений других процессов
+        self._generation = 0
+        self._reset()
 
-    def _load_books(self) -> list[Book]:
+    def _reset(self) -> None:
+        """
+        Очищает хранилище и индексы в памяти перед загрузкой каталога.
         """
-        Загружает книги из JSON-файла в память.
+        self._generation += 1
+        # Индекс book_id -> Book: основное хранилище, сохраняет порядок добавления книг
+        self._books: dict[int, Book] = {}
+        # Инвертированные индексы по названию и автору для поиска без перебора каталога.
+        # Строятся при первом поиске по тексту, чтобы не замедлять загрузку каталога
+        self._title_index = TextIndex()
+        self._author_index = TextIndex()
+        self._text_indexed = False
+        # Индекс для ранжированного поиска с учётом опечаток, строится при первом таком поиске
+        self._ranked_index: RankedIndex | None = None
+        # Индекс автодополнения названий и авторов, строится при первом запросе дополнений
+        self._prefix_index: PrefixIndex | None = None
+        # Вторичные индексы: упорядоченные по ID и году и хеш-индекс по статусу
+        self._id_index = SortedIndex()
+        self._year_index = SortedIndex()
+        self._status_index: dict[BookStatus, set[int]] = {status: set() for status in BookStatus}
+        self._next_book_id = 1
+
+    @property
+    def books(self) -> list[Book]:
+        """
+        Возвращает список всех книг в порядке их добавления.
         :return: Список объектов Book.
         """
+        with self._reading():
+            return list(self._books.values())
+
+    def _write_lock(self) -> ContextManager[None]:
+        """
+        :return: Блокировка потоков на запись (пустой контекст вне потокобезопасного режима).
+        """
+        return self._lock.write() if self._lock is not None else nullcontext()
+
+    def _read_lock(self) -> ContextManager[None]:
+        """
+        :return: Блокировка потоков на чтение (пустой контекст вне потокобезопасного режима).
+        """
+        return self._lock.read() if self._lock is not None else nullcontext()
+
+    def _io_timer(self, operation: str) -> ContextManager[None]:
+        """
+        :return: Замер времени операции ввода-вывода (пустой контекст, если метрики не собираются).
+        """
+        if self._metrics is None:
+            return nullcontext()
+        return self._metrics.timer('library_io_duration_seconds', {'operation': operation})
+
+    def _count_io(self, metric: str, operation: str, size: int) -> None:
+        """
+        Учитывает объём прочитанных или записанных данных.
+        :param metric: Имя метрики.
+        :param operation: Операция ввода-вывода.
+        :param size: Количество байт.
+        """
+        if self._metrics is not None:
+            self._metrics.increment(metric, {'operation': operation}, size)
+
+    def _count_scanned(self, count: int) -> None:
+        """
+        Учитывает книги, просмотренные при поиске.
+        :param count: Количество книг.
+        """
+        if self._metrics is not None:
+            self._metrics.increment('library_repository_rows_scanned_total', value=count)
+
+    @contextmanager
+    def _reading(self, text_search: bool = False, ranked_search: bool = False,
+                 prefix_search: bool = False) -> Iterator[None]:
+        """
+        Готовит копию в памяти к чтению и удерживает блокировку потоков на чтение.
+        Актуальность копии проверяется под блокировкой на чтение по подписи файлов без блокировки файла.
+        Подгрузка изменений (и построение текстовых индексов) меняет состояние, поэтому
+        выполняется, только если копия устарела, под блокировкой на запись; само чтение идёт параллельно.
+        :param text_search: Построить текстовые индексы, если они ещё не построены.
+        :param ranked_search: Построить индекс ранжированного поиска, если он ещё не построен.
+        :param prefix_search: Построить индекс автодополнения, если он ещё не построен.
+        """
+        with self._read_lock():
+            if self._is_ready(text_search, ranked_search, prefix_search):
+                yield
+                return
+
+        with self._write_lock():
+            self._refresh()
+            if text_search:
+                self._ensure_text_indexed()
+            if ranked_search and self._ranked_index is None:
+                self._ranked_index = RankedIndex.build(self._books.values())
+            if prefix_search and self._prefix_index is None:
+                self._prefix_index = PrefixIndex.build(
+                    text for book in self._books.values() for text in (book.title, book.author)
+                )
+        with self._read_lock():
+            yield
+
+    def _is_ready(self, text_search: bool, ranked_search: bool, prefix_search: bool) -> bool:
+        """
+        Проверяет, что копия в памяти актуальна и нужные индексы построены. Проверка стоит двух
+        вызовов stat и не захватывает блокировку файла; устаревшая подпись лишь отправляет чтение
+        по медленному пути, где изменения подгружаются под блокировкой.
+        :param text_search: Нужны текстовые индексы.
+        :param ranked_search: Нужен индекс ранжированного поиска.
+        :param prefix_search: Нужен индекс автодополнения.
+        :return: True, если читать можно без подготовки.
+        """
+        if not self._loaded:
+            return False
+        if (text_search and not self._text_indexed or ranked_search and self._ranked_index is None
+                or prefix_search and self._prefix_index is None):
+            return False
+        if self._transaction_depth:
+            # Транзакцию ведёт этот же поток: копия актуальна
+            return True
+        return self._data_signature() == self._signature and self._journal_size() == self._journal_offset
+
+    def _journal_size(self) -> int:
+        """
+        :return: Размер журнала в байтах (0, если журнала нет).
+        """
         try:
-            with open(self.data_file, 'r', encoding='utf-8') as file:
-                return [
-                    Book(
-                        book_id=book['book_id'],
-                        title=book['title'],
-                        author=book['author'],
-                        year=book['year'],
-                        status=BookStatus(book['status'])
-                    ) for book in json.load(file)
-                ]
+            return os.path.getsize(self.journal_file)
         except FileNotFoundError:
-            # Если файл отсутствует, создаём его и возвращаем пустой список
-            with open(self.data_file, 'w', encoding='utf-8') as file:
-                json.dump([], file)
-            return []
+            return 0
+
+    def _data_signature(self) -> tuple[int, int, int] | None:
+        """
+        Подпись JSON-файла: inode, размер и время изменения. Снимок переписывается через
+        переименование временного файла, поэтому каждая перезапись меняет inode.
+        :return: Подпись или None, если файла нет.
+        """
+        try:
+            stat = os.stat(self.data_file)
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+    def _refresh(self) -> None:
+        """
+        Приводит копию в памяти к актуальной версии файлов: при первом обращении загружает каталог,
+        затем подгружает только изменения, сделанные другими процессами. Внутри транзакции
+        блокировка уже удерживается и копия актуальна, поэтому проверка пропускается.
+        """
+        if self._transaction_depth:
+            return
+        with self._file_lock.acquire():
+            if not self._loaded:
+                self._loaded = True
+                self._load_books()
+                return
+
+            if self._data_signature() != self._signature:
+                # Другой процесс переписал снимок - отдельные изменения уже не восстановить
+                self._reset()
+                self._load_books()
+                return
+
+            journal_size = self._journal_size()
+            if journal_size > self._journal_offset:
+                self._replay_journal()
+            elif journal_size < self._journal_offset:
+                self._reset()
+                self._load_books()
+
+    @staticmethod
+    def _book_to_record(book: Book) -> dict:
+        """
+        Преобразует книгу в словарь для сериализации. ISBN записывается, только если он указан,
+        поэтому файлы книг без ISBN не меняются.
+        :param book: Объект Book.
+        :return: Словарь с полями книги.
+        """
+        record = {
+            'book_id': book.book_id,
+            'title': book.title,
+            'author': book.author,
+            'year': book.year,
+            'status': book.status.value
+        }
+        if book.isbn is not None:
+            record['isbn'] = book.isbn
+        return record
+
+    @staticmethod
+    def _record_to_book(record: dict) -> Book:
+        """
+        Создаёт книгу из сериализованного словаря.
+        :param record: Словарь с полями книги.
+        :return: Объект Book.
+        """
+        return Book(
+            book_id=record['book_id'],
+            title=record['title'],
+            author=record['author'],
+            year=record['year'],
+            status=BookStatus(record['status']),
+            isbn=record.get('isbn')
+        )
+
+    def _load_books(self) -> None:
+        """
+        Загружает снимок в память (двоичный, если он актуален, иначе JSON-файл), восстанавливает
+        счётчик идентификаторов и воспроизводит поверх снимка записи журнала.
+        """
+        self._signature = self._data_signature()
+        self._journal_offset = 0
+        with self._io_timer('load_books'):
+            snapshot = read_snapshot(self.snapshot_file, self.data_file) if os.path.exists(self.data_file) else None
+            if snapshot is not None:
+                stored_next_id, books = snapshot
+                self._bulk_load(books, stored_next_id)
+                if self._metrics is not None:
+                    self._count_io('library_io_bytes_read_total', 'load_books', os.path.getsize(self.snapshot_file))
+            elif not self._load_json():
+                # Если файл отсутствует, создаём пустой снимок
+                self._save_books()
+                return
+
+        if self._replay_journal() and self.journal_threshold is None:
+            # Журнал остался от журналируемого режима - переносим его в снимок
+            self._save_books()
+
+    def _load_json(self) -> bool:
+        """
+        Потоково загружает книги из файла каталога (формат определяется по расширению, см. catalog_file)
+        и, если снимки включены, записывает по нему двоичный снимок для следующих запусков.
+        :return: False, если файла каталога нет.
+        """
+        if not os.path.exists(self.data_file):
+            return False
+        header: dict = {}
+        self._bulk_load((self._record_to_book(record) for record in read_catalog(self.data_file, header)), 1)
+        # Счётчик идентификаторов известен только после перебора книг: в JSON-документе он может идти после них
+        self._next_book_id = max(self._next_book_id, header.get('next_book_id', 1))
+        if self._metrics is not None:
+            self._count_io('library_io_bytes_read_total', 'load_books', os.path.getsize(self.data_file))
+        if self.snapshot:
+            write_snapshot(self.snapshot_file, self.data_file, self._next_book_id, self._books.values())
+        return True
+
+    def _bulk_load(self, books: Iterable[Book], stored_next_id: int) -> None:
+        """
+        Заполняет пустое хранилище книгами снимка: упорядоченные индексы сортируются один раз
+        для всего каталога вместо вставки каждой книги по отдельности.
+        :param books: Книги снимка.
+        :param stored_next_id: Сохранённый счётчик идентификаторов.
+        """
+        for book in books:
+            self._books[book.book_id] = book
+        for book in self._books.values():
+            self._status_index[book.status].add(book.book_id)
+        self._id_index.bulk_add((book_id, book_id) for book_id in self._books)
+        self._year_index.bulk_add((book.year, book.book_id) for book in self._books.values())
+        self._next_book_id = max(self._next_book_id, stored_next_id, max(self._books, default=0) + 1)
+
+    def _ensure_text_indexed(self) -> None:
+        """
+        Строит индексы по названию и автору при первом поиске по тексту.
+        """
+        if not self._text_indexed:
+            self._text_indexed = True
+            for book in self._books.values():
+                self._title_index.add(book.book_id, book.title)
+                self._author_index.add(book.book_id, book.author)
+
+    def _replay_journal(self) -> bool:
+        """
+        Применяет к копии в памяти записи журнала, которые ещё не были прочитаны.
+        Недописанная последняя запись (после сбоя) отбрасывается, а журнал обрезается до неё.
+        :return: True, если в журнале были новые записи.
+        """
+        try:
+            file = open(self.journal_file, 'rb')
+        except FileNotFoundError:
+            return False
+
+        start = valid_size = self._journal_offset
+        with file:
+            file.seek(start)
+            for line in file:
+                try:
+                    if not line.endswith(b'\n'):
+                        raise ValueError("Недописанная запись журнала")
+                    self._apply_journal_record(json.loads(line))
+                except ValueError:
+                    break
+                valid_size += len(line)
+            torn = file.tell() != valid_size
+
+        if torn:
+            with open(self.journal_file, 'r+b') as file:
+                file.truncate(valid_size)
+                os.fsync(file.fileno())
+        self._count_io('library_io_bytes_read_total', 'replay_journal', valid_size - start)
+        self._journal_offset = valid_size
+        return valid_size > start
+
+    def _apply_journal_record(self, record: dict) -> None:
+        """
+        Применяет одну запись журнала. Все операции идемпотентны, поэтому повторное
+        воспроизведение журнала поверх уже свёрнутого снимка безопасно.
+        :param record: Запись журнала.
+        """
+        operation = record['op']
+        if operation == 'add':
+            self._put_book(self._record_to_book(record['book']))
+        elif operation == 'remove':
+            self._pop_book(record['book_id'])
+        elif operation == 'status':
+            book = self._books.get(record['book_id'])
+            if book is not None:
+                self._set_status(book, BookStatus(record['status']))
+        elif operation == 'reserve':
+            self._next_book_id = max(self._next_book_id, record['next_book_id'])
+        else:
+            raise ValueError(f"Неизвестная операция журнала: {operation}")
+
+    def _put_book(self, book: Book) -> None:
+        """
+        Помещает книгу в хранилище и индексы и сдвигает счётчик идентификаторов за её ID.
+        :param book: Объект Book.
+        """
+        self._pop_book(book.book_id)
+        self._books[book.book_id] = book
+        if self._text_indexed:
+            self._title_index.add(book.book_id, book.title)
+            self._author_index.add(book.book_id, book.author)
+        if self._ranked_index is not None:
+            self._ranked_index.add(book)
+        if self._prefix_index is not None:
+            self._prefix_index.add(book.title)
+            self._prefix_index.add(book.author)
+        self._id_index.add(book.book_id, book.book_id)
+        self._year_index.add(book.year, book.book_id)
+        self._status_index[book.status].add(book.book_id)
+        # Книга могла прийти с явно заданным ID - счётчик не должен его выдать повторно
+        self._next_book_id = max(self._next_book_id, book.book_id + 1)
+        self._generation += 1
+
+    def _pop_book(self, book_id: int, deferred: list[Book] | None = None) -> Book | None:
+        """
+        Удаляет книгу из хранилища и индексов.
+        :param book_id: Идентификатор книги.
+        :param deferred: Список, в который откладываются книги для удаления из упорядоченных индексов
+            одним проходом (при удалении многих книг); None - удалить из них сразу.
+        :return: Удалённая книга или None, если книги не было.
+        """
+        book = self._books.pop(book_id, None)
+        if book is not None:
+            if self._text_indexed:
+                self._title_index.remove(book_id)
+                self._author_index.remove(book_id)
+            if self._ranked_index is not None:
+                self._ranked_index.remove(book)
+            if self._prefix_index is not None:
+                self._prefix_index.remove(book.title)
+                self._prefix_index.remove(book.author)
+            if deferred is None:
+                self._id_index.remove(book_id, book_id)
+                self._year_index.remove(book.year, book_id)
+            else:
+                deferred.append(book)
+            self._status_index[book.status].discard(book_id)
+            self._generation += 1
+        return book
+
+    def _set_status(self, book: Book, new_status: BookStatus) -> None:
+        """
+        Меняет статус книги и переносит её в индексе статусов.
+        :param book: Объект Book.
+        :param new_status: Новый статус книги.
+        """
+        self._status_index[book.status].discard(book.book_id)
+        book.status = new_status
+        self._status_index[new_status].add(book.book_id)
+        self._generation += 1
 
     def _save_books(self) -> None:
         """
-        Сохраняет текущий список книг в JSON-файл.
+        Атомарно сохраняет текущий список книг и счётчик идентификаторов в файл каталога
+        (запись во временный файл, fsync и переименование) и двоичный снимок, после чего очищает журнал.
+        Без снимков прежний файл снимка не удаляется: он перестаёт совпадать с каталогом и не читается.
+        """
+        with self._io_timer('save_books'):
+            size = write_catalog(self.data_file, self._next_book_id,
+                                 (self._book_to_record(book) for book in self._books.values()))
+            if self.snapshot:
+                write_snapshot(self.snapshot_file, self.data_file, self._next_book_id, self._books.values())
+        if self._metrics is not None:
+            snapshot_size = os.path.getsize(self.snapshot_file) if self.snapshot else 0
+            self._count_io('library_io_bytes_written_total', 'save_books', size + snapshot_size)
+        self._signature = self._data_signature()
+
+        if os.path.exists(self.journal_file) and os.path.getsize(self.journal_file):
+            with open(self.journal_file, 'r+b') as file:
+                file.truncate(0)
+                os.fsync(file.fileno())
+        self._journal_offset = 0
+
+    def export_catalog(self, path: str) -> int:
+        """
+        Атомарно записывает каталог с учётом журнала в другой файл; формат определяется по расширению
+        (см. catalog_file). Используется для перевода каталога в другой формат хранения.
+        :param path: Путь к файлу, в который записывается каталог.
+        :return: Размер записанного файла в байтах.
+        """
+        with self._reading():
+            return write_catalog(path, self._next_book_id,
+                                 (self._book_to_record(book) for book in self._books.values()))
+
+    def _commit(self, record: dict) -> None:
+        """
+        Фиксирует изменение. Внутри транзакции запись откладывается до её завершения.
+        :param record: Запись об изменении.
+        """
+        self._pending.append(record)
+        if not self._transaction_depth:
+            self._flush()
+
+    def _flush(self) -> None:
+        """
+        Сохраняет накопленные изменения: в журналируемом режиме дописывает их в журнал
+        одной записью на диск с одним fsync, иначе перезаписывает снимок целиком.
+        Резервирование идентификаторов без изменений книг и без журналирования тоже дописывается
+        в журнал: снимок ради одного счётчика не переписывается, журнал свернётся при следующем изменении.
+        """
+        records, self._pending = self._pending, []
+        if not records:
+            return
+        if self.journal_threshold is None and any(record['op'] != 'reserve' for record in records):
+            self._save_books()
+            return
+
+        payload = ''.join(
+            json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n' for record in records
+        ).encode('utf-8')
+        with self._io_timer('append_journal'), open(self.journal_file, 'ab') as file:
+            file.write(payload)
+            file.flush()
+            os.fsync(file.fileno())
+            journal_size = file.tell()
+        self._count_io('library_io_bytes_written_total', 'append_journal', len(payload))
+        # Под блокировкой журнал дописываем только мы, поэтому всё до конца файла уже в памяти
+        self._journal_offset = journal_size
+
+        if self.journal_threshold is not None and journal_size >= self.journal_threshold:
+            self._save_books()
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """
+        Группирует изменения: все они сохраняются на диск один раз при выходе из блока.
+        Изменения в памяти применяются сразу, поэтому при исключении уже сделанные изменения
+        всё равно сохраняются - так память и файл остаются согласованными.
+        На время внешней транзакции захватываются блокировка файла и блокировка потоков на запись,
+        а копия в памяти предварительно приводится к актуальной версии файлов.
+        """
+        with self._write_lock(), self._file_lock.acquire():
+            self._refresh()
+            self._transaction_depth += 1
+            try:
+                yield
+            finally:
+                self._transaction_depth -= 1
+                if not self._transaction_depth:
+                    self._flush()
+
+    def next_book_id(self) -> int:
+        """
+        Выделяет новый идентификатор книги за O(1).
+        :return: Идентификатор, который ещё не использовался в этом хранилище.
+        """
+        return self.reserve_book_ids(1)[0]
+
+    def reserve_book_ids(self, count: int) -> range:
+        """
+        Резервирует блок идущих подряд идентификаторов книг.
+        Счётчик сохраняется на диск (без журналирования - записью журнала до следующего изменения книг),
+        поэтому идентификаторы удалённых книг не переиспользуются, а другие процессы не выдадут те же идентификаторы.
+        :param count: Количество идентификаторов.
+        :return: Диапазон зарезервированных идентификаторов.
         """
-        with open(self.data_file, 'w', encoding='utf-8') as file:
-            json.dump([
-                {
-                    'book_id': book.book_id,
-                    'title': book.title,
-                    'author': book.author,
-                    'year': book.year,
-                    'status': book.status.value
-                } for book in self.books
-            ], file, ensure_ascii=False, indent=4)
+        if count < 1:
+            raise ValueError("Количество идентификаторов должно быть положительным")
+        with self.transaction():
+            start = self._next_book_id
+            self._next_book_id += count
+            self._commit({'op': 'reserve', 'next_book_id': self._next_book_id})
+        return range(start, start + count)
 
     def add_book_to_library(self, book: Book) -> None:
         """
         Добавляет книгу в хранилище и сохраняет изменения в файл.
         :param book: Объект Book для добавления.
         """
-        self.books.append(book)
-        self._save_books()
+        with self.transaction():
+            self._put_book(book)
+            self._commit({'op': 'add', 'book': self._book_to_record(book)})
 
     def remove_book_from_library(self, book_id: int) -> bool:
         """
@@ -71,12 +586,29 @@ class JsonLibraryRepository(LibraryRepository):
         :param book_id: Идентификатор книги.
         :return: True, если книга была удалена, иначе False.
         """
-        for book in self.books:
-            if book.book_id == book_id:
-                self.books.remove(book)
-                self._save_books()
-                return True
-        return False
+        with self.transaction():
+            if self._pop_book(book_id) is None:
+                return False
+            self._commit({'op': 'remove', 'book_id': book_id})
+        return True
+
+    def remove_books_from_library(self, book_ids: Iterable[int]) -> list[int]:
+        """
+        Удаляет несколько книг одной транзакцией. Упорядоченные индексы перестраиваются
+        одним проходом после удаления всех книг, а не сдвигаются для каждой книги.
+        :param book_ids: Идентификаторы книг.
+        :return: Идентификаторы книг, которые не найдены.
+        """
+        missing, removed = [], []
+        with self.transaction():
+            for book_id in book_ids:
+                if self._pop_book(book_id, removed) is None:
+                    missing.append(book_id)
+                else:
+                    self._commit({'op': 'remove', 'book_id': book_id})
+            self._id_index.remove_many((book.book_id, book.book_id) for book in removed)
+            self._year_index.remove_many((book.year, book.book_id) for book in removed)
+        return missing
 
     def search_book_in_library(self, criteria: SearchCriteria) -> list[Book] | None:
         """
@@ -84,13 +616,101 @@ class JsonLibraryRepository(LibraryRepository):
         :param criteria: Объект SearchCriteria с параметрами поиска.
         :return: Список найденных книг или None, если ничего не найдено.
         """
-        result = [
-            book for book in self.books
-            if (criteria.title and criteria.title.lower() in book.title.lower()) or
-               (criteria.author and criteria.author.lower() in book.author.lower()) or
-               (criteria.year and criteria.year == book.year)
-        ]
-        return result if result else None
+        with self._reading(text_search=bool(criteria.title or criteria.author)):
+            book_ids = self._match(criteria)
+            return [self._books[book_id] for book_id in sorted(book_ids)] or None
+
+    def search_ranked(self, query: str, limit: int = 10) -> list[Book]:
+        """
+        Ищет книги по запросу в свободной форме с учётом опечаток и ранжирует их по BM25.
+        Индекс строится при первом таком поиске и дальше обновляется вместе с каталогом.
+        :param query: Строка запроса.
+        :param limit: Количество лучших результатов.
+        :return: Список найденных книг по убыванию релевантности.
+        """
+        with self._reading(ranked_search=True):
+            return [self._books[book_id] for book_id in self._ranked_index.search(query, limit)]
+
+    def suggest(self, prefix: str, limit: int = 10) -> list[str]:
+        """
+        Возвращает названия и имена авторов, начинающиеся с prefix, по отсортированному индексу
+        за O(log n + limit). Индекс строится при первом запросе и дальше обновляется вместе с каталогом.
+        :param prefix: Начало названия или имени автора.
+        :param limit: Наибольшее количество дополнений.
+        :return: Список дополнений в алфавитном порядке.
+        """
+        with self._reading(prefix_search=True):
+            return self._prefix_index.complete(prefix, limit)
+
+    def _match(self, criteria: SearchCriteria) -> set[int]:
+        """
+        Находит ID книг, подходящих под критерии, используя индексы.
+        :param criteria: Объект SearchCriteria с параметрами поиска.
+        :return: Множество ID найденных книг (пустое, если не задано ни одного условия).
+        """
+        matches: list[set[int]] = []
+        if criteria.title:
+            matches.append(self._title_index.search(criteria.title))
+        if criteria.author:
+            matches.append(self._author_index.search(criteria.author))
+        if criteria.year:
+            matches.append(set(self._year_index.range(criteria.year, criteria.year)))
+        if criteria.year_from is not None or criteria.year_to is not None:
+            matches.append(set(self._year_index.range(criteria.year_from, criteria.year_to)))
+        if criteria.status is not None:
+            matches.append(self._status_index[criteria.status])
+        if not matches:
+            return set()
+        self._count_scanned(sum(map(len, matches)))
+
+        if criteria.match_all:
+            matches.sort(key=len)
+            return matches[0].intersection(*matches[1:])
+        return set().union(*matches)
+
+    def iter_books(self, page: PageRequest, criteria: SearchCriteria | None = None) -> Iterator[Book]:
+        """
+        Возвращает одну страницу книг. Перебор всего каталога по ID или году идёт по
+        упорядоченным индексам за O(log n + размер страницы); остальные случаи отбирают
+        только нужные offset + limit книг через кучу. Страница собирается целиком под блокировкой,
+        чтобы её не затронули изменения, сделанные после вызова.
+        :param page: Параметры страницы.
+        :param criteria: Критерии поиска или None, чтобы перебирать весь каталог.
+        :return: Итератор книг страницы.
+        """
+        text_search = criteria is not None and bool(criteria.title or criteria.author)
+        with self._reading(text_search):
+            return iter(self._select_page(page, criteria))
+
+    def _select_page(self, page: PageRequest, criteria: SearchCriteria | None) -> list[Book]:
+        """
+        Отбирает книги страницы.
+        :param page: Параметры страницы.
+        :param criteria: Критерии поиска или None, чтобы перебирать весь каталог.
+        :return: Список книг страницы.
+        """
+        index = {'book_id': self._id_index, 'year': self._year_index}.get(page.order_by)
+        if criteria is None and index is not None:
+            book_ids = index.slice_after(page.after, page.offset, page.limit, page.descending)
+            return [self._books[book_id] for book_id in book_ids]
+
+        def sort_key(book: Book) -> tuple:
+            return getattr(book, page.order_by), book.book_id
+
+        books = self._books.values() if criteria is None else [self._books[i] for i in self._match(criteria)]
+        if criteria is None:
+            self._count_scanned(len(books))
+        if page.after is not None:
+            after = tuple(page.after)
+            if page.descending:
+                books = [book for book in books if sort_key(book) < after]
+            else:
+                books = [book for book in books if sort_key(book) > after]
+
+        if page.limit is None:
+            return sorted(books, key=sort_key, reverse=page.descending)[page.offset:]
+        select = heapq.nlargest if page.descending else heapq.nsmallest
+        return select(page.offset + page.limit, books, key=sort_key)[page.offset:]
 
     def change_book_status(self, book_id: int, new_status: BookStatus) -> bool:
         """
@@ -99,9 +719,29 @@ class JsonLibraryRepository(LibraryRepository):
         :param new_status: Новый статус книги.
         :return: True, если статус был успешно изменён, иначе False.
         """
-        for book in self.books:
-            if book.book_id == book_id:
-                book.status = new_status
-                self._save_books()
-                return True
-        return False
+        with self.transaction():
+            book = self._books.get(book_id)
+            if book is None:
+                return False
+            self._set_status(book, new_status)
+            self._commit({'op': 'status', 'book_id': book_id, 'status': new_status.value})
+        return True
+
+    def get_book_by_id(self, book_id: int) -> Book | None:
+        """
+        Возвращает книгу по её ID.
+        :param book_id: Идентификатор книги.
+        :return: Объект Book или None, если книга не найдена.
+        """
+        with self._reading():
+            return self._books.get(book_id)
+
+    def generation(self) -> int:
+        """
+        Возвращает номер версии каталога. Перед ответом подгружает изменения других процессов,
+        поэтому номер меняется и после их изменений.
+        :return: Номер версии каталога.
+        """
+        with self._reading():
+            return self._generation
+
@@ -0,0 +1,324 @@
+import json
+import os
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import date
+from typing import Iterator
+
+from src.application.interfaces.loan_repository import LoanRepository
+from src.domain.entities.loan import Loan
+from src.domain.value_objects.search_text import normalize_text
+from src.infrastructure.concurrency.file_lock import FileLock
+from src.infrastructure.indexes.sorted_index import SortedIndex
+from src.infrastructure.serialization.atomic_write import atomic_write
+
+# Наименьшее количество лишних записей (возвратов), при котором файл сворачивается
+COMPACTION_MIN_RECORDS = 1000
+
+
+class JsonLinesLoanRepository(LoanRepository):
+    """
+    Реализация интерфейса LoanRepository в файле формата JSON lines.
+
+    Каждое изменение дописывается в конец файла одной строкой: оформление выдачи - запись "issue"
+    со всеми полями выдачи, возврат - запись "return" с датой возврата. Поэтому файл не переписывается
+    при каждом изменении. Когда записей о возвратах накапливается больше, чем самих выдач, файл
+    сворачивается: переписывается по одной записи "issue" на выдачу (с датой возврата, если она есть).
+
+    В памяти хранятся выдачи и индексы: открытая выдача каждой книги, выдачи каждой книги и каждого
+    читателя и упорядоченный по сроку возврата индекс открытых выдач, из которого просроченные
+    выдачи берутся за O(log n + k).
+
+    С одним файлом могут работать несколько процессов: изменения выполняются под межпроцессной
+    блокировкой (<data_file>.lock), а перед каждой операцией дочитываются строки, дописанные
+    другими процессами (после сворачивания файл перечитывается целиком).
+    """
+
+    def __init__(self, data_file: str) -> None:
+        """
+        Инициализация хранилища. Файл читается при первом обращении к данным.
+        :param data_file: Путь к файлу выдач.
+        """
+        self.data_file = data_file
+        self._file_lock = FileLock(data_file + '.lock')
+        # Незаписанные изменения внутри транзакции
+        self._pending: list[dict] = []
+        self._transaction_depth = 0
+        self._loaded = False
+        self._reset()
+
+    def _reset(self) -> None:
+        """
+        Очищает выдачи и индексы в памяти перед чтением файла.
+        """
+        self._loans: dict[int, Loan] = {}
+        # Индекс book_id -> ID открытой выдачи
+        self._active_by_book: dict[int, int] = {}
+        # История выдач: book_id -> ID выдач и нормализованное имя читателя -> ID выдач
+        self._by_book: dict[int, list[int]] = defaultdict(list)
+        self._by_borrower: dict[str, list[int]] = defaultdict(list)
+        # Открытые выдачи, упорядоченные по сроку возврата (порядковый номер дня, ID выдачи)
+        self._due_index = SortedIndex()
+        self._next_loan_id = 1
+        # Прочитанная часть файла: inode, длина и количество записей
+        self._inode: int | None = None
+        self._offset = 0
+        self._records = 0
+
+    @staticmethod
+    def _loan_to_record(loan: Loan) -> dict:
+        """
+        Преобразует выдачу в словарь для сериализации.
+        :param loan: Объект Loan.
+        :return: Словарь с полями выдачи.
+        """
+        return {
+            'loan_id': loan.loan_id,
+            'book_id': loan.book_id,
+            'borrower': loan.borrower,
+            'issued_on': loan.issued_on.isoformat(),
+            'due_on': loan.due_on.isoformat(),
+            'returned_on': loan.returned_on.isoformat() if loan.returned_on is not None else None,
+        }
+
+    @staticmethod
+    def _record_to_loan(record: dict) -> Loan:
+        """
+        Преобразует словарь в объект Loan.
+        :param record: Словарь с полями выдачи.
+        :return: Объект Loan.
+        """
+        return Loan(
+            loan_id=record['loan_id'],
+            book_id=record['book_id'],
+            borrower=record['borrower'],
+            issued_on=date.fromisoformat(record['issued_on']),
+            due_on=date.fromisoformat(record['due_on']),
+            returned_on=date.fromisoformat(record['returned_on']) if record.get('returned_on') else None,
+        )
+
+    def _refresh(self) -> None:
+        """
+        Дочитывает изменения файла, сделанные после последнего чтения. Внутри транзакции
+        блокировка уже удерживается и данные актуальны, поэтому проверка пропускается.
+        """
+        if self._transaction_depth:
+            return
+        with self._file_lock.acquire():
+            try:
+                stat = os.stat(self.data_file)
+            except FileNotFoundError:
+                stat = None
+            if stat is None or not self._loaded or stat.st_ino != self._inode or stat.st_size < self._offset:
+                # Первое чтение, либо файл свёрнут или удалён другим процессом - читаем заново
+                self._loaded = True
+                self._reset()
+                if stat is None:
+                    return
+                self._inode = stat.st_ino
+            if stat.st_size > self._offset:
+                self._read_tail()
+
+    def _read_tail(self) -> None:
+        """
+        Применяет записи файла после прочитанной части. Недописанная последняя запись
+        (после сбоя) отбрасывается, а файл обрезается до неё.
+        """
+        valid_size = self._offset
+        with open(self.data_file, 'rb') as file:
+            file.seek(valid_size)
+            for line in file:
+                try:
+                    if not line.endswith(b'\n'):
+                        raise ValueError("Недописанная запись")
+                    self._apply_record(json.loads(line))
+                except ValueError:
+                    break
+                valid_size += len(line)
+                self._records += 1
+            torn = file.tell() != valid_size
+
+        if torn:
+            with open(self.data_file, 'r+b') as file:
+                file.truncate(valid_size)
+                os.fsync(file.fileno())
+        self._offset = valid_size
+
+    def _apply_record(self, record: dict) -> None:
+        """
+        Применяет одну запись файла.
+        :param record: Запись об изменении.
+        """
+        operation = record['op']
+        if operation == 'issue':
+            self._put_loan(self._record_to_loan(record['loan']))
+        elif operation == 'return':
+            loan = self._loans.get(record['loan_id'])
+            if loan is not None and loan.is_active:
+                self._close(loan, date.fromisoformat(record['returned_on']))
+        else:
+            raise ValueError(f"Неизвестная операция: {operation}")
+
+    def _put_loan(self, loan: Loan) -> None:
+        """
+        Помещает выдачу в хранилище и индексы.
+        :param loan: Объект Loan.
+        """
+        self._loans[loan.loan_id] = loan
+        self._by_book[loan.book_id].append(loan.loan_id)
+        self._by_borrower[normalize_text(loan.borrower)].append(loan.loan_id)
+        self._next_loan_id = max(self._next_loan_id, loan.loan_id + 1)
+        if loan.is_active:
+            self._active_by_book[loan.book_id] = loan.loan_id
+            self._due_index.add(loan.due_on.toordinal(), loan.loan_id)
+
+    def _close(self, loan: Loan, returned_on: date) -> None:
+        """
+        Отмечает возврат книги и убирает выдачу из индексов открытых выдач.
+        :param loan: Открытая выдача.
+        :param returned_on: Дата возврата.
+        """
+        loan.returned_on = returned_on
+        if self._active_by_book.get(loan.book_id) == loan.loan_id:
+            del self._active_by_book[loan.book_id]
+        self._due_index.remove(loan.due_on.toordinal(), loan.loan_id)
+
+    def _flush(self) -> None:
+        """
+        Дописывает накопленные изменения в файл одной записью на диск с одним fsync
+        и сворачивает файл, если в нём накопилось слишком много записей о возвратах.
+        """
+        records, self._pending = self._pending, []
+        if not records:
+            return
+        payload = ''.join(
+            json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n' for record in records
+        ).encode('utf-8')
+        with open(self.data_file, 'ab') as file:
+            file.write(payload)
+            file.flush()
+            os.fsync(file.fileno())
+            self._offset = file.tell()
+            self._inode = os.fstat(file.fileno()).st_ino
+        self._records += len(records)
+
+        if self._records - len(self._loans) >= max(COMPACTION_MIN_RECORDS, len(self._loans)):
+            self._compact()
+
+    def _compact(self) -> None:
+        """
+        Переписывает файл по одной записи на выдачу.
+        """
+        payload = ''.join(
+            json.dumps({'op': 'issue', 'loan': self._loan_to_record(loan)}, ensure_ascii=False,
+                       separators=(',', ':')) + '\n'
+            for loan in self._loans.values()
+        ).encode('utf-8')
+        atomic_write(self.data_file, payload)
+        self._inode = os.stat(self.data_file).st_ino
+        self._offset = len(payload)
+        self._records = len(self._loans)
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """
+        Группирует изменения: все они дописываются в файл один раз при выходе из блока.
+        На время внешней транзакции удерживается блокировка файла, поэтому идентификатор,
+        выделенный next_loan_id внутри транзакции, не достанется другому процессу.
+        """
+        with self._file_lock.acquire():
+            self._refresh()
+            self._transaction_depth += 1
+            try:
+                yield
+            finally:
+                self._transaction_depth -= 1
+                if not self._transaction_depth:
+                    self._flush()
+
+    def add_loan(self, loan: Loan) -> None:
+        """
+        Добавляет выдачу в хранилище.
+        :param loan: Объект Loan.
+        :raises ValueError: Если выдача с таким ID уже есть или книга уже выдана.
+        """
+        with self.transaction():
+            if loan.loan_id in self._loans:
+                raise ValueError(f"Выдача с ID {loan.loan_id} уже существует")
+            if loan.is_active and loan.book_id in self._active_by_book:
+                raise ValueError("Книга уже выдана")
+            self._put_loan(loan)
+            self._pending.append({'op': 'issue', 'loan': self._loan_to_record(loan)})
+
+    def close_loan(self, loan_id: int, returned_on: date) -> bool:
+        """
+        Закрывает выдачу.
+        :param loan_id: Идентификатор выдачи.
+        :param returned_on: Дата возврата.
+        :return: True, если выдача была открыта и закрыта, иначе False.
+        """
+        with self.transaction():
+            loan = self._loans.get(loan_id)
+            if loan is None or not loan.is_active:
+                return False
+            self._close(loan, returned_on)
+            self._pending.append({'op': 'return', 'loan_id': loan_id, 'returned_on': returned_on.isoformat()})
+        return True
+
+    def next_loan_id(self) -> int:
+        """
+        Выделяет новый идентификатор выдачи за O(1).
+        :return: Идентификатор, который ещё не использовался в этом хранилище.
+        """
+        with self.transaction():
+            loan_id = self._next_loan_id
+            self._next_loan_id += 1
+        return loan_id
+
+    def get_loan(self, loan_id: int) -> Loan | None:
+        """
+        Возвращает выдачу по её ID.
+        :param loan_id: Идентификатор выдачи.
+        :return: Объект Loan или None, если выдача не найдена.
+        """
+        self._refresh()
+        return self._loans.get(loan_id)
+
+    def active_loan(self, book_id: int) -> Loan | None:
+        """
+        Возвращает открытую выдачу книги за O(1).
+        :param book_id: Идентификатор книги.
+        :return: Объект Loan или None, если книга не выдана.
+        """
+        self._refresh()
+        loan_id = self._active_by_book.get(book_id)
+        return self._loans[loan_id] if loan_id is not None else None
+
+    def loans_of_book(self, book_id: int) -> list[Loan]:
+        """
+        Возвращает историю выдач книги.
+        :param book_id: Идентификатор книги.
+        :return: Список выдач в порядке оформления.
+        """
+        self._refresh()
+        return [self._loans[loan_id] for loan_id in self._by_book.get(book_id, ())]
+
+    def loans_of_borrower(self, borrower: str, active_only: bool = False) -> list[Loan]:
+        """
+        Возвращает выдачи читателя.
+        :param borrower: Имя читателя (без учёта регистра и "ё").
+        :param active_only: Вернуть только невозвращённые книги.
+        :return: Список выдач в порядке оформления.
+        """
+        self._refresh()
+        loans = [self._loans[loan_id] for loan_id in self._by_borrower.get(normalize_text(borrower.strip()), ())]
+        return [loan for loan in loans if loan.is_active] if active_only else loans
+
+    def overdue_loans(self, today: date) -> list[Loan]:
+        """
+        Возвращает просроченные выдачи по индексу сроков возврата.
+        :param today: Текущая дата.
+        :return: Список выдач по возрастанию срока возврата.
+        """
+        self._refresh()
+        return [self._loans[loan_id] for loan_id in self._due_index.range(None, today.toordinal() - 1)]
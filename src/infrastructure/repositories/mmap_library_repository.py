@@ -0,0 +1,579 @@
+import bisect
+import heapq
+import mmap
+import os
+import struct
+from array import array
+from contextlib import contextmanager
+from typing import Iterable, Iterator
+
+from src.application.dto.page_request import PageRequest
+from src.application.dto.search_criteria import SearchCriteria
+from src.application.interfaces.library_repository import LibraryRepository
+from src.domain.entities.book import Book
+from src.domain.value_objects.book_status import BookStatus
+from src.domain.value_objects.search_text import normalize_text
+from src.infrastructure.indexes.ranked_index import RankedIndex
+from src.infrastructure.serialization.atomic_write import atomic_file, atomic_write, fsync_directory
+
+MAGIC = b"LMRF"
+VERSION = 2
+
+# Заголовок файла: сигнатура, версия, число занятых слотов, счётчик ID, голова списка свободных слотов
+HEADER = struct.Struct("<4sIqqq")
+HEADER_SIZE = 64
+# Запись книги: ID, год, код статуса, смещение и длина названия и автора в куче строк, ISBN-13 числом (0 - не указан)
+RECORD = struct.Struct("<qiB3xQIQIq")
+# Запись версии 1 - без ISBN; такие файлы переводятся в текущую версию при открытии
+RECORD_V1 = struct.Struct("<qiB3xQIQI")
+STATUS_OFFSET = 12
+
+STATUSES = tuple(BookStatus)
+STATUS_CODES = {status: code for code, status in enumerate(STATUSES)}
+# Код статуса свободного слота; в поле ID такого слота хранится номер следующего свободного слота
+FREE = 255
+NO_SLOT = -1
+
+INITIAL_CAPACITY = 1024
+# Сжатие файлов запускается, когда мёртвых байт (строк удалённых и заменённых книг в куче
+# и свободных слотов) больше, чем живых, и не меньше этого числа
+COMPACT_THRESHOLD = 1024 * 1024
+
+
+class MmapLibraryRepository(LibraryRepository):
+    """
+    Реализация интерфейса LibraryRepository поверх файла записей фиксированной длины,
+    отображённого в память (mmap). Строки (названия и авторы) хранятся в отдельной куче строк
+    <data_file>.heap, в которую только дописываются данные.
+
+    Изменение статуса - запись одного байта на месте, добавление и удаление затрагивают один слот.
+    Записи читаются прямо из отображения файла, объект Book создаётся только при запросе.
+    Слоты удалённых книг образуют список свободных слотов и используются повторно.
+
+    Строки удалённых и заменённых книг остаются в куче. Когда мёртвых данных становится больше,
+    чем живых, оба файла переписываются без них (см. _compact).
+    """
+
+    def __init__(self, data_file: str) -> None:
+        """
+        Инициализация репозитория: открывает (или создаёт) файл записей и кучу строк
+        и строит в памяти индекс book_id -> номер слота.
+        :param data_file: Путь к файлу записей.
+        """
+        self.data_file = data_file
+        self.heap_file = data_file + ".heap"
+        self._transaction_depth = 0
+        self._generation = 0
+        # Индекс ранжированного поиска (в памяти): строится при первом таком поиске, дальше обновляется при изменениях
+        self._ranked_index: RankedIndex | None = None
+        self._open()
+        # ID книг по возрастанию - для постраничного перебора
+        self._ids = array("q", sorted(self._slots))
+
+    def _open(self) -> None:
+        """
+        Открывает файл записей и кучу строк (завершив прерванное сжатие), отображает файл записей
+        в память и строит индекс book_id -> номер слота и счётчики живых данных.
+        """
+        self._finish_compaction()
+        is_new = not os.path.exists(self.data_file) or os.path.getsize(self.data_file) == 0
+        self._file = open(self.data_file, "w+b" if is_new else "r+b")
+        if is_new:
+            self._file.truncate(HEADER_SIZE + INITIAL_CAPACITY * RECORD.size)
+        self._map = mmap.mmap(self._file.fileno(), 0)
+        if is_new:
+            self._write_header(slot_count=0, next_book_id=1, free_head=NO_SLOT)
+            self._map.flush()
+
+        magic, version = HEADER.unpack_from(self._map, 0)[:2]
+        if magic == MAGIC and version == 1:
+            self._upgrade_from_v1()
+        magic, version, self._slot_count, self._next_book_id, self._free_head = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Файл {self.data_file} не является файлом записей библиотеки версии {VERSION}")
+
+        self._heap = open(self.heap_file, "a+b")
+        self._heap_map: mmap.mmap | None = None
+        self._heap_size = self._heap.seek(0, os.SEEK_END)
+
+        self._slots: dict[int, int] = {}
+        # Байты кучи, на которые ссылаются занятые слоты
+        self._live_heap = 0
+        for slot, record in self._iter_records():
+            self._slots[record[0]] = slot
+            self._live_heap += record[4] + record[6]
+
+    @property
+    def books(self) -> list[Book]:
+        """
+        Возвращает список всех книг, упорядоченный по ID.
+        :return: Список объектов Book.
+        """
+        return [self._materialize(self._slots[book_id]) for book_id in self._ids]
+
+    def close(self) -> None:
+        """
+        Сбрасывает изменения на диск и закрывает файлы.
+        """
+        self._sync()
+        self._close_files()
+
+    def _close_files(self) -> None:
+        """
+        Закрывает отображения и файлы.
+        """
+        if self._heap_map is not None:
+            self._heap_map.close()
+        self._map.close()
+        self._file.close()
+        self._heap.close()
+
+    def _upgrade_from_v1(self) -> None:
+        """
+        Переводит файл записей версии 1 в текущую раскладку: записи с пустым ISBN пишутся в новый файл,
+        который атомарно заменяет прежний. Список свободных слотов и куча строк не меняются.
+        """
+        _, _, slot_count, next_book_id, free_head = HEADER.unpack_from(self._map, 0)
+        payload = bytearray(HEADER_SIZE)
+        HEADER.pack_into(payload, 0, MAGIC, VERSION, slot_count, next_book_id, free_head)
+        view = memoryview(self._map)[HEADER_SIZE:HEADER_SIZE + slot_count * RECORD_V1.size]
+        try:
+            for record in RECORD_V1.iter_unpack(view):
+                payload += RECORD.pack(*record, 0)
+        finally:
+            view.release()
+        payload += bytes((max(slot_count, INITIAL_CAPACITY) - slot_count) * RECORD.size)
+        atomic_write(self.data_file, bytes(payload))
+        self._map.close()
+        self._file.close()
+        self._file = open(self.data_file, "r+b")
+        self._map = mmap.mmap(self._file.fileno(), 0)
+
+    def _write_header(self, slot_count: int, next_book_id: int, free_head: int) -> None:
+        """
+        Записывает заголовок файла.
+        """
+        HEADER.pack_into(self._map, 0, MAGIC, VERSION, slot_count, next_book_id, free_head)
+        self._slot_count, self._next_book_id, self._free_head = slot_count, next_book_id, free_head
+
+    @staticmethod
+    def _offset(slot: int) -> int:
+        """
+        Смещение записи слота в файле.
+        """
+        return HEADER_SIZE + slot * RECORD.size
+
+    def _iter_records(self) -> Iterator[tuple[int, tuple]]:
+        """
+        Перебирает занятые слоты без копирования: записи распаковываются прямо из memoryview отображения.
+        :return: Итератор пар (номер слота, распакованная запись).
+        """
+        view = memoryview(self._map)[HEADER_SIZE:self._offset(self._slot_count)]
+        try:
+            for slot, record in enumerate(RECORD.iter_unpack(view)):
+                if record[2] != FREE:
+                    yield slot, record
+        finally:
+            view.release()
+
+    def _read_string(self, offset: int, length: int) -> str:
+        """
+        Читает строку из кучи строк, при необходимости заново отображая выросший файл кучи.
+        :param offset: Смещение строки в куче.
+        :param length: Длина строки в байтах.
+        :return: Строка.
+        """
+        return self._read_bytes(offset, length).decode("utf-8")
+
+    def _read_bytes(self, offset: int, length: int) -> bytes:
+        """
+        Читает байты строки из кучи строк, при необходимости заново отображая выросший файл кучи.
+        :param offset: Смещение строки в куче.
+        :param length: Длина строки в байтах.
+        :return: Байты строки.
+        """
+        if not length:
+            return b""
+        if self._heap_map is None or offset + length > len(self._heap_map):
+            if self._heap_map is not None:
+                self._heap_map.close()
+            self._heap.flush()
+            self._heap_map = mmap.mmap(self._heap.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._heap_map[offset:offset + length]
+
+    def _append_string(self, text: str) -> tuple[int, int]:
+        """
+        Дописывает строку в кучу строк.
+        :param text: Строка.
+        :return: Пара (смещение, длина в байтах).
+        """
+        data = text.encode("utf-8")
+        offset = self._heap_size
+        self._heap.write(data)
+        self._heap_size += len(data)
+        self._live_heap += len(data)
+        return offset, len(data)
+
+    def _materialize(self, slot: int, record: tuple | None = None) -> Book:
+        """
+        Создаёт объект Book из записи слота.
+        :param slot: Номер слота.
+        :param record: Уже распакованная запись или None, чтобы прочитать её из файла.
+        :return: Объект Book.
+        """
+        book_id, year, status, title_offset, title_length, author_offset, author_length, isbn = (
+            record or RECORD.unpack_from(self._map, self._offset(slot))
+        )
+        return Book(
+            book_id=book_id,
+            title=self._read_string(title_offset, title_length),
+            author=self._read_string(author_offset, author_length),
+            year=year,
+            status=STATUSES[status],
+            isbn=str(isbn) if isbn else None
+        )
+
+    def _allocate_slot(self) -> int:
+        """
+        Выделяет слот: берёт первый из списка свободных, иначе новый в конце файла,
+        при необходимости увеличивая файл вдвое.
+        :return: Номер слота.
+        """
+        if self._free_head != NO_SLOT:
+            slot = self._free_head
+            next_free = RECORD.unpack_from(self._map, self._offset(slot))[0]
+            self._write_header(self._slot_count, self._next_book_id, next_free)
+            return slot
+
+        slot = self._slot_count
+        if self._offset(slot + 1) > len(self._map):
+            self._map.flush()
+            self._map.close()
+            self._file.truncate(self._offset(max(slot, INITIAL_CAPACITY) * 2))
+            self._map = mmap.mmap(self._file.fileno(), 0)
+        self._write_header(slot + 1, self._next_book_id, self._free_head)
+        return slot
+
+    def _sync(self, slot: int | None = None) -> None:
+        """
+        Сбрасывает изменения на диск: сначала кучу строк, затем страницы отображения
+        с заголовком и изменённым слотом. Внутри транзакции откладывается до её конца.
+        :param slot: Изменённый слот или None, чтобы сбросить всё отображение.
+        """
+        if self._transaction_depth:
+            return
+        self._heap.flush()
+        os.fsync(self._heap.fileno())
+        if slot is None:
+            self._map.flush()
+        else:
+            self._map.flush(0, HEADER_SIZE)
+            start = self._offset(slot) - self._offset(slot) % mmap.PAGESIZE
+            self._map.flush(start, self._offset(slot) + RECORD.size - start)
+
+        dead = self._heap_size - self._live_heap + (self._slot_count - len(self._slots)) * RECORD.size
+        if dead >= COMPACT_THRESHOLD and dead > self._live_heap + len(self._slots) * RECORD.size:
+            self._compact()
+
+    def _compact(self) -> None:
+        """
+        Переписывает кучу строк и файл записей без мёртвых данных: строки живых книг копируются в новую
+        кучу, а записи - в слоты подряд по возрастанию ID, так что список свободных слотов пустеет.
+        Новые файлы пишутся рядом (<файл>.compact): сначала куча, затем файл записей. Готовый файл
+        записей .compact означает, что и новая куча записана, поэтому сжатие, прерванное при замене
+        файлов, завершается при следующем открытии (см. _finish_compaction).
+        """
+        records = bytearray(HEADER_SIZE)
+        offset = 0
+        with atomic_file(self.heap_file + ".compact") as heap:
+            for book_id in self._ids:
+                record = RECORD.unpack_from(self._map, self._offset(self._slots[book_id]))
+                title, author = self._read_bytes(record[3], record[4]), self._read_bytes(record[5], record[6])
+                heap.write(title)
+                heap.write(author)
+                records += RECORD.pack(record[0], record[1], record[2], offset, len(title),
+                                       offset + len(title), len(author), record[7])
+                offset += len(title) + len(author)
+        HEADER.pack_into(records, 0, MAGIC, VERSION, len(self._ids), self._next_book_id, NO_SLOT)
+        records += bytes((max(len(self._ids), INITIAL_CAPACITY) - len(self._ids)) * RECORD.size)
+        atomic_write(self.data_file + ".compact", bytes(records))
+        self._close_files()
+        try:
+            self._open()
+        except OSError:
+            # Замена файлов прервана: открываем их заново, чтобы экземпляр оставался рабочим.
+            # Готовые файлы .compact при этом ещё раз подставляются на место прежних
+            self._open()
+            raise
+
+    def _finish_compaction(self) -> None:
+        """
+        Заменяет прежние файлы сжатыми, если их подготовка завершена: сначала кучу строк, затем
+        файл записей. Если файла записей .compact нет, сжатие прервано до его записи - прежние
+        файлы целы, а недописанная куча удаляется.
+        """
+        data_compact, heap_compact = self.data_file + ".compact", self.heap_file + ".compact"
+        if os.path.exists(data_compact):
+            if os.path.exists(heap_compact):
+                os.replace(heap_compact, self.heap_file)
+                # Новая куча должна оказаться на диске раньше, чем исчезнет файл записей .compact
+                fsync_directory(os.path.dirname(os.path.abspath(self.heap_file)))
+            os.replace(data_compact, self.data_file)
+        elif os.path.exists(heap_compact):
+            os.remove(heap_compact)
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """
+        Группирует изменения: сброс на диск выполняется один раз при выходе из блока.
+        """
+        self._transaction_depth += 1
+        try:
+            yield
+        finally:
+            self._transaction_depth -= 1
+            if not self._transaction_depth:
+                self._sync()
+
+    def add_book_to_library(self, book: Book) -> None:
+        """
+        Добавляет книгу в свободный слот. Книга с уже существующим ID перезаписывает свой слот.
+        :param book: Объект Book для добавления.
+        """
+        title_offset, title_length = self._append_string(book.title)
+        author_offset, author_length = self._append_string(book.author)
+
+        slot = self._slots.get(book.book_id)
+        if slot is not None:
+            # Строки заменяемой версии книги становятся мёртвыми
+            previous = RECORD.unpack_from(self._map, self._offset(slot))
+            self._live_heap -= previous[4] + previous[6]
+        if self._ranked_index is not None:
+            if slot is not None:
+                self._ranked_index.remove(self._materialize(slot))
+            self._ranked_index.add(book)
+        if slot is None:
+            slot = self._allocate_slot()
+            self._slots[book.book_id] = slot
+            if not self._ids or self._ids[-1] < book.book_id:
+                self._ids.append(book.book_id)
+            else:
+                self._ids.insert(bisect.bisect_left(self._ids, book.book_id), book.book_id)
+
+        RECORD.pack_into(self._map, self._offset(slot), book.book_id, book.year, STATUS_CODES[book.status],
+                         title_offset, title_length, author_offset, author_length, int(book.isbn or 0))
+        if book.book_id >= self._next_book_id:
+            self._write_header(self._slot_count, book.book_id + 1, self._free_head)
+        self._generation += 1
+        self._sync(slot)
+
+    def remove_book_from_library(self, book_id: int) -> bool:
+        """
+        Освобождает слот книги и добавляет его в список свободных слотов.
+        :param book_id: Идентификатор книги.
+        :return: True, если книга была удалена, иначе False.
+        """
+        slot = self._slots.pop(book_id, None)
+        if slot is None:
+            return False
+        if self._ranked_index is not None:
+            self._ranked_index.remove(self._materialize(slot))
+        del self._ids[bisect.bisect_left(self._ids, book_id)]
+        self._release_slot(slot)
+        self._generation += 1
+        self._sync(slot)
+        return True
+
+    def remove_books_from_library(self, book_ids: Iterable[int]) -> list[int]:
+        """
+        Освобождает слоты нескольких книг одной транзакцией. Отсортированный список ID
+        перестраивается одним проходом после освобождения всех слотов.
+        :param book_ids: Идентификаторы книг.
+        :return: Идентификаторы книг, которые не найдены.
+        """
+        missing, removed = [], set()
+        with self.transaction():
+            for book_id in book_ids:
+                slot = self._slots.pop(book_id, None)
+                if slot is None:
+                    missing.append(book_id)
+                    continue
+                if self._ranked_index is not None:
+                    self._ranked_index.remove(self._materialize(slot))
+                self._release_slot(slot)
+                removed.add(book_id)
+            if removed:
+                self._ids = array("q", (book_id for book_id in self._ids if book_id not in removed))
+                self._generation += 1
+        return missing
+
+    def _release_slot(self, slot: int) -> None:
+        """
+        Помечает слот свободным и ставит его в начало списка свободных слотов.
+        Строки книги в куче становятся мёртвыми.
+        :param slot: Номер слота.
+        """
+        record = RECORD.unpack_from(self._map, self._offset(slot))
+        self._live_heap -= record[4] + record[6]
+        RECORD.pack_into(self._map, self._offset(slot), self._free_head, 0, FREE, 0, 0, 0, 0, 0)
+        self._write_header(self._slot_count, self._next_book_id, slot)
+
+    def change_book_status(self, book_id: int, new_status: BookStatus) -> bool:
+        """
+        Изменяет статус книги записью одного байта в её слоте.
+        :param book_id: Идентификатор книги.
+        :param new_status: Новый статус книги.
+        :return: True, если статус был успешно изменён, иначе False.
+        """
+        slot = self._slots.get(book_id)
+        if slot is None:
+            return False
+        self._map[self._offset(slot) + STATUS_OFFSET] = STATUS_CODES[new_status]
+        self._generation += 1
+        self._sync(slot)
+        return True
+
+    def get_book_by_id(self, book_id: int) -> Book | None:
+        """
+        Возвращает книгу по её ID.
+        :param book_id: Идентификатор книги.
+        :return: Объект Book или None, если книга не найдена.
+        """
+        slot = self._slots.get(book_id)
+        return None if slot is None else self._materialize(slot)
+
+    def search_ranked(self, query: str, limit: int = 10) -> list[Book]:
+        """
+        Ищет книги по запросу в свободной форме с учётом опечаток и ранжирует их по BM25.
+        Индекс хранится в памяти, строится при первом поиске, а дальше обновляется при добавлении
+        и удалении книг.
+        :param query: Строка запроса.
+        :param limit: Количество лучших результатов.
+        :return: Список найденных книг по убыванию релевантности.
+        """
+        if self._ranked_index is None:
+            self._ranked_index = RankedIndex.build(self.books)
+        return [self.get_book_by_id(book_id) for book_id in self._ranked_index.search(query, limit)]
+
+    def generation(self) -> int:
+        """
+        Возвращает номер версии каталога, который увеличивается при каждом изменении книг.
+        :return: Номер версии каталога.
+        """
+        return self._generation
+
+    def next_book_id(self) -> int:
+        """
+        Выделяет новый идентификатор книги.
+        :return: Идентификатор, который ещё не использовался в этом файле.
+        """
+        return self.reserve_book_ids(1)[0]
+
+    def reserve_book_ids(self, count: int) -> range:
+        """
+        Резервирует блок идущих подряд идентификаторов книг. Счётчик хранится в заголовке файла.
+        :param count: Количество идентификаторов.
+        :return: Диапазон зарезервированных идентификаторов.
+        """
+        if count < 1:
+            raise ValueError("Количество идентификаторов должно быть положительным")
+        start = self._next_book_id
+        self._write_header(self._slot_count, start + count, self._free_head)
+        # Счётчик должен попасть на диск до того, как ID будут выданы: иначе после сбоя они выдадутся повторно
+        if not self._transaction_depth:
+            self._map.flush(0, HEADER_SIZE)
+        return range(start, start + count)
+
+    def search_book_in_library(self, criteria: SearchCriteria) -> list[Book] | None:
+        """
+        Ищет книги проходом по записям файла. Названия и авторы декодируются только
+        для тех условий, которые заданы.
+        :param criteria: Объект SearchCriteria с параметрами поиска.
+        :return: Список найденных книг или None, если ничего не найдено.
+        """
+        matched = self._match(criteria)
+        matched.sort(key=lambda item: item[1][0])
+        return [self._materialize(slot, record) for slot, record in matched] or None
+
+    def _match(self, criteria: SearchCriteria) -> list[tuple[int, tuple]]:
+        """
+        Отбирает записи, подходящие под критерии.
+        :param criteria: Объект SearchCriteria с параметрами поиска.
+        :return: Список пар (номер слота, запись).
+        """
+        checks = []
+        if criteria.title:
+            title = normalize_text(criteria.title)
+            checks.append(lambda record: title in normalize_text(self._read_string(record[3], record[4])))
+        if criteria.author:
+            author = normalize_text(criteria.author)
+            checks.append(lambda record: author in normalize_text(self._read_string(record[5], record[6])))
+        if criteria.year:
+            checks.append(lambda record: record[1] == criteria.year)
+        if criteria.year_from is not None or criteria.year_to is not None:
+            low = criteria.year_from if criteria.year_from is not None else -2 ** 31
+            high = criteria.year_to if criteria.year_to is not None else 2 ** 31 - 1
+            checks.append(lambda record: low <= record[1] <= high)
+        if criteria.status is not None:
+            status = STATUS_CODES[criteria.status]
+            checks.append(lambda record: record[2] == status)
+        if not checks:
+            return []
+
+        combine = all if criteria.match_all else any
+        return [
+            (slot, record) for slot, record in self._iter_records()
+            if combine(check(record) for check in checks)
+        ]
+
+    def iter_books(self, page: PageRequest, criteria: SearchCriteria | None = None) -> Iterator[Book]:
+        """
+        Возвращает одну страницу книг. Перебор всего каталога по ID идёт по упорядоченному
+        массиву ID; остальные случаи отбирают нужные offset + limit записей через кучу.
+        :param page: Параметры страницы.
+        :param criteria: Критерии поиска или None, чтобы перебирать весь каталог.
+        :return: Итератор книг страницы.
+        """
+        def materialize(book_ids: Iterable[int]) -> Iterator[Book]:
+            # Страница отдаётся лениво: книги, удалённые во время перебора, пропускаются,
+            # а запись читается заново, потому что слот мог смениться при сжатии файлов
+            for book_id in book_ids:
+                slot = self._slots.get(book_id)
+                if slot is not None:
+                    yield self._materialize(slot)
+
+        if criteria is None and page.order_by == "book_id":
+            if page.descending:
+                end = len(self._ids) if page.after is None else bisect.bisect_left(self._ids, page.after[1])
+                end -= page.offset
+                start = 0 if page.limit is None else max(end - page.limit, 0)
+                book_ids = reversed(self._ids[start:max(end, 0)])
+            else:
+                start = (0 if page.after is None else bisect.bisect_right(self._ids, page.after[1])) + page.offset
+                book_ids = self._ids[start:None if page.limit is None else start + page.limit]
+            return materialize(book_ids)
+
+        def sort_key(item: tuple[int, tuple]) -> tuple:
+            _, record = item
+            value = {
+                "book_id": lambda: record[0],
+                "year": lambda: record[1],
+                "title": lambda: self._read_string(record[3], record[4]),
+                "author": lambda: self._read_string(record[5], record[6]),
+            }[page.order_by]()
+            return value, record[0]
+
+        items = self._iter_records() if criteria is None else self._match(criteria)
+        if page.after is not None:
+            after = tuple(page.after)
+            if page.descending:
+                items = [item for item in items if sort_key(item) < after]
+            else:
+                items = [item for item in items if sort_key(item) > after]
+
+        if page.limit is None:
+            ordered = sorted(items, key=sort_key, reverse=page.descending)[page.offset:]
+        else:
+            select = heapq.nlargest if page.descending else heapq.nsmallest
+            ordered = select(page.offset + page.limit, items, key=sort_key)[page.offset:]
+        return materialize([record[0] for _, record in ordered])
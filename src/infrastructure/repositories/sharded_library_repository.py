@@ -0,0 +1,352 @@
+import bisect
+import heapq
+import multiprocessing
+import os
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from operator import attrgetter
+from typing import Any, Callable, Iterable, Iterator
+
+from src.application.dto.page_request import PageRequest
+from src.application.dto.search_criteria import SearchCriteria
+from src.application.interfaces.library_repository import LibraryRepository
+from src.domain.entities.book import Book
+from src.domain.events.book_event import BookEvent
+from src.domain.value_objects.book_status import BookStatus
+from src.infrastructure.repositories.columnar_library_repository import ColumnarLibraryRepository
+
+# Шард каталога в рабочем процессе: у каждого процесса свой
+_shard: ColumnarLibraryRepository | None = None
+
+
+def _book_to_row(book: Book) -> tuple:
+    """
+    Преобразует книгу в кортеж полей: кортежи передаются между процессами в несколько раз
+    быстрее объектов Book.
+    :param book: Объект Book.
+    :return: Кортеж (ID, название, автор, год, статус, ISBN).
+    """
+    return book.book_id, book.title, book.author, book.year, book.status, book.isbn
+
+
+def _load_shard(rows: list[tuple]) -> None:
+    """
+    Заполняет шард рабочего процесса книгами (выполняется в рабочем процессе).
+    :param rows: Книги шарда в виде кортежей полей.
+    """
+    global _shard
+    _shard = ColumnarLibraryRepository(Book(*row) for row in rows)
+
+
+def _apply_updates(updates: list[tuple]) -> None:
+    """
+    Применяет к шарду изменения каталога в порядке их выполнения (выполняется в рабочем процессе).
+    :param updates: Изменения: ("add", кортеж полей книги), ("remove", ID книги) или ("status", ID книги, статус).
+    """
+    for operation, *args in updates:
+        if operation == "add":
+            _shard.add_book_to_library(Book(*args[0]))
+        elif operation == "remove":
+            _shard.remove_book_from_library(*args)
+        elif operation == "status":
+            _shard.change_book_status(*args)
+        else:
+            raise ValueError(f"Неизвестная операция: {operation}")
+
+
+def _search_shard(criteria: SearchCriteria) -> list[Book]:
+    """
+    Ищет книги в шарде (выполняется в рабочем процессе).
+    :param criteria: Критерии поиска.
+    :return: Найденные книги, упорядоченные по ID.
+    """
+    return _shard.search_book_in_library(criteria) or []
+
+
+class ShardedLibraryRepository(LibraryRepository):
+    """
+    Обёртка над репозиторием, которая выполняет поиск по критериям параллельно в нескольких процессах.
+
+    Каталог делится на шарды по диапазонам ID поровну; каждый шард хранится в памяти своего рабочего
+    процесса (ColumnarLibraryRepository) и просматривается им независимо, поэтому поиск не упирается
+    в GIL одного процесса. Результаты шардов, упорядоченные по ID, сливаются k-путевым слиянием
+    через кучу. Шарды загружаются при первом поиске.
+
+    Хранилищем остаётся обёрнутый репозиторий: изменения выполняются в нём, а шардам рассылаются
+    только сами изменения (добавление, удаление, смена статуса) - шард не перечитывается целиком.
+    Изменения транзакции рассылаются одним сообщением на шард после её фиксации. Если каталог изменён
+    в обход обёртки (например, другим процессом) или транзакция завершилась ошибкой, шарды загружаются
+    заново при следующем поиске. Новые книги с ID больше последней границы попадают в последний шард;
+    границы пересчитываются при каждой полной загрузке.
+
+    Остальные методы и атрибуты (чтение по ID, страницы, ранжированный поиск и т.п.) берутся
+    у обёрнутого репозитория.
+    """
+
+    def __init__(self, repository: LibraryRepository, shards: int | None = None) -> None:
+        """
+        :param repository: Обёртываемый репозиторий.
+        :param shards: Количество шардов (рабочих процессов); по умолчанию - количество ядер.
+        """
+        self.repository = repository
+        self.shard_count = shards or os.cpu_count() or 1
+        if self.shard_count < 1:
+            raise ValueError("Количество шардов должно быть положительным")
+        # Один процесс на шард: задачи одного исполнителя выполняются по порядку, поэтому
+        # поиск всегда видит все разосланные до него изменения
+        self._executors: list[ProcessPoolExecutor] = []
+        # Первые ID шардов, начиная со второго: книга попадает в шард bisect_right(self._bounds, book_id)
+        self._bounds: list[int] = []
+        # Версия каталога, которой соответствуют шарды (None - шарды нужно загрузить заново)
+        self._synced_generation: int | None = None
+        # Изменения незавершённой транзакции: номер шарда -> изменения
+        self._pending: dict[int, list[tuple]] = defaultdict(list)
+        self._transaction_depth = 0
+
+    def __getattr__(self, name: str) -> Any:
+        # Вызывается только для атрибутов, которых нет у обёртки
+        if name == "repository":
+            raise AttributeError(name)
+        return getattr(self.repository, name)
+
+    def close(self) -> None:
+        """
+        Останавливает рабочие процессы и закрывает обёрнутый репозиторий.
+        """
+        for executor in self._executors:
+            executor.shutdown(cancel_futures=True)
+        self._executors = []
+        self._synced_generation = None
+        close = getattr(self.repository, "close", None)
+        if close is not None:
+            close()
+
+    def _load_shards(self) -> None:
+        """
+        Делит каталог на шарды поровну по диапазонам ID и загружает их в рабочие процессы.
+        """
+        with self.repository.transaction():
+            rows = [_book_to_row(book) for book in self.repository.iter_books(PageRequest())]
+            generation = self.repository.generation()
+        if not self._executors:
+            # spawn: репозиторий может использоваться из нескольких потоков (сервер), а fork
+            # многопоточного процесса небезопасен
+            context = multiprocessing.get_context("spawn")
+            self._executors = [
+                ProcessPoolExecutor(max_workers=1, mp_context=context) for _ in range(self.shard_count)
+            ]
+
+        size = max(1, -(-len(rows) // self.shard_count))
+        # Границы пустых шардов - за последним ID, чтобы новые книги попадали в последний шард
+        end = rows[-1][0] + 1 if rows else 1
+        self._bounds = [rows[i * size][0] if i * size < len(rows) else end for i in range(1, self.shard_count)]
+        futures = [
+            executor.submit(_load_shard, rows[i * size:(i + 1) * size]) for i, executor in enumerate(self._executors)
+        ]
+        for future in futures:
+            future.result()
+        self._pending.clear()
+        self._synced_generation = generation
+
+    def _queue(self, book_id: int, update: tuple) -> None:
+        """
+        Добавляет изменение книги в очередь её шарда.
+        :param book_id: Идентификатор книги.
+        :param update: Изменение (см. _apply_updates).
+        """
+        if self._synced_generation is not None:
+            self._pending[bisect.bisect_right(self._bounds, book_id)].append(update)
+
+    def _send_pending(self) -> None:
+        """
+        Рассылает накопленные изменения шардам: одно сообщение на шард.
+        """
+        pending, self._pending = self._pending, defaultdict(list)
+        if self._synced_generation is None:
+            return
+        for shard, updates in pending.items():
+            self._executors[shard].submit(_apply_updates, updates)
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """
+        Транзакция обёрнутого репозитория. Изменения рассылаются шардам после фиксации внешней
+        транзакции; при ошибке шарды помечаются устаревшими, так как неизвестно, какие изменения
+        успели попасть в хранилище.
+        """
+        self._transaction_depth += 1
+        try:
+            with self.repository.transaction():
+                yield
+        except BaseException:
+            self._synced_generation = None
+            raise
+        finally:
+            self._transaction_depth -= 1
+        if not self._transaction_depth:
+            self._send_pending()
+
+    @contextmanager
+    def _mirroring(self) -> Iterator[None]:
+        """
+        Выполняет изменение в транзакции и проверяет, что шарды соответствуют каталогу:
+        если перед изменением версия каталога отличалась от версии шардов (каталог изменён
+        в обход обёртки), шарды помечаются устаревшими.
+        """
+        with self.transaction():
+            in_sync = self._synced_generation == self.repository.generation()
+            yield
+            self._synced_generation = self.repository.generation() if in_sync else None
+
+    def add_book_to_library(self, book: Book) -> None:
+        """
+        Добавляет книгу в обёрнутый репозиторий и ставит её в очередь её шарда.
+        :param book: Объект книги для добавления.
+        """
+        with self._mirroring():
+            self.repository.add_book_to_library(book)
+            self._queue(book.book_id, ("add", _book_to_row(book)))
+
+    def add_books_to_library(self, books: Iterable[Book]) -> None:
+        """
+        Добавляет несколько книг в одной транзакции обёрнутого репозитория и ставит их в очереди шардов.
+        :param books: Объекты книг для добавления.
+        """
+        books = list(books)
+        with self._mirroring():
+            self.repository.add_books_to_library(books)
+            for book in books:
+                self._queue(book.book_id, ("add", _book_to_row(book)))
+
+    def remove_book_from_library(self, book_id: int) -> bool:
+        """
+        Удаляет книгу из обёрнутого репозитория; удаление рассылается её шарду.
+        :param book_id: Идентификатор книги.
+        :return: True, если книга успешно удалена, иначе False.
+        """
+        with self._mirroring():
+            removed = self.repository.remove_book_from_library(book_id)
+            if removed:
+                self._queue(book_id, ("remove", book_id))
+        return removed
+
+    def remove_books_from_library(self, book_ids: Iterable[int]) -> list[int]:
+        """
+        Удаляет несколько книг в одной транзакции; удаление найденных книг рассылается их шардам.
+        :param book_ids: Идентификаторы книг.
+        :return: Идентификаторы книг, которые не найдены.
+        """
+        book_ids = list(book_ids)
+        with self._mirroring():
+            missing = self.repository.remove_books_from_library(book_ids)
+            for book_id in set(book_ids).difference(missing):
+                self._queue(book_id, ("remove", book_id))
+        return missing
+
+    def change_book_status(self, book_id: int, new_status: BookStatus) -> bool:
+        """
+        Изменяет статус книги в обёрнутом репозитории; изменение рассылается её шарду.
+        :param book_id: Идентификатор книги.
+        :param new_status: Новый статус книги.
+        :return: True, если статус успешно изменён, иначе False.
+        """
+        with self._mirroring():
+            changed = self.repository.change_book_status(book_id, new_status)
+            if changed:
+                self._queue(book_id, ("status", book_id, new_status))
+        return changed
+
+    def change_books_status(self, book_ids: Iterable[int], new_status: BookStatus) -> list[int]:
+        """
+        Изменяет статус нескольких книг в одной транзакции; изменения рассылаются их шардам.
+        :param book_ids: Идентификаторы книг.
+        :param new_status: Новый статус книг.
+        :return: Идентификаторы книг, которые не найдены.
+        """
+        book_ids = list(book_ids)
+        with self._mirroring():
+            missing = self.repository.change_books_status(book_ids, new_status)
+            for book_id in set(book_ids).difference(missing):
+                self._queue(book_id, ("status", book_id, new_status))
+        return missing
+
+    def search_book_in_library(self, criteria: SearchCriteria) -> list[Book] | None:
+        """
+        Ищет книги параллельно во всех шардах и сливает результаты по возрастанию ID.
+        :param criteria: Объект SearchCriteria с параметрами поиска.
+        :return: Список найденных книг или None, если ничего не найдено.
+        """
+        if self._transaction_depth:
+            # Внутри транзакции поиск должен видеть её изменения
+            self._send_pending()
+        if self._synced_generation is None or self._synced_generation != self.repository.generation():
+            self._load_shards()
+        futures = [executor.submit(_search_shard, criteria) for executor in self._executors]
+        results = [future.result() for future in futures]
+        return list(heapq.merge(*results, key=attrgetter("book_id"))) or None
+
+    def get_book_by_id(self, book_id: int) -> Book | None:
+        """
+        Возвращает книгу по ID из обёрнутого репозитория.
+        :param book_id: Идентификатор книги.
+        :return: Объект книги или None, если книга не найдена.
+        """
+        return self.repository.get_book_by_id(book_id)
+
+    def next_book_id(self) -> int:
+        """
+        Выделяет идентификатор новой книги в обёрнутом репозитории.
+        :return: Новый уникальный идентификатор книги.
+        """
+        return self.repository.next_book_id()
+
+    def reserve_book_ids(self, count: int) -> range:
+        """
+        Резервирует блок идентификаторов в обёрнутом репозитории.
+        :param count: Количество идентификаторов.
+        :return: Диапазон зарезервированных идентификаторов.
+        """
+        return self.repository.reserve_book_ids(count)
+
+    def iter_books(self, page: PageRequest, criteria: SearchCriteria | None = None) -> Iterator[Book]:
+        """
+        Возвращает страницу книг из обёрнутого репозитория (без шардов).
+        :param page: Параметры страницы.
+        :param criteria: Критерии поиска или None, чтобы перебирать весь каталог.
+        :return: Итератор книг страницы.
+        """
+        return self.repository.iter_books(page, criteria)
+
+    def generation(self) -> int:
+        """
+        Возвращает номер версии каталога обёрнутого репозитория.
+        :return: Номер версии каталога.
+        """
+        return self.repository.generation()
+
+    def search_ranked(self, query: str, limit: int = 10) -> list[Book]:
+        """
+        Выполняет ранжированный поиск в обёрнутом репозитории.
+        :param query: Строка запроса.
+        :param limit: Количество лучших результатов.
+        :return: Список найденных книг.
+        """
+        return self.repository.search_ranked(query, limit)
+
+    def subscribe(self, listener: Callable[[BookEvent], None]) -> Callable[[], None]:
+        """
+        Подписывает listener на события изменения каталога обёрнутого репозитория.
+        :param listener: Функция, которая вызывается с каждым событием.
+        :return: Функция отмены подписки.
+        """
+        return self.repository.subscribe(listener)
+
+    def suggest(self, prefix: str, limit: int = 10) -> list[str]:
+        """
+        Возвращает дополнения по префиксу из обёрнутого репозитория.
+        :param prefix: Начало названия или имени автора.
+        :param limit: Наибольшее количество дополнений.
+        :return: Список дополнений.
+        """
+        return self.repository.suggest(prefix, limit)
@@ -0,0 +1,450 @@
+import sqlite3
+from contextlib import contextmanager
+from typing import Iterable, Iterator
+
+from src.application.dto.page_request import PageRequest
+from src.application.dto.search_criteria import SearchCriteria
+from src.application.interfaces.library_repository import LibraryRepository
+from src.domain.entities.book import Book
+from src.domain.value_objects.book_status import BookStatus
+from src.domain.value_objects.search_text import normalize_text
+from src.infrastructure.indexes.ranked_index import RankedIndex
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS books (
+    book_id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL,
+    author TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    title_norm TEXT NOT NULL,
+    author_norm TEXT NOT NULL,
+    isbn TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_books_year ON books (year);
+CREATE INDEX IF NOT EXISTS idx_books_author ON books (author_norm);
+CREATE INDEX IF NOT EXISTS idx_books_title ON books (title_norm);
+CREATE INDEX IF NOT EXISTS idx_books_status ON books (status);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO meta (key, value) VALUES ('next_book_id', 1);
+"""
+
+BOOK_COLUMNS = "book_id, title, author, year, status, isbn"
+
+# Количество ID в одном запросе WHERE book_id IN (...) - меньше ограничения SQLite на число параметров
+IN_CLAUSE_CHUNK = 500
+
+
+class SqliteLibraryRepository(LibraryRepository):
+    """
+    Реализация интерфейса LibraryRepository поверх встроенной базы SQLite.
+    Каталог не загружается в память целиком: каждое изменение затрагивает одну строку,
+    а поиск выполняется запросом к базе.
+    """
+
+    def __init__(self, data_file: str) -> None:
+        """
+        Инициализация репозитория: открывает базу, включает WAL-журналирование и создаёт схему.
+        :param data_file: Путь к файлу базы данных SQLite.
+        """
+        self.data_file = data_file
+        self._connection = sqlite3.connect(data_file)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._transaction_depth = 0
+        with self._connection:
+            self._connection.executescript(SCHEMA)
+            self._upgrade_schema()
+        # Счётчик собственных изменений и последнее значение data_version, которое меняется,
+        # когда изменения в базе фиксирует другое соединение
+        self._generation = 0
+        self._data_version = self._read_data_version()
+        # Индекс ранжированного поиска (в памяти) и версия каталога, которой он соответствует.
+        # Собственные изменения переносятся в индекс сразу, изменения других соединений - перестройкой
+        self._ranked_index: RankedIndex | None = None
+        self._ranked_generation: int | None = None
+
+    @property
+    def books(self) -> list[Book]:
+        """
+        Возвращает список всех книг, упорядоченный по ID.
+        :return: Список объектов Book.
+        """
+        cursor = self._connection.execute(f"SELECT {BOOK_COLUMNS} FROM books ORDER BY book_id")
+        return [self._row_to_book(row) for row in cursor]
+
+    def _upgrade_schema(self) -> None:
+        """
+        Приводит базу, созданную прежней версией, к текущей схеме: добавляет в таблицу books
+        столбец ISBN и переводит статусы, записанные как есть, к нижнему регистру (см. _status_key).
+        Функция lower() в SQLite не работает с кириллицей, поэтому значения подставляются из Python;
+        благодаря индексу по статусу в уже приведённой базе запросы ничего не перебирают.
+        """
+        columns = {row[1] for row in self._connection.execute("PRAGMA table_info(books)")}
+        if "isbn" not in columns:
+            self._connection.execute("ALTER TABLE books ADD COLUMN isbn TEXT")
+        self._connection.executemany(
+            "UPDATE books SET status = ? WHERE status = ?",
+            [(self._status_key(status), status.value) for status in BookStatus
+             if status.value != self._status_key(status)]
+        )
+
+    @staticmethod
+    def _row_to_book(row: tuple) -> Book:
+        """
+        Создаёт книгу из строки таблицы books.
+        :param row: Кортеж (book_id, title, author, year, status, isbn).
+        :return: Объект Book.
+        """
+        book_id, title, author, year, status, isbn = row
+        return Book(book_id=book_id, title=title, author=author, year=year, status=BookStatus(status), isbn=isbn)
+
+    @staticmethod
+    def _normalize(text: str) -> str:
+        """
+        Приводит строку к виду для поиска. Функция lower() в SQLite работает только с ASCII,
+        поэтому нормализация выполняется в Python и хранится в отдельных столбцах.
+        :param text: Исходная строка.
+        :return: Нормализованная строка.
+        """
+        return normalize_text(text)
+
+    @staticmethod
+    def _status_key(status: BookStatus) -> str:
+        """
+        Значение статуса для хранения в базе. NOCASE в SQLite не работает с кириллицей,
+        поэтому статус приводится к нижнему регистру до записи, и индекс по нему точный.
+        :param status: Статус книги.
+        :return: Статус в нижнем регистре.
+        """
+        return status.value.lower()
+
+    def _read_data_version(self) -> int:
+        """
+        :return: Значение PRAGMA data_version для текущего соединения.
+        """
+        return self._connection.execute("PRAGMA data_version").fetchone()[0]
+
+    def close(self) -> None:
+        """
+        Закрывает соединение с базой данных.
+        """
+        self._connection.close()
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """
+        Выполняет изменения в одной транзакции SQLite. Вложенные вызовы присоединяются
+        к внешней транзакции; при исключении все изменения откатываются. Откат не затрагивает
+        индекс ранжированного поиска в памяти, поэтому индекс сбрасывается и строится заново.
+        """
+        if self._transaction_depth:
+            self._transaction_depth += 1
+            try:
+                yield
+            finally:
+                self._transaction_depth -= 1
+            return
+
+        self._transaction_depth = 1
+        try:
+            with self._connection:
+                yield
+        except BaseException:
+            self._ranked_index = self._ranked_generation = None
+            raise
+        finally:
+            self._transaction_depth = 0
+
+    def _changed(self, added: Iterable[Book] = (), removed: Iterable[Book] = ()) -> None:
+        """
+        Отмечает изменение каталога этим соединением: увеличивает номер версии и переносит изменение
+        в индекс ранжированного поиска, если индекс соответствовал прежней версии. Изменения
+        других соединений, ещё не учтённые в номере версии, обнаружатся позже по data_version,
+        и тогда индекс будет перестроен.
+        :param added: Добавленные книги.
+        :param removed: Удалённые книги.
+        """
+        current = self._ranked_index is not None and self._ranked_generation == self._generation
+        self._generation += 1
+        if current:
+            for book in removed:
+                self._ranked_index.remove(book)
+            for book in added:
+                self._ranked_index.add(book)
+            self._ranked_generation = self._generation
+
+    def add_book_to_library(self, book: Book) -> None:
+        """
+        Добавляет книгу в базу.
+        :param book: Объект Book для добавления.
+        """
+        self.add_books_to_library([book])
+
+    def add_books_to_library(self, books: Iterable[Book]) -> None:
+        """
+        Добавляет несколько книг одним пакетным INSERT в рамках одной транзакции.
+        :param books: Объекты Book для добавления.
+        """
+        books = list(books)
+        rows = [
+            (book.book_id, book.title, book.author, book.year, self._status_key(book.status),
+             self._normalize(book.title), self._normalize(book.author), book.isbn)
+            for book in books
+        ]
+        if not rows:
+            return
+        with self.transaction():
+            self._connection.executemany(
+                "INSERT INTO books (book_id, title, author, year, status, title_norm, author_norm, isbn) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows
+            )
+            # Книги могли прийти с явно заданными ID - счётчик не должен их выдать повторно
+            self._connection.execute(
+                "UPDATE meta SET value = MAX(value, ?) WHERE key = 'next_book_id'",
+                (max(row[0] for row in rows) + 1,)
+            )
+            self._changed(added=books)
+
+    def remove_book_from_library(self, book_id: int) -> bool:
+        """
+        Удаляет книгу из базы по её ID.
+        :param book_id: Идентификатор книги.
+        :return: True, если книга была удалена, иначе False.
+        """
+        with self.transaction():
+            # Удаляемая книга нужна, только чтобы убрать её слова из индекса ранжированного поиска
+            book = self.get_book_by_id(book_id) if self._ranked_index is not None else None
+            cursor = self._connection.execute("DELETE FROM books WHERE book_id = ?", (book_id,))
+            if cursor.rowcount:
+                self._changed(removed=[book] if book is not None else ())
+        return cursor.rowcount > 0
+
+    def _select_by_ids(self, book_ids: list[int], columns: str) -> Iterator[tuple]:
+        """
+        Читает строки книг запросами по первичному ключу пачками ID.
+        :param book_ids: Идентификаторы книг.
+        :param columns: Список столбцов для SELECT.
+        :return: Итератор найденных строк.
+        """
+        for start in range(0, len(book_ids), IN_CLAUSE_CHUNK):
+            chunk = book_ids[start:start + IN_CLAUSE_CHUNK]
+            yield from self._connection.execute(
+                f"SELECT {columns} FROM books WHERE book_id IN ({', '.join('?' * len(chunk))})", chunk
+            )
+
+    def _existing_ids(self, book_ids: list[int]) -> set[int]:
+        """
+        Находит, какие из книг есть в базе.
+        :param book_ids: Идентификаторы книг.
+        :return: Множество найденных ID.
+        """
+        return {row[0] for row in self._select_by_ids(book_ids, "book_id")}
+
+    def remove_books_from_library(self, book_ids: Iterable[int]) -> list[int]:
+        """
+        Удаляет несколько книг одним пакетным DELETE в рамках одной транзакции.
+        :param book_ids: Идентификаторы книг.
+        :return: Идентификаторы книг, которые не найдены.
+        """
+        book_ids = list(book_ids)
+        with self.transaction():
+            if self._ranked_index is not None:
+                removed = [self._row_to_book(row) for row in self._select_by_ids(book_ids, BOOK_COLUMNS)]
+                existing = {book.book_id for book in removed}
+            else:
+                removed, existing = [], self._existing_ids(book_ids)
+            self._connection.executemany("DELETE FROM books WHERE book_id = ?", ((book_id,) for book_id in existing))
+            if existing:
+                self._changed(removed=removed)
+        return [book_id for book_id in book_ids if book_id not in existing]
+
+    def search_book_in_library(self, criteria: SearchCriteria) -> list[Book] | None:
+        """
+        Ищет книги в базе по заданным критериям.
+        :param criteria: Объект SearchCriteria с параметрами поиска.
+        :return: Список найденных книг или None, если ничего не найдено.
+        """
+        where, params = self._where(criteria)
+        if not where:
+            return None
+
+        cursor = self._connection.execute(
+            f"SELECT {BOOK_COLUMNS} FROM books WHERE {where} ORDER BY book_id", params
+        )
+        result = [self._row_to_book(row) for row in cursor]
+        return result if result else None
+
+    def _where(self, criteria: SearchCriteria) -> tuple[str, list]:
+        """
+        Строит условие WHERE по критериям поиска.
+        :param criteria: Объект SearchCriteria с параметрами поиска.
+        :return: Текст условия (пустой, если не задано ни одного фильтра) и параметры запроса.
+        """
+        conditions, params = [], []
+        if criteria.title:
+            conditions.append("instr(title_norm, ?) > 0")
+            params.append(self._normalize(criteria.title))
+        if criteria.author:
+            conditions.append("instr(author_norm, ?) > 0")
+            params.append(self._normalize(criteria.author))
+        if criteria.year:
+            conditions.append("year = ?")
+            params.append(criteria.year)
+        if criteria.year_from is not None or criteria.year_to is not None:
+            conditions.append("year BETWEEN ? AND ?")
+            params.extend([
+                criteria.year_from if criteria.year_from is not None else -2 ** 63,
+                criteria.year_to if criteria.year_to is not None else 2 ** 63 - 1,
+            ])
+        if criteria.status is not None:
+            conditions.append("status = ?")
+            params.append(self._status_key(criteria.status))
+
+        operator = " AND " if criteria.match_all else " OR "
+        return operator.join(conditions), params
+
+    def iter_books(self, page: PageRequest, criteria: SearchCriteria | None = None) -> Iterator[Book]:
+        """
+        Возвращает одну страницу книг. Строки читаются из курсора SQLite по мере перебора,
+        курсор по ключу превращается в условие (поле, book_id) > (?, ?).
+        :param page: Параметры страницы.
+        :param criteria: Критерии поиска или None, чтобы перебирать весь каталог.
+        :return: Итератор книг страницы.
+        """
+        conditions, params = [], []
+        if criteria is not None:
+            where, where_params = self._where(criteria)
+            if not where:
+                return iter(())
+            conditions.append(f"({where})")
+            params.extend(where_params)
+        if page.after is not None:
+            conditions.append(f"({page.order_by}, book_id) {'<' if page.descending else '>'} (?, ?)")
+            params.extend(page.after)
+
+        direction = "DESC" if page.descending else "ASC"
+        query = f"SELECT {BOOK_COLUMNS} FROM books"
+        if conditions:
+            query += f" WHERE {' AND '.join(conditions)}"
+        query += f" ORDER BY {page.order_by} {direction}, book_id {direction} LIMIT ? OFFSET ?"
+        params.extend([-1 if page.limit is None else page.limit, page.offset])
+        return (self._row_to_book(row) for row in self._connection.execute(query, params))
+
+    def change_book_status(self, book_id: int, new_status: BookStatus) -> bool:
+        """
+        Изменяет статус книги по её ID.
+        :param book_id: Идентификатор книги.
+        :param new_status: Новый статус книги.
+        :return: True, если статус был успешно изменён, иначе False.
+        """
+        with self.transaction():
+            cursor = self._connection.execute(
+                "UPDATE books SET status = ? WHERE book_id = ?", (self._status_key(new_status), book_id)
+            )
+            if cursor.rowcount:
+                self._changed()
+        return cursor.rowcount > 0
+
+    def change_books_status(self, book_ids: Iterable[int], new_status: BookStatus) -> list[int]:
+        """
+        Изменяет статус нескольких книг одним пакетным UPDATE в рамках одной транзакции.
+        :param book_ids: Идентификаторы книг.
+        :param new_status: Новый статус книг.
+        :return: Идентификаторы книг, которые не найдены.
+        """
+        book_ids = list(book_ids)
+        status = self._status_key(new_status)
+        with self.transaction():
+            existing = self._existing_ids(book_ids)
+            self._connection.executemany(
+                "UPDATE books SET status = ? WHERE book_id = ?", ((status, book_id) for book_id in existing)
+            )
+            if existing:
+                self._changed()
+        return [book_id for book_id in book_ids if book_id not in existing]
+
+    def get_book_by_id(self, book_id: int) -> Book | None:
+        """
+        Возвращает книгу по её ID.
+        :param book_id: Идентификатор книги.
+        :return: Объект Book или None, если книга не найдена.
+        """
+        row = self._connection.execute(
+            f"SELECT {BOOK_COLUMNS} FROM books WHERE book_id = ?", (book_id,)
+        ).fetchone()
+        return self._row_to_book(row) if row else None
+
+    def suggest(self, prefix: str, limit: int = 10) -> list[str]:
+        """
+        Возвращает названия и имена авторов, начинающиеся с prefix. Начало строки превращается
+        в диапазон [prefix, prefix + максимальный символ), который читается по индексам
+        на нормализованных столбцах.
+        :param prefix: Начало названия или имени автора.
+        :param limit: Наибольшее количество дополнений.
+        :return: Список дополнений в алфавитном порядке.
+        """
+        low = self._normalize(prefix)
+        high = low + chr(0x10FFFF)
+        rows = self._connection.execute(
+            "SELECT norm, MIN(text) FROM ("
+            " SELECT title_norm AS norm, title AS text FROM books WHERE title_norm >= ? AND title_norm < ?"
+            " UNION ALL"
+            " SELECT author_norm, author FROM books WHERE author_norm >= ? AND author_norm < ?"
+            ") GROUP BY norm ORDER BY norm LIMIT ?",
+            (low, high, low, high, limit)
+        )
+        return [text for _, text in rows]
+
+    def search_ranked(self, query: str, limit: int = 10) -> list[Book]:
+        """
+        Ищет книги по запросу в свободной форме с учётом опечаток и ранжирует их по BM25.
+        Индекс хранится в памяти и строится при первом поиске. Изменения этого соединения переносятся
+        в него сразу, а после изменений через другое соединение он перестраивается.
+        :param query: Строка запроса.
+        :param limit: Количество лучших результатов.
+        :return: Список найденных книг по убыванию релевантности.
+        """
+        generation = self.generation()
+        if self._ranked_generation != generation:
+            self._ranked_index = RankedIndex.build(self.books)
+            self._ranked_generation = generation
+        return [self.get_book_by_id(book_id) for book_id in self._ranked_index.search(query, limit)]
+
+    def generation(self) -> int:
+        """
+        Возвращает номер версии каталога. Учитывает и изменения, сделанные через другие соединения с базой.
+        :return: Номер версии каталога.
+        """
+        data_version = self._read_data_version()
+        if data_version != self._data_version:
+            self._data_version = data_version
+            self._generation += 1
+        return self._generation
+
+    def next_book_id(self) -> int:
+        """
+        Выделяет новый идентификатор книги.
+        :return: Идентификатор, который ещё не использовался в этой базе.
+        """
+        return self.reserve_book_ids(1)[0]
+
+    def reserve_book_ids(self, count: int) -> range:
+        """
+        Резервирует блок идущих подряд идентификаторов книг. Счётчик хранится в таблице meta.
+        :param count: Количество идентификаторов.
+        :return: Диапазон зарезервированных идентификаторов.
+        """
+        if count < 1:
+            raise ValueError("Количество идентификаторов должно быть положительным")
+        with self.transaction():
+            # UPDATE первым захватывает блокировку на запись, поэтому чтение ниже видит уже
+            # сдвинутый счётчик и параллельные процессы не получат одинаковые ID
+            self._connection.execute(
+                "UPDATE meta SET value = value + ? WHERE key = 'next_book_id'", (count,)
+            )
+            end = self._connection.execute("SELECT value FROM meta WHERE key = 'next_book_id'").fetchone()[0]
+        return range(end - count, end)
@@ -0,0 +1,52 @@
+import os
+from contextlib import contextmanager, suppress
+from typing import BinaryIO, Iterator
+
+
+@contextmanager
+def atomic_file(path: str) -> Iterator[BinaryIO]:
+    """
+    Открывает временный файл в том же каталоге для записи нового содержимого файла path.
+    При успешном выходе из блока данные сбрасываются на диск и временный файл переименовывается
+    поверх исходного; при исключении временный файл удаляется, а исходный остаётся прежним.
+    :param path: Путь к файлу.
+    :return: Двоичный файл для записи.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "wb") as file:
+            yield file
+            file.flush()
+            os.fsync(file.fileno())
+    except BaseException:
+        with suppress(FileNotFoundError):
+            os.unlink(tmp_path)
+        raise
+    os.replace(tmp_path, path)
+    fsync_directory(directory)
+
+
+def fsync_directory(directory: str) -> None:
+    """
+    Сбрасывает на диск сам каталог, чтобы создание и переименование файлов в нём пережили сбой питания.
+    На платформах без O_DIRECTORY (Windows) ничего не делает.
+    :param directory: Путь к каталогу.
+    """
+    if hasattr(os, "O_DIRECTORY"):
+        dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+def atomic_write(path: str, payload: bytes) -> None:
+    """
+    Атомарно заменяет содержимое файла: данные пишутся во временный файл в том же каталоге,
+    сбрасываются на диск и переименовываются поверх исходного файла.
+    :param path: Путь к файлу.
+    :param payload: Новое содержимое файла.
+    """
+    with atomic_file(path) as file:
+        file.write(payload)
@@ -0,0 +1,72 @@
+import marshal
+import os
+from typing import Iterable
+
+from src.domain.entities.book import Book
+from src.domain.value_objects.book_status import BookStatus
+from src.infrastructure.serialization.atomic_write import atomic_write
+
+MAGIC = b"LMBS"
+# Версия формата снимка: меняется при любом изменении раскладки данных
+VERSION = 2
+
+STATUSES = tuple(BookStatus)
+STATUS_CODES = {status: code for code, status in enumerate(STATUSES)}
+
+
+def _source_signature(source_file: str) -> tuple[int, int]:
+    """
+    Подпись исходного файла, по которой проверяется, что снимок построен именно по нему.
+    :param source_file: Путь к исходному файлу.
+    :return: Пара (размер, время изменения в наносекундах).
+    """
+    stat = os.stat(source_file)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def write_snapshot(path: str, source_file: str, next_book_id: int, books: Iterable[Book]) -> None:
+    """
+    Атомарно записывает двоичный снимок каталога рядом с исходным файлом (см. atomic_write).
+    Данные хранятся по столбцам и сериализуются marshal, поэтому читаются без разбора JSON.
+    :param path: Путь к файлу снимка.
+    :param source_file: Путь к исходному JSON-файлу, который описывает снимок.
+    :param next_book_id: Счётчик идентификаторов.
+    :param books: Книги каталога.
+    """
+    ids, titles, authors, years, statuses, isbns = [], [], [], [], [], []
+    for book in books:
+        ids.append(book.book_id)
+        titles.append(book.title)
+        authors.append(book.author)
+        years.append(book.year)
+        statuses.append(STATUS_CODES[book.status])
+        isbns.append(book.isbn)
+    payload = marshal.dumps((_source_signature(source_file), next_book_id, ids, titles, authors, years,
+                             bytes(statuses), isbns))
+    atomic_write(path, MAGIC + bytes([VERSION]) + payload)
+
+
+def read_snapshot(path: str, source_file: str) -> tuple[int, list[Book]] | None:
+    """
+    Читает двоичный снимок, если он есть, совпадает по версии и построен по текущему
+    состоянию исходного файла.
+    :param path: Путь к файлу снимка.
+    :param source_file: Путь к исходному JSON-файлу.
+    :return: Пара (счётчик идентификаторов, список книг) или None, если снимок непригоден.
+    """
+    try:
+        with open(path, "rb") as file:
+            data = file.read()
+        if data[:len(MAGIC)] != MAGIC or data[len(MAGIC)] != VERSION:
+            return None
+        signature, next_book_id, ids, titles, authors, years, statuses, isbns = marshal.loads(data[len(MAGIC) + 1:])
+        if tuple(signature) != _source_signature(source_file):
+            return None
+    except (OSError, IndexError, EOFError, ValueError, TypeError):
+        return None
+
+    books = [
+        Book(book_id=book_id, title=title, author=author, year=year, status=STATUSES[status], isbn=isbn)
+        for book_id, title, author, year, status, isbn in zip(ids, titles, authors, years, statuses, isbns)
+    ]
+    return next_book_id, books
@@ -0,0 +1,66 @@
+import csv
+import json
+import os
+from typing import Iterable, Iterator
+
+# Поля книги в файлах импорта и экспорта
+FIELDS = ("book_id", "title", "author", "year", "status", "isbn")
+
+SUPPORTED_EXTENSIONS = (".csv", ".jsonl")
+
+
+def _extension(path: str) -> str:
+    """
+    Определяет формат файла по расширению.
+    :param path: Путь к файлу.
+    :return: Расширение файла в нижнем регистре.
+    :raises ValueError: Если формат не поддерживается.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in SUPPORTED_EXTENSIONS:
+        raise ValueError(f"Неподдерживаемый формат файла: {path} (ожидается {', '.join(SUPPORTED_EXTENSIONS)})")
+    return extension
+
+
+def read_records(path: str) -> Iterator[dict]:
+    """
+    Построчно читает записи о книгах из файла CSV (с заголовком) или JSON Lines.
+    Файл не загружается в память целиком. Вместо строки JSON Lines, которую не удалось разобрать,
+    возвращается исключение ValueError: импорт учитывает его как ошибку записи и продолжает работу.
+    :param path: Путь к файлу.
+    :return: Итератор словарей с полями книги (или ValueError для нечитаемых строк).
+    """
+    extension = _extension(path)
+    with open(path, "r", encoding="utf-8", newline="") as file:
+        if extension == ".csv":
+            yield from csv.DictReader(file)
+        else:
+            for line in file:
+                if line.strip():
+                    try:
+                        yield json.loads(line)
+                    except ValueError as e:
+                        yield ValueError(f"Некорректная строка JSON: {e}")
+
+
+def write_records(path: str, records: Iterable[dict]) -> int:
+    """
+    Построчно записывает записи о книгах в файл CSV или JSON Lines.
+    :param path: Путь к файлу.
+    :param records: Словари с полями книги.
+    :return: Количество записанных записей.
+    """
+    extension = _extension(path)
+    count = 0
+    with open(path, "w", encoding="utf-8", newline="") as file:
+        if extension == ".csv":
+            writer = csv.DictWriter(file, fieldnames=FIELDS, extrasaction="ignore")
+            writer.writeheader()
+            for record in records:
+                writer.writerow(record)
+                count += 1
+        else:
+            for record in records:
+                file.write(json.dumps(record, ensure_ascii=False) + "\n")
+                count += 1
+    return count
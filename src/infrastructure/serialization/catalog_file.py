@@ -0,0 +1,203 @@
+import gzip
+import io
+import json
+import lzma
+from contextlib import nullcontext
+from typing import BinaryIO, ContextManager, Iterable, Iterator, TextIO
+
+from src.infrastructure.serialization.atomic_write import atomic_file
+
+# Форматы файла каталога по расширению: JSON-документ с отступами (исходный формат books.json),
+# JSON lines (заголовок и по одной книге в строке) и JSON lines, сжатый gzip или lzma
+CATALOG_EXTENSIONS = (".json", ".jsonl", ".jsonl.gz", ".jsonl.xz")
+
+# Размер блока при потоковом чтении JSON-документа (в символах)
+READ_CHUNK_SIZE = 64 * 1024
+# Количество строк JSON lines, которые кодируются и записываются одним вызовом
+WRITE_BATCH_SIZE = 1000
+
+
+def catalog_extension(path: str) -> str:
+    """
+    Определяет формат файла каталога по расширению. Файлы с другими расширениями
+    читаются и записываются как JSON-документ, как и до появления других форматов.
+    :param path: Путь к файлу каталога.
+    :return: Расширение из CATALOG_EXTENSIONS.
+    """
+    name = path.lower()
+    for extension in (".jsonl.gz", ".jsonl.xz", ".jsonl"):
+        if name.endswith(extension):
+            return extension
+    return ".json"
+
+
+def _open_compressed(file: BinaryIO, extension: str, mode: str) -> ContextManager[BinaryIO]:
+    """
+    Оборачивает файл потоком сжатия или распаковки, если формат сжатый.
+    Сам файл при выходе из блока не закрывается.
+    """
+    if extension == ".jsonl.gz":
+        return gzip.GzipFile(fileobj=file, mode=mode)
+    if extension == ".jsonl.xz":
+        return lzma.LZMAFile(file, mode)
+    return nullcontext(file)
+
+
+def write_catalog(path: str, next_book_id: int, records: Iterable[dict]) -> int:
+    """
+    Атомарно записывает каталог в формате, выбранном по расширению файла.
+    В формате JSON lines первая строка - заголовок {"next_book_id": ...}, дальше по одной книге
+    в строке без лишних пробелов; сжатые форматы пишутся потоком, без сборки всего файла в памяти.
+    :param path: Путь к файлу каталога.
+    :param next_book_id: Счётчик идентификаторов.
+    :param records: Словари с полями книг.
+    :return: Размер записанного файла в байтах.
+    """
+    extension = catalog_extension(path)
+    with atomic_file(path) as file:
+        if extension == ".json":
+            file.write(json.dumps({'next_book_id': next_book_id, 'books': list(records)},
+                                  ensure_ascii=False, indent=4).encode('utf-8'))
+        else:
+            with _open_compressed(file, extension, "wb") as stream:
+                stream.write(_json_line({'next_book_id': next_book_id}))
+                batch = []
+                for record in records:
+                    batch.append(_json_line(record))
+                    if len(batch) == WRITE_BATCH_SIZE:
+                        stream.write(b''.join(batch))
+                        batch = []
+                stream.write(b''.join(batch))
+        size = file.tell()
+    return size
+
+
+def _json_line(record: dict) -> bytes:
+    return (json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n').encode('utf-8')
+
+
+def read_catalog(path: str, header: dict) -> Iterator[dict]:
+    """
+    Потоково читает книги из файла каталога: файл разбирается по частям, и в памяти одновременно
+    находится только небольшой блок файла, а не весь файл и всё дерево разбора.
+    :param path: Путь к файлу каталога.
+    :param header: Словарь, в который записываются поля заголовка (next_book_id) по мере их чтения;
+        после исчерпания итератора он заполнен полностью.
+    :return: Итератор словарей с полями книг.
+    :raises FileNotFoundError: Если файла нет (при первом обращении к итератору).
+    """
+    extension = catalog_extension(path)
+    with open(path, 'rb') as raw, _open_compressed(raw, extension, "rb") as stream:
+        text = io.TextIOWrapper(stream, encoding='utf-8')
+        if extension == ".json":
+            yield from _JsonDocumentReader(text).records(header)
+            return
+        for number, line in enumerate(text):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if number == 0 and 'book_id' not in record:
+                header.update(record)
+                continue
+            yield record
+
+
+class _JsonDocumentReader:
+    """
+    Потоковый разбор JSON-документа каталога: {"next_book_id": ..., "books": [...]} или просто списка книг.
+    Книги разбираются по одной json.JSONDecoder.raw_decode из буфера, который дочитывается блоками.
+    """
+
+    def __init__(self, file: TextIO) -> None:
+        self._file = file
+        self._buffer = ""
+        self._position = 0
+        self._eof = False
+        self._decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        """
+        Дочитывает следующий блок файла, отбрасывая уже разобранную часть буфера.
+        :return: False, если файл закончился.
+        """
+        chunk = self._file.read(READ_CHUNK_SIZE)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buffer = self._buffer[self._position:] + chunk
+        self._position = 0
+        return True
+
+    def _peek(self) -> str:
+        """
+        Пропускает пробельные символы и возвращает следующий символ (пустую строку в конце файла).
+        """
+        while True:
+            while self._position < len(self._buffer) and self._buffer[self._position] in " \t\r\n":
+                self._position += 1
+            if self._position < len(self._buffer) or not self._fill():
+                return self._buffer[self._position:self._position + 1]
+
+    def _expect(self, symbols: str) -> str:
+        """
+        Читает один из ожидаемых символов.
+        :raises ValueError: Если в файле другой символ.
+        """
+        symbol = self._peek()
+        if not symbol or symbol not in symbols:
+            raise ValueError(f"Некорректный файл каталога: ожидался один из символов {symbols!r}")
+        self._position += 1
+        return symbol
+
+    def _value(self):
+        """
+        Разбирает очередное JSON-значение. Значение, которое упирается в конец буфера, разбирается
+        заново после дочитывания: число или объект могли оборваться на границе блока.
+        """
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._position)
+            except json.JSONDecodeError:
+                if self._eof or not self._fill():
+                    raise
+                continue
+            if end == len(self._buffer) and not self._eof and self._fill():
+                continue
+            self._position = end
+            return value
+
+    def _array(self) -> Iterator:
+        """
+        Разбирает элементы JSON-массива по одному.
+        """
+        self._expect("[")
+        if self._peek() == "]":
+            self._position += 1
+            return
+        while True:
+            yield self._value()
+            if self._expect(",]") == "]":
+                return
+
+    def records(self, header: dict) -> Iterator[dict]:
+        """
+        :param header: Словарь для полей документа, кроме списка книг.
+        :return: Итератор словарей с полями книг.
+        """
+        if self._peek() == "[":
+            # Старый формат файла - просто список книг
+            yield from self._array()
+            return
+        self._expect("{")
+        if self._peek() == "}":
+            return
+        while True:
+            key = self._value()
+            self._expect(":")
+            if key == 'books':
+                yield from self._array()
+            else:
+                header[key] = self._value()
+            if self._expect(",}") == "}":
+                return
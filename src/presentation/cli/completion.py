@@ -0,0 +1,42 @@
+from contextlib import contextmanager
+from typing import Iterator
+
+try:
+    import readline
+except ImportError:
+    # readline доступен не на всех платформах (например, в Windows) - тогда ввод работает без дополнения
+    readline = None
+
+
+@contextmanager
+def readline_completion(use_case) -> Iterator[None]:
+    """
+    Включает дополнение по клавише Tab на время ввода: вся введённая строка дополняется
+    до названий книг и имён авторов из каталога. По выходе восстанавливается прежний обработчик.
+    :param use_case: Объект для выполнения бизнес-логики автодополнения или None.
+    """
+    if readline is None or use_case is None:
+        yield
+        return
+
+    matches: list[str] = []
+
+    def complete(text: str, state: int) -> str | None:
+        if state == 0:
+            matches[:] = use_case.execute(text)
+        return matches[state] if state < len(matches) else None
+
+    previous_completer = readline.get_completer()
+    previous_delims = readline.get_completer_delims()
+    readline.set_completer(complete)
+    # Дополняется вся строка целиком, а не последнее слово
+    readline.set_completer_delims("")
+    if "libedit" in (readline.__doc__ or ""):
+        readline.parse_and_bind("bind ^I rl_complete")
+    else:
+        readline.parse_and_bind("tab: complete")
+    try:
+        yield
+    finally:
+        readline.set_completer(previous_completer)
+        readline.set_completer_delims(previous_delims)
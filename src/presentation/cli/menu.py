@@ -1,5 +1,7 @@
-from src.application.dto.book_dto import BookDTO
+from src.application.deduplication.duplicate_detector import DuplicateBookError
 from src.application.dto.search_criteria import SearchCriteria
+from src.application.use_cases.issue_book import LOAN_PERIOD_DAYS
+from src.presentation.cli.completion import readline_completion
 from src.presentation.cli.messages import MESSAGES
 
 
@@ -14,7 +16,7 @@ def display_menu(actions) -> None:
 
         if choice in actions:
             actions[choice]()
-        elif choice == "6":
+        elif choice == "13":
             print(MESSAGES["exit"])
             break
         else:
@@ -59,15 +61,16 @@ def validate_status(status: str) -> str:
     return status.title()
 
 
-def get_book_details() -> tuple[str, str, int]:
+def get_book_details() -> tuple[str, str, int, str | None]:
     """
     Получает данные о книге от пользователя.
-    :return: Кортеж с названием, автором и годом выпуска книги.
+    :return: Кортеж с названием, автором, годом выпуска книги и ISBN (None, если не введён).
     """
     title = input(MESSAGES["add_prompt_title"])
     author = input(MESSAGES["add_prompt_author"])
     year = validate_year(input(MESSAGES["add_prompt_year"]))
-    return title, author, year
+    isbn = input(MESSAGES["add_prompt_isbn"]).strip() or None
+    return title, author, year, isbn
 
 
 def get_book_id() -> int:
@@ -94,8 +97,16 @@ def add_book(use_case) -> None:
     :param use_case: Объект для выполнения бизнес-логики добавления книги.
     """
     try:
-        title, author, year = get_book_details()
-        use_case.execute(title, author, year)
+        title, author, year, isbn = get_book_details()
+        try:
+            use_case.execute(title, author, year, isbn)
+        except DuplicateBookError as e:
+            # Дубликат может быть ещё одним экземпляром той же книги - добавляем только с подтверждения
+            print(f"\n{e}")
+            if input(MESSAGES["add_duplicate_prompt"]).strip().lower() not in ("да", "д", "y", "yes"):
+                print(MESSAGES["add_cancelled"])
+                return
+            use_case.execute(title, author, year, isbn, allow_duplicate=True)
         print(MESSAGES["add_success"])
     except ValueError as e:
         print(e)
@@ -114,33 +125,54 @@ def delete_book(use_case) -> None:
         print(e)
 
 
-def search_books(use_case) -> None:
+def search_books(use_case, ranked_use_case=None, suggest_use_case=None) -> None:
     """
-    Выполняет поиск книг по критериям.
+    Выполняет поиск книг по критериям. Если точных совпадений нет, предлагает книги,
+    найденные ранжированным поиском с учётом опечаток.
     :param use_case: Объект для выполнения бизнес-логики поиска книг.
+    :param ranked_use_case: Объект для ранжированного поиска или None.
+    :param suggest_use_case: Объект для автодополнения запроса по Tab или None.
     """
-    query = input(MESSAGES["search_prompt"])
+    with readline_completion(suggest_use_case):
+        query = input(MESSAGES["search_prompt"])
     criteria = SearchCriteria(title=query, author=query, year=int(query) if query.isdigit() else None)  # type: ignore
-    results = use_case.execute(criteria)
-    if results:
-        for book in results:
-            print(book)
-    else:
+    if display_pages(use_case.iter_pages(criteria)):
+        return
+
+    suggestions = ranked_use_case.execute(query) if ranked_use_case is not None and query.strip() else []
+    if not suggestions:
         print(MESSAGES["search_not_found"])
+        return
+    print(MESSAGES["search_suggestions"])
+    for book in suggestions:
+        print(book)
 
 
-def display_books(books) -> None:
+def display_books(use_case) -> None:
     """
-    Отображает список книг.
-    :param books: Список объектов книг.
+    Отображает книги библиотеки постранично.
+    :param use_case: Объект для выполнения бизнес-логики просмотра книг.
     """
-    if books:
-        for book in books:
-            print(BookDTO.from_book(book))
-    else:
+    if not display_pages(use_case.execute()):
         print(MESSAGES["no_books"])
 
 
+def display_pages(pages) -> bool:
+    """
+    Выводит страницы книг по одной, запрашивая следующую только по желанию пользователя.
+    :param pages: Итератор страниц, каждая страница - список книг в формате DTO.
+    :return: True, если была выведена хотя бы одна книга.
+    """
+    shown = False
+    for page in pages:
+        if shown and input(MESSAGES["next_page_prompt"]).strip().lower() == "q":
+            break
+        for book in page:
+            print(book)
+        shown = True
+    return shown
+
+
 def change_status(use_case) -> None:
     """
     Изменяет статус книги с помощью переданного use case.
@@ -153,3 +185,96 @@ def change_status(use_case) -> None:
         print(MESSAGES["status_success"])
     except ValueError as e:
         print(e)
+
+
+def issue_book(use_case) -> None:
+    """
+    Выдаёт книгу читателю с помощью переданного use case.
+    :param use_case: Объект для выполнения бизнес-логики выдачи книги.
+    """
+    try:
+        book_id = get_book_id()
+        borrower = input(MESSAGES["borrower_prompt"])
+        days = input(MESSAGES["loan_days_prompt"].format(LOAN_PERIOD_DAYS)).strip()
+        if days and not days.isdigit():
+            raise ValueError(MESSAGES["loan_days_error"])
+        loan_id = use_case.execute(book_id, borrower, int(days) if days else LOAN_PERIOD_DAYS)
+        print(MESSAGES["issue_success"].format(loan_id))
+    except ValueError as e:
+        print(e)
+
+
+def return_book(use_case) -> None:
+    """
+    Принимает книгу от читателя с помощью переданного use case.
+    :param use_case: Объект для выполнения бизнес-логики возврата книги.
+    """
+    try:
+        book_id = get_book_id()
+        use_case.execute(book_id)
+        print(MESSAGES["return_success"])
+    except ValueError as e:
+        print(e)
+
+
+def display_overdue_loans(use_case) -> None:
+    """
+    Выводит просроченные выдачи.
+    :param use_case: Объект для выполнения бизнес-логики поиска просроченных выдач.
+    """
+    loans = use_case.execute()
+    if not loans:
+        print(MESSAGES["no_overdue_loans"])
+    for loan in loans:
+        print(loan)
+
+
+def display_borrower_loans(use_case) -> None:
+    """
+    Выводит выдачи читателя.
+    :param use_case: Объект для выполнения бизнес-логики просмотра выдач читателя.
+    """
+    try:
+        loans = use_case.execute(input("\n" + MESSAGES["borrower_prompt"]))
+    except ValueError as e:
+        print(e)
+        return
+    if not loans:
+        print(MESSAGES["no_borrower_loans"])
+    for loan in loans:
+        print(loan)
+
+
+def show_statistics(use_case) -> None:
+    """
+    Выводит сводную статистику каталога.
+    :param use_case: Объект для выполнения бизнес-логики получения статистики.
+    """
+    print()
+    print(use_case.execute())
+
+
+def show_duplicates(use_case) -> None:
+    """
+    Выводит группы дубликатов в каталоге.
+    :param use_case: Объект для выполнения бизнес-логики поиска дубликатов.
+    """
+    clusters = use_case.execute()
+    if not clusters:
+        print(MESSAGES["no_duplicates"])
+        return
+    for number, books in enumerate(clusters, start=1):
+        print(MESSAGES["duplicate_cluster"].format(number, len(books)))
+        for book in books:
+            print(book)
+
+
+def show_metrics(metrics) -> None:
+    """
+    Выводит собранные метрики.
+    :param metrics: Реестр метрик или None, если сбор метрик не включён.
+    """
+    if metrics is None:
+        print(MESSAGES["metrics_disabled"])
+        return
+    print("\n" + (metrics.render_text() or MESSAGES["metrics_empty"]))
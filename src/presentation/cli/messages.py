@@ -6,20 +6,43 @@ MESSAGES = {
         "3. Найти книгу\n"
         "4. Отобразить все книги\n"
         "5. Изменить статус книги\n"
-        "6. Выход\n"
+        "6. Выдать книгу читателю\n"
+        "7. Принять книгу от читателя\n"
+        "8. Просроченные выдачи\n"
+        "9. Выдачи читателя\n"
+        "10. Статистика каталога\n"
+        "11. Найти дубликаты\n"
+        "12. Показать метрики\n"
+        "13. Выход\n"
     ),
     "add_prompt_title": "\nВведите название книги: ",
     "add_prompt_author": "Введите автора книги: ",
     "add_prompt_year": "Введите год выпуска книги: ",
+    "add_prompt_isbn": "Введите ISBN книги (Enter - без ISBN): ",
+    "add_duplicate_prompt": "Добавить ещё один экземпляр? (да/нет): ",
+    "add_cancelled": "\nКнига не добавлена.",
+    "no_duplicates": "\nДубликатов в каталоге нет.",
+    "duplicate_cluster": "\nГруппа {}, книг: {}",
     "add_success": "\nКнига успешно добавлена.",
     "prompt_id": "\nВведите ID книги: ",
     "delete_success": "\nКнига успешно удалена.",
-    "search_prompt": "\nВведите название, автора или год выпуска книги: ",
+    "search_prompt": "\nВведите название, автора или год выпуска книги (Tab - дополнить): ",
     "search_not_found": "\nКнига не найдена.",
+    "search_suggestions": "\nТочных совпадений нет. Возможно, вы искали:",
     "no_books": "\nКниг в библиотеке нет.",
+    "next_page_prompt": "\nEnter - следующая страница, q - вернуться в меню: ",
     "status_prompt_new": "Введите новый статус книги (В наличии или Выдана): ",
     "status_success": "\nСтатус книги успешно изменён.",
     "input_error": "Некорректный ввод. Попробуйте снова.",
+    "borrower_prompt": "Введите имя читателя: ",
+    "loan_days_prompt": "Введите срок выдачи в днях (Enter - {} дней): ",
+    "loan_days_error": "Введите срок выдачи корректно (только цифры).",
+    "issue_success": "\nКнига выдана, номер выдачи: {}.",
+    "return_success": "\nКнига принята.",
+    "no_overdue_loans": "\nПросроченных выдач нет.",
+    "no_borrower_loans": "\nУ читателя нет выдач.",
+    "metrics_disabled": "\nСбор метрик не включён. Запустите программу с ключом --metrics.",
+    "metrics_empty": "Метрик пока нет.",
     "exit": "Выход из программы.",
     "add_year_error": "Введите год выпуска корректно (только цифры).",
     "status_id_error": "Введите ID корректно (только цифры).",
@@ -0,0 +1,360 @@
+"""
+Сетевой интерфейс библиотеки: asyncio-сервер с протоколом JSON lines поверх TCP или Unix-сокета.
+
+Каждая строка запроса - JSON-объект {"id": ..., "method": ..., "params": {...}}, каждая строка
+ответа - {"id": ..., "result": ...} или {"id": ..., "error": "..."}. Запросы одного соединения
+обрабатываются параллельно, поэтому ответы могут приходить не в порядке запросов - их
+сопоставляют по id.
+
+Методы:
+- add_book(title, author, year, isbn, allow_duplicate) -> ID добавленной книги (isbn необязателен;
+  книга, которая уже есть в каталоге, отклоняется, если не передан allow_duplicate=true);
+- remove_book(book_id) -> null;
+- change_status(book_id, status) -> null;
+- search(title, author, year, year_from, year_to, status, match_all) -> список книг;
+- search_ranked(query, limit) -> список книг по убыванию релевантности, с учётом опечаток;
+- suggest(prefix, limit) -> названия и имена авторов, начинающиеся с prefix;
+- list_books(page_size, order_by, descending, after) -> {"books": [...], "next": курсор или null};
+- issue_book(book_id, borrower, days) -> ID выдачи;
+- return_book(book_id) -> null;
+- overdue_loans() -> список просроченных выдач по возрастанию срока возврата;
+- borrower_loans(borrower, active_only) -> список выдач читателя;
+- metrics() -> метрики в текстовом формате Prometheus (если сбор метрик включён, иначе null).
+"""
+import asyncio
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from dataclasses import asdict
+from typing import Any, Callable
+
+from src.application.cache.search_result_cache import SearchResultCache
+from src.application.deduplication.duplicate_detector import DuplicateDetector
+from src.application.dto.search_criteria import SearchCriteria
+from src.application.interfaces.library_repository import LibraryRepository
+from src.application.interfaces.loan_repository import LoanRepository
+from src.application.metrics.instrumentation import instrument_use_case
+from src.application.metrics.metrics_registry import MetricsRegistry
+from src.application.use_cases.add_book import AddBookUseCase
+from src.application.use_cases.borrower_loans import BorrowerLoansUseCase
+from src.application.use_cases.change_status import ChangeBookStatusUseCase
+from src.application.use_cases.issue_book import LOAN_PERIOD_DAYS, IssueBookUseCase
+from src.application.use_cases.list_books import ListBooksUseCase
+from src.application.use_cases.overdue_loans import OverdueLoansUseCase
+from src.application.use_cases.ranked_search import RankedSearchUseCase
+from src.application.use_cases.remove_book import RemoveBookUseCase
+from src.application.use_cases.return_book import ReturnBookUseCase
+from src.application.use_cases.search_book import SearchBookUseCase
+from src.application.use_cases.suggest import SuggestUseCase
+from src.domain.value_objects.book_status import BookStatus
+
+logger = logging.getLogger(__name__)
+
+# Методы, изменяющие каталог: они накапливаются и сохраняются на диск группами
+WRITE_METHODS = frozenset({"add_book", "remove_book", "change_status", "issue_book", "return_book"})
+
+# Методы учёта выдач: доступны, только если серверу передано хранилище выдач
+LOAN_METHODS = frozenset({"issue_book", "return_book", "overdue_loans", "borrower_loans"})
+
+# Максимальная длина строки запроса в байтах
+MAX_REQUEST_SIZE = 1024 * 1024
+
+
+class LibraryServer:
+    """
+    Сервер, через который несколько клиентов (киосков) работают с одним каталогом в памяти.
+
+    Все обращения к репозиторию выполняются в одном рабочем потоке, поэтому цикл событий
+    не блокируется на диске, а репозиторию не нужна собственная синхронизация (подходит любое
+    хранилище, включая SQLite, соединение которого привязано к потоку). Изменения от всех
+    клиентов собираются в очередь: пока на диск сохраняется одна группа, копится следующая,
+    и вся группа фиксируется одной транзакцией репозитория.
+    """
+
+    def __init__(self, repository_factory: Callable[[], LibraryRepository], max_batch: int = 512,
+                 metrics: MetricsRegistry | None = None,
+                 loans_factory: Callable[[], LoanRepository] | None = None) -> None:
+        """
+        Инициализация сервера.
+        :param repository_factory: Функция, создающая репозиторий (вызывается в рабочем потоке).
+        :param max_batch: Максимальное количество изменений в одной группе.
+        :param metrics: Реестр метрик сценариев использования или None, чтобы не собирать метрики.
+        :param loans_factory: Функция, создающая хранилище выдач (вызывается в рабочем потоке),
+            или None, если выдачи не учитываются.
+        """
+        if max_batch < 1:
+            raise ValueError("Размер группы изменений должен быть положительным")
+        self._repository_factory = repository_factory
+        self._loans_factory = loans_factory
+        self.max_batch = max_batch
+        self.metrics = metrics
+        self.repository: LibraryRepository | None = None
+        self.loans: LoanRepository | None = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="library-repository")
+        self._writes: asyncio.Queue | None = None
+        self._committer: asyncio.Task | None = None
+        self._server: asyncio.AbstractServer | None = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0, path: str | None = None) -> asyncio.AbstractServer:
+        """
+        Создаёт репозиторий и начинает принимать соединения.
+        :param host: Адрес для TCP-сокета.
+        :param port: Порт для TCP-сокета (0 - выбрать свободный).
+        :param path: Путь к Unix-сокету; если задан, host и port не используются.
+        :return: Запущенный asyncio-сервер.
+        """
+        self.repository = await self._run(self._repository_factory)
+        if self._loans_factory is not None:
+            self.loans = await self._run(self._loans_factory)
+        self._add_book = AddBookUseCase(self.repository, DuplicateDetector(self.repository))
+        self._remove_book = RemoveBookUseCase(self.repository, self.loans)
+        self._change_status = ChangeBookStatusUseCase(self.repository, self.loans)
+        self._search_book = SearchBookUseCase(self.repository, cache=SearchResultCache(metrics=self.metrics))
+        self._list_books = ListBooksUseCase(self.repository)
+        self._ranked_search = RankedSearchUseCase(self.repository)
+        self._suggest = SuggestUseCase(self.repository)
+        use_cases = [self._add_book, self._remove_book, self._change_status, self._search_book,
+                     self._list_books, self._ranked_search, self._suggest]
+        if self.loans is not None:
+            self._issue_book = IssueBookUseCase(self.repository, self.loans)
+            self._return_book = ReturnBookUseCase(self.repository, self.loans)
+            self._overdue_loans = OverdueLoansUseCase(self.repository, self.loans)
+            self._borrower_loans = BorrowerLoansUseCase(self.repository, self.loans)
+            use_cases += [self._issue_book, self._return_book, self._overdue_loans, self._borrower_loans]
+        if self.metrics is not None:
+            for use_case in use_cases:
+                instrument_use_case(use_case, self.metrics)
+
+        self._writes = asyncio.Queue()
+        self._committer = asyncio.create_task(self._commit_loop())
+        if path is not None:
+            self._server = await asyncio.start_unix_server(self._handle_connection, path, limit=MAX_REQUEST_SIZE)
+        else:
+            self._server = await asyncio.start_server(self._handle_connection, host, port, limit=MAX_REQUEST_SIZE)
+        return self._server
+
+    async def close(self) -> None:
+        """
+        Останавливает приём соединений, дожидается сохранения принятых изменений и закрывает
+        репозиторий и хранилище выдач.
+        """
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._committer is not None:
+            await self._writes.join()
+            self._committer.cancel()
+        close_repository = getattr(self.repository, "close", None)
+        if close_repository is not None:
+            await self._run(close_repository)
+        close_loans = getattr(self.loans, "close", None)
+        if close_loans is not None:
+            await self._run(close_loans)
+        self._executor.shutdown()
+
+    async def _run(self, function: Callable, *args) -> Any:
+        """
+        Выполняет функцию в рабочем потоке репозитория.
+        """
+        return await asyncio.get_running_loop().run_in_executor(self._executor, function, *args)
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        Обслуживает одно соединение: каждый запрос обрабатывается отдельной задачей.
+        """
+        write_lock = asyncio.Lock()
+        tasks = set()
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ValueError, ConnectionError):
+                    # Слишком длинная строка или разорванное соединение
+                    break
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                task = asyncio.create_task(self._respond(line, writer, write_lock))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks)
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _respond(self, line: bytes, writer: asyncio.StreamWriter, write_lock: asyncio.Lock) -> None:
+        """
+        Выполняет один запрос и отправляет ответ.
+        :param line: Строка запроса.
+        :param writer: Поток для ответа клиенту.
+        :param write_lock: Блокировка, чтобы ответы разных задач не перемешивались.
+        """
+        request_id = None
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("Запрос должен быть JSON-объектом")
+            request_id = request.get("id")
+            result = await self.dispatch(request.get("method"), request.get("params") or {})
+            response = {"id": request_id, "result": result}
+        except KeyError as error:
+            response = {"id": request_id, "error": f"Не задан параметр: {error.args[0]}"}
+        except (ValueError, TypeError) as error:
+            response = {"id": request_id, "error": str(error)}
+        except Exception:
+            logger.exception("Ошибка при обработке запроса")
+            response = {"id": request_id, "error": "Внутренняя ошибка сервера"}
+
+        async with write_lock:
+            try:
+                writer.write(json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n")
+                await writer.drain()
+            except ConnectionError:
+                pass
+
+    async def dispatch(self, method: str, params: dict) -> Any:
+        """
+        Выполняет метод протокола.
+        :param method: Имя метода.
+        :param params: Параметры метода.
+        :return: Результат, пригодный для сериализации в JSON.
+        :raises ValueError: Если метод неизвестен или параметры некорректны.
+        """
+        call = self._prepare(method, params)
+        if method in WRITE_METHODS:
+            future = asyncio.get_running_loop().create_future()
+            await self._writes.put((call, future))
+            return await future
+        return await self._run(call)
+
+    def _prepare(self, method: str, params: dict) -> Callable[[], Any]:
+        """
+        Проверяет параметры и возвращает функцию, выполняющую сценарий использования.
+        """
+        if method == "add_book":
+            title, author, year = str(params["title"]), str(params["author"]), int(params["year"])
+            isbn = str(params["isbn"]) if params.get("isbn") else None
+            allow_duplicate = bool(params.get("allow_duplicate", False))
+            return lambda: self._add_book.execute(title, author, year, isbn, allow_duplicate)
+        if method == "remove_book":
+            book_id = int(params["book_id"])
+            return lambda: self._remove_book.execute(book_id)
+        if method == "change_status":
+            book_id, status = int(params["book_id"]), str(params["status"])
+            return lambda: self._change_status.execute(book_id, status)
+        if method == "search":
+            criteria = self._criteria(params)
+            return lambda: [asdict(book) for book in self._search_book.execute(criteria) or []]
+        if method == "search_ranked":
+            query, limit = str(params["query"]), int(params.get("limit", 10))
+            return lambda: [asdict(book) for book in self._ranked_search.execute(query, limit)]
+        if method == "suggest":
+            prefix, limit = str(params["prefix"]), int(params.get("limit", 10))
+            return lambda: self._suggest.execute(prefix, limit)
+        if method == "list_books":
+            return self._prepare_list(params)
+        if method in LOAN_METHODS:
+            return self._prepare_loans(method, params)
+        if method == "metrics":
+            return lambda: self.metrics.render_prometheus() if self.metrics is not None else None
+        raise ValueError(f"Неизвестный метод: {method}")
+
+    def _prepare_loans(self, method: str, params: dict) -> Callable[[], Any]:
+        """
+        Готовит вызов сценария учёта выдач.
+        """
+        if self.loans is None:
+            raise ValueError("Учёт выдач не включён")
+        if method == "issue_book":
+            book_id, borrower = int(params["book_id"]), str(params["borrower"])
+            days = int(params.get("days", LOAN_PERIOD_DAYS))
+            return lambda: self._issue_book.execute(book_id, borrower, days)
+        if method == "return_book":
+            book_id = int(params["book_id"])
+            return lambda: self._return_book.execute(book_id)
+        if method == "overdue_loans":
+            return lambda: [asdict(loan) for loan in self._overdue_loans.execute()]
+        borrower, active_only = str(params["borrower"]), bool(params.get("active_only", False))
+        return lambda: [asdict(loan) for loan in self._borrower_loans.execute(borrower, active_only)]
+
+    @staticmethod
+    def _criteria(params: dict) -> SearchCriteria:
+        """
+        Собирает критерии поиска из параметров запроса.
+        """
+        def optional_int(name: str) -> int | None:
+            return int(params[name]) if params.get(name) is not None else None
+
+        return SearchCriteria(
+            title=params.get("title"),
+            author=params.get("author"),
+            year=optional_int("year"),
+            year_from=optional_int("year_from"),
+            year_to=optional_int("year_to"),
+            status=BookStatus(params["status"]) if params.get("status") else None,
+            match_all=bool(params.get("match_all", False)),
+        )
+
+    def _prepare_list(self, params: dict) -> Callable[[], dict]:
+        """
+        Готовит запрос одной страницы каталога. Ответ содержит курсор для следующей страницы.
+        """
+        page_size = int(params.get("page_size", 20))
+        order_by = params.get("order_by", "book_id")
+        after = tuple(params["after"]) if params.get("after") is not None else None
+        pages = self._list_books.execute(page_size=page_size, order_by=order_by,
+                                         descending=bool(params.get("descending", False)), after=after)
+
+        def first_page() -> dict:
+            books = next(pages, [])
+            cursor = [getattr(books[-1], order_by), books[-1].book_id] if len(books) == page_size else None
+            return {"books": [asdict(book) for book in books], "next": cursor}
+
+        return first_page
+
+    async def _commit_loop(self) -> None:
+        """
+        Сохраняет изменения группами: забирает из очереди всё, что накопилось, и выполняет
+        группу одной транзакцией в рабочем потоке.
+        """
+        while True:
+            batch = [await self._writes.get()]
+            while len(batch) < self.max_batch and not self._writes.empty():
+                batch.append(self._writes.get_nowait())
+            try:
+                outcomes = await self._run(self._apply_writes, [call for call, _ in batch])
+            except Exception as error:
+                # Группу не удалось сохранить - сообщаем об ошибке всем её участникам
+                outcomes = [error] * len(batch)
+            for (_, future), outcome in zip(batch, outcomes):
+                if not future.done():
+                    if isinstance(outcome, Exception):
+                        future.set_exception(outcome)
+                    else:
+                        future.set_result(outcome)
+                self._writes.task_done()
+
+    def _apply_writes(self, calls: list[Callable[[], Any]]) -> list[Any]:
+        """
+        Выполняет группу изменений в одной транзакции. Ошибка одного изменения
+        (например, книга не найдена) не отменяет остальные.
+        :param calls: Функции изменений.
+        :return: Результаты или исключения, в порядке изменений.
+        """
+        outcomes = []
+        # Выдачи сохраняются раньше каталога; после сбоя между двумя записями книга с открытой
+        # выдачей может остаться в наличии - возврат такой книги закрывает выдачу
+        loans_transaction = self.loans.transaction() if self.loans is not None else nullcontext()
+        with self.repository.transaction(), loans_transaction:
+            for call in calls:
+                try:
+                    outcomes.append(call())
+                except Exception as error:
+                    outcomes.append(error)
+        return outcomes
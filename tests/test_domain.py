@@ -0,0 +1,109 @@
+import tracemalloc
+import unittest
+from dataclasses import dataclass
+
+from src.domain.entities.book import Book
+from src.domain.value_objects.book_status import BookStatus
+from src.domain.value_objects.isbn import normalize_isbn
+from src.domain.value_objects.search_text import normalize_text
+
+
+@dataclass(frozen=True)
+class LegacyBookStatus:
+    """Прежняя реализация статуса: новый объект и проверка на каждую книгу."""
+    value: str
+
+    def __post_init__(self):
+        allowed_statuses = ["в наличии", "выдана"]
+        if self.value.lower() not in allowed_statuses:
+            raise ValueError(f"Недопустимый статус книги: {self.value}")
+
+
+@dataclass
+class LegacyBook:
+    """Прежняя реализация книги: обычный dataclass со словарём атрибутов."""
+    book_id: int
+    title: str
+    author: str
+    year: int
+    status: LegacyBookStatus
+
+
+def measure(factory, rows) -> int:
+    """Возвращает объём памяти (в байтах), занятый объектами, созданными из rows."""
+    tracemalloc.start()
+    objects = [factory(*row) for row in rows]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objects
+    return size
+
+
+class TestBookStatus(unittest.TestCase):
+    """
+    Тесты для статуса книги.
+    """
+
+    def test_status_is_interned(self):
+        """Тест: статусы с разным регистром - один и тот же объект."""
+        self.assertIs(BookStatus("В Наличии"), BookStatus.AVAILABLE)
+        self.assertIs(BookStatus("выдана"), BookStatus.ISSUED)
+        self.assertEqual(BookStatus("в наличии").value, "В наличии")
+
+    def test_invalid_status(self):
+        """Тест: недопустимый статус вызывает ValueError."""
+        with self.assertRaises(ValueError):
+            BookStatus("Потеряна")
+
+
+class TestIsbn(unittest.TestCase):
+    """
+    Тесты для ISBN книги.
+    """
+
+    def test_isbn_is_normalized_to_isbn13(self):
+        """Тест: ISBN-10 и ISBN-13 с дефисами и пробелами приводятся к 13 цифрам."""
+        self.assertEqual(normalize_isbn("0-306-40615-2"), "9780306406157")
+        self.assertEqual(normalize_isbn("978 0 306 40615 7"), "9780306406157")
+        self.assertEqual(normalize_isbn("080442957x"), "9780804429573")
+        self.assertEqual(Book(1, "Книга", "Автор", 2000, isbn="0-306-40615-2").isbn, "9780306406157")
+        self.assertIsNone(Book(1, "Книга", "Автор", 2000, isbn="").isbn)
+
+    def test_invalid_isbn(self):
+        """Тест: неверная длина или контрольная цифра вызывает ValueError."""
+        for value in ("0-306-40615-3", "9780306406158", "12345", "97803064061XX"):
+            with self.assertRaises(ValueError):
+                normalize_isbn(value)
+
+
+class TestSearchText(unittest.TestCase):
+    """
+    Тесты нормализации строк для поиска.
+    """
+
+    def test_normalize_text(self):
+        """Тест: регистр и "ё" не различаются, остальные символы сохраняются."""
+        self.assertEqual(normalize_text("Ёжик в ТУМАНЕ"), "ежик в тумане")
+        self.assertEqual(normalize_text("Фёдор Достоевский, 1866"), "федор достоевский, 1866")
+
+
+class TestBookMemoryFootprint(unittest.TestCase):
+    """
+    Замер памяти каталога до и после перехода на __slots__ и общие экземпляры статусов.
+    """
+
+    def test_slots_book_uses_less_memory(self):
+        """Тест: каталог из компактных книг занимает заметно меньше памяти."""
+        rows = [
+            (book_id, f"Книга {book_id}", "".join(["Автор ", str(book_id % 100)]), 1900 + book_id % 120,
+             "Выдана" if book_id % 3 else "В наличии")
+            for book_id in range(20000)
+        ]
+        legacy = measure(lambda i, t, a, y, s: LegacyBook(i, t, a, y, LegacyBookStatus(s)), rows)
+        compact = measure(lambda i, t, a, y, s: Book(i, t, a, y, BookStatus(s)), rows)
+        self.assertLess(compact, legacy * 0.6, f"Память на {len(rows)} книг: было {legacy / 2 ** 20:.2f} МБ, "
+                                               f"стало {compact / 2 ** 20:.2f} МБ ({compact / legacy:.0%})")
+
+
+if __name__ == "__main__":
+    unittest.main()
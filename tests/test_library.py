@@ -1,30 +1,60 @@
 import unittest
+from datetime import date
+from typing import Iterator
 
+from src.application.cache.search_result_cache import SearchResultCache
+from src.application.deduplication.duplicate_detector import DuplicateBookError, DuplicateDetector
+from src.application.events.observable_repository import ObservableLibraryRepository
+from src.application.dto.page_request import PageRequest
 from src.application.dto.search_criteria import SearchCriteria
 from src.application.interfaces.library_repository import LibraryRepository
+from src.application.interfaces.loan_repository import LoanRepository
+from src.application.metrics.instrumentation import InstrumentedRepository, instrument_use_case
+from src.application.metrics.metrics_registry import MetricsRegistry
+from src.application.statistics.catalog_statistics import CatalogStatistics
 from src.application.use_cases.add_book import AddBookUseCase
+from src.application.use_cases.borrower_loans import BorrowerLoansUseCase
+from src.application.use_cases.bulk_add_books import BulkAddBooksUseCase
+from src.application.use_cases.bulk_change_status import BulkChangeStatusUseCase
+from src.application.use_cases.bulk_remove_books import BulkRemoveBooksUseCase
+from src.application.use_cases.catalog_statistics import CatalogStatisticsUseCase
 from src.application.use_cases.change_status import ChangeBookStatusUseCase
+from src.application.use_cases.duplicate_clusters import DuplicateClustersUseCase
+from src.application.use_cases.export_books import ExportBooksUseCase
+from src.application.use_cases.issue_book import IssueBookUseCase
+from src.application.use_cases.list_books import ListBooksUseCase
+from src.application.use_cases.overdue_loans import OverdueLoansUseCase
+from src.application.use_cases.ranked_search import RankedSearchUseCase
 from src.application.use_cases.remove_book import RemoveBookUseCase
+from src.application.use_cases.return_book import ReturnBookUseCase
 from src.application.use_cases.search_book import SearchBookUseCase
+from src.application.use_cases.suggest import SuggestUseCase
 from src.domain.entities.book import Book
+from src.domain.entities.loan import Loan
+from src.domain.events.book_event import BookEventKind
 from src.domain.value_objects.book_status import BookStatus
 
 
 class MockLibraryRepository(LibraryRepository):
     def __init__(self):
         self.books = []
+        self.searches = 0
+        self._generation = 0
 
     def add_book_to_library(self, book: Book) -> None:
         self.books.append(book)
+        self._generation += 1
 
     def remove_book_from_library(self, book_id: int) -> bool:
         for book in self.books:
             if book.book_id == book_id:
                 self.books.remove(book)
+                self._generation += 1
                 return True
         return False
 
     def search_book_in_library(self, criteria: SearchCriteria) -> list[Book] | None:
+        self.searches += 1
         result = [
             book for book in self.books
             if (criteria.title and criteria.title.lower() in book.title.lower()) or
@@ -37,9 +67,70 @@ class MockLibraryRepository(LibraryRepository):
         for book in self.books:
             if book.book_id == book_id:
                 book.status = new_status
+                self._generation += 1
                 return True
         return False
 
+    def generation(self) -> int:
+        return self._generation
+
+    def get_book_by_id(self, book_id: int) -> Book | None:
+        for book in self.books:
+            if book.book_id == book_id:
+                return book
+        return None
+
+    def next_book_id(self) -> int:
+        return self.reserve_book_ids(1)[0]
+
+    def reserve_book_ids(self, count: int) -> range:
+        start = max((book.book_id for book in self.books), default=0) + 1
+        return range(start, start + count)
+
+    def iter_books(self, page: PageRequest, criteria: SearchCriteria | None = None) -> Iterator[Book]:
+        books = self.books if criteria is None else self.search_book_in_library(criteria) or []
+        books = sorted(books, key=lambda book: (getattr(book, page.order_by), book.book_id),
+                       reverse=page.descending)
+        if page.after is not None:
+            key = lambda book: (getattr(book, page.order_by), book.book_id)
+            books = [book for book in books if (key(book) < page.after if page.descending else key(book) > page.after)]
+        end = None if page.limit is None else page.offset + page.limit
+        return iter(books[page.offset:end])
+
+
+class MockLoanRepository(LoanRepository):
+    def __init__(self):
+        self.loans: list[Loan] = []
+
+    def add_loan(self, loan: Loan) -> None:
+        self.loans.append(loan)
+
+    def close_loan(self, loan_id: int, returned_on: date) -> bool:
+        loan = self.get_loan(loan_id)
+        if loan is None or not loan.is_active:
+            return False
+        loan.returned_on = returned_on
+        return True
+
+    def next_loan_id(self) -> int:
+        return len(self.loans) + 1
+
+    def get_loan(self, loan_id: int) -> Loan | None:
+        return next((loan for loan in self.loans if loan.loan_id == loan_id), None)
+
+    def active_loan(self, book_id: int) -> Loan | None:
+        return next((loan for loan in self.loans if loan.book_id == book_id and loan.is_active), None)
+
+    def loans_of_book(self, book_id: int) -> list[Loan]:
+        return [loan for loan in self.loans if loan.book_id == book_id]
+
+    def loans_of_borrower(self, borrower: str, active_only: bool = False) -> list[Loan]:
+        return [loan for loan in self.loans
+                if loan.borrower.lower() == borrower.lower() and (loan.is_active or not active_only)]
+
+    def overdue_loans(self, today: date) -> list[Loan]:
+        return sorted((loan for loan in self.loans if loan.is_overdue(today)), key=lambda loan: loan.due_on)
+
 
 class TestLibraryMethods(unittest.TestCase):
     """
@@ -60,6 +151,7 @@ class TestLibraryMethods(unittest.TestCase):
         self.remove_book_use_case = RemoveBookUseCase(self.repository)
         self.search_book_use_case = SearchBookUseCase(self.repository)
         self.change_status_use_case = ChangeBookStatusUseCase(self.repository)
+        self.list_books_use_case = ListBooksUseCase(self.repository)
 
     def test_add_book(self):
         """Тест добавления книги."""
@@ -67,6 +159,7 @@ class TestLibraryMethods(unittest.TestCase):
         self.assertEqual(len(self.repository.books), 3)
         self.assertEqual(self.repository.books[2].title, "A Byte of Python")
         self.assertEqual(self.repository.books[2].author, "Swaroop Chitlur")
+        self.assertEqual(self.repository.books[2].book_id, 3)
 
     def test_delete_book(self):
         """Тест удаления книги по ID."""
@@ -110,6 +203,465 @@ class TestLibraryMethods(unittest.TestCase):
         with self.assertRaises(ValueError):
             self.change_status_use_case.execute(999, "Выдана")
 
+    def test_list_books_by_pages(self):
+        """Тест постраничного просмотра книг."""
+        self.add_book_use_case.execute("A Byte of Python", "Swaroop Chitlur", 2013)
+        pages = list(self.list_books_use_case.execute(page_size=2))
+        self.assertEqual([[book.book_id for book in page] for page in pages], [[1, 2], [3]])
+        pages = list(self.list_books_use_case.execute(page_size=2, order_by="year", descending=True))
+        self.assertEqual([[book.year for book in page] for page in pages], [[2024, 2017], [2013]])
+        with self.assertRaises(ValueError):
+            self.list_books_use_case.execute(page_size=0)
+
+    def test_search_book_by_pages(self):
+        """Тест постраничной выдачи результатов поиска."""
+        pages = list(self.search_book_use_case.iter_pages(SearchCriteria(author="Бхаргава", year=2024), page_size=1))
+        self.assertEqual([[book.book_id for book in page] for page in pages], [[1], [2]])
+
+    def test_ranked_search_validates_query(self):
+        """Тест ранжированного поиска: пустой запрос и неположительный limit отклоняются."""
+        use_case = RankedSearchUseCase(self.repository)
+        with self.assertRaises(ValueError):
+            use_case.execute("  ")
+        with self.assertRaises(ValueError):
+            use_case.execute("Python", limit=0)
+
+    def test_suggest(self):
+        """Тест автодополнения через реализацию по умолчанию с перебором каталога."""
+        use_case = SuggestUseCase(self.repository)
+        self.assertEqual(use_case.execute("и"), ["Изучаем Python"])
+        self.assertEqual(use_case.execute("а"), ["Адитья Бхаргава"])
+        self.assertEqual(use_case.execute(""), [])
+        with self.assertRaises(ValueError):
+            use_case.execute("и", limit=0)
+
+    def test_bulk_add_books(self):
+        """Тест массового импорта: корректные записи добавляются пакетами, ошибочные попадают в отчёт."""
+        records = [
+            {"title": "Война и мир", "author": "Лев Толстой", "year": "1869"},
+            {"title": "", "author": "Без названия", "year": 2000},
+            {"title": "Мастер и Маргарита", "author": "Михаил Булгаков", "year": 1967, "status": "Выдана"},
+            {"title": "Идиот", "author": "Фёдор Достоевский", "year": "давно"},
+        ]
+        progress = []
+        report = BulkAddBooksUseCase(self.repository).execute(
+            records, batch_size=1, progress=lambda r: progress.append(r.imported)
+        )
+        self.assertEqual(report.imported, 2)
+        self.assertEqual([number for number, _ in report.errors], [2, 4])
+        self.assertEqual(progress, [1, 2])
+        self.assertEqual([book.book_id for book in self.repository.books], [1, 2, 3, 4])
+        self.assertEqual(self.repository.books[3].status.value, "Выдана")
+
+    def test_bulk_change_status(self):
+        """Тест пакетного изменения статуса: повторы учитываются один раз, ненайденные ID попадают в отчёт."""
+        report = BulkChangeStatusUseCase(self.repository).execute(iter([2, 42, 1, 2]), "Выдана")
+        self.assertEqual((report.changed, report.errors), (2, [(42, "Книга не найдена")]))
+        self.assertEqual(report.processed, 3)
+        self.assertEqual([book.status for book in self.repository.books], [BookStatus.ISSUED] * 2)
+        with self.assertRaises(ValueError):
+            BulkChangeStatusUseCase(self.repository).execute([1], "Потеряна")
+
+    def test_bulk_remove_books(self):
+        """Тест пакетного удаления книг."""
+        report = BulkRemoveBooksUseCase(self.repository).execute([1, 7, 1])
+        self.assertEqual((report.changed, report.errors), (1, [(7, "Книга не найдена")]))
+        self.assertEqual([book.book_id for book in self.repository.books], [2])
+
+    def test_export_books(self):
+        """Тест выгрузки каталога."""
+        records = list(ExportBooksUseCase(self.repository).execute(page_size=1))
+        self.assertEqual([record["book_id"] for record in records], [1, 2])
+        self.assertEqual(records[1]["status"], "Выдана")
+
+
+class TestSearchResultCache(unittest.TestCase):
+    """
+    Тесты кэша результатов поиска.
+    """
+
+    def setUp(self):
+        self.repository = MockLibraryRepository()
+        self.repository.books = [
+            Book(book_id=1, title="Изучаем Python", author="Эрик Мэтиз", year=2024),
+            Book(book_id=2, title="Грокаем Алгоритмы", author="Адитья Бхаргава", year=2017),
+        ]
+        self.cache = SearchResultCache(max_size=2)
+        self.use_case = SearchBookUseCase(self.repository, cache=self.cache)
+
+    def test_repeated_search_is_served_from_cache(self):
+        """Тест: повторный поиск с теми же (с точностью до регистра) критериями не обращается к репозиторию."""
+        first = self.use_case.execute(SearchCriteria(author="Мэтиз"))
+        second = self.use_case.execute(SearchCriteria(author="мэтиз", year=0))
+        self.assertEqual(first, second)
+        self.assertEqual(self.repository.searches, 1)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_pages_are_served_from_cache_and_counted_in_metrics(self):
+        """Тест: постраничный поиск (как в меню) идёт через кэш, обращения к кэшу попадают в метрики."""
+        metrics = MetricsRegistry()
+        use_case = SearchBookUseCase(self.repository, cache=SearchResultCache(metrics=metrics))
+        criteria = SearchCriteria(title="python", author="бхаргава")
+        first = list(use_case.iter_pages(criteria, page_size=1))
+        second = list(use_case.iter_pages(criteria, page_size=1))
+        self.assertEqual([[book.book_id for book in page] for page in first], [[1], [2]])
+        self.assertEqual(first, second)
+        self.assertEqual(self.repository.searches, 1)
+        self.assertEqual(list(use_case.iter_pages(SearchCriteria(title="толстой"))), [])
+        self.assertEqual(metrics.counter_value("library_search_cache_requests_total", {"result": "hit"}), 1)
+        self.assertEqual(metrics.counter_value("library_search_cache_requests_total", {"result": "miss"}), 2)
+        help_line = "# HELP library_search_cache_requests_total Количество обращений к кэшу"
+        self.assertIn(help_line, metrics.render_prometheus())
+
+    def test_mutations_invalidate_cache(self):
+        """Тест: добавление, удаление и изменение статуса сбрасывают кэш."""
+        criteria = SearchCriteria(title="python")
+        self.assertEqual(len(self.use_case.execute(criteria)), 1)
+
+        AddBookUseCase(self.repository).execute("Python. К вершинам мастерства", "Лучано Рамальо", 2016)
+        self.assertEqual(len(self.use_case.execute(criteria)), 2)
+        ChangeBookStatusUseCase(self.repository).execute(1, "Выдана")
+        self.assertEqual(self.use_case.execute(criteria)[0].status, "Выдана")
+        RemoveBookUseCase(self.repository).execute(1)
+        self.assertEqual([book.book_id for book in self.use_case.execute(criteria)], [3])
+        self.assertEqual(self.cache.hits, 0)
+
+    def test_least_recently_used_result_is_evicted(self):
+        """Тест: при переполнении вытесняется самый давно запрошенный результат."""
+        for author in ("мэтиз", "бхаргава", "мэтиз", "толстой"):
+            self.use_case.execute(SearchCriteria(author=author))
+        self.assertEqual(len(self.cache), 2)
+        self.use_case.execute(SearchCriteria(author="мэтиз"))
+        self.use_case.execute(SearchCriteria(author="бхаргава"))
+        self.assertEqual((self.cache.hits, self.cache.misses), (2, 4))
+
+
+class TestLoans(unittest.TestCase):
+    """
+    Тесты сценариев выдачи и возврата книг.
+    """
+
+    def setUp(self):
+        self.repository = MockLibraryRepository()
+        self.repository.books = [
+            Book(book_id=1, title="Изучаем Python", author="Эрик Мэтиз", year=2024),
+            Book(book_id=2, title="Грокаем Алгоритмы", author="Адитья Бхаргава", year=2017),
+            Book(book_id=3, title="Чистый код", author="Роберт Мартин", year=2008, status=BookStatus.ISSUED),
+        ]
+        self.loans = MockLoanRepository()
+        self.issue = IssueBookUseCase(self.repository, self.loans)
+        self.return_book = ReturnBookUseCase(self.repository, self.loans)
+
+    def test_issue_and_return(self):
+        """Тест: выдача отмечает книгу выданной, возврат закрывает выдачу."""
+        loan_id = self.issue.execute(1, " Иван Петров ", days=7, today=date(2024, 3, 1))
+        loan = self.loans.get_loan(loan_id)
+        self.assertEqual((loan.borrower, loan.due_on), ("Иван Петров", date(2024, 3, 8)))
+        self.assertEqual(self.repository.get_book_by_id(1).status, BookStatus.ISSUED)
+        with self.assertRaises(ValueError):
+            self.issue.execute(1, "Анна Смирнова")
+
+        self.return_book.execute(1, today=date(2024, 3, 5))
+        self.assertEqual(loan.returned_on, date(2024, 3, 5))
+        self.assertEqual(self.repository.get_book_by_id(1).status, BookStatus.AVAILABLE)
+        with self.assertRaises(ValueError):
+            self.return_book.execute(1)
+
+    def test_issue_validates_input(self):
+        """Тест: выдача требует существующую книгу в наличии, читателя и положительный срок."""
+        for book_id, borrower, days in ((42, "Иван", 14), (3, "Иван", 14), (1, "  ", 14), (1, "Иван", 0)):
+            with self.assertRaises(ValueError):
+                self.issue.execute(book_id, borrower, days)
+        self.assertEqual(self.loans.loans, [])
+
+    def test_book_issued_without_loan_can_be_returned(self):
+        """Тест: книгу, выданную до учёта выдач, можно вернуть."""
+        self.return_book.execute(3)
+        self.assertEqual(self.repository.get_book_by_id(3).status, BookStatus.AVAILABLE)
+
+    def test_book_available_with_open_loan_can_be_returned(self):
+        """Тест: книгу в наличии с открытой выдачей (сбой между записями) можно вернуть и выдать снова."""
+        self.loans.add_loan(Loan(self.loans.next_loan_id(), 1, "Иван Петров", date(2024, 3, 1), date(2024, 3, 15)))
+        with self.assertRaises(ValueError):
+            self.issue.execute(1, "Анна Смирнова")
+        self.return_book.execute(1)
+        self.assertIsNone(self.loans.active_loan(1))
+        self.issue.execute(1, "Анна Смирнова")
+
+    def test_overdue_and_borrower_loans(self):
+        """Тест: просроченные выдачи упорядочены по сроку возврата, выдачи читателя - по оформлению."""
+        self.issue.execute(1, "Иван Петров", days=10, today=date(2024, 3, 1))
+        self.issue.execute(2, "Анна Смирнова", days=3, today=date(2024, 3, 1))
+        overdue = OverdueLoansUseCase(self.repository, self.loans).execute(today=date(2024, 3, 20))
+        self.assertEqual([(loan.book_id, loan.due_on) for loan in overdue], [(2, "2024-03-04"), (1, "2024-03-11")])
+        self.assertEqual(overdue[0].title, "Грокаем Алгоритмы")
+
+        self.return_book.execute(1)
+        borrower_loans = BorrowerLoansUseCase(self.repository, self.loans)
+        self.assertEqual(len(borrower_loans.execute("иван петров")), 1)
+        self.assertEqual(borrower_loans.execute("иван петров", active_only=True), [])
+
+    def test_status_change_respects_loans(self):
+        """Тест: с учётом выдач статус "Выдана" не ставится вручную, а возврат в наличие закрывает выдачу."""
+        change_status = ChangeBookStatusUseCase(self.repository, self.loans)
+        with self.assertRaises(ValueError):
+            change_status.execute(1, "Выдана")
+        loan_id = self.issue.execute(1, "Иван Петров")
+        with self.assertRaises(ValueError):
+            RemoveBookUseCase(self.repository, self.loans).execute(1)
+        change_status.execute(1, "В наличии")
+        self.assertFalse(self.loans.get_loan(loan_id).is_active)
+        RemoveBookUseCase(self.repository, self.loans).execute(1)
+
+    def test_bulk_operations_respect_loans(self):
+        """Тест: пакетный возврат в наличие закрывает выдачи, выданные книги не удаляются."""
+        first = self.issue.execute(1, "Иван Петров")
+        self.issue.execute(2, "Анна Смирнова")
+        with self.assertRaises(ValueError):
+            BulkChangeStatusUseCase(self.repository, self.loans).execute([1, 2], "Выдана")
+
+        report = BulkRemoveBooksUseCase(self.repository, self.loans).execute([2, 3])
+        self.assertEqual((report.changed, report.errors), (1, [(2, "Книга выдана читателю и не может быть удалена")]))
+
+        report = BulkChangeStatusUseCase(self.repository, self.loans).execute([1, 3], "В наличии")
+        self.assertEqual((report.changed, report.errors), (1, [(3, "Книга не найдена")]))
+        self.assertFalse(self.loans.get_loan(first).is_active)
+        self.assertIsNotNone(self.loans.active_loan(2))
+
+
+class TestStatistics(unittest.TestCase):
+    """
+    Тесты событий изменения каталога и статистики, которая обновляется по ним.
+    """
+
+    def setUp(self):
+        self.repository = MockLibraryRepository()
+        self.repository.books = [
+            Book(book_id=1, title="Изучаем Python", author="Эрик Мэтиз", year=2024),
+            Book(book_id=2, title="Ёжик в тумане", author="Сергей Козлов", year=1969, status=BookStatus.ISSUED),
+            Book(book_id=3, title="Заяц-хвастун", author="Сергей Козлов", year=1971),
+        ]
+        self.observable = ObservableLibraryRepository(self.repository)
+        self.scans = 0
+        iter_books = self.repository.iter_books
+        self.repository.iter_books = lambda *args: (setattr(self, "scans", self.scans + 1), iter_books(*args))[1]
+        self.use_case = CatalogStatisticsUseCase(self.observable)
+
+    def test_events_are_published(self):
+        """Тест: добавление, удаление и смена статуса публикуют события, после отписки событий нет."""
+        events = []
+        unsubscribe = self.observable.subscribe(events.append)
+        self.observable.add_book_to_library(Book(4, "Идиот", "Фёдор Достоевский", 1869))
+        self.assertTrue(self.observable.change_book_status(2, BookStatus.AVAILABLE))
+        self.assertEqual(self.observable.remove_books_from_library([1, 42]), [42])
+        self.assertEqual([event.kind for event in events],
+                         [BookEventKind.ADDED, BookEventKind.STATUS_CHANGED, BookEventKind.REMOVED])
+        self.assertEqual((events[1].previous_status, events[1].book.status), (BookStatus.ISSUED, BookStatus.AVAILABLE))
+        self.assertEqual(events[2].book.title, "Изучаем Python")
+        self.assertEqual(events[-1].generation, self.repository.generation())
+
+        unsubscribe()
+        self.observable.remove_book_from_library(4)
+        self.assertEqual(len(events), 3)
+
+    def test_statistics_are_updated_by_events(self):
+        """Тест: статистика строится одним проходом, а дальше обновляется по событиям."""
+        statistics = self.use_case.execute(top_authors=1)
+        self.assertEqual((statistics.total, statistics.by_status), (3, {"В наличии": 2, "Выдана": 1}))
+        self.assertEqual(statistics.by_decade, {1960: 1, 1970: 1, 2020: 1})
+        self.assertEqual(statistics.top_authors, [("Сергей Козлов", 2)])
+
+        self.observable.add_books_to_library([Book(4, "Идиот", "Фёдор Достоевский", 1869),
+                                              Book(5, "Бесы", "Фёдор Достоевский", 1872)])
+        self.observable.change_books_status([1, 4], BookStatus.ISSUED)
+        self.observable.remove_book_from_library(3)
+        statistics = self.use_case.execute(top_authors=2)
+        self.assertEqual((statistics.total, statistics.by_status), (4, {"В наличии": 1, "Выдана": 3}))
+        self.assertEqual(statistics.by_decade, {1860: 1, 1870: 1, 1960: 1, 2020: 1})
+        self.assertEqual(statistics.top_authors, [("Фёдор Достоевский", 2), ("Сергей Козлов", 1)])
+        self.assertEqual(self.use_case.statistics.count_by_year(1869), 1)
+        self.assertEqual(self.scans, 1)
+        self.assertIn("Выдана: 3", repr(statistics))
+
+    def test_statistics_are_rebuilt_after_changes_without_events(self):
+        """Тест: изменения в обход событий и ошибка в транзакции приводят к новому проходу по каталогу."""
+        self.use_case.execute()
+        self.repository.remove_book_from_library(1)
+        self.assertEqual(self.use_case.execute().total, 2)
+        self.assertEqual(self.scans, 2)
+
+        with self.assertRaises(RuntimeError):
+            with self.observable.transaction():
+                self.observable.remove_book_from_library(2)
+                raise RuntimeError("сбой")
+        self.assertIsNone(self.use_case.statistics.generation)
+        self.assertEqual(self.use_case.execute().total, 1)
+        self.assertEqual(self.scans, 3)
+
+        # Репозиторий без событий: статистика строится заново после каждого изменения
+        use_case = CatalogStatisticsUseCase(self.repository)
+        self.assertEqual(use_case.execute().by_status, {"В наличии": 1, "Выдана": 0})
+
+    def test_top_authors_heap_stays_consistent(self):
+        """Тест: ленивая куча авторов после многих изменений даёт те же ответы, что и подсчёт заново."""
+        statistics = CatalogStatistics()
+        statistics.rebuild([], generation=0)
+        books = {}
+        for book_id in range(1, 3001):
+            author = f"Автор {book_id * 7 % 13}"
+            if book_id % 3 == 0 and books:
+                removed = books.pop(next(iter(books)))
+                statistics._count(removed, -1)
+            book = Book(book_id, f"Книга {book_id}", author, 1900 + book_id % 100)
+            books[book_id] = book
+            statistics._count(book, 1)
+
+        counts = {}
+        for book in books.values():
+            counts[book.author] = counts.get(book.author, 0) + 1
+        expected = sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+        self.assertEqual(statistics.top_authors(5), expected[:5])
+        self.assertEqual(statistics.top_authors(100), expected)
+        self.assertEqual(statistics.total, len(books))
+
+
+class TestDuplicates(unittest.TestCase):
+    """
+    Тесты поиска дубликатов по ISBN и отпечатку (название, автор, год).
+    """
+
+    def setUp(self):
+        self.repository = MockLibraryRepository()
+        self.repository.books = [
+            Book(book_id=1, title="Война и мир", author="Лев Толстой", year=1869, isbn="5-17-090335-9"),
+            Book(book_id=2, title="Анна Каренина", author="Лев Толстой", year=1878),
+        ]
+        self.observable = ObservableLibraryRepository(self.repository)
+        self.scans = 0
+        iter_books = self.repository.iter_books
+        self.repository.iter_books = lambda *args: (setattr(self, "scans", self.scans + 1), iter_books(*args))[1]
+        self.duplicates = DuplicateDetector(self.observable)
+        self.add_book = AddBookUseCase(self.observable, self.duplicates)
+
+    def test_add_rejects_duplicate_without_rescan(self):
+        """Тест: дубликат по отпечатку или ISBN отклоняется, индексы обновляются по событиям."""
+        with self.assertRaises(DuplicateBookError) as raised:
+            self.add_book.execute("ВОЙНА  И МИР.", "лев толстой", 1869)
+        self.assertEqual(raised.exception.book_ids, [1])
+        # ISBN-10 и ISBN-13 одной книги совпадают
+        with self.assertRaises(DuplicateBookError):
+            self.add_book.execute("War and Peace", "Leo Tolstoy", 2005, isbn="978-5-17-090335-1")
+        book_id = self.add_book.execute("Воскресение", "Лев Толстой", 1899)
+        with self.assertRaises(DuplicateBookError):
+            self.add_book.execute("Воскресение", "Лев Толстой", 1899)
+        self.observable.remove_book_from_library(book_id)
+        self.assertEqual(self.add_book.execute("Воскресение", "Лев Толстой", 1899), book_id)
+        self.assertEqual(self.scans, 1)
+
+    def test_add_allows_another_copy_on_request(self):
+        """Тест: ещё один экземпляр добавляется с allow_duplicate, без поиска дубликатов - всегда."""
+        book_id = self.add_book.execute("Анна Каренина", "Лев Толстой", 1878, allow_duplicate=True)
+        self.assertEqual(self.observable.get_book_by_id(book_id).title, "Анна Каренина")
+        AddBookUseCase(self.observable).execute("Анна Каренина", "Лев Толстой", 1878)
+        self.assertEqual(len(self.repository.books), 4)
+        with self.assertRaises(ValueError):
+            self.add_book.execute("Детство", "Лев Толстой", 1852, isbn="978-5-17-090335-3")
+
+    def test_clusters_join_isbn_and_fingerprint_matches(self):
+        """Тест: группы дубликатов объединяют совпадения по ISBN и по отпечатку в одну цепочку."""
+        self.observable.add_books_to_library([
+            Book(3, "War and Peace", "Leo Tolstoy", 2005, isbn="9785170903351"),
+            Book(4, "Война и мир", "Лев Толстой", 1869),
+            Book(5, "Anna Karenina", "Leo Tolstoy", 2004),
+            Book(6, "Анна Каренина!", "Лев  Толстой", 1878),
+        ])
+        clusters = DuplicateClustersUseCase(self.observable, self.duplicates).execute()
+        self.assertEqual([[book.book_id for book in cluster] for cluster in clusters], [[1, 3, 4], [2, 6]])
+        self.assertEqual(clusters[0][0].isbn, "9785170903351")
+        self.assertEqual(DuplicateClustersUseCase(MockLibraryRepository()).execute(), [])
+
+    def test_bulk_import_rejects_duplicates(self):
+        """Тест импорта: отклоняются книги из каталога и повторы внутри файла, в том числе в одном пакете."""
+        records = [
+            {"title": "Война и мир", "author": "Лев Толстой", "year": "1869"},
+            {"title": "Детство", "author": "Лев Толстой", "year": "1852", "isbn": "978-5-04-116563-5"},
+            {"title": "Детство (переиздание)", "author": "Л. Н. Толстой", "year": "2021", "isbn": "9785041165635"},
+            {"title": "Отрочество", "author": "Лев Толстой", "year": "1854"},
+            {"title": "Отрочество", "author": "Лев Толстой", "year": "1854"},
+            {"title": "Юность", "author": "Лев Толстой", "year": "1857", "isbn": "123"},
+        ]
+        report = BulkAddBooksUseCase(self.observable, self.duplicates).execute(records, batch_size=2)
+        self.assertEqual(report.imported, 2)
+        self.assertEqual([number for number, _ in report.errors], [1, 3, 5, 6])
+        self.assertIn("ID: 1", report.errors[0][1])
+        self.assertEqual(report.errors[1][1], "Повтор записи 2")
+        self.assertIn("ID: 4", report.errors[2][1])
+        self.assertEqual(self.scans, 1)
+
+
+class TestMetrics(unittest.TestCase):
+    """
+    Тесты реестра метрик и обёрток для сценариев использования и репозитория.
+    """
+
+    def setUp(self):
+        self.metrics = MetricsRegistry()
+        self.repository = MockLibraryRepository()
+        self.repository.books = [
+            Book(book_id=1, title="Изучаем Python", author="Эрик Мэтиз", year=2024),
+            Book(book_id=2, title="Грокаем Алгоритмы", author="Адитья Бхаргава", year=2017),
+        ]
+        self.instrumented = InstrumentedRepository(self.repository, self.metrics)
+
+    def test_use_case_calls_and_errors_are_counted(self):
+        """Тест: вызовы и ошибки сценария использования учитываются по имени сценария."""
+        use_case = instrument_use_case(RemoveBookUseCase(self.repository), self.metrics)
+        use_case.execute(1)
+        with self.assertRaises(ValueError):
+            use_case.execute(42)
+        labels = {"use_case": "RemoveBookUseCase"}
+        self.assertEqual(self.metrics.counter_value("library_use_case_calls_total", labels), 2)
+        self.assertEqual(self.metrics.counter_value("library_use_case_errors_total", labels), 1)
+        self.assertEqual(self.metrics.histogram_count("library_use_case_duration_seconds", labels), 2)
+
+    def test_repository_rows_returned_are_counted(self):
+        """Тест: обёртка репозитория считает вызовы методов и возвращённые книги."""
+        SearchBookUseCase(self.instrumented).execute(SearchCriteria(author="мэтиз"))
+        pages = list(ListBooksUseCase(self.instrumented).execute(page_size=10))
+        self.assertEqual(len(pages[0]), 2)
+        search = {"method": "search_book_in_library"}
+        self.assertEqual(self.metrics.counter_value("library_repository_calls_total", search), 1)
+        self.assertEqual(self.metrics.counter_value("library_repository_rows_returned_total", search), 1)
+        self.assertEqual(self.metrics.counter_value("library_repository_rows_returned_total",
+                                                    {"method": "iter_books"}), 2)
+
+    def test_instrumented_repository_delegates_other_attributes(self):
+        """Тест: транзакции замеряются, а остальные атрибуты берутся у обёрнутого репозитория."""
+        AddBookUseCase(self.instrumented).execute("A Byte of Python", "Swaroop Chitlur", 2013)
+        self.assertEqual(len(self.instrumented.books), 3)
+        self.assertEqual(self.metrics.counter_value("library_repository_calls_total", {"method": "transaction"}), 1)
+
+    def test_bulk_use_cases_run_in_one_transaction(self):
+        """Тест: пакетные изменение статуса и удаление выполняются одной транзакцией репозитория."""
+        BulkChangeStatusUseCase(self.instrumented).execute([1, 2], "Выдана")
+        report = BulkRemoveBooksUseCase(self.instrumented).execute([1, 2, 3])
+        self.assertEqual((report.changed, report.errors), (2, [(3, "Книга не найдена")]))
+        self.assertEqual(self.metrics.counter_value("library_repository_calls_total", {"method": "transaction"}), 2)
+
+    def test_prometheus_format(self):
+        """Тест: гистограммы выводятся накопительными корзинами, метки экранируются."""
+        self.metrics.observe("library_io_duration_seconds", 0.002, {"operation": "save_books"})
+        self.metrics.observe("library_io_duration_seconds", 10, {"operation": "save_books"})
+        self.metrics.increment("library_io_bytes_written_total", {"operation": 'a"b'}, 512)
+        text = self.metrics.render_prometheus()
+        self.assertIn("# TYPE library_io_duration_seconds histogram", text)
+        self.assertIn('library_io_duration_seconds_bucket{operation="save_books",le="0.001"} 0', text)
+        self.assertIn('library_io_duration_seconds_bucket{operation="save_books",le="0.005"} 1', text)
+        self.assertIn('library_io_duration_seconds_bucket{operation="save_books",le="+Inf"} 2', text)
+        self.assertIn('library_io_duration_seconds_count{operation="save_books"} 2', text)
+        self.assertIn('library_io_bytes_written_total{operation="a\\"b"} 512', text)
+        self.assertIn("save_books: вызовов 2", self.metrics.render_text())
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,1221 @@
+import json
+import multiprocessing
+import os
+import sqlite3
+import tempfile
+import threading
+import unittest
+from array import array
+from datetime import date
+from unittest import mock
+
+from src.domain.entities.book import Book
+from src.domain.entities.loan import Loan
+from src.domain.value_objects.book_status import BookStatus
+from src.application.dto.page_request import PageRequest
+from src.application.dto.search_criteria import SearchCriteria
+from src.application.events.observable_repository import ObservableLibraryRepository
+from src.application.use_cases.bulk_add_books import BulkAddBooksUseCase
+from src.application.use_cases.catalog_statistics import CatalogStatisticsUseCase
+from src.application.metrics.metrics_registry import MetricsRegistry
+from src.infrastructure.concurrency.read_write_lock import ReadWriteLock
+from src.infrastructure.indexes.prefix_index import PrefixIndex
+from src.infrastructure.indexes.ranked_index import RankedIndex, edit_distance
+from src.infrastructure.indexes.text_index import TextIndex
+from src.infrastructure.repositories import columnar_library_repository
+from src.infrastructure.repositories.columnar_library_repository import ColumnarLibraryRepository
+from src.infrastructure.repositories import jsonl_loan_repository
+from src.infrastructure.repositories import mmap_library_repository
+from src.infrastructure.repositories.json_library_repository import JsonLibraryRepository
+from src.infrastructure.repositories.jsonl_loan_repository import JsonLinesLoanRepository
+from src.infrastructure.repositories.mmap_library_repository import MmapLibraryRepository
+from src.infrastructure.repositories.sharded_library_repository import ShardedLibraryRepository
+from src.infrastructure.repositories.sqlite_library_repository import SqliteLibraryRepository
+from src.infrastructure.serialization import catalog_file
+from src.infrastructure.serialization.book_records import read_records
+from src.infrastructure.serialization.catalog_file import read_catalog, write_catalog
+
+
+class TestJsonLibraryRepository(unittest.TestCase):
+    """
+    Тесты для JSON-репозитория на временном файле.
+    """
+
+    def setUp(self):
+        """
+        Создаём репозиторий во временном каталоге с двумя книгами.
+        """
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.data_file = os.path.join(self.tmp_dir.name, "books.json")
+        self.repository = JsonLibraryRepository(self.data_file)
+        self.repository.add_book_to_library(Book(1, "Изучаем Python", "Эрик Мэтиз", 2024))
+        self.repository.add_book_to_library(Book(2, "Грокаем Алгоритмы", "Адитья Бхаргава", 2017))
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_get_book_by_id(self):
+        """Тест получения книги по ID."""
+        self.assertEqual(self.repository.get_book_by_id(2).title, "Грокаем Алгоритмы")
+        self.assertIsNone(self.repository.get_book_by_id(999))
+
+    def test_remove_book_keeps_index_in_sync(self):
+        """Тест удаления книги: книга исчезает и из списка, и из индекса."""
+        self.assertTrue(self.repository.remove_book_from_library(1))
+        self.assertFalse(self.repository.remove_book_from_library(1))
+        self.assertIsNone(self.repository.get_book_by_id(1))
+        self.assertEqual([book.book_id for book in self.repository.books], [2])
+
+    def test_change_status_is_persisted(self):
+        """Тест изменения статуса: изменение сохраняется в файл."""
+        self.assertTrue(self.repository.change_book_status(1, BookStatus("Выдана")))
+        reloaded = JsonLibraryRepository(self.data_file)
+        self.assertEqual(reloaded.get_book_by_id(1).status.value, "Выдана")
+        self.assertEqual(len(reloaded.books), 2)
+
+    def test_ids_are_not_reused_after_delete(self):
+        """Тест выделения ID: идентификатор удалённой книги не выдаётся повторно, в том числе другим экземпляром."""
+        self.repository.remove_book_from_library(2)
+        reloaded = JsonLibraryRepository(self.data_file)
+        self.assertEqual(reloaded.next_book_id(), 3)
+        self.assertEqual(self.repository.next_book_id(), 4)
+
+    def test_reserve_block_of_ids(self):
+        """Тест резервирования блока идентификаторов."""
+        self.assertEqual(self.repository.reserve_book_ids(3), range(3, 6))
+        self.assertEqual(self.repository.next_book_id(), 6)
+        with self.assertRaises(ValueError):
+            self.repository.reserve_book_ids(0)
+
+    def test_search_uses_text_indexes(self):
+        """Тест поиска по индексам: слова, подстроки, короткие запросы и буква "ё"."""
+        self.repository.add_book_to_library(Book(3, "Ёжик в тумане", "Сергей Козлов", 1969))
+        search = self.repository.search_book_in_library
+        self.assertEqual([b.book_id for b in search(SearchCriteria(title="изучаем python"))], [1])
+        self.assertEqual([b.book_id for b in search(SearchCriteria(title="горитм"))], [2])
+        self.assertEqual([b.book_id for b in search(SearchCriteria(title="ежик"))], [3])
+        self.assertEqual([b.book_id for b in search(SearchCriteria(author="з"))], [1, 3])
+        self.assertEqual([b.book_id for b in search(SearchCriteria(author="Мэтиз", year=1969))], [1, 3])
+        self.assertIsNone(search(SearchCriteria(title="Толстой")))
+
+        self.repository.remove_book_from_library(3)
+        self.assertIsNone(search(SearchCriteria(title="ежик")))
+
+    def test_search_by_year_range_and_status(self):
+        """Тест поиска по диапазону лет и статусу с объединением условий через И/ИЛИ."""
+        self.repository.add_book_to_library(Book(3, "Ёжик в тумане", "Сергей Козлов", 1969))
+        self.repository.change_book_status(2, BookStatus("Выдана"))
+        search = self.repository.search_book_in_library
+        criteria = SearchCriteria(year_from=1950, year_to=2020, status=BookStatus("В наличии"), match_all=True)
+        self.assertEqual([b.book_id for b in search(criteria)], [3])
+        criteria = SearchCriteria(year_to=1970, status=BookStatus("выдана"))
+        self.assertEqual([b.book_id for b in search(criteria)], [2, 3])
+        self.assertEqual([b.book_id for b in search(SearchCriteria(year_from=2018))], [1])
+        self.assertIsNone(search(SearchCriteria(title="python", year=2017, match_all=True)))
+
+    def test_iter_books_pagination(self):
+        """Тест постраничного перебора: limit/offset, курсор по ключу и сортировка."""
+        self.repository.add_book_to_library(Book(3, "Ёжик в тумане", "Сергей Козлов", 1969))
+        ids = lambda page, criteria=None: [b.book_id for b in self.repository.iter_books(page, criteria)]
+        self.assertEqual(ids(PageRequest(limit=2)), [1, 2])
+        self.assertEqual(ids(PageRequest(limit=2, after=(2, 2))), [3])
+        self.assertEqual(ids(PageRequest(limit=2, offset=1, descending=True)), [2, 1])
+        self.assertEqual(ids(PageRequest(order_by="year")), [3, 2, 1])
+        self.assertEqual(ids(PageRequest(order_by="year", after=(1969, 3), limit=1)), [2])
+        self.assertEqual(ids(PageRequest(order_by="title", limit=2)), [3, 2])
+        self.assertEqual(ids(PageRequest(order_by="author", descending=True, after=("Эрик Мэтиз", 1))), [3, 2])
+        self.assertEqual(ids(PageRequest(order_by="year"), SearchCriteria(year_from=2000)), [2, 1])
+        self.assertEqual(ids(PageRequest(), SearchCriteria()), [])
+
+    def test_transaction_saves_once(self):
+        """Тест транзакции: несколько изменений сохраняются в файл одной записью."""
+        saves = []
+        original_save = self.repository._save_books
+        self.repository._save_books = lambda: (saves.append(1), original_save())
+        with self.repository.transaction():
+            self.repository.add_books_to_library([Book(3, "Идиот", "Фёдор Достоевский", 1869)])
+            self.repository.change_book_status(3, BookStatus("Выдана"))
+            self.assertEqual(saves, [])
+        self.assertEqual(saves, [1])
+        self.assertEqual(JsonLibraryRepository(self.data_file).get_book_by_id(3).status.value, "Выдана")
+
+    def test_batch_status_change_and_remove_save_once(self):
+        """Тест пакетных операций: ненайденные ID возвращаются, изменения сохраняются одной записью."""
+        self.repository.add_book_to_library(Book(3, "Идиот", "Фёдор Достоевский", 1869))
+        saves = []
+        original_save = self.repository._save_books
+        self.repository._save_books = lambda: (saves.append(1), original_save())
+        self.assertEqual(self.repository.change_books_status([1, 42, 3], BookStatus.ISSUED), [42])
+        self.assertEqual(self.repository.remove_books_from_library([3, 2, 7]), [7])
+        self.assertEqual(saves, [1, 1])
+
+        self.assertEqual([book.book_id for book in self.repository.iter_books(PageRequest(order_by="year"))], [1])
+        reloaded = JsonLibraryRepository(self.data_file)
+        self.assertEqual([(book.book_id, book.status) for book in reloaded.books], [(1, BookStatus.ISSUED)])
+
+    def test_ranked_search_follows_changes(self):
+        """Тест ранжированного поиска: индекс обновляется при добавлении и удалении книг."""
+        self.assertEqual([book.book_id for book in self.repository.search_ranked("грокаем алгоритмы")], [2])
+        self.repository.add_book_to_library(Book(3, "Алгоритмы на Python", "Эрик Мэтиз", 2020))
+        self.assertEqual([book.book_id for book in self.repository.search_ranked("алгаритмы мэтис")], [3, 2, 1])
+        self.repository.remove_book_from_library(3)
+        self.assertEqual([book.book_id for book in self.repository.search_ranked("алгаритмы")], [2])
+
+    def test_suggest_follows_changes(self):
+        """Тест автодополнения: индекс обновляется при добавлении и удалении книг."""
+        self.assertEqual(self.repository.suggest("гро"), ["Грокаем Алгоритмы"])
+        self.repository.add_book_to_library(Book(3, "Грокаем глубокое обучение", "Эндрю Траск", 2019))
+        self.assertEqual(self.repository.suggest("грокаем"), ["Грокаем Алгоритмы", "Грокаем глубокое обучение"])
+        self.repository.remove_book_from_library(2)
+        self.assertEqual(self.repository.suggest("гро"), ["Грокаем глубокое обучение"])
+        self.assertEqual(self.repository.suggest("эр"), ["Эрик Мэтиз"])
+
+    def test_lazy_load_and_binary_snapshot(self):
+        """Тест ленивой загрузки: каталог читается при первом обращении, из двоичного снимка, пока он актуален."""
+        self.assertTrue(os.path.exists(self.repository.snapshot_file))
+        reloaded = JsonLibraryRepository(self.data_file)
+        self.assertFalse(reloaded._loaded)
+        with mock.patch.object(JsonLibraryRepository, "_load_json") as load_json:
+            self.assertEqual(reloaded.get_book_by_id(2).title, "Грокаем Алгоритмы")
+        load_json.assert_not_called()
+        self.assertEqual(reloaded.next_book_id(), 3)
+
+    def test_io_and_scan_metrics(self):
+        """Тест: репозиторий с реестром метрик учитывает чтение, запись и просмотренные книги."""
+        metrics = MetricsRegistry()
+        repository = JsonLibraryRepository(self.data_file, metrics=metrics)
+        repository.search_book_in_library(SearchCriteria(author="мэтиз", year=2017))
+        read = metrics.counter_value("library_io_bytes_read_total", {"operation": "load_books"})
+        self.assertEqual(read, os.path.getsize(self.data_file + ".bin"))
+        self.assertEqual(metrics.counter_value("library_repository_rows_scanned_total"), 2)
+
+        repository.change_book_status(1, BookStatus.ISSUED)
+        written = metrics.counter_value("library_io_bytes_written_total", {"operation": "save_books"})
+        self.assertEqual(written, os.path.getsize(self.data_file) + os.path.getsize(self.data_file + ".bin"))
+        self.assertEqual(metrics.histogram_count("library_io_duration_seconds", {"operation": "save_books"}), 1)
+
+    def test_stale_binary_snapshot_is_ignored(self):
+        """Тест: изменённый вручную JSON-файл новее снимка и читается вместо него."""
+        with open(self.data_file, encoding="utf-8") as file:
+            data = json.load(file)
+        data["books"][0]["title"] = "Изучаем Python, 3-е издание"
+        with open(self.data_file, "w", encoding="utf-8") as file:
+            json.dump(data, file, ensure_ascii=False)
+        reloaded = JsonLibraryRepository(self.data_file)
+        self.assertEqual(reloaded.get_book_by_id(1).title, "Изучаем Python, 3-е издание")
+        self.assertEqual(JsonLibraryRepository(self.data_file).get_book_by_id(1).title, "Изучаем Python, 3-е издание")
+
+    def test_isbn_is_stored_only_when_set(self):
+        """Тест ISBN: сохраняется в JSON и двоичном снимке, у книг без ISBN поле не записывается."""
+        self.repository.add_book_to_library(Book(3, "Война и мир", "Лев Толстой", 1869, isbn="5-17-090335-9"))
+        with open(self.data_file, encoding="utf-8") as file:
+            records = json.load(file)["books"]
+        self.assertNotIn("isbn", records[0])
+        self.assertEqual(records[2]["isbn"], "9785170903351")
+        self.assertEqual(JsonLibraryRepository(self.data_file).get_book_by_id(3).isbn, "9785170903351")
+        os.remove(self.repository.snapshot_file)
+        reloaded = JsonLibraryRepository(self.data_file)
+        self.assertEqual([book.isbn for book in reloaded.books], [None, None, "9785170903351"])
+
+
+class TestTextIndex(unittest.TestCase):
+    """
+    Тесты для инвертированного индекса по тексту.
+    """
+
+    def test_add_replace_and_remove(self):
+        """Тест инкрементального обновления индекса."""
+        index = TextIndex()
+        index.add(1, "Война и мир")
+        index.add(2, "Мир полудня")
+        self.assertEqual(index.search("мир"), {1, 2})
+        self.assertEqual(index.search("ойна"), {1})
+
+        index.add(1, "Анна Каренина")
+        self.assertEqual(index.search("мир"), {2})
+        self.assertEqual(index.search("карен"), {1})
+
+        index.remove(2)
+        self.assertEqual(index.search("мир"), set())
+        self.assertEqual(index.search("и"), {1})
+
+    def test_whole_word_query_matches_inside_longer_words(self):
+        """Тест: запрос, совпадающий с целым словом одной книги, находит и подстроку в слове другой."""
+        index = TextIndex()
+        index.add(1, "Война и мир")
+        index.add(2, "Миры Пола Андерсона")
+        self.assertEqual(index.search("мир"), {1, 2})
+        self.assertEqual(index.search("и мир"), {1})
+
+        repository = JsonLibraryRepository(os.path.join(tempfile.mkdtemp(), "books.json"))
+        repository.add_book_to_library(Book(1, "Война и мир", "Лев Толстой", 1869))
+        repository.add_book_to_library(Book(2, "Миры Пола Андерсона", "Пол Андерсон", 1990))
+        result = repository.search_book_in_library(SearchCriteria(title="мир"))
+        self.assertEqual([book.book_id for book in result], [1, 2])
+
+
+class TestRankedIndex(unittest.TestCase):
+    """
+    Тесты индекса ранжированного поиска.
+    """
+
+    def setUp(self):
+        self.books = [
+            Book(1, "Война и мир", "Лев Толстой", 1869),
+            Book(2, "Анна Каренина", "Лев Толстой", 1877),
+            Book(3, "Идиот", "Фёдор Достоевский", 1869),
+            Book(4, "Мир на ладони", "Иван Петров", 2000),
+        ]
+        self.index = RankedIndex.build(self.books)
+
+    def test_typos_are_tolerated(self):
+        """Тест: слова с опечатками находят книги."""
+        self.assertEqual(self.index.search("Толстй"), [1, 2])
+        self.assertEqual(self.index.search("достаевский идот"), [3])
+        self.assertEqual(self.index.search("Толстой", limit=1), [1])
+        self.assertEqual(self.index.search("Шекспир"), [])
+
+    def test_results_are_ranked(self):
+        """Тест: книга, совпадающая по большему числу слов запроса, идёт первой."""
+        self.assertEqual(self.index.search("мир война"), [1, 4])
+        self.assertEqual(self.index.search("мир петров"), [4, 1])
+
+    def test_removed_book_leaves_no_trace(self):
+        """Тест: после удаления книги её слова пропадают из словаря и словаря удалений."""
+        self.index.remove(self.books[3])
+        self.index.remove(self.books[0])
+        self.assertEqual(self.index.search("мир"), [])
+        self.assertEqual(self.index.corrections("воина"), {})
+        self.assertEqual(self.index.search("толстой"), [2])
+
+    def test_corrections_stop_at_closest_distance(self):
+        """Тест: после исправления одной опечатки варианты с большим числом удалений не перебираются."""
+        lookups = []
+        deletions = self.index._deletions
+
+        class RecordingDeletions(dict):
+            def get(self, key, default=None):
+                lookups.append(key)
+                return deletions.get(key, default)
+
+        self.index._deletions = RecordingDeletions()
+        self.assertEqual(self.index.corrections("толстй"), {"толстой": 1})
+        self.assertEqual(min(map(len, lookups)), len("толстй") - 1)
+
+    def test_edit_distance(self):
+        """Тест расстояния Дамерау-Левенштейна."""
+        self.assertEqual(edit_distance("толстой", "толстой", 2), 0)
+        self.assertEqual(edit_distance("тлостой", "толстой", 2), 1)
+        self.assertEqual(edit_distance("kitten", "sitting", 5), 3)
+        self.assertEqual(edit_distance("kitten", "sitting", 1), 2)
+
+
+class TestPrefixIndex(unittest.TestCase):
+    """
+    Тесты индекса автодополнения.
+    """
+
+    def test_complete_in_alphabetical_order(self):
+        """Тест: дополнения идут по алфавиту, регистр и "ё" не учитываются, повторы схлопываются."""
+        index = PrefixIndex.build(["Лев Толстой", "Лёгкое дыхание", "Лев Толстой", "Левиафан"])
+        index.add("Лето Господне")
+        self.assertEqual(index.complete("ле"), ["Лев Толстой", "Левиафан", "Лёгкое дыхание", "Лето Господне"])
+        self.assertEqual(index.complete("ЛЕГ"), ["Лёгкое дыхание"])
+        self.assertEqual(index.complete("лев", limit=1), ["Лев Толстой"])
+        self.assertEqual(index.complete("я"), [])
+
+    def test_string_disappears_with_last_book(self):
+        """Тест: строка остаётся, пока есть хотя бы одна книга с ней."""
+        index = PrefixIndex.build(["Лев Толстой", "Лев Толстой"])
+        index.remove("Лев Толстой")
+        self.assertEqual(index.complete("лев"), ["Лев Толстой"])
+        index.remove("Лев Толстой")
+        self.assertEqual(index.complete("лев"), [])
+        self.assertEqual(len(index), 0)
+
+
+class TestJournaledJsonLibraryRepository(unittest.TestCase):
+    """
+    Тесты для журналируемого режима JSON-репозитория.
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.data_file = os.path.join(self.tmp_dir.name, "books.json")
+        self.repository = JsonLibraryRepository(self.data_file, journal_threshold=1024 * 1024)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_mutations_are_appended_to_journal(self):
+        """Тест журнала: изменения не переписывают снимок, а восстанавливаются при загрузке."""
+        self.assertEqual(self.repository.books, [])
+        snapshot_size = os.path.getsize(self.data_file)
+        self.repository.add_book_to_library(Book(1, "Изучаем Python", "Эрик Мэтиз", 2024))
+        self.repository.add_book_to_library(Book(2, "Грокаем Алгоритмы", "Адитья Бхаргава", 2017))
+        self.repository.change_book_status(1, BookStatus("Выдана"))
+        self.repository.remove_book_from_library(2)
+        self.assertEqual(os.path.getsize(self.data_file), snapshot_size)
+
+        reloaded = JsonLibraryRepository(self.data_file, journal_threshold=1024 * 1024)
+        self.assertEqual([book.book_id for book in reloaded.books], [1])
+        self.assertEqual(reloaded.get_book_by_id(1).status.value, "Выдана")
+        self.assertEqual(reloaded.next_book_id(), 3)
+
+    def test_journal_is_compacted_after_threshold(self):
+        """Тест свёртки журнала в снимок после превышения порога."""
+        repository = JsonLibraryRepository(self.data_file, journal_threshold=200)
+        for book_id in range(1, 6):
+            repository.add_book_to_library(Book(book_id, f"Книга {book_id}", "Автор", 2000))
+        self.assertLess(os.path.getsize(repository.journal_file), 200)
+        self.assertEqual(len(JsonLibraryRepository(self.data_file).books), 5)
+
+    def test_transaction_appends_batch_to_journal(self):
+        """Тест транзакции в журналируемом режиме: все записи попадают в журнал при выходе из блока."""
+        with self.repository.transaction():
+            self.repository.add_books_to_library(Book(i, f"Книга {i}", "Автор", 2000) for i in range(1, 4))
+            self.assertFalse(os.path.exists(self.repository.journal_file))
+        reloaded = JsonLibraryRepository(self.data_file, journal_threshold=1024 * 1024)
+        self.assertEqual(len(reloaded.books), 3)
+
+    def test_statistics_follow_journaled_changes_without_rescan(self):
+        """Тест: статистика по событиям не перестраивается после записи в журнал и его сворачивания."""
+        self.repository.journal_threshold = 512
+        repository = ObservableLibraryRepository(self.repository)
+        use_case = CatalogStatisticsUseCase(repository)
+        use_case.execute()
+        with mock.patch.object(self.repository, "iter_books", side_effect=AssertionError("повторный проход")):
+            for book_id in range(10, 40):
+                repository.add_book_to_library(Book(book_id, f"Книга {book_id}", "Автор", 1990))
+            repository.change_book_status(10, BookStatus.ISSUED)
+            statistics = use_case.execute()
+        self.assertEqual(statistics.by_status["Выдана"], 1)
+        self.assertEqual(statistics.top_authors[0], ("Автор", 30))
+        self.assertEqual(statistics.total, len(JsonLibraryRepository(self.data_file).books))
+        self.assertLess(os.path.getsize(self.repository.journal_file), 512)
+
+    def test_torn_journal_tail_is_discarded(self):
+        """Тест восстановления после сбоя: недописанная запись журнала отбрасывается."""
+        self.repository.add_book_to_library(Book(1, "Изучаем Python", "Эрик Мэтиз", 2024))
+        with open(self.repository.journal_file, "ab") as file:
+            file.write(b'{"op":"remove","book_')
+        reloaded = JsonLibraryRepository(self.data_file, journal_threshold=1024 * 1024)
+        self.assertIsNotNone(reloaded.get_book_by_id(1))
+        reloaded.change_book_status(1, BookStatus("Выдана"))
+        again = JsonLibraryRepository(self.data_file, journal_threshold=1024 * 1024)
+        self.assertEqual(again.get_book_by_id(1).status.value, "Выдана")
+
+
+class TestCatalogFileFormats(unittest.TestCase):
+    """
+    Тесты форматов файла каталога, выбираемых по расширению.
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.records = [JsonLibraryRepository._book_to_record(Book(i, f"Книга {i}", "Лев Толстой", 1869))
+                        for i in range(1, 51)]
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.tmp_dir.name, name)
+
+    def test_round_trip_in_every_format(self):
+        """Тест: каталог читается обратно во всех форматах, компактные форматы меньше документа с отступами."""
+        sizes = {}
+        for name in ("books.json", "books.jsonl", "books.jsonl.gz", "books.jsonl.xz"):
+            sizes[name] = write_catalog(self.path(name), 51, iter(self.records))
+            self.assertEqual(sizes[name], os.path.getsize(self.path(name)))
+            header = {}
+            self.assertEqual(list(read_catalog(self.path(name), header)), self.records)
+            self.assertEqual(header, {"next_book_id": 51})
+        self.assertLess(sizes["books.jsonl"], sizes["books.json"])
+        self.assertLess(sizes["books.jsonl.gz"], sizes["books.jsonl"])
+        with open(self.path("books.jsonl"), encoding="utf-8") as file:
+            self.assertEqual(file.readline(), '{"next_book_id":51}\n')
+
+    def test_document_is_parsed_in_small_chunks(self):
+        """Тест потокового разбора: книги и значения на границах блоков не теряются."""
+        path = self.path("books.json")
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump({"books": self.records, "next_book_id": 77}, file, ensure_ascii=False, indent=4)
+        header = {}
+        with mock.patch.object(catalog_file, "READ_CHUNK_SIZE", 7):
+            records = read_catalog(path, header)
+            self.assertEqual(next(records), self.records[0])
+            self.assertEqual(header, {})
+            self.assertEqual(list(records), self.records[1:])
+        self.assertEqual(header, {"next_book_id": 77})
+
+    def test_legacy_list_document(self):
+        """Тест старого формата: файл - просто список книг."""
+        path = self.path("books.json")
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(self.records[:3], file, ensure_ascii=False)
+        with mock.patch.object(catalog_file, "READ_CHUNK_SIZE", 5):
+            self.assertEqual(list(read_catalog(path, {})), self.records[:3])
+        with open(path, "w", encoding="utf-8") as file:
+            file.write("[]")
+        self.assertEqual(list(read_catalog(path, {})), [])
+
+    def test_repository_in_compressed_format(self):
+        """Тест репозитория со сжатым файлом: изменения сохраняются и читаются без двоичного снимка."""
+        data_file = self.path("books.jsonl.gz")
+        repository = JsonLibraryRepository(data_file)
+        repository.add_books_to_library(Book(i, f"Книга {i}", "Автор", 2000) for i in range(1, 4))
+        repository.remove_book_from_library(2)
+        os.remove(repository.snapshot_file)
+        reloaded = JsonLibraryRepository(data_file)
+        self.assertEqual([book.book_id for book in reloaded.books], [1, 3])
+        self.assertEqual(reloaded.next_book_id(), 4)
+
+    def test_export_catalog_includes_journal(self):
+        """Тест перевода формата: журнал учитывается, исходный файл не переписывается, снимок не создаётся."""
+        source = self.path("books.json")
+        repository = JsonLibraryRepository(source, journal_threshold=1024 * 1024)
+        repository.add_books_to_library(Book(i, f"Книга {i}", "Автор", 2000) for i in range(1, 4))
+        source_size = os.path.getsize(source)
+        os.remove(repository.snapshot_file)
+        target = self.path("books.jsonl.xz")
+        size = JsonLibraryRepository(source, journal_threshold=1024 * 1024, snapshot=False).export_catalog(target)
+        self.assertEqual(size, os.path.getsize(target))
+        self.assertEqual(os.path.getsize(source), source_size)
+        self.assertFalse(os.path.exists(repository.snapshot_file))
+        migrated = JsonLibraryRepository(target)
+        self.assertEqual(len(migrated.books), 3)
+        self.assertEqual(migrated.next_book_id(), 4)
+        self.assertFalse([name for name in os.listdir(self.tmp_dir.name) if name.endswith(".tmp")])
+
+    def test_import_skips_malformed_json_lines(self):
+        """Тест импорта: нечитаемая строка JSON Lines попадает в отчёт, остальные книги добавляются."""
+        path = self.path("import.jsonl")
+        with open(path, "w", encoding="utf-8") as file:
+            file.write('{"title": "Война и мир", "author": "Лев Толстой", "year": 1869}\n')
+            file.write('{"title": "Идиот", "author"\n')
+            file.write('\n{"title": "Мастер и Маргарита", "author": "Михаил Булгаков", "year": 1967}\n')
+        repository = JsonLibraryRepository(self.path("books.json"))
+        report = BulkAddBooksUseCase(repository).execute(read_records(path))
+        self.assertEqual(report.imported, 2)
+        self.assertEqual([number for number, _ in report.errors], [2])
+        self.assertEqual([book.title for book in repository.books], ["Война и мир", "Мастер и Маргарита"])
+
+def add_books_in_process(data_file: str, count: int) -> None:
+    """Добавляет книги в общий файл из отдельного процесса."""
+    repository = JsonLibraryRepository(data_file, journal_threshold=4096)
+    for _ in range(count):
+        book_id = repository.next_book_id()
+        repository.add_book_to_library(Book(book_id, f"Книга {book_id}", "Автор", 2000))
+
+
+class TestConcurrentJsonLibraryRepository(unittest.TestCase):
+    """
+    Тесты совместной работы нескольких экземпляров JSON-репозитория и нескольких потоков.
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.data_file = os.path.join(self.tmp_dir.name, "books.json")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_journal_changes_of_other_instance_are_applied_incrementally(self):
+        """Тест: изменения другого экземпляра подгружаются из хвоста журнала без перечитывания снимка."""
+        first = JsonLibraryRepository(self.data_file, journal_threshold=1024 * 1024)
+        second = JsonLibraryRepository(self.data_file, journal_threshold=1024 * 1024)
+        first.add_book_to_library(Book(1, "Изучаем Python", "Эрик Мэтиз", 2024))
+        self.assertEqual(len(second.books), 1)
+
+        first.change_book_status(1, BookStatus.ISSUED)
+        first.add_book_to_library(Book(2, "Грокаем Алгоритмы", "Адитья Бхаргава", 2017))
+        with mock.patch.object(JsonLibraryRepository, "_load_books") as load_books:
+            self.assertEqual(second.get_book_by_id(1).status, BookStatus.ISSUED)
+            found = second.search_book_in_library(SearchCriteria(author="бхаргава"))
+        load_books.assert_not_called()
+        self.assertEqual([book.book_id for book in found], [2])
+
+    def test_rewritten_snapshot_is_reloaded(self):
+        """Тест: после перезаписи снимка другим экземпляром каталог перечитывается, изменения не теряются."""
+        first = JsonLibraryRepository(self.data_file)
+        second = JsonLibraryRepository(self.data_file)
+        first.add_book_to_library(Book(1, "Изучаем Python", "Эрик Мэтиз", 2024))
+        second.add_book_to_library(Book(2, "Грокаем Алгоритмы", "Адитья Бхаргава", 2017))
+        first.change_book_status(2, BookStatus.ISSUED)
+
+        reloaded = JsonLibraryRepository(self.data_file)
+        self.assertEqual([book.book_id for book in reloaded.books], [1, 2])
+        self.assertEqual(reloaded.get_book_by_id(2).status, BookStatus.ISSUED)
+
+    def test_instances_do_not_reserve_same_ids(self):
+        """Тест: два экземпляра не выдают одинаковые идентификаторы."""
+        first = JsonLibraryRepository(self.data_file, journal_threshold=1024 * 1024)
+        second = JsonLibraryRepository(self.data_file, journal_threshold=1024 * 1024)
+        ids = [first.next_book_id(), second.next_book_id(), *first.reserve_book_ids(2), second.next_book_id()]
+        self.assertEqual(ids, [1, 2, 3, 4, 5])
+
+    def test_reserve_without_journal_does_not_rewrite_catalog(self):
+        """Тест: без журналирования резервирование ID не переписывает каталог, но видно другим экземплярам."""
+        first = JsonLibraryRepository(self.data_file)
+        first.add_book_to_library(Book(1, "Изучаем Python", "Эрик Мэтиз", 2024))
+        with mock.patch.object(JsonLibraryRepository, "_save_books") as save_books:
+            self.assertEqual(first.next_book_id(), 2)
+        save_books.assert_not_called()
+
+        second = JsonLibraryRepository(self.data_file)
+        self.assertEqual(second.next_book_id(), 3)
+        first.add_book_to_library(Book(2, "Грокаем Алгоритмы", "Адитья Бхаргава", 2017))
+        self.assertEqual(os.path.getsize(first.journal_file), 0)
+        self.assertEqual(JsonLibraryRepository(self.data_file).next_book_id(), 4)
+
+    def test_fresh_reads_do_not_take_file_lock(self):
+        """Тест: чтение актуальной копии не захватывает блокировку файла и блокировку на запись."""
+        first = JsonLibraryRepository(self.data_file, journal_threshold=1024 * 1024, thread_safe=True)
+        second = JsonLibraryRepository(self.data_file, journal_threshold=1024 * 1024)
+        first.add_book_to_library(Book(1, "Изучаем Python", "Эрик Мэтиз", 2024))
+        with mock.patch.object(first._file_lock, "acquire") as acquire, \
+                mock.patch.object(first._lock, "write") as write:
+            self.assertEqual(first.get_book_by_id(1).title, "Изучаем Python")
+        acquire.assert_not_called()
+        write.assert_not_called()
+
+        second.change_book_status(1, BookStatus.ISSUED)
+        self.assertEqual(first.get_book_by_id(1).status, BookStatus.ISSUED)
+
+    def test_generation_changes_after_changes_of_other_instance(self):
+        """Тест: номер версии каталога меняется и после изменений другого экземпляра."""
+        first = JsonLibraryRepository(self.data_file, journal_threshold=1024 * 1024)
+        second = JsonLibraryRepository(self.data_file, journal_threshold=1024 * 1024)
+        first.add_book_to_library(Book(1, "Изучаем Python", "Эрик Мэтиз", 2024))
+        generation = second.generation()
+        self.assertEqual(second.generation(), generation)
+        first.change_book_status(1, BookStatus.ISSUED)
+        self.assertNotEqual(second.generation(), generation)
+
+    def test_processes_do_not_lose_updates(self):
+        """Тест: одновременные изменения из нескольких процессов не теряются."""
+        processes = [
+            multiprocessing.Process(target=add_books_in_process, args=(self.data_file, 25)) for _ in range(4)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+            self.assertEqual(process.exitcode, 0)
+
+        books = JsonLibraryRepository(self.data_file).books
+        self.assertEqual(sorted(book.book_id for book in books), list(range(1, 101)))
+
+    def test_threads_share_thread_safe_repository(self):
+        """Тест потокобезопасного режима: параллельные добавления и поиск из нескольких потоков."""
+        repository = JsonLibraryRepository(self.data_file, journal_threshold=1024 * 1024, thread_safe=True)
+        errors = []
+
+        def worker(number: int) -> None:
+            try:
+                for i in range(50):
+                    book_id = repository.next_book_id()
+                    repository.add_book_to_library(Book(book_id, f"Книга {number}-{i}", f"Автор {number}", 2000))
+                    repository.search_book_in_library(SearchCriteria(author=f"Автор {number}"))
+            except Exception as error:
+                errors.append(error)
+
+        threads = [threading.Thread(target=worker, args=(number,)) for number in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len(repository.books), 200)
+        self.assertEqual(len(JsonLibraryRepository(self.data_file).books), 200)
+
+
+class TestJsonLinesLoanRepository(unittest.TestCase):
+    """
+    Тесты хранилища выдач в файле JSON lines.
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.data_file = os.path.join(self.tmp_dir.name, "loans.jsonl")
+        self.repository = JsonLinesLoanRepository(self.data_file)
+        self.repository.add_loan(Loan(1, 10, "Иван Петров", date(2024, 3, 1), date(2024, 3, 15)))
+        self.repository.add_loan(Loan(2, 20, "Анна Смирнова", date(2024, 3, 2), date(2024, 3, 5)))
+        self.repository.add_loan(Loan(3, 30, "Иван Пётров", date(2024, 3, 3), date(2024, 3, 10)))
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_indexes(self):
+        """Тест: открытая выдача книги, выдачи читателя и просроченные выдачи по сроку возврата."""
+        self.assertEqual(self.repository.active_loan(20).loan_id, 2)
+        self.assertEqual([loan.loan_id for loan in self.repository.loans_of_borrower("ИВАН ПЕТРОВ")], [1, 3])
+        overdue = self.repository.overdue_loans(date(2024, 3, 11))
+        self.assertEqual([loan.loan_id for loan in overdue], [2, 3])
+        self.assertEqual(self.repository.overdue_loans(date(2024, 3, 5)), [])
+
+        self.assertTrue(self.repository.close_loan(2, date(2024, 3, 12)))
+        self.assertFalse(self.repository.close_loan(2, date(2024, 3, 12)))
+        self.assertIsNone(self.repository.active_loan(20))
+        self.assertEqual([loan.loan_id for loan in self.repository.overdue_loans(date(2024, 3, 20))], [3, 1])
+        self.assertEqual(self.repository.loans_of_borrower("иван петров", active_only=True)[0].loan_id, 1)
+
+    def test_book_cannot_have_two_open_loans(self):
+        """Тест: вторая открытая выдача той же книги и повтор ID отклоняются."""
+        with self.assertRaises(ValueError):
+            self.repository.add_loan(Loan(4, 10, "Анна Смирнова", date(2024, 3, 4), date(2024, 3, 18)))
+        with self.assertRaises(ValueError):
+            self.repository.add_loan(Loan(1, 40, "Анна Смирнова", date(2024, 3, 4), date(2024, 3, 18)))
+        self.assertEqual(self.repository.next_loan_id(), 4)
+
+    def test_changes_are_appended(self):
+        """Тест: каждое изменение дописывается одной строкой, история сохраняется между запусками."""
+        size = os.path.getsize(self.data_file)
+        self.repository.close_loan(1, date(2024, 3, 14))
+        with open(self.data_file, "rb") as file:
+            file.seek(size)
+            self.assertEqual(json.loads(file.read()),
+                             {"op": "return", "loan_id": 1, "returned_on": "2024-03-14"})
+
+        reloaded = JsonLinesLoanRepository(self.data_file)
+        self.assertEqual(reloaded.loans_of_book(10)[0].returned_on, date(2024, 3, 14))
+        self.assertEqual(reloaded.next_loan_id(), 4)
+
+    def test_other_instance_changes_are_visible(self):
+        """Тест: изменения другого экземпляра подгружаются без перечитывания файла."""
+        other = JsonLinesLoanRepository(self.data_file)
+        self.assertIsNotNone(other.active_loan(10))
+        with other.transaction():
+            loan_id = other.next_loan_id()
+            other.add_loan(Loan(loan_id, 40, "Анна Смирнова", date(2024, 3, 4), date(2024, 3, 18)))
+            other.close_loan(1, date(2024, 3, 4))
+        self.assertEqual(self.repository.active_loan(40).loan_id, 4)
+        self.assertIsNone(self.repository.active_loan(10))
+        self.assertEqual(self.repository.next_loan_id(), 5)
+
+    def test_compaction(self):
+        """Тест: накопившиеся записи о возвратах сворачиваются, другие экземпляры перечитывают файл."""
+        other = JsonLinesLoanRepository(self.data_file)
+        other.active_loan(10)
+        with mock.patch.object(jsonl_loan_repository, "COMPACTION_MIN_RECORDS", 2):
+            self.repository.close_loan(1, date(2024, 3, 5))
+            self.repository.close_loan(2, date(2024, 3, 5))
+            self.repository.close_loan(3, date(2024, 3, 5))
+        with open(self.data_file, encoding="utf-8") as file:
+            records = [json.loads(line) for line in file]
+        self.assertEqual([record["op"] for record in records], ["issue"] * 3)
+        self.assertTrue(all(not loan.is_active for loan in other.loans_of_borrower("иван петров")))
+
+    def test_torn_record_is_discarded(self):
+        """Тест: недописанная после сбоя запись отбрасывается."""
+        with open(self.data_file, "ab") as file:
+            file.write(b'{"op":"return","loan_id":1')
+        reloaded = JsonLinesLoanRepository(self.data_file)
+        self.assertTrue(reloaded.get_loan(1).is_active)
+        reloaded.close_loan(1, date(2024, 3, 5))
+        self.assertFalse(JsonLinesLoanRepository(self.data_file).get_loan(1).is_active)
+
+
+class TestReadWriteLock(unittest.TestCase):
+    """
+    Тесты блокировки читателей-писателей.
+    """
+
+    def test_readers_run_in_parallel(self):
+        """Тест: несколько читателей одновременно удерживают блокировку."""
+        lock = ReadWriteLock()
+        barrier = threading.Barrier(3, timeout=5)
+
+        def reader() -> None:
+            with lock.read():
+                barrier.wait()
+
+        threads = [threading.Thread(target=reader) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        barrier.wait()
+        for thread in threads:
+            thread.join()
+
+    def test_writer_excludes_readers(self):
+        """Тест: читатель ждёт завершения записи, а писатель может повторно захватить блокировку."""
+        lock = ReadWriteLock()
+        events = []
+
+        def read() -> None:
+            with lock.read():
+                events.append("read")
+
+        with lock.write():
+            reader = threading.Thread(target=read)
+            with lock.write(), lock.read():
+                events.append("write")
+            reader.start()
+            reader.join(0.1)
+            self.assertTrue(reader.is_alive())
+        reader.join(5)
+        self.assertEqual(events, ["write", "read"])
+
+
+class TestSqliteLibraryRepository(unittest.TestCase):
+    """
+    Тесты для SQLite-репозитория на временной базе.
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.data_file = os.path.join(self.tmp_dir.name, "books.sqlite3")
+        self.repository = SqliteLibraryRepository(self.data_file)
+        self.repository.add_book_to_library(Book(1, "Изучаем Python", "Эрик Мэтиз", 2024))
+        self.repository.add_book_to_library(Book(2, "Грокаем Алгоритмы", "Адитья Бхаргава", 2017))
+
+    def tearDown(self):
+        self.repository.close()
+        self.tmp_dir.cleanup()
+
+    def test_search_is_case_insensitive_for_cyrillic(self):
+        """Тест поиска: регистр кириллицы не учитывается."""
+        result = self.repository.search_book_in_library(SearchCriteria(title="грокаем"))
+        self.assertEqual([book.book_id for book in result], [2])
+        result = self.repository.search_book_in_library(SearchCriteria(author="мэтиз", year=2017))
+        self.assertEqual([book.book_id for book in result], [1, 2])
+        self.assertIsNone(self.repository.search_book_in_library(SearchCriteria(title="Толстой")))
+
+    def test_search_by_year_range_and_status(self):
+        """Тест поиска по диапазону лет и статусу в SQL."""
+        self.repository.change_book_status(2, BookStatus("Выдана"))
+        search = self.repository.search_book_in_library
+        criteria = SearchCriteria(year_from=2000, status=BookStatus("В Наличии"), match_all=True)
+        self.assertEqual([b.book_id for b in search(criteria)], [1])
+        self.assertEqual(search(criteria)[0].status.value, "В наличии")
+        self.assertEqual([b.book_id for b in search(SearchCriteria(year_to=2020))], [2])
+
+    def test_transaction_is_rolled_back_on_error(self):
+        """Тест транзакции: при ошибке пакет не сохраняется целиком."""
+        with self.assertRaises(sqlite3.IntegrityError):
+            self.repository.add_books_to_library([Book(3, "Идиот", "Фёдор Достоевский", 1869),
+                                                  Book(1, "Дубликат", "Автор", 2000)])
+        self.assertIsNone(self.repository.get_book_by_id(3))
+        with self.assertRaises(RuntimeError):
+            with self.repository.transaction():
+                self.repository.change_book_status(1, BookStatus("Выдана"))
+                raise RuntimeError
+        self.assertEqual(self.repository.get_book_by_id(1).status.value, "В наличии")
+
+    def test_ranked_search_is_rebuilt_after_changes(self):
+        """Тест ранжированного поиска в SQLite: индекс в памяти перестраивается после изменений."""
+        self.assertEqual([book.book_id for book in self.repository.search_ranked("Бхаргва")], [2])
+        self.repository.remove_book_from_library(2)
+        self.assertEqual(self.repository.search_ranked("Бхаргва"), [])
+
+    def test_ranked_index_is_updated_incrementally(self):
+        """Тест: свои изменения переносятся в индекс без перестройки, изменения другого соединения и откат - с ней."""
+        self.repository.search_ranked("мэтиз")
+        with mock.patch.object(RankedIndex, "build", side_effect=RankedIndex.build) as build:
+            self.repository.add_book_to_library(Book(3, "Алгоритмы на Python", "Бхаргава", 2020))
+            self.repository.change_book_status(1, BookStatus.ISSUED)
+            self.repository.remove_books_from_library([1])
+            self.assertEqual([book.book_id for book in self.repository.search_ranked("алгоритмы")], [2, 3])
+            self.assertEqual(self.repository.search_ranked("мэтиз"), [])
+            build.assert_not_called()
+
+            with self.assertRaises(sqlite3.IntegrityError):
+                self.repository.add_books_to_library([Book(4, "Бесы", "Достоевский", 1872), Book(2, "Дубль", "А", 1)])
+            self.assertEqual(self.repository.search_ranked("бесы"), [])
+            other = SqliteLibraryRepository(self.data_file)
+            other.add_book_to_library(Book(5, "Идиот", "Достоевский", 1869))
+            other.close()
+            self.assertEqual([book.book_id for book in self.repository.search_ranked("идиот")], [5])
+            self.assertEqual(build.call_count, 2)
+
+    def test_suggest_reads_prefix_range(self):
+        """Тест автодополнения в SQLite: названия и авторы по началу строки."""
+        self.repository.add_book_to_library(Book(3, "Эргономика", "Автор", 2000))
+        self.assertEqual(self.repository.suggest("Э"), ["Эргономика", "Эрик Мэтиз"])
+        self.assertEqual(self.repository.suggest("эрг", limit=5), ["Эргономика"])
+        self.assertEqual(self.repository.suggest("ю"), [])
+
+    def test_generation_tracks_other_connections(self):
+        """Тест: номер версии меняется при изменениях через это и через другое соединение."""
+        generation = self.repository.generation()
+        self.assertFalse(self.repository.change_book_status(999, BookStatus.ISSUED))
+        self.assertEqual(self.repository.generation(), generation)
+        other = SqliteLibraryRepository(self.data_file)
+        other.remove_book_from_library(2)
+        other.close()
+        self.assertNotEqual(self.repository.generation(), generation)
+
+    def test_iter_books_pagination(self):
+        """Тест постраничного перебора в SQL."""
+        ids = lambda page, criteria=None: [b.book_id for b in self.repository.iter_books(page, criteria)]
+        self.assertEqual(ids(PageRequest(limit=1)), [1])
+        self.assertEqual(ids(PageRequest(limit=1, after=(1, 1))), [2])
+        self.assertEqual(ids(PageRequest(order_by="year", descending=True, offset=1)), [2])
+        self.assertEqual(ids(PageRequest(order_by="title", after=("Грокаем Алгоритмы", 2))), [1])
+        self.assertEqual(ids(PageRequest(), SearchCriteria(author="бхаргава")), [2])
+
+    def test_change_status_and_remove(self):
+        """Тест изменения статуса и удаления книги."""
+        self.assertTrue(self.repository.change_book_status(1, BookStatus("Выдана")))
+        self.assertEqual(self.repository.get_book_by_id(1).status.value, "Выдана")
+        self.assertTrue(self.repository.remove_book_from_library(1))
+        self.assertFalse(self.repository.remove_book_from_library(1))
+        self.assertFalse(self.repository.change_book_status(1, BookStatus("Выдана")))
+        self.assertIsNone(self.repository.get_book_by_id(1))
+
+    def test_batch_status_change_and_remove(self):
+        """Тест пакетных операций: ненайденные ID возвращаются в порядке запроса."""
+        self.assertEqual(self.repository.change_books_status([2, 9, 1, 8], BookStatus.ISSUED), [9, 8])
+        self.assertEqual(self.repository.get_book_by_id(2).status, BookStatus.ISSUED)
+        self.assertEqual(self.repository.remove_books_from_library(iter([1, 9])), [9])
+        self.assertEqual([book.book_id for book in self.repository.iter_books(PageRequest())], [2])
+
+    def test_ids_are_persisted_and_not_reused(self):
+        """Тест выделения ID: счётчик хранится в базе и не откатывается после удаления."""
+        self.assertEqual(self.repository.reserve_book_ids(2), range(3, 5))
+        self.repository.remove_book_from_library(2)
+        self.repository.close()
+        self.repository = SqliteLibraryRepository(self.data_file)
+        self.assertEqual(self.repository.next_book_id(), 5)
+        self.assertEqual(len(self.repository.books), 1)
+
+    def test_isbn_column_is_added_to_old_database(self):
+        """Тест: в базу прежней версии без столбца ISBN он добавляется при открытии."""
+        self.repository.close()
+        old_file = os.path.join(self.tmp_dir.name, "old.sqlite3")
+        with sqlite3.connect(old_file) as connection:
+            connection.executescript(
+                "CREATE TABLE books (book_id INTEGER PRIMARY KEY, title TEXT NOT NULL, author TEXT NOT NULL,"
+                " year INTEGER NOT NULL, status TEXT NOT NULL, title_norm TEXT NOT NULL, author_norm TEXT NOT NULL);"
+                "INSERT INTO books VALUES (1, 'Идиот', 'Фёдор Достоевский', 1869, 'в наличии', 'идиот', 'федор');"
+            )
+        connection.close()
+        self.repository = SqliteLibraryRepository(old_file)
+        self.assertIsNone(self.repository.get_book_by_id(1).isbn)
+        self.repository.add_book_to_library(Book(2, "Бесы", "Фёдор Достоевский", 1872, isbn="0-306-40615-2"))
+        self.repository.close()
+        self.repository = SqliteLibraryRepository(old_file)
+        self.assertEqual([book.isbn for book in self.repository.books], [None, "9780306406157"])
+
+    def test_statuses_of_old_database_are_lowercased(self):
+        """Тест: статусы, записанные прежней версией как есть, находятся поиском по статусу после открытия."""
+        self.repository.close()
+        with sqlite3.connect(self.data_file) as connection:
+            connection.execute("UPDATE books SET status = 'В наличии'")
+            connection.execute("UPDATE books SET status = 'Выдана' WHERE book_id = 2")
+        connection.close()
+        self.repository = SqliteLibraryRepository(self.data_file)
+        result = self.repository.search_book_in_library(SearchCriteria(status=BookStatus.AVAILABLE))
+        self.assertEqual([book.book_id for book in result], [1])
+        result = self.repository.search_book_in_library(SearchCriteria(status=BookStatus.ISSUED))
+        self.assertEqual([book.book_id for book in result], [2])
+
+
+class TestColumnarLibraryRepository(unittest.TestCase):
+    """
+    Тесты для столбцового хранилища в памяти.
+    """
+
+    def setUp(self):
+        self.repository = ColumnarLibraryRepository([
+            Book(1, "Изучаем Python", "Эрик Мэтиз", 2024),
+            Book(2, "Грокаем Алгоритмы", "Адитья Бхаргава", 2017, BookStatus("Выдана")),
+            Book(4, "Ёжик в тумане", "Сергей Козлов", 1969),
+        ])
+
+    def test_get_add_and_replace(self):
+        """Тест получения, вставки в середину и замены книги."""
+        self.repository.add_book_to_library(Book(3, "Заяц", "Сергей Козлов", 1970))
+        self.assertEqual([book.book_id for book in self.repository.books], [1, 2, 3, 4])
+        self.assertEqual(self.repository.get_book_by_id(3).author, "Сергей Козлов")
+        self.repository.add_book_to_library(Book(3, "Заяц-хвастун", "Сергей Козлов", 1971, isbn="9780306406157"))
+        self.assertEqual(self.repository.get_book_by_id(3).title, "Заяц-хвастун")
+        self.assertEqual(self.repository.get_book_by_id(3).isbn, "9780306406157")
+        self.assertIsNone(self.repository.get_book_by_id(4).isbn)
+        self.assertEqual(self.repository.next_book_id(), 5)
+
+    def test_ranked_index_is_updated_incrementally(self):
+        """Тест: после первого ранжированного поиска изменения переносятся в индекс без перестройки."""
+        self.assertEqual([book.book_id for book in self.repository.search_ranked("ежик")], [4])
+        with mock.patch.object(RankedIndex, "build") as build:
+            self.repository.add_book_to_library(Book(3, "Ежик и медвежонок", "Сергей Козлов", 1970))
+            self.repository.add_book_to_library(Book(4, "Заяц", "Сергей Козлов", 1971))
+            self.repository.change_book_status(1, BookStatus.ISSUED)
+            self.assertEqual([book.book_id for book in self.repository.search_ranked("ежик")], [3])
+            for book_id in (1, 2):
+                self.repository.remove_book_from_library(book_id)
+            self.assertEqual([book.book_id for book in self.repository.search_ranked("козлов")], [3, 4])
+            self.assertEqual(self.repository.search_ranked("мэтиз"), [])
+        build.assert_not_called()
+
+    def test_search_over_columns(self):
+        """Тест поиска по столбцам: подстрока названия, автор, годы и статус."""
+        search = lambda criteria: [b.book_id for b in self.repository.search_book_in_library(criteria) or []]
+        self.assertEqual(search(SearchCriteria(title="ежик")), [4])
+        self.assertEqual(search(SearchCriteria(title="а")), [1, 2, 4])
+        self.assertEqual(search(SearchCriteria(author="козлов", year=2024)), [1, 4])
+        criteria = SearchCriteria(year_from=1950, status=BookStatus("В наличии"), match_all=True)
+        self.assertEqual(search(criteria), [1, 4])
+        self.assertEqual(self.repository.count_by_status(BookStatus("Выдана")), 1)
+
+    def test_remove_and_change_status(self):
+        """Тест удаления и изменения статуса."""
+        self.assertTrue(self.repository.change_book_status(1, BookStatus("Выдана")))
+        self.assertTrue(self.repository.remove_book_from_library(2))
+        self.assertFalse(self.repository.remove_book_from_library(2))
+        self.assertFalse(self.repository.change_book_status(2, BookStatus("Выдана")))
+        self.assertEqual(self.repository.count_by_status(BookStatus("Выдана")), 1)
+        self.assertIsNone(self.repository.search_book_in_library(SearchCriteria(title="грокаем")))
+        self.assertEqual(len(self.repository), 2)
+
+    def test_compaction(self):
+        """Тест уплотнения столбцов после массового удаления."""
+        columnar_library_repository.COMPACT_THRESHOLD = 1
+        try:
+            self.repository.remove_book_from_library(1)
+            self.repository.remove_book_from_library(2)
+        finally:
+            columnar_library_repository.COMPACT_THRESHOLD = 1024
+        self.assertEqual(len(self.repository._ids), 1)
+        self.assertEqual(self.repository.search_book_in_library(SearchCriteria(title="туман"))[0].book_id, 4)
+
+    def test_iter_books_pagination(self):
+        """Тест постраничного перебора по столбцам."""
+        self.repository.remove_book_from_library(2)
+        ids = lambda page, criteria=None: [b.book_id for b in self.repository.iter_books(page, criteria)]
+        self.assertEqual(ids(PageRequest(limit=1, after=(1, 1))), [4])
+        self.assertEqual(ids(PageRequest(descending=True)), [4, 1])
+        self.assertEqual(ids(PageRequest(order_by="year", limit=1)), [4])
+        self.assertEqual(ids(PageRequest(order_by="author"), SearchCriteria(year_from=1900)), [4, 1])
+
+
+class TestShardedLibraryRepository(unittest.TestCase):
+    """
+    Тесты для параллельного поиска по шардам в рабочих процессах.
+    """
+
+    def setUp(self):
+        self.base = ColumnarLibraryRepository(
+            Book(book_id, f"Книга {book_id}", f"Автор {book_id % 3}", 2000 + book_id % 5) for book_id in range(1, 11)
+        )
+        self.repository = ShardedLibraryRepository(self.base, shards=3)
+        self.loads = 0
+        load_shards = self.repository._load_shards
+        self.repository._load_shards = lambda: (setattr(self, "loads", self.loads + 1), load_shards())
+
+    def tearDown(self):
+        self.repository.close()
+
+    def search(self, **criteria) -> list[int]:
+        return [book.book_id for book in self.repository.search_book_in_library(SearchCriteria(**criteria)) or []]
+
+    def test_results_of_shards_are_merged_by_id(self):
+        """Тест поиска: результаты всех шардов сливаются по возрастанию ID и совпадают с обычным поиском."""
+        criteria = SearchCriteria(author="автор 1", year_from=2001, match_all=True)
+        expected = [book.book_id for book in self.base.search_book_in_library(criteria)]
+        self.assertEqual(self.search(author="автор 1", year_from=2001, match_all=True), expected)
+        self.assertEqual(self.search(title="книга"), list(range(1, 11)))
+        self.assertEqual(self.repository._bounds, [5, 9])
+        self.assertEqual(self.search(title="нет такой"), [])
+
+    def test_changes_are_sent_to_shards_incrementally(self):
+        """Тест изменений: шарды получают сами изменения и не перезагружаются."""
+        self.search(title="книга")
+        self.repository.add_book_to_library(Book(11, "Новая книга", "Автор 1", 2024))
+        self.repository.remove_book_from_library(1)
+        self.repository.change_book_status(5, BookStatus.ISSUED)
+        with self.repository.transaction():
+            self.assertEqual(self.repository.remove_books_from_library([2, 42]), [42])
+            self.assertEqual(self.search(title="книга 2"), [])
+            self.repository.change_books_status([6, 7], BookStatus.ISSUED)
+        self.assertEqual(self.search(status=BookStatus.ISSUED), [5, 6, 7])
+        self.assertEqual(self.search(title="новая"), [11])
+        self.assertEqual(self.loads, 1)
+
+    def test_shards_are_reloaded_after_outside_changes(self):
+        """Тест: после изменения каталога в обход обёртки или ошибки в транзакции шарды загружаются заново."""
+        self.search(title="книга")
+        self.base.change_book_status(3, BookStatus.ISSUED)
+        self.repository.change_book_status(4, BookStatus.ISSUED)
+        self.assertEqual(self.search(status=BookStatus.ISSUED), [3, 4])
+        self.assertEqual(self.loads, 2)
+
+        with self.assertRaises(RuntimeError):
+            with self.repository.transaction():
+                self.repository.remove_book_from_library(3)
+                raise RuntimeError("сбой")
+        self.assertEqual(self.search(status=BookStatus.ISSUED), [4])
+        self.assertEqual(self.loads, 3)
+
+
+class TestMmapLibraryRepository(unittest.TestCase):
+    """
+    Тесты для хранилища в файле записей фиксированной длины.
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.data_file = os.path.join(self.tmp_dir.name, "books.rec")
+        self.repository = MmapLibraryRepository(self.data_file)
+        self.repository.add_book_to_library(Book(1, "Изучаем Python", "Эрик Мэтиз", 2024))
+        self.repository.add_book_to_library(Book(2, "Грокаем Алгоритмы", "Адитья Бхаргава", 2017))
+
+    def tearDown(self):
+        self.repository.close()
+        self.tmp_dir.cleanup()
+
+    def reopen(self):
+        self.repository.close()
+        self.repository = MmapLibraryRepository(self.data_file)
+
+    def test_status_change_is_in_place(self):
+        """Тест изменения статуса: меняется только байт статуса, размер файлов не растёт."""
+        sizes = os.path.getsize(self.data_file), os.path.getsize(self.repository.heap_file)
+        self.assertTrue(self.repository.change_book_status(2, BookStatus("Выдана")))
+        self.assertEqual((os.path.getsize(self.data_file), os.path.getsize(self.repository.heap_file)), sizes)
+        self.reopen()
+        self.assertEqual(self.repository.get_book_by_id(2).status, BookStatus.ISSUED)
+
+    def test_free_slots_are_reused(self):
+        """Тест удаления: освобождённый слот занимает следующая добавленная книга, ID не переиспользуется."""
+        slot = self.repository._slots[1]
+        self.assertTrue(self.repository.remove_book_from_library(1))
+        self.assertFalse(self.repository.remove_book_from_library(1))
+        book_id = self.repository.next_book_id()
+        self.repository.add_book_to_library(Book(book_id, "Ёжик в тумане", "Сергей Козлов", 1969))
+        self.assertEqual(book_id, 3)
+        self.assertEqual(self.repository._slots[3], slot)
+        self.reopen()
+        self.assertEqual([book.book_id for book in self.repository.books], [2, 3])
+        self.assertEqual(self.repository.next_book_id(), 4)
+
+    def test_batch_remove_frees_slots(self):
+        """Тест пакетного удаления: слоты освобождаются, список ID перестраивается."""
+        self.assertEqual(self.repository.remove_books_from_library([1, 5, 2]), [5])
+        self.assertEqual(self.repository.books, [])
+        self.assertIsInstance(self.repository._ids, array)
+        self.reopen()
+        self.assertEqual(self.repository.books, [])
+        self.repository.add_book_to_library(Book(3, "Ёжик в тумане", "Сергей Козлов", 1969))
+        self.assertIn(self.repository._slots[3], (0, 1))
+
+    def test_file_grows_and_search(self):
+        """Тест роста файла и поиска по записям."""
+        with self.repository.transaction():
+            for book_id in range(3, 2100):
+                self.repository.add_book_to_library(Book(book_id, f"Книга {book_id}", "Автор", 1900 + book_id % 100))
+        self.reopen()
+        self.assertEqual(len(self.repository.books), 2099)
+        result = self.repository.search_book_in_library(SearchCriteria(title="грокаем", year=2024))
+        self.assertEqual([book.book_id for book in result], [1, 2])
+        criteria = SearchCriteria(author="автор", year_from=1998, match_all=True)
+        self.assertEqual(len(self.repository.search_book_in_library(criteria)), 42)
+        page = PageRequest(order_by="title", limit=2, descending=True)
+        self.assertEqual([book.title for book in self.repository.iter_books(page)], ["Книга 999", "Книга 998"])
+        self.assertEqual([book.book_id for book in self.repository.iter_books(PageRequest(limit=2, offset=1))], [2, 3])
+
+    def test_ranked_index_is_updated_incrementally(self):
+        """Тест: после первого ранжированного поиска изменения переносятся в индекс без перестройки."""
+        self.assertEqual([book.book_id for book in self.repository.search_ranked("грокаем")], [2])
+        with mock.patch.object(RankedIndex, "build") as build:
+            self.repository.add_book_to_library(Book(3, "Грокаем глубокое обучение", "Эндрю Траск", 2019))
+            self.repository.add_book_to_library(Book(2, "Алгоритмы", "Адитья Бхаргава", 2017))
+            self.assertEqual([book.book_id for book in self.repository.search_ranked("грокаем")], [3])
+            self.repository.remove_book_from_library(3)
+            self.repository.remove_books_from_library([1])
+            self.assertEqual(self.repository.search_ranked("грокаем мэтиз"), [])
+            self.assertEqual([book.book_id for book in self.repository.search_ranked("алгоритмы")], [2])
+        build.assert_not_called()
+
+    def test_iteration_skips_removed_books(self):
+        """Тест: книги, удалённые во время перебора страницы, пропускаются."""
+        books = self.repository.iter_books(PageRequest())
+        self.assertEqual(next(books).book_id, 1)
+        self.repository.remove_book_from_library(2)
+        self.assertEqual(list(books), [])
+
+        self.repository.add_book_to_library(Book(3, "Ёжик в тумане", "Сергей Козлов", 1969))
+        books = self.repository.iter_books(PageRequest(order_by="title"))
+        self.assertEqual(next(books).book_id, 3)
+        self.repository.remove_books_from_library([1])
+        self.assertEqual(list(books), [])
+
+    def test_dead_space_is_compacted(self):
+        """Тест сжатия: строки удалённых и заменённых книг и свободные слоты убираются из файлов."""
+        with mock.patch.object(mmap_library_repository, "COMPACT_THRESHOLD", 0):
+            with self.repository.transaction():
+                for book_id in range(3, 50):
+                    self.repository.add_book_to_library(Book(book_id, f"Книга {book_id}", "Автор", 2000))
+            self.repository.add_book_to_library(Book(2, "Алгоритмы", "Адитья Бхаргава", 2017))
+            self.repository.remove_books_from_library(range(3, 50))
+
+        live = [Book(1, "Изучаем Python", "Эрик Мэтиз", 2024), Book(2, "Алгоритмы", "Адитья Бхаргава", 2017)]
+        heap_size = sum(len(book.title.encode()) + len(book.author.encode()) for book in live)
+        self.assertEqual(os.path.getsize(self.repository.heap_file), heap_size)
+        self.assertEqual(self.repository._slot_count, 2)
+        self.assertEqual(self.repository._free_head, mmap_library_repository.NO_SLOT)
+        self.assertEqual(self.repository.books, live)
+        self.assertEqual(self.repository.next_book_id(), 50)
+        self.reopen()
+        self.assertEqual(self.repository.books, live)
+        self.assertFalse([name for name in os.listdir(self.tmp_dir.name) if name.endswith(".compact")])
+
+    def test_interrupted_compaction_is_finished(self):
+        """Тест: сжатие, прерванное при замене файлов, завершается сразу или при следующем открытии."""
+        replace = os.replace
+        failures = [1]
+
+        def fail_on_data_file(source, target):
+            if target == self.data_file and failures:
+                failures.pop()
+                raise OSError("сбой")
+            replace(source, target)
+
+        self.repository.remove_book_from_library(1)
+        with mock.patch.object(mmap_library_repository.os, "replace", side_effect=fail_on_data_file):
+            with self.assertRaises(OSError):
+                self.repository._compact()
+        self.assertEqual(self.repository.books, [Book(2, "Грокаем Алгоритмы", "Адитья Бхаргава", 2017)])
+        self.assertEqual(self.repository._slot_count, 1)
+        self.assertFalse(os.path.exists(self.data_file + ".compact"))
+
+        self.repository.remove_book_from_library(2)
+        failures.extend([1, 1])
+        with mock.patch.object(mmap_library_repository.os, "replace", side_effect=fail_on_data_file):
+            with self.assertRaises(OSError):
+                self.repository._compact()
+        self.assertTrue(os.path.exists(self.data_file + ".compact"))
+        self.repository = MmapLibraryRepository(self.data_file)
+        self.assertEqual(self.repository.books, [])
+        self.assertEqual(self.repository._slot_count, 0)
+        self.assertFalse(os.path.exists(self.data_file + ".compact"))
+
+    def test_isbn_and_upgrade_from_version_1(self):
+        """Тест ISBN: хранится в записи; файл версии 1 без ISBN переводится в новую раскладку при открытии."""
+        self.repository.add_book_to_library(Book(3, "Бесы", "Фёдор Достоевский", 1872, isbn="0-306-40615-2"))
+        self.reopen()
+        self.assertEqual(self.repository.get_book_by_id(3).isbn, "9780306406157")
+        self.assertIsNone(self.repository.get_book_by_id(1).isbn)
+
+        old_file = os.path.join(self.tmp_dir.name, "old.rec")
+        title, author = "Идиот".encode(), "Фёдор Достоевский".encode()
+        with open(old_file + ".heap", "wb") as file:
+            file.write(title + author)
+        with open(old_file, "wb") as file:
+            file.write(mmap_library_repository.HEADER.pack(b"LMRF", 1, 2, 8, 1).ljust(64, b"\0"))
+            file.write(mmap_library_repository.RECORD_V1.pack(7, 1869, 0, 0, len(title), len(title), len(author)))
+            file.write(mmap_library_repository.RECORD_V1.pack(-1, 0, 255, 0, 0, 0, 0))
+        self.repository.close()
+        self.repository = MmapLibraryRepository(old_file)
+        self.assertEqual(self.repository.books, [Book(7, "Идиот", "Фёдор Достоевский", 1869)])
+        self.repository.add_book_to_library(Book(8, "Бесы", "Фёдор Достоевский", 1872))
+        self.assertEqual(self.repository._slots[8], 1)
+        self.repository.close()
+        self.repository = MmapLibraryRepository(old_file)
+        self.assertEqual([book.book_id for book in self.repository.books], [7, 8])
+
+
+if __name__ == "__main__":
+    unittest.main()
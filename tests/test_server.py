@@ -0,0 +1,154 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from src.application.metrics.metrics_registry import MetricsRegistry
+from src.domain.entities.book import Book
+from src.infrastructure.repositories.json_library_repository import JsonLibraryRepository
+from src.infrastructure.repositories.jsonl_loan_repository import JsonLinesLoanRepository
+from src.presentation.server.library_server import LibraryServer
+
+
+class TestLibraryServer(unittest.IsolatedAsyncioTestCase):
+    """
+    Тесты asyncio-сервера на временном JSON-хранилище.
+    """
+
+    async def asyncSetUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.data_file = os.path.join(self.tmp_dir.name, "books.json")
+        repository = JsonLibraryRepository(self.data_file)
+        repository.add_book_to_library(Book(1, "Изучаем Python", "Эрик Мэтиз", 2024))
+        self.server = LibraryServer(lambda: JsonLibraryRepository(self.data_file))
+        listener = await self.server.start()
+        self.port = listener.sockets[0].getsockname()[1]
+        self.clients = []
+
+    async def asyncTearDown(self):
+        for _, writer in self.clients:
+            writer.close()
+            await writer.wait_closed()
+        await self.server.close()
+        self.tmp_dir.cleanup()
+
+    async def connect(self) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        client = await asyncio.open_connection("127.0.0.1", self.port)
+        self.clients.append(client)
+        return client
+
+    async def call_many(self, requests: list[dict]) -> dict:
+        """Отправляет запросы одним пакетом и возвращает ответы по id."""
+        reader, writer = await self.connect()
+        writer.write(b"".join(json.dumps(request).encode("utf-8") + b"\n" for request in requests))
+        await writer.drain()
+        responses = {}
+        for _ in requests:
+            response = json.loads(await reader.readline())
+            responses[response["id"]] = response
+        return responses
+
+    async def call(self, method: str, **params) -> dict:
+        return (await self.call_many([{"id": 1, "method": method, "params": params}]))[1]
+
+    async def test_add_search_and_change_status(self):
+        """Тест: добавление, поиск и изменение статуса через сокет."""
+        added = await self.call("add_book", title="Грокаем Алгоритмы", author="Адитья Бхаргава", year=2017,
+                                isbn="978-5-4461-0923-4")
+        self.assertEqual(added, {"id": 1, "result": 2})
+        self.assertEqual((await self.call("change_status", book_id=2, status="Выдана"))["result"], None)
+
+        found = await self.call("search", author="бхаргава")
+        self.assertEqual(found["result"], [{"book_id": 2, "title": "Грокаем Алгоритмы", "author": "Адитья Бхаргава",
+                                            "year": 2017, "status": "Выдана", "isbn": "9785446109234"}])
+        self.assertEqual(JsonLibraryRepository(self.data_file).get_book_by_id(2).status.value, "Выдана")
+
+    async def test_errors_are_reported(self):
+        """Тест: ошибки сценариев и протокола возвращаются клиенту, соединение не рвётся."""
+        responses = await self.call_many([
+            {"id": 1, "method": "remove_book", "params": {"book_id": 999}},
+            {"id": 2, "method": "unknown"},
+            {"id": 3, "method": "add_book", "params": {"title": "Без автора", "year": 2000}},
+        ])
+        self.assertEqual(responses[1]["error"], "Книга не найдена")
+        self.assertIn("unknown", responses[2]["error"])
+        self.assertEqual(responses[3]["error"], "Не задан параметр: author")
+
+    async def test_duplicate_add_is_rejected(self):
+        """Тест: книга, которая уже есть в каталоге, не добавляется повторно без allow_duplicate."""
+        duplicate = await self.call("add_book", title="изучаем python", author="Эрик Мэтиз", year=2024)
+        self.assertEqual(duplicate["error"], "Такая книга уже есть в каталоге (ID: 1)")
+        self.assertEqual(len(JsonLibraryRepository(self.data_file).books), 1)
+        added = await self.call("add_book", title="Изучаем Python", author="Эрик Мэтиз", year=2024,
+                                allow_duplicate=True)
+        self.assertEqual(added["result"], 2)
+
+    async def test_metrics(self):
+        """Тест: метрики сценариев доступны клиенту, только если сбор метрик включён."""
+        self.assertIsNone((await self.call("metrics"))["result"])
+
+        await self.server.close()
+        self.server = LibraryServer(lambda: JsonLibraryRepository(self.data_file), metrics=MetricsRegistry())
+        self.port = (await self.server.start()).sockets[0].getsockname()[1]
+        await self.call("search", author="мэтиз")
+        text = (await self.call("metrics"))["result"]
+        self.assertIn('library_use_case_calls_total{use_case="SearchBookUseCase"} 1', text)
+
+    async def test_loans(self):
+        """Тест: выдача и возврат книги через сокет, если серверу передано хранилище выдач."""
+        self.assertEqual((await self.call("issue_book", book_id=1, borrower="Иван"))["error"], "Учёт выдач не включён")
+
+        await self.server.close()
+        loans_file = os.path.join(self.tmp_dir.name, "loans.jsonl")
+        self.server = LibraryServer(lambda: JsonLibraryRepository(self.data_file),
+                                    loans_factory=lambda: JsonLinesLoanRepository(loans_file))
+        self.port = (await self.server.start()).sockets[0].getsockname()[1]
+        self.assertEqual((await self.call("issue_book", book_id=1, borrower="Иван Петров"))["result"], 1)
+        self.assertEqual((await self.call("change_status", book_id=1, status="Выдана"))["error"],
+                         "Книга выдаётся через оформление выдачи с указанием читателя")
+        loans = (await self.call("borrower_loans", borrower="иван петров"))["result"]
+        self.assertEqual([(loan["book_id"], loan["title"]) for loan in loans], [(1, "Изучаем Python")])
+        self.assertEqual((await self.call("return_book", book_id=1))["result"], None)
+        self.assertFalse(JsonLinesLoanRepository(loans_file).get_loan(1).is_active)
+        self.assertEqual(JsonLibraryRepository(self.data_file).get_book_by_id(1).status.value, "В наличии")
+
+    async def test_close_closes_loan_repository(self):
+        """Тест: при остановке сервер закрывает и хранилище выдач."""
+        loans = mock.Mock()
+        server = LibraryServer(lambda: JsonLibraryRepository(self.data_file), loans_factory=lambda: loans)
+        await server.start()
+        await server.close()
+        loans.close.assert_called_once_with()
+
+    async def test_list_books_returns_cursor(self):
+        """Тест постраничного просмотра: курсор из ответа продолжает выдачу."""
+        for year in (2001, 2002, 2003):
+            await self.call("add_book", title=f"Книга {year}", author="Автор", year=year)
+        first = (await self.call("list_books", page_size=2))["result"]
+        self.assertEqual([book["book_id"] for book in first["books"]], [1, 2])
+        second = (await self.call("list_books", page_size=2, after=first["next"]))["result"]
+        self.assertEqual([book["book_id"] for book in second["books"]], [3, 4])
+        self.assertIsNone((await self.call("list_books", page_size=2, after=second["next"]))["result"]["next"])
+
+    async def test_writes_of_many_clients_are_group_committed(self):
+        """Тест группового сохранения: изменения многих клиентов сохраняются меньшим числом записей на диск."""
+        save_books = JsonLibraryRepository._save_books
+        with mock.patch.object(JsonLibraryRepository, "_save_books", autospec=True, side_effect=save_books) as save:
+            results = await asyncio.gather(*(
+                self.call_many([
+                    {"id": i, "method": "add_book",
+                     "params": {"title": f"Книга {client}-{i}", "author": "Автор", "year": 2000}}
+                    for i in range(10)
+                ])
+                for client in range(5)
+            ))
+        book_ids = [response["result"] for responses in results for response in responses.values()]
+        self.assertEqual(sorted(book_ids), list(range(2, 52)))
+        self.assertLess(save.call_count, 50)
+        self.assertEqual(len(JsonLibraryRepository(self.data_file).books), 51)
+
+
+if __name__ == "__main__":
+    unittest.main()